@@ -23,6 +23,8 @@ from difflib import SequenceMatcher
 from pathlib import Path
 from typing import Any, Iterable, Mapping
 
+from notesreminder.lib.member_history import latest_scrape, roster_rows
+
 ROOT = Path(__file__).resolve().parent
 DB_PATH = ROOT / "reminders.db"
 MODELS_DIR = ROOT / "models"
@@ -143,22 +145,13 @@ class AuditCounts:
 
 def latest_roster_rows(conn: sqlite3.Connection, as_of: date) -> tuple[list[sqlite3.Row], dict[str, str]]:
     conn.row_factory = sqlite3.Row
-    table = conn.execute(
-        "SELECT 1 FROM sqlite_master WHERE type='table' "
-        "AND name='pike13_current_member_snapshots'"
-    ).fetchone()
-    if not table:
+    stamps = {slug: latest_scrape(conn, slug) for slug in ("westu-sor", "theheights-sor")}
+    latest = {slug: stamp for slug, stamp in stamps.items() if stamp}
+    if not latest:
         raise RuntimeError(
             "No corrected Pike13 roster snapshots. Run scrape_pike13_current_members.py first."
         )
-    latest = {
-        row["school_slug"]: row["scraped_at"]
-        for row in conn.execute(
-            "SELECT school_slug, MAX(scraped_at) scraped_at "
-            "FROM pike13_current_member_snapshots GROUP BY school_slug"
-        )
-    }
-    missing = {"westu-sor", "theheights-sor"} - set(latest)
+    missing = set(stamps) - set(latest)
     if missing:
         raise RuntimeError(f"Missing current roster snapshots for: {', '.join(sorted(missing))}")
     for slug, stamp in latest.items():
@@ -168,13 +161,7 @@ def latest_roster_rows(conn: sqlite3.Connection, as_of: date) -> tuple[list[sqli
             raise RuntimeError(f"Roster for {slug} is {age} days old; refresh before reporting")
     rows: list[sqlite3.Row] = []
     for slug, stamp in latest.items():
-        rows.extend(
-            conn.execute(
-                "SELECT * FROM pike13_current_member_snapshots "
-                "WHERE school_slug=? AND scraped_at=?",
-                (slug, stamp),
-            ).fetchall()
-        )
+        rows.extend(roster_rows(conn, slug, stamp))
     return rows, latest
 
 
@@ -3,6 +3,11 @@ import subprocess
 import sys
 from datetime import datetime, timedelta
 
+from notesreminder.lib.scrape_diagnostics import DIAGNOSTICS_MODES
+
+DEFAULT_PROFILE_DIR = "browser_profiles/sor_shared"
+DEFAULT_STATE_DB = "backfill_state.db"
+
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Backfill reminders DB for multiple schools.")
@@ -32,6 +37,51 @@ def parse_args():
         action="store_true",
         help="Enable verbose logging in run_daily.py",
     )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Scrape one shard per school per day on a pool of browser contexts, resumable via --state-db",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Concurrent shards in --parallel mode (default: schools x --site-cap if a browser broker "
+             "owns the profile, else 1)",
+    )
+    parser.add_argument(
+        "--site-cap",
+        type=int,
+        default=2,
+        help="Max concurrent shards per school in --parallel mode",
+    )
+    parser.add_argument(
+        "--min-interval",
+        type=float,
+        help="Min seconds between shard starts on the same school (default: $BACKFILL_SITE_MIN_INTERVAL_S or 2)",
+    )
+    parser.add_argument(
+        "--order",
+        choices=["oldest", "newest"],
+        default="oldest",
+        help="Which days to scrape first in --parallel mode",
+    )
+    parser.add_argument(
+        "--skip-s3-sync",
+        action="store_true",
+        help="In --parallel mode, merge into the local DB without downloading it from or uploading it to S3",
+    )
+    parser.add_argument("--state-db", default=DEFAULT_STATE_DB, help="Shard checkpoint DB for --parallel")
+    parser.add_argument("--db-path", help="Reminders DB to merge into in --parallel mode (default: run_daily's)")
+    parser.add_argument(
+        "--pike13-profile-dir",
+        default=DEFAULT_PROFILE_DIR,
+        help="Persistent browser profile for Pike13 authentication in --parallel mode",
+    )
+    parser.add_argument(
+        "--scrape-diagnostics",
+        choices=DIAGNOSTICS_MODES,
+        help="Playwright trace/screenshot policy for --parallel shards (default: $NOTES_SCRAPE_DIAGNOSTICS)",
+    )
     return parser.parse_args()
 
 
@@ -60,14 +110,92 @@ def run_school(school, start_date, end_date, no_email, verbose):
     subprocess.run(cmd, check=True)
 
 
+def run_parallel(args, start_date, end_date):
+    """Scrape and merge day shards, bracketed by the S3 round trip ``run_daily.py`` does.
+
+    The DB is downloaded once before the shards run and uploaded once after the
+    reporting tables are synced, so the next ``run_daily`` download keeps the
+    backfill. Shards merge with note scoring skipped, so backfilled notes are
+    left unscored.
+    """
+    import run_daily
+    from notesreminder.lib.browser_broker import broker_endpoint
+    from notesreminder.orchestration.backfill_scheduler import connect_state, run_scheduler
+    from notesreminder.orchestration.day_backfill import (
+        DayShardRunner,
+        SiteRateLimiter,
+        day_shards,
+        pike13_day_scraper,
+    )
+
+    if args.db_path:
+        run_daily.DB_PATH = args.db_path
+    if not args.skip_s3_sync:
+        run_daily.download_db_from_s3(run_daily.DB_PATH, run_daily.S3_BUCKET, run_daily.S3_KEY)
+    for ensure in (
+        run_daily.ensure_location_column,
+        run_daily.ensure_notes_columns,
+        run_daily.ensure_note_score_columns,
+        run_daily.ensure_pike13_column,
+        run_daily.ensure_unique_lesson_ids,
+    ):
+        ensure()
+
+    start = datetime.strptime(start_date, "%Y-%m-%d").date()
+    end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    shards = day_shards(args.schools, start, end, order=args.order)
+    workers = args.workers
+    if workers is None:
+        # Without a broker only one browser can hold the profile at a time.
+        workers = len(args.schools) * args.site_cap if broker_endpoint(args.pike13_profile_dir) else 1
+    site_caps = {shard.site: args.site_cap for shard in shards}
+    limiter = SiteRateLimiter() if args.min_interval is None else SiteRateLimiter(args.min_interval)
+    runner = DayShardRunner(
+        run_daily.DB_PATH,
+        pike13_day_scraper(args.pike13_profile_dir, args.scrape_diagnostics, args.verbose),
+        run_daily.update_reminders_from_dataframe,
+        rate_limiter=limiter,
+        verbose=args.verbose,
+    )
+    print(f"Backfilling {len(shards)} day shards for {', '.join(args.schools)} "
+          f"{start_date}..{end_date} with {workers} workers", flush=True)
+
+    def on_event(kind, shard, result):
+        if kind == "finish":
+            print(f"[{result['verdict']}] {shard.key} in {int(result['duration_s'])}s: "
+                  f"{result.get('detail')}", flush=True)
+
+    summary = run_scheduler(args.state_db, shards, runner, site_caps=site_caps,
+                            max_workers=workers, on_event=on_event)
+    conn = connect_state(args.state_db)
+    try:
+        keys = {shard.key for shard in shards}
+        statuses = [row["status"] for row in conn.execute(
+            "SELECT chunk_key, status FROM backfill_chunks WHERE source = ?", (shards[0].source,)
+        ) if row["chunk_key"] in keys] if shards else []
+    finally:
+        conn.close()
+    done = statuses.count("done")
+    if summary["attempted"]:
+        run_daily.sync_reporting_tables(run_daily.DB_PATH)
+        run_daily.sync_lesson_notes_to_reminders(run_daily.DB_PATH)
+        if not args.skip_s3_sync:
+            run_daily.upload_db_to_s3(run_daily.DB_PATH, run_daily.S3_BUCKET, run_daily.S3_KEY)
+    print(f"Ran {summary['attempted']} shards this run; {done}/{len(shards)} done", flush=True)
+    return 0 if done == len(shards) else 1
+
+
 def main():
     args = parse_args()
     start_date, end_date = args.start_date, args.end_date
     if not start_date or not end_date:
         start_date, end_date = default_dates()
+    if args.parallel:
+        return run_parallel(args, start_date, end_date)
     for school in args.schools:
         run_school(school, start_date, end_date, args.no_email, args.verbose)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
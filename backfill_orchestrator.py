@@ -2,13 +2,17 @@
 """Backfill orchestrator — runs per-source, per-month, with DeepSeek-pro verification.
 
 Design:
-- Serial execution (the warm Okta profile dir is shared; concurrent use clashes).
 - Each (source, school, month-chunk) is one unit of work.
+- Chunks run concurrently with a cap per site (each Pike13 school, Dialpad,
+  HubSpot, Gmail). The warm Okta profile dir can only be opened by one
+  browser, so the default is serial unless a browser broker
+  (scripts/browser_broker.py) owns the profile and leases contexts.
 - After each chunk, a before/after SQL check is sent to DeepSeek-pro (via the
   local litellm proxy, direct HTTP — no tool-call wrapper) which returns
   PASS/FAIL with a one-line reason.
-- Resume-safe: a progress JSON records every chunk's status; re-running skips
-  already-verified chunks.
+- Resume-safe: chunk state, timing and row deltas live in the backfill_chunks
+  table of backfill_state.db (atomic updates); re-running skips PASS chunks.
+  Verdicts from the legacy backfill_progress.json are imported once.
 - Per-chunk timeout so a hung extractor can't stall the whole run.
 - Final Telegram summary on completion.
 
@@ -16,6 +20,7 @@ Usage:
   python backfill_orchestrator.py            # run full plan Jan17->today
   python backfill_orchestrator.py --source pike13   # one source only
   python backfill_orchestrator.py --dry        # print plan, no execution
+  python backfill_orchestrator.py --status     # chunk states + rows/min per source
 """
 from __future__ import annotations
 
@@ -30,6 +35,17 @@ import urllib.request
 from datetime import date, datetime, timedelta
 from pathlib import Path
 
+from notesreminder.lib.browser_broker import broker_endpoint
+from notesreminder.orchestration.backfill_scheduler import (
+    ChunkSpec,
+    connect_state,
+    import_progress_json,
+    register_chunks,
+    run_scheduler,
+    status_counts,
+    throughput,
+)
+
 REPO = Path(__file__).resolve().parent
 DB = REPO / "reminders.db"
 LOG_DIR = REPO / "logs" / "backfill_chunks"
@@ -38,6 +54,7 @@ PROFILE = REPO / "browser_profiles" / "sor_shared"
 VENV_PY = Path.home() / ".hermes" / "env" / "bin" / "python"
 PY = str(VENV_PY if VENV_PY.exists() else "python3")
 PROGRESS = REPO / "backfill_progress.json"
+STATE_DB = REPO / "backfill_state.db"
 LOG = REPO / "backfill_run.log"
 
 SCHOOLS = ["westu-sor", "theheights-sor"]
@@ -66,10 +83,6 @@ def load_progress() -> dict:
     return {"chunks": {}}
 
 
-def save_progress(p: dict):
-    PROGRESS.write_text(json.dumps(p, indent=2, default=str))
-
-
 def month_chunks(start: date, end: date):
     """Yield (chunk_start, chunk_end) one calendar month at a time, inclusive."""
     y, m = start.year, start.month
@@ -100,11 +113,13 @@ def jobs_for(source: str, start: str, end: str, school: str | None) -> list[dict
                     "--pike13-profile-dir", prof, "--no-email",
                     "--skip-note-scoring", "--skip-s3-sync",
                     "--db-path", str(DB)],
+            # Scoped to the school so concurrent school chunks don't see
+            # each other's inserts in their row deltas.
             "verify_sql": (
                 "SELECT COUNT(*) FROM lessons WHERE lesson_date BETWEEN ? AND ? "
-                "AND school_id IS NOT NULL"
+                "AND school_id = (SELECT school_id FROM schools WHERE school_code = ?)"
             ),
-            "verify_params": [start, end],
+            "verify_params": [start, end, school],
             "verify_table": "lessons",
         }]
     if source == "dialpad_sms":
@@ -162,6 +177,23 @@ def jobs_for(source: str, start: str, end: str, school: str | None) -> list[dict
 
 ALL_SOURCES = ["pike13", "dialpad_sms", "dialpad_voice", "hubspot", "school_email"]
 
+# Chunks on the same site share a concurrency cap; different sites run together.
+SITE_CAPS_DEFAULT = 1
+
+
+def site_for(source: str, school: str | None) -> str:
+    if source == "pike13":
+        return f"pike13:{school}"
+    if source.startswith("dialpad"):
+        return "dialpad"
+    if source == "school_email":
+        return "gmail"
+    return source
+
+
+def chunk_key(source: str, school: str | None, start: str) -> str:
+    return f"{source}:{school or '-'}:{start}"
+
 
 def count_rows(sql: str, params: list) -> int:
     c = sqlite3.connect(str(DB))
@@ -214,7 +246,7 @@ VERDICT: PASS|FAIL — <one-line reason>"""
 
 
 def run_chunk(job: dict, start: str, end: str) -> dict:
-    key = f"{job['source']}:{job.get('school') or '-'}:{start}"
+    key = chunk_key(job["source"], job.get("school"), start)
     before = count_rows(job["verify_sql"], job["verify_params"])
     max_before = None
     log(f"[START] {key}  cmd={' '.join(job['cmd'])}")
@@ -274,73 +306,130 @@ def _date_col(table: str) -> str:
     }.get(table, "rowid")
 
 
+def build_plan(sources: list[str], start: date, end: date, school: str | None,
+               order: str = "oldest") -> list[ChunkSpec]:
+    months = list(month_chunks(start, end))
+    if order == "newest":
+        months.reverse()
+    plan = []
+    for month_rank, (cs, ce) in enumerate(months):
+        s, e = cs.isoformat(), ce.isoformat()
+        for source_rank, src in enumerate(sources):
+            if src == "pike13":
+                schools = [school] if school else SCHOOLS
+            else:
+                schools = [school]
+            for sch in schools:
+                plan.append(ChunkSpec(
+                    key=chunk_key(src, sch, s), source=src, school=sch, start=s, end=e,
+                    site=site_for(src, sch),
+                    priority=month_rank * len(ALL_SOURCES) + source_rank,
+                ))
+    return plan
+
+
+def execute_spec(spec: ChunkSpec) -> dict:
+    results = [run_chunk(job, spec.start, spec.end)
+               for job in jobs_for(spec.source, spec.start, spec.end, spec.school)]
+    failed = [r for r in results if r["verdict"] != "PASS"]
+    result = failed[0] if failed else results[0]
+    return {**result, "before": sum(r["before"] for r in results),
+            "after": sum(r["after"] for r in results)}
+
+
+def print_status(conn):
+    print("Chunk states:", json.dumps(status_counts(conn), sort_keys=True))
+    for source, stats in throughput(conn).items():
+        print(f"  {source:14s} chunks={stats['chunks']:4d} rows={stats['rows_added']:7d} "
+              f"rows/min={stats['rows_per_minute']:8.2f}")
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--source", help="limit to one source")
     ap.add_argument("--school", help="limit pike13 to one school")
     ap.add_argument("--dry", action="store_true", help="print plan only")
+    ap.add_argument("--status", action="store_true", help="print chunk states and throughput, then exit")
     ap.add_argument("--start", default="2026-01-17", help="global start YYYY-MM-DD")
     ap.add_argument("--end", default=date.today().isoformat(), help="global end YYYY-MM-DD")
+    ap.add_argument("--order", choices=["oldest", "newest"], default="oldest",
+                    help="which months to run first")
+    ap.add_argument("--workers", type=int,
+                    help="max concurrent chunks (default: one per site if a browser broker owns the "
+                         "profile, else 1)")
+    ap.add_argument("--site-cap", type=int, default=SITE_CAPS_DEFAULT,
+                    help="max concurrent chunks per site")
+    ap.add_argument("--state-db", default=str(STATE_DB))
     args = ap.parse_args()
 
+    if args.status:
+        conn = connect_state(args.state_db)
+        print_status(conn)
+        conn.close()
+        return
+
     sources = [args.source] if args.source else ALL_SOURCES
     start = datetime.strptime(args.start, "%Y-%m-%d").date()
     end = datetime.strptime(args.end, "%Y-%m-%d").date()
+    plan = build_plan(sources, start, end, args.school, args.order)
+    sites = sorted({spec.site for spec in plan})
 
-    # Build plan
-    plan = []
-    for src in sources:
-        for (cs, ce) in month_chunks(start, end):
-            s, e = cs.isoformat(), ce.isoformat()
-            for sch in (SCHOOLS if src == "pike13" else [args.school]):
-                if src != "pike13" and args.school:
-                    sch = args.school
-                elif src != "pike13":
-                    sch = None
-                plan.append((src, sch, s, e))
-
-    log(f"PLAN: {len(plan)} chunks across sources={sources} {start}..{end}")
+    log(f"PLAN: {len(plan)} chunks across sources={sources} sites={sites} {start}..{end}")
     if args.dry:
-        for src, sch, s, e in plan:
-            print(f"  {src:14s} {sch or '-':14s} {s}..{e}")
+        for spec in plan:
+            print(f"  p{spec.priority:<4d} {spec.source:14s} {spec.school or '-':14s} {spec.start}..{spec.end}")
         return
 
-    progress = load_progress()
-    done = 0
-    passed = 0
-    failed = 0
-    for (src, sch, s, e) in plan:
-        jobs = jobs_for(src, s, e, sch)
-        for job in jobs:
-            key = f"{job['source']}:{job.get('school') or '-'}:{s}"
-            prev = progress["chunks"].get(key)
-            if prev and prev.get("verdict") == "PASS":
-                log(f"[SKIP ] {key} already PASS")
-                done += 1; passed += 1
-                continue
-            res = run_chunk(job, s, e)
-            progress["chunks"][key] = res
-            save_progress(progress)
-            done += 1
-            if res["verdict"] == "PASS":
-                passed += 1
-            else:
-                failed += 1
-
-    log(f"COMPLETE: {done} chunks, {passed} PASS, {failed} FAIL")
+    workers = args.workers
+    if workers is None:
+        workers = len(sites) if broker_endpoint(PROFILE) else 1
+        if workers == 1:
+            log("No browser broker owns the shared profile; running chunks serially.")
+    site_caps = {site: args.site_cap for site in sites}
+
+    conn = connect_state(args.state_db)
+    register_chunks(conn, plan)
+    imported = import_progress_json(conn, load_progress())
+    if imported:
+        log(f"Imported {imported} PASS chunks from {PROGRESS.name}")
+    conn.close()
+
+    def on_event(kind, spec, result):
+        if kind == "start":
+            log(f"[QUEUE] {spec.key} site={spec.site} p={spec.priority}")
+            return
+        delta = (result.get("after") or 0) - (result.get("before") or 0)
+        rpm = result["throughput"].get("rows_per_minute")
+        log(f"[RATE ] {spec.key} {result['verdict']} delta={delta} in {int(result['duration_s'])}s"
+            f" | {spec.source} {rpm} rows/min")
+
+    summary = run_scheduler(args.state_db, plan, execute_spec, site_caps=site_caps,
+                            max_workers=workers, on_event=on_event)
+
+    conn = connect_state(args.state_db)
+    keys = [spec.key for spec in plan]
+    rows = conn.execute(
+        f"SELECT chunk_key, verdict, detail FROM backfill_chunks WHERE chunk_key IN ({','.join('?' * len(keys))})",
+        keys,
+    ).fetchall() if keys else []
+    passed = sum(1 for r in rows if r["verdict"] == "PASS")
+    fails = [(r["chunk_key"], r["detail"] or "") for r in rows if r["verdict"] != "PASS"]
+    log(f"COMPLETE: {len(rows)} chunks, {passed} PASS, {len(fails)} FAIL "
+        f"(ran {summary['attempted']} this run with {workers} workers)")
+    for source, stats in summary["throughput"].items():
+        log(f"  {source}: {stats['rows_added']} rows in {stats['minutes']} min = {stats['rows_per_minute']} rows/min")
+    conn.close()
     # Telegram summary
     try:
-        import importlib
         sys.path.insert(0, str(REPO))
         from okta_auth.config import get_config
         from telegram import Bot
         c = get_config()
-        fails = [k for k, v in progress["chunks"].items() if v.get("verdict") != "PASS"]
         msg = (f"📊 BACKFILL COMPLETE\n"
-               f"Chunks: {done} | PASS: {passed} | FAIL: {failed}\n"
+               f"Chunks: {len(rows)} | PASS: {passed} | FAIL: {len(fails)}\n"
                f"Window: {start}..{end}\n")
         if fails:
-            msg += "FAILURES:\n" + "\n".join(f"  • {k}: {progress['chunks'][k].get('deepseek','')[:80]}" for k in fails[:15])
+            msg += "FAILURES:\n" + "\n".join(f"  • {k}: {detail[:80]}" for k, detail in fails[:15])
         else:
             msg += "All chunks verified by DeepSeek-pro. 🎉"
         async def _s():
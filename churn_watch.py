@@ -6,10 +6,10 @@ Design: Don't flood with 300 names. Surface the 30-40 students who need
 a concrete action TODAY. Each student gets ONE recommended action.
 """
 
-import os, sqlite3, re
 from datetime import date, timedelta
 import pandas as pd
-import numpy as np
+
+from notesreminder.lib.analytics_snapshot import load_frames
 
 DB = "reminders.db"
 MDIR = "models"
@@ -18,29 +18,14 @@ SCHOOLS = {1: "West University Place", 2: "The Heights"}
 
 
 def load_data():
-    c = sqlite3.connect(DB)
-    lessons = pd.read_sql_query("""
-        SELECT lesson_id, school_id, instructor_id, lesson_date, lesson_time,
-               lesson_type, students_raw
-        FROM lessons WHERE students_raw IS NOT NULL AND students_raw != ''
-    """, c)
-    notes = pd.read_sql_query("""
-        SELECT lesson_id, note_completed, note_score FROM lesson_notes
-    """, c)
-    c.close()
+    frames = load_frames(DB, ["student_lessons", "lesson_notes"])
+    lessons = frames["student_lessons"][[
+        "lesson_id", "school_id", "instructor_id", "lesson_date", "lesson_time",
+        "lesson_type", "student_name",
+    ]].reset_index(drop=True)
+    notes = frames["lesson_notes"][["lesson_id", "note_completed", "note_score"]]
     lessons["lesson_date"] = pd.to_datetime(lessons["lesson_date"])
-    rows = []
-    for _, r in lessons.iterrows():
-        names = [n.strip() for n in re.split(r',\s*', str(r["students_raw"])) if n.strip()]
-        for name in names:
-            rows.append(dict(
-                lesson_id=r["lesson_id"], school_id=r["school_id"],
-                instructor_id=r["instructor_id"],
-                lesson_date=r["lesson_date"], lesson_time=r["lesson_time"],
-                lesson_type=r["lesson_type"],
-                student_name=name,
-            ))
-    return pd.DataFrame(rows), notes
+    return lessons, notes
 
 
 def compute_features(lessons, notes, today):
@@ -4,11 +4,13 @@ email_sentiment_v2.py — Smart student matching for school emails.
 Three strategies: (1) email exact match, (2) name in subject/body/snippet,
 (3) thread propagation. Then scores sentiment and computes per-student features.
 """
-import sqlite3, json, csv, requests, re, time
+import sqlite3, csv, re
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict, Counter
 
+from notesreminder.lib.llm_gateway import LLMRequest, run_completions
+
 DB_PATH = Path(__file__).parent / "reminders.db"
 MODELS_DIR = Path(__file__).parent / "models"
 
@@ -154,9 +156,9 @@ For each email snippet, return:
   "info_only", or "other"
 Return JSON array: [{"idx": 0, "sentiment": "neutral", "intent": "info_only"}]"""
 
-    results = []
-    for b in range(0, len(emails), batch_size):
-        batch = emails[b:b+batch_size]
+    batches = [emails[b:b+batch_size] for b in range(0, len(emails), batch_size)]
+    requests = []
+    for batch in batches:
         snippets = []
         for i, e in enumerate(batch):
             body = (e.get("body") or "")[:300].replace("\n", " ")
@@ -164,40 +166,28 @@ Return JSON array: [{"idx": 0, "sentiment": "neutral", "intent": "info_only"}]""
             snippets.append(f"[{i}] {subj} | {body}")
 
         prompt = "Classify:\n\n" + "\n\n".join(snippets)
+        requests.append(LLMRequest.chat(SYSTEM, prompt, model="gpt-4o-mini", temperature=0.2,
+                                        max_tokens=1500, json_mode=True, key=batch))
 
-        headers = {"Authorization": f"Bearer {OPENAI_KEY}", "Content-Type": "application/json"}
-        body_req = {
-            "model": "gpt-4o-mini",
-            "messages": [
-                {"role": "system", "content": SYSTEM},
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": 0.2, "max_tokens": 1500,
-            "response_format": {"type": "json_object"}
-        }
+    responses, summary = run_completions(requests, api_key=OPENAI_KEY, caller="email_sentiment_v2")
 
+    results = []
+    for response in responses:
+        batch = response.request.key
+        if not response.ok:
+            print(f"    Batch error: {response.error}")
+            continue
         try:
-            r = requests.post("https://api.openai.com/v1/chat/completions",
-                            headers=headers, json=body_req, timeout=120)
-            if r.status_code == 200:
-                data = r.json()
-                content = data["choices"][0]["message"]["content"]
-                scores = json.loads(content)
-                if isinstance(scores, dict):
-                    for k in scores:
-                        if isinstance(scores[k], list):
-                            scores = scores[k]
-                            break
-                for s in scores:
-                    idx = s.get("idx", -1)
-                    if isinstance(idx, int) and 0 <= idx < len(batch):
-                        results.append({**batch[idx], "sentiment": s.get("sentiment", "neutral"),
-                                       "intent": s.get("intent", "info_only")})
-            else:
-                print(f"    Batch error: {r.status_code}")
-        except Exception as ex:
+            scores = response.json_list()
+        except ValueError as ex:
             print(f"    Batch error: {ex}")
-        time.sleep(0.3)
+            continue
+        for s in scores:
+            idx = s.get("idx", -1)
+            if isinstance(idx, int) and 0 <= idx < len(batch):
+                results.append({**batch[idx], "sentiment": s.get("sentiment", "neutral"),
+                               "intent": s.get("intent", "info_only")})
+    print(f"    LLM: {summary['requests']} batches, {summary['cache_hits']} cached, ${summary['cost_usd']:.4f}")
 
     return results
 
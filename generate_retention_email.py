@@ -11,13 +11,15 @@ For EVERY flagged student, pulls from ALL data sources:
 
 No generic advice. Every recommendation is grounded in real data.
 """
-import pickle, sys, sqlite3, re, json
+import pickle, sys, re, json
 from pathlib import Path
 from datetime import date, timedelta
 from collections import defaultdict
 import pandas as pd
 import numpy as np
 
+from notesreminder.lib.analytics_snapshot import load_frames
+
 PROJ = Path(__file__).parent
 MODELS_DIR = PROJ / "models"
 DB_PATH = PROJ / "reminders.db"
@@ -34,32 +36,29 @@ TODAY = date.today()
 
 def load_all_data():
     """Pre-load all tables into memory. Returns (notes_df, comms_lookup, people_lookup)."""
-    con = sqlite3.connect(str(DB_PATH))
+    frames = load_frames(DB_PATH, [
+        "lessons", "pike13_clients", "pike13_people", "dialpad_voicemails",
+        "dialpad_sms_threads", "dialpad_sms_messages", "dialpad_call_reviews", "school_email_messages",
+    ])
     
     # Lesson notes with student info
-    notes_raw = pd.read_sql_query("""
-        SELECT l.students_raw, l.lesson_date, l.instructor_id, 
-               ln.note_score, ln.note_completed, ln.notes_text, l.lesson_type,
-               l.school_id
-        FROM lessons l
-        LEFT JOIN lesson_notes ln ON l.lesson_id = ln.lesson_id
-        WHERE l.students_raw IS NOT NULL AND l.students_raw != ''
-    """, con)
+    lessons = frames["lessons"]
+    notes_raw = lessons.loc[
+        lessons["students_raw"].notna() & (lessons["students_raw"] != ""),
+        ["students_raw", "lesson_date", "instructor_id", "note_score", "note_completed", "notes_text", "lesson_type", "school_id"],
+    ].reset_index(drop=True)
     notes_raw["lesson_date"] = pd.to_datetime(notes_raw["lesson_date"])
     
     # ── Pike13 clients — plan hold status + dependents ──
-    clients_df = pd.read_sql_query("""
-        SELECT "Client" as client_name, "Dependents" as dependents, "Has Plan on Hold?" as on_hold
-        FROM pike13_clients
-    """, con)
+    clients_df = frames["pike13_clients"].rename(columns={"Client": "client_name", "Dependents": "dependents", "Has Plan on Hold?": "on_hold"})
     
     # Build client → on_hold lookup + dependent → client lookup
     client_on_hold = {}
     dependent_to_client = {}
-    for _, r in clients_df.iterrows():
-        cname = str(r.get("client_name", "")).strip().lower()
-        on_hold = str(r.get("on_hold", "")).strip().lower() == "yes"
-        deps = str(r.get("dependents", ""))
+    for client_name, on_hold, deps in zip(clients_df["client_name"], clients_df["on_hold"], clients_df["dependents"]):
+        cname = str(client_name).strip().lower()
+        on_hold = str(on_hold).strip().lower() == "yes"
+        deps = str(deps)
         if cname:
             client_on_hold[cname] = on_hold
         for dep in re.split(r'[,;\n]+', deps):
@@ -69,47 +68,38 @@ def load_all_data():
     
     # Pike13 people — name → phone/email
     people = {}
-    ppl = pd.read_sql_query("SELECT person_id, full_name, email, phone, phone_normalized FROM pike13_people", con)
-    for _, r in ppl.iterrows():
-        name = str(r.get("full_name", "")).strip()
+    ppl = frames["pike13_people"]
+    for full_name, email, phone_normalized in zip(ppl["full_name"], ppl["email"], ppl["phone_normalized"]):
+        name = str(full_name).strip()
         if name:
             people[name.lower()] = {
-                "phone": str(r.get("phone_normalized", r.get("phone", "")) or ""),
-                "email": str(r.get("email", "")) or "",
+                "phone": str(phone_normalized or ""),
+                "email": str(email) or "",
             }
     
     # Voicemails — external_number → transcript
-    vms = pd.read_sql_query("""
-        SELECT external_number, date, transcription_text, name as caller_name
-        FROM dialpad_voicemails 
-        WHERE transcription_text IS NOT NULL AND transcription_text != ''
-    """, con)
+    vms = frames["dialpad_voicemails"].rename(columns={"name": "caller_name"})
+    vms = vms[vms["transcription_text"].notna() & (vms["transcription_text"] != "")]
     
     # SMS — phone numbers from threads
-    sms_threads = pd.read_sql_query("""
-        SELECT thread_id, phone, phone_normalized FROM dialpad_sms_threads
-    """, con)
-    sms_msgs = pd.read_sql_query("""
-        SELECT thread_id, message_at, direction, body 
-        FROM dialpad_sms_messages 
-        WHERE body IS NOT NULL AND body != ''
-    """, con)
+    sms_threads = frames["dialpad_sms_threads"][["thread_id", "phone", "phone_normalized"]]
+    sms_msgs = frames["dialpad_sms_messages"]
+    sms_msgs = sms_msgs.loc[sms_msgs["body"].notna() & (sms_msgs["body"] != ""), ["thread_id", "message_at", "direction", "body"]]
     sms = sms_msgs.merge(sms_threads, on="thread_id", how="left")
     
     # Call reviews — staff notes on parent calls (transcripts)
-    reviews = pd.read_sql_query("""
-        SELECT call_id, transcript_text, recap_text, event_at
-        FROM dialpad_call_reviews
-        WHERE transcript_text IS NOT NULL AND transcript_text != ''
-    """, con)
+    reviews = frames["dialpad_call_reviews"]
+    reviews = reviews.loc[
+        reviews["transcript_text"].notna() & (reviews["transcript_text"] != ""),
+        ["call_id", "transcript_text", "recap_text", "event_at"],
+    ].reset_index(drop=True)
     
     # School emails
-    emails = pd.read_sql_query("""
-        SELECT message_id, subject, snippet, body, from_email, from_email_normalized, message_at
-        FROM school_email_messages
-        WHERE (snippet IS NOT NULL AND snippet != '')
-           OR (body IS NOT NULL AND body != '')
-    """, con)
+    emails = frames["school_email_messages"]
+    emails = emails.loc[
+        (emails["snippet"].notna() & (emails["snippet"] != "")) | (emails["body"].notna() & (emails["body"] != "")),
+        ["message_id", "subject", "snippet", "body", "from_email", "from_email_normalized", "message_at"],
+    ].reset_index(drop=True)
     
     # Comm sentiment (pre-computed)
     sent_path = MODELS_DIR / "comm_sentiment.csv"
@@ -129,30 +119,27 @@ def load_all_data():
                 total_dissat_hits=int(r.get("total_dissat_hits", 0) or 0),
             )
     
-    con.close()
-    
     # Build phone → voicemails lookup
     phone_vms = defaultdict(list)
-    for _, r in vms.iterrows():
-        phone = str(r.get("external_number", "")).strip()
+    for external_number, vm_date, text, caller in zip(vms["external_number"], vms["date"], vms["transcription_text"], vms["caller_name"]):
+        phone = str(external_number).strip()
         if phone:
             phone_vms[phone].append({
-                "date": str(r.get("date", ""))[:19],
-                "text": str(r.get("transcription_text", ""))[:200],
-                "caller": str(r.get("caller_name", "")),
+                "date": str(vm_date)[:19],
+                "text": str(text)[:200],
+                "caller": str(caller),
             })
     
     # Build phone → SMS lookup  
     phone_sms = defaultdict(list)
-    for _, r in sms.iterrows():
-        phone = str(r.get("phone_normalized", r.get("phone", "")) or "").strip()
-        phone = re.sub(r'\D', '', phone)
+    for phone_normalized, message_at, direction, body in zip(sms["phone_normalized"], sms["message_at"], sms["direction"], sms["body"]):
+        phone = re.sub(r'\D', '', str(phone_normalized or "").strip())
         if len(phone) >= 10:
-            body = str(r.get("body", ""))[:200]
+            body = str(body)[:200]
             if body.strip():
                 phone_sms[phone].append({
-                    "date": str(r.get("message_at", ""))[:19],
-                    "direction": str(r.get("direction", "")),
+                    "date": str(message_at)[:19],
+                    "direction": str(direction),
                     "body": body,
                 })
     
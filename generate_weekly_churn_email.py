@@ -14,13 +14,13 @@ Usage:
     python3 generate_weekly_churn_email.py --send             # Generate + send
     python3 generate_weekly_churn_email.py --output email.md  # Save to file
 """
-import sqlite3, json, pickle, csv, re
+import sqlite3, json, pickle, csv
 from pathlib import Path
 from datetime import date, datetime, timedelta
-from collections import defaultdict
-import numpy as np
 import pandas as pd
 
+from notesreminder.lib.analytics_snapshot import iter_rows, load_frames
+
 DB_PATH = Path(__file__).parent / "reminders.db"
 MODELS_DIR = Path(__file__).parent / "models"
 MODEL_PATH = MODELS_DIR / "churn_model_v14_final_enhanced.pkl"
@@ -43,36 +43,34 @@ def load_model():
 
 
 def load_all_data():
-    con = sqlite3.connect(str(DB_PATH))
-    con.row_factory = sqlite3.Row
+    frames = load_frames(DB_PATH, ["student_lessons", "lessons", "lesson_notes", "pike13_people"])
     
-    # Students with lessons
-    lessons = pd.read_sql_query("""
-        SELECT lesson_id, lesson_date, students_raw, school_id, instructor_id
-        FROM lessons WHERE students_raw IS NOT NULL AND students_raw != ''
-    """, con)
-    lessons["lesson_date"] = pd.to_datetime(lessons["lesson_date"])
+    # Students with lessons (one row per student per lesson)
+    student_lessons = frames["student_lessons"]
+    con = sqlite3.connect(str(DB_PATH))
+    instructors = pd.read_sql_query("SELECT instructor_id, instructor_name FROM instructors", con)
+    con.close()
+    evidence = build_student_evidence(student_lessons, frames["lessons"], instructors)
+    student_lessons["lesson_date"] = pd.to_datetime(student_lessons["lesson_date"])
     
     # Notes
-    notes = pd.read_sql_query(
-        "SELECT lesson_id, note_score, note_score_explanation FROM lesson_notes WHERE note_score IS NOT NULL",
-        con
-    )
+    notes = frames["lesson_notes"]
+    notes = notes.loc[notes["note_score"].notna(), ["lesson_id", "note_score", "note_score_explanation"]].reset_index(drop=True)
     
     # Pike13 people
     people = {}
-    for row in con.execute("""
-        SELECT full_name, first_name, last_name, email_normalized, phone_normalized, 
-               membership_state, school
-        FROM pike13_people WHERE full_name IS NOT NULL AND full_name != ''
-    """):
-        key = (row["full_name"] or "").strip().lower()
+    ppl = frames["pike13_people"]
+    ppl = ppl[ppl["full_name"].notna() & (ppl["full_name"] != "")]
+    for full_name, first_name, email, phone, membership, school in iter_rows(
+        ppl, ["full_name", "first_name", "email_normalized", "phone_normalized", "membership_state", "school"]
+    ):
+        key = (full_name or "").strip().lower()
         if key == "loading":
             continue
         people[key] = {
-            "full_name": row["full_name"], "first_name": row["first_name"] or "",
-            "email": row["email_normalized"] or "", "phone": row["phone_normalized"] or "",
-            "membership": row["membership_state"] or "", "school": row["school"] or "",
+            "full_name": full_name, "first_name": first_name or "",
+            "email": email or "", "phone": phone or "",
+            "membership": membership or "", "school": school or "",
         }
     
     # Engagement
@@ -93,25 +91,39 @@ def load_all_data():
         with open(TRACKING_PATH) as f:
             prev_recs = json.load(f)
     
-    con.close()
-    return lessons, notes, people, engagement, leavers, prev_recs
+    return student_lessons, notes, people, engagement, leavers, prev_recs, evidence
+
+
+def build_student_evidence(student_lessons, lessons, instructors):
+    """Latest lesson, scored note and note explanation per student (keyed by lower-cased name).
+
+    Built once from the preloaded tables so reasons, actions and talking points
+    need no per-student queries. ``lesson_date`` is still the stored text here,
+    so ordering matches ``ORDER BY lesson_date`` in SQLite.
+    """
+    rows = student_lessons[["student_key", "lesson_id", "lesson_date", "lesson_type", "instructor_id", "note_score"]]
+    rows = rows.merge(lessons[["lesson_id", "note_score_explanation"]].drop_duplicates("lesson_id"), on="lesson_id", how="left")
+    rows = rows.merge(instructors.drop_duplicates("instructor_id"), on="instructor_id", how="left")
+    rows = rows[rows["lesson_date"].notna()].sort_values("lesson_date", kind="stable")
+
+    def latest(frame, columns):
+        last = frame.drop_duplicates("student_key", keep="last").set_index("student_key")
+        return {key: values for key, values in zip(last.index, iter_rows(last, columns))}
+
+    return {
+        "last_lesson": latest(rows, ["lesson_type", "lesson_date", "instructor_name"]),
+        "last_scored_note": latest(rows[rows["note_score"].notna()], ["note_score", "lesson_date", "lesson_type", "instructor_name"]),
+        "last_note_explanation": latest(rows[rows["note_score_explanation"].notna()], ["note_score_explanation", "lesson_date"]),
+    }
 
 
 # ─── 2. FEATURE COMPUTATION ───
 
-def expand_students(lessons_df):
-    rows = []
-    for _, r in lessons_df.iterrows():
-        for n in re.split(r',\s*', str(r["students_raw"])):
-            if n.strip():
-                rows.append({
-                    "student": n.strip().lower(),
-                    "lesson_id": r["lesson_id"],
-                    "lesson_date": r["lesson_date"],
-                    "school_id": r["school_id"],
-                    "instructor_id": r["instructor_id"],
-                })
-    return pd.DataFrame(rows)
+def expand_students(student_lessons):
+    """Rows keyed by lower-cased student name; the snapshot's student_lessons is already exploded."""
+    return student_lessons.rename(columns={"student_key": "student"})[
+        ["student", "lesson_id", "lesson_date", "school_id", "instructor_id"]
+    ].reset_index(drop=True)
 
 
 def compute_features(student_name, group, notes_df, engagement, ref_date):
@@ -157,46 +169,96 @@ def compute_features(student_name, group, notes_df, engagement, ref_date):
     }
 
     e = engagement.get(student_name, {})
-    eng_keys = [
-        "comms_engagement_avg_risk", "comms_engagement_total",
-        "comms_engagement_cancellation_rate", "comms_engagement_praise_rate",
-        "comms_engagement_inquiry_rate", "comms_engagement_positive_ratio",
-        "comms_engagement_negative_ratio", "comms_engagement_risk_volatility",
-    ]
-    for k in eng_keys:
+    for k in ENGAGEMENT_KEYS:
         row[k] = float(e.get(k, 0))
 
     return row
 
 
+ENGAGEMENT_KEYS = [
+    "comms_engagement_avg_risk", "comms_engagement_total",
+    "comms_engagement_cancellation_rate", "comms_engagement_praise_rate",
+    "comms_engagement_inquiry_rate", "comms_engagement_positive_ratio",
+    "comms_engagement_negative_ratio", "comms_engagement_risk_volatility",
+]
+
+
+def build_feature_matrix(expanded, notes_df, engagement, ref_date, active_days=90):
+    """``compute_features`` for every student at once, one row per active student.
+
+    A student is active when their latest lesson (scheduled ones included) is at
+    most ``active_days`` before ``ref_date``; like ``compute_features``, students
+    with fewer than 5 lessons up to ``ref_date`` are left out.
+    """
+    ref_ts = pd.Timestamp(ref_date)
+    last_any = expanded.groupby("student")["lesson_date"].max()
+    active = last_any.index[(ref_ts - last_any).dt.days <= active_days]
+    pre = expanded[expanded["student"].isin(active) & (expanded["lesson_date"] <= ref_ts)]
+    pre = pre.sort_values(["student", "lesson_date"], kind="stable")
+    d30, d60, d90 = ref_ts - timedelta(days=30), ref_ts - timedelta(days=60), ref_ts - timedelta(days=90)
+
+    dates = pre["lesson_date"]
+    by_student = pre.assign(
+        in_30=dates >= d30,
+        in_60=dates >= d60,
+        in_90=dates >= d90,
+        older=(dates >= d60) & (dates < d30),
+        gap=dates.groupby(pre["student"]).diff().dt.days,
+    ).groupby("student")
+    m = by_student.agg(
+        total_lessons=("lesson_id", "size"),
+        lessons_30d=("in_30", "sum"),
+        lessons_60d=("in_60", "sum"),
+        lessons_90d=("in_90", "sum"),
+        older=("older", "sum"),
+        first=("lesson_date", "min"),
+        last=("lesson_date", "max"),
+        max_gap_days=("gap", "max"),
+        avg_gap_days=("gap", "mean"),
+        gap_std=("gap", "std"),
+        n_gaps=("gap", "count"),
+    )
+    m = m[m["total_lessons"] >= 5]
+
+    m["freq_decline_ratio"] = m["lessons_30d"] / m["older"].clip(lower=1)
+    m["days_since_last"] = (ref_ts - m["last"]).dt.days
+    m["tenure_days"] = (ref_ts - m["first"]).dt.days
+    m["max_gap_days"] = m["max_gap_days"].where(m["n_gaps"] > 0, 0).astype(int)
+    m["avg_gap_days"] = m["avg_gap_days"].where(m["n_gaps"] > 0, 999)
+    m["gap_std"] = m["gap_std"].where(m["n_gaps"] > 1, 0)
+
+    # Share of recent lessons taught by the student's most frequent instructor.
+    recent = pre[pre["lesson_date"] >= d90]
+    top_instructor = recent.groupby(["student", "instructor_id"]).size().groupby(level="student").max()
+    m["teacher_consistency"] = (top_instructor / recent.groupby("student").size()).reindex(m.index).fillna(0)
+
+    scores = pre[["student", "lesson_id"]].merge(notes_df[["lesson_id", "note_score"]], on="lesson_id", how="left")
+    m["avg_note_score"] = scores.groupby("student")["note_score"].mean().reindex(m.index).fillna(0.0)
+
+    for k in ENGAGEMENT_KEYS:
+        m[k] = [float(engagement.get(name, {}).get(k, 0)) for name in m.index]
+
+    return m.drop(columns=["older", "first", "last", "n_gaps"])
+
+
 # ─── 3. CHURN PREDICTION ───
 
 def predict_churn(expanded, notes_df, people, engagement, model_artifact):
-    """Compute churn probabilities for all active students."""
+    """Compute churn probabilities for all active students in one batch."""
     model = model_artifact["model"]
     scaler = model_artifact["scaler"]
     features = model_artifact["features"]
-    today_ts = pd.Timestamp(TODAY)
+    
+    matrix = build_feature_matrix(expanded, notes_df, engagement, TODAY)
+    if matrix.empty:
+        return {}
+    
+    # Feature matrix in the model's expected order; missing features score as 0.
+    X = matrix.reindex(columns=features, fill_value=0).to_numpy(dtype=float)
+    probs = model.predict_proba(scaler.transform(X))[:, 1]
     
     predictions = {}
-    for name, group in expanded.groupby("student"):
-        name_l = name.strip().lower()
-        last = group["lesson_date"].max()
-        if (today_ts - last).days > 90:
-            continue  # Inactive
-        
-        feat = compute_features(name_l, group, notes_df, engagement, TODAY)
-        if feat is None:
-            continue
-        
-        # Build feature vector in model's expected order
-        X = []
-        for f in features:
-            X.append(feat.get(f, 0))
-        X = np.array(X).reshape(1, -1)
-        Xs = scaler.transform(X)
-        prob = model.predict_proba(Xs)[0, 1]
-        
+    for (name_l, feat), prob in zip(matrix.to_dict("index").items(), probs):
         info = people.get(name_l, {})
         predictions[name_l] = {
             "name": info.get("full_name", name_l),
@@ -214,7 +276,7 @@ def predict_churn(expanded, notes_df, people, engagement, model_artifact):
 
 # ─── 4. REASON GENERATION ───
 
-def generate_reasons(feat, student_name, con):
+def generate_reasons(feat):
     """Generate human-readable churn reasons from features."""
     reasons = []
     
@@ -244,7 +306,7 @@ def generate_reasons(feat, student_name, con):
     return reasons
 
 
-def generate_actions(feat, student_info, student_name, con):
+def generate_actions(feat, student_info, student_name, evidence):
     """Generate specific, actionable recommendations based on data signals."""
     actions = []
     days = feat["days_since_last"]
@@ -272,14 +334,7 @@ def generate_actions(feat, student_info, student_name, con):
         actions.append(f"Lesson frequency has dropped. Ask whether the current pace still works — suggest consolidating to fewer but longer sessions if that would help.")
     
     # 5. Instructor note signal
-    notes_rows = con.execute("""
-        SELECT ln.note_score, l.lesson_date, l.lesson_type, i.instructor_name
-        FROM lesson_notes ln 
-        JOIN lessons l ON ln.lesson_id = l.lesson_id
-        LEFT JOIN instructors i ON l.instructor_id = i.instructor_id
-        WHERE l.students_raw LIKE ? AND ln.note_score IS NOT NULL
-        ORDER BY l.lesson_date DESC LIMIT 1
-    """, (f"%{name}%",)).fetchone()
+    notes_rows = evidence["last_scored_note"].get(student_name)
     
     if notes_rows:
         score = notes_rows[0] or 0
@@ -334,29 +389,20 @@ def find_returning_students(expanded, leavers):
     return returning[:TOP_N_RETURN]
 
 
-def generate_return_talking_points(student, con):
+def generate_return_talking_points(student, evidence):
     """Generate personalized talking points for returning students."""
     points = []
     name = student["name"]
+    key = name.strip().lower()
     
     # Get last lesson details
-    last_lesson = con.execute("""
-        SELECT l.lesson_type, l.lesson_date, i.instructor_name
-        FROM lessons l LEFT JOIN instructors i ON l.instructor_id = i.instructor_id
-        WHERE l.students_raw LIKE ? 
-        ORDER BY l.lesson_date DESC LIMIT 1
-    """, (f"%{name}%",)).fetchone()
+    last_lesson = evidence["last_lesson"].get(key)
     
     if last_lesson:
         points.append(f"Last lesson: {last_lesson[0]} with {last_lesson[2] or 'Unknown'} on {last_lesson[1]}")
     
     # Get last note
-    last_note = con.execute("""
-        SELECT ln.note_score_explanation, l.lesson_date
-        FROM lesson_notes ln JOIN lessons l ON ln.lesson_id = l.lesson_id
-        WHERE l.students_raw LIKE ? AND ln.note_score_explanation IS NOT NULL
-        ORDER BY l.lesson_date DESC LIMIT 1
-    """, (f"%{name}%",)).fetchone()
+    last_note = evidence["last_note_explanation"].get(key)
     
     if last_note:
         points.append(f'Note: "{last_note[0][:200]}"')
@@ -379,6 +425,16 @@ def check_followups(prev_recs, con):
     last_week = prev_recs.get("week", "")
     recs = prev_recs.get("recommendations", {})
     
+    # The counts cover the whole week, not one student, so each is queried at most once.
+    counts = {}
+    def week_count(table, column):
+        if table not in counts:
+            counts[table] = con.execute(f"""
+                SELECT COUNT(*) FROM {table}
+                WHERE {column} >= ? AND {column} <= ?
+            """, (last_week, str(TODAY))).fetchone()[0]
+        return counts[table]
+    
     for student, rec in recs.items():
         actions = rec.get("actions", [])
         statuses = []
@@ -386,18 +442,12 @@ def check_followups(prev_recs, con):
         for action in actions:
             # Check if phone call was made
             if "call" in action.lower() or "📞" in action:
-                calls = con.execute("""
-                    SELECT COUNT(*) FROM dialpad_calls
-                    WHERE date_started >= ? AND date_started <= ?
-                """, (last_week, str(TODAY))).fetchone()[0]
+                calls = week_count("dialpad_calls", "date_started")
                 statuses.append(f"{'✓' if calls > 0 else '✗'} Phone call {'made' if calls > 0 else 'NOT made'}")
             
             # Check if SMS was sent
             if "sms" in action.lower() or "📱" in action:
-                sms_count = con.execute("""
-                    SELECT COUNT(*) FROM dialpad_sms_messages
-                    WHERE message_at >= ? AND message_at <= ?
-                """, (last_week, str(TODAY))).fetchone()[0]
+                sms_count = week_count("dialpad_sms_messages", "message_at")
                 statuses.append(f"{'✓' if sms_count > 0 else '✗'} SMS {'sent' if sms_count > 0 else 'NOT sent'}")
         
         if statuses:
@@ -507,11 +557,8 @@ def format_email(at_risk, returning, score_changes, followups, total_students):
 
 def main():
     print("🔍 Loading data...")
-    lessons, notes, people, engagement, leavers, prev_recs = load_all_data()
-    expanded = expand_students(lessons)
-    
-    con = sqlite3.connect(str(DB_PATH))
-    con.row_factory = sqlite3.Row
+    student_lessons, notes, people, engagement, leavers, prev_recs, evidence = load_all_data()
+    expanded = expand_students(student_lessons)
     
     print("📊 Computing churn predictions...")
     model = load_model()
@@ -541,8 +588,8 @@ def main():
             break
         if info["churn_probability"] < CHURN_THRESHOLD:
             break
-        reasons = generate_reasons(info["features"], name, con)
-        actions = generate_actions(info["features"], info, name, con)
+        reasons = generate_reasons(info["features"])
+        actions = generate_actions(info["features"], info, name, evidence)
         
         # Check prior score
         prev = prev_recs.get("scores", {}).get(name, {})
@@ -561,7 +608,7 @@ def main():
     # Returning students
     returning = find_returning_students(expanded, leavers)
     for student in returning:
-        student["talking_points"] = generate_return_talking_points(student, con)
+        student["talking_points"] = generate_return_talking_points(student, evidence)
     
     print(f"  {len(returning)} students returning from hold")
     
@@ -577,7 +624,9 @@ def main():
             }
     
     # Follow-ups
+    con = sqlite3.connect(str(DB_PATH))
     followups = check_followups(prev_recs, con)
+    con.close()
     
     # Generate email
     email = format_email(at_risk, returning, score_changes, followups, len(predictions))
@@ -599,8 +648,6 @@ def main():
     with open(TRACKING_PATH, "w") as f:
         json.dump(recs, f, indent=2, default=str)
     
-    con.close()
-    
     # Output
     import argparse
     parser = argparse.ArgumentParser()
@@ -2,6 +2,7 @@ import argparse
 import csv
 import re
 import sqlite3
+from difflib import SequenceMatcher
 from pathlib import Path
 
 
@@ -37,6 +38,7 @@ def ensure_indexes(conn):
     if table_exists(conn, "dialpad_calls"):
         conn.execute("CREATE INDEX IF NOT EXISTS idx_calls_email ON dialpad_calls(email_lower)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_calls_phone ON dialpad_calls(external_number_digits)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_calls_name ON dialpad_calls(name_lower)")
     if table_exists(conn, "pike13_clients"):
         conn.execute("CREATE INDEX IF NOT EXISTS idx_clients_email ON pike13_clients(email_lower)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_clients_guardian_email ON pike13_clients(guardian_email_lower)")
@@ -195,6 +197,217 @@ def load_dialpad_generic(conn, table_name, csvs, key_column=None):
                 )
 
 
+CLIENT_KEY_TABLE = "client_match_keys"
+# Blocks larger than this are near-stop-word tokens ("the", "school"); they add
+# cost without discriminating, so fuzzy matching skips them.
+FUZZY_MAX_BLOCK_SIZE = 200
+FUZZY_MIN_SCORE = 0.88
+SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+def normalize_name(value):
+    if not value:
+        return None
+    tokens = re.findall(r"[a-z0-9']+", value.lower())
+    return " ".join(tokens) or None
+
+
+def soundex(token):
+    letters = re.sub(r"[^a-z]", "", token.lower())
+    if not letters:
+        return None
+    code = letters[0].upper()
+    previous = SOUNDEX_CODES.get(letters[0])
+    for char in letters[1:]:
+        digit = SOUNDEX_CODES.get(char)
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if char not in "hw":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def name_blocks(name):
+    """Phonetic bucket per token, so 'Jon Smyth' and 'John Smith' share blocks."""
+    return {code for code in (soundex(token) for token in name.split() if len(token) > 1) if code}
+
+
+def build_client_keys(conn):
+    """Normalize every client contact value once into (client_id, key_type, key_value)."""
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {CLIENT_KEY_TABLE} (
+            client_id TEXT NOT NULL,
+            key_type TEXT NOT NULL,
+            key_value TEXT NOT NULL,
+            source_column TEXT,
+            PRIMARY KEY (key_type, key_value, client_id)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(f"DELETE FROM {CLIENT_KEY_TABLE}")
+    rows = conn.execute(
+        """
+        SELECT "Client ID", "Email", "Guardian Email", "Account Manager Emails",
+               "Phone", "Mobile Phone", "Account Manager Phones", "Emergency Contact Number",
+               "Client", "Guardian Name"
+        FROM pike13_clients
+        WHERE "Client ID" IS NOT NULL AND "Client ID" != ''
+        """
+    )
+    keys = []
+    for (
+        client_id,
+        email,
+        guardian_email,
+        manager_emails,
+        phone,
+        mobile,
+        manager_phones,
+        emergency_phone,
+        client_name,
+        guardian_name,
+    ) in rows:
+        candidates = [
+            ("email", normalize_email(email), "Email"),
+            ("email", normalize_email(guardian_email), "Guardian Email"),
+            *(("email", normalize_email(value), "Account Manager Emails") for value in split_multi(manager_emails)),
+            ("phone", normalize_phone(phone), "Phone"),
+            ("phone", normalize_phone(mobile), "Mobile Phone"),
+            *(("phone", normalize_phone(value), "Account Manager Phones") for value in split_multi(manager_phones)),
+            ("phone", normalize_phone(emergency_phone), "Emergency Contact Number"),
+            ("name", (client_name or "").strip().lower() or None, "Client"),
+            ("name", (guardian_name or "").strip().lower() or None, "Guardian Name"),
+        ]
+        keys.extend(
+            (client_id, key_type, value, column) for key_type, value, column in candidates if value
+        )
+    conn.executemany(
+        f"INSERT OR IGNORE INTO {CLIENT_KEY_TABLE} (client_id, key_type, key_value, source_column) "
+        "VALUES (?, ?, ?, ?)",
+        keys,
+    )
+    return len(keys)
+
+
+EXACT_MATCH_RULES = (
+    # match_type, key_type, calls column, confidence, matched_on
+    ("email_exact", "email", "email_lower", 0.95, "dialpad_calls.email"),
+    ("phone_exact", "phone", "external_number_digits", 0.90, "dialpad_calls.external_number"),
+    ("name_exact", "name", "name_lower", 0.70, "dialpad_calls.name"),
+)
+
+
+def build_exact_matches(conn):
+    counts = {}
+    for match_type, key_type, column, confidence, matched_on in EXACT_MATCH_RULES:
+        cursor = conn.execute(
+            f"""
+            INSERT OR IGNORE INTO call_client_matches
+            (call_id, client_id, match_type, confidence, match_value, matched_on)
+            SELECT c.call_id, k.client_id, ?, ?, c.{column}, ?
+            FROM dialpad_calls c
+            JOIN {CLIENT_KEY_TABLE} k
+              ON k.key_type = ?
+             AND k.key_value = c.{column}
+            WHERE c.{column} IS NOT NULL
+            """,
+            (match_type, confidence, matched_on, key_type),
+        )
+        counts[match_type] = cursor.rowcount
+    return counts
+
+
+def fuzzy_name_candidates(call_names, client_names, min_score=FUZZY_MIN_SCORE):
+    """Yield (call_name, client_id, score) for names that share a phonetic block.
+
+    ``client_names`` is an iterable of (client_id, raw_name). Only pairs in a
+    common soundex bucket are scored, so cost grows with bucket sizes rather
+    than calls x clients.
+    """
+    blocks = {}
+    for client_id, raw_name in client_names:
+        name = normalize_name(raw_name)
+        if not name:
+            continue
+        for block in name_blocks(name):
+            blocks.setdefault(block, []).append((client_id, name))
+
+    for raw_call_name in call_names:
+        call_name = normalize_name(raw_call_name)
+        if not call_name:
+            continue
+        call_sorted = " ".join(sorted(call_name.split()))
+        candidates = {}
+        for block in name_blocks(call_name):
+            bucket = blocks.get(block, ())
+            if len(bucket) > FUZZY_MAX_BLOCK_SIZE:
+                continue
+            for client_id, name in bucket:
+                candidates.setdefault((client_id, name), 0)
+                candidates[(client_id, name)] += 1
+        for (client_id, name), shared in candidates.items():
+            # Single-token names only need one block; multi-token names need two.
+            if shared < min(2, len(call_name.split()), len(name.split())):
+                continue
+            score = max(
+                SequenceMatcher(None, call_name, name).ratio(),
+                SequenceMatcher(None, call_sorted, " ".join(sorted(name.split()))).ratio(),
+            )
+            if score >= min_score:
+                yield raw_call_name, client_id, round(score, 3)
+
+
+def build_fuzzy_name_matches(conn, min_score=FUZZY_MIN_SCORE):
+    call_names = [
+        row[0]
+        for row in conn.execute(
+            """
+            SELECT DISTINCT c.name_lower
+            FROM dialpad_calls c
+            WHERE c.name_lower IS NOT NULL
+              AND NOT EXISTS (
+                  SELECT 1 FROM call_client_matches m
+                  WHERE m.call_id = c.call_id AND m.match_type <> 'name_fuzzy'
+              )
+            """
+        )
+    ]
+    client_names = conn.execute(
+        f"SELECT client_id, key_value FROM {CLIENT_KEY_TABLE} WHERE key_type = 'name'"
+    ).fetchall()
+    pairs = [
+        (client_id, round(0.6 * score, 3), call_name, call_name)
+        for call_name, client_id, score in fuzzy_name_candidates(call_names, client_names, min_score)
+    ]
+    before = conn.total_changes
+    conn.executemany(
+        """
+        INSERT OR IGNORE INTO call_client_matches
+        (call_id, client_id, match_type, confidence, match_value, matched_on)
+        SELECT c.call_id, ?, 'name_fuzzy', ?, ?, 'dialpad_calls.name'
+        FROM dialpad_calls c
+        WHERE c.name_lower = ?
+          -- Another call with the same name may already have an exact match; leave it alone.
+          AND NOT EXISTS (
+              SELECT 1 FROM call_client_matches m
+              WHERE m.call_id = c.call_id AND m.match_type <> 'name_fuzzy'
+          )
+        """,
+        pairs,
+    )
+    return conn.total_changes - before
+
+
 def build_matches(conn, enable_fuzzy=False):
     conn.execute(
         """
@@ -214,81 +427,11 @@ def build_matches(conn, enable_fuzzy=False):
         "ON call_client_matches(call_id, client_id, match_type, match_value)"
     )
 
-    # Email matches (client email + guardian email + account manager email).
-    email_matches = conn.execute(
-        """
-        SELECT c.call_id, p."Client ID", c.email_lower
-        FROM dialpad_calls c
-        JOIN pike13_clients p
-          ON c.email_lower IS NOT NULL
-         AND (
-             c.email_lower = p.email_lower
-             OR c.email_lower = p.guardian_email_lower
-             OR c.email_lower = LOWER(p."Account Manager Emails")
-         )
-        """
-    ).fetchall()
-    for call_id, client_id, value in email_matches:
-        conn.execute(
-            """
-            INSERT OR IGNORE INTO call_client_matches
-            (call_id, client_id, match_type, confidence, match_value, matched_on)
-            VALUES (?, ?, 'email_exact', 0.95, ?, 'dialpad_calls.email')
-            """,
-            (call_id, client_id, value),
-        )
-
-    # Phone matches (external number vs client phone/mobile/account manager phones).
-    phone_matches = conn.execute(
-        """
-        SELECT c.call_id, p."Client ID", c.external_number_digits
-        FROM dialpad_calls c
-        JOIN pike13_clients p
-          ON c.external_number_digits IS NOT NULL
-         AND (
-             c.external_number_digits = p.phone_digits
-             OR c.external_number_digits = p.mobile_digits
-             OR c.external_number_digits = p.account_manager_phone_digits
-             OR c.external_number_digits = REPLACE(REPLACE(REPLACE(p."Emergency Contact Number", '-', ''), '(', ''), ')', '')
-         )
-        """
-    ).fetchall()
-    for call_id, client_id, value in phone_matches:
-        conn.execute(
-            """
-            INSERT OR IGNORE INTO call_client_matches
-            (call_id, client_id, match_type, confidence, match_value, matched_on)
-            VALUES (?, ?, 'phone_exact', 0.90, ?, 'dialpad_calls.external_number')
-            """,
-            (call_id, client_id, value),
-        )
-
-    # Name matches (exact match on client or guardian name).
-    name_matches = conn.execute(
-        """
-        SELECT c.call_id, p."Client ID", c.name_lower
-        FROM dialpad_calls c
-        JOIN pike13_clients p
-          ON c.name_lower IS NOT NULL
-         AND (
-             c.name_lower = LOWER(p."Client")
-             OR c.name_lower = LOWER(p."Guardian Name")
-         )
-        """
-    ).fetchall()
-    for call_id, client_id, value in name_matches:
-        conn.execute(
-            """
-            INSERT OR IGNORE INTO call_client_matches
-            (call_id, client_id, match_type, confidence, match_value, matched_on)
-            VALUES (?, ?, 'name_exact', 0.70, ?, 'dialpad_calls.name')
-            """,
-            (call_id, client_id, value),
-        )
-
+    build_client_keys(conn)
+    counts = build_exact_matches(conn)
     if enable_fuzzy:
-        # Optional fuzzy matching can be added later; skip by default.
-        pass
+        counts["name_fuzzy"] = build_fuzzy_name_matches(conn)
+    return counts
 
 
 def table_exists(conn, table_name):
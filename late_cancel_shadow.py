@@ -16,6 +16,8 @@ from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Iterable, Mapping
 
+from notesreminder.lib.member_history import latest_scrape, on_roster_between, roster_rows, scraped_between
+
 ROOT = Path(__file__).resolve().parent
 DB_PATH = ROOT / "reminders.db"
 MODELS_DIR = ROOT / "models"
@@ -160,20 +162,10 @@ def _latest_roster_rows(conn: sqlite3.Connection, as_of: date) -> list[sqlite3.R
     conn.row_factory = sqlite3.Row
     rows: list[sqlite3.Row] = []
     for slug in SCHOOL_NAMES:
-        stamp = conn.execute(
-            """SELECT MAX(scraped_at) FROM pike13_current_member_snapshots
-               WHERE school_slug=? AND DATE(scraped_at) <= DATE(?)""",
-            (slug, as_of.isoformat()),
-        ).fetchone()[0]
+        stamp = latest_scrape(conn, slug, on_or_before=as_of)
         if stamp is None:
             continue
-        rows.extend(
-            conn.execute(
-                """SELECT * FROM pike13_current_member_snapshots
-                   WHERE school_slug=? AND scraped_at=?""",
-                (slug, stamp),
-            ).fetchall()
-        )
+        rows.extend(roster_rows(conn, slug, stamp))
     return rows
 
 
@@ -263,21 +255,10 @@ def evaluate_matured_observations(
             due_date = (
                 date.fromisoformat(row["as_of"]) + timedelta(days=28)
             ).isoformat()
-            source_ready = conn.execute(
-                """SELECT 1 FROM pike13_current_member_snapshots
-                   WHERE school_slug=? AND snapshot_date BETWEEN ? AND ? LIMIT 1""",
-                (row["school_slug"], due_date, evaluation_date.isoformat()),
-            ).fetchone()
-            if source_ready is None:
+            window = (due_date, evaluation_date.isoformat())
+            if not scraped_between(conn, row["school_slug"], *window):
                 continue
-            retained = int(
-                conn.execute(
-                    """SELECT 1 FROM pike13_current_member_snapshots
-                       WHERE person_id=? AND snapshot_date BETWEEN ? AND ? LIMIT 1""",
-                    (row["person_id"], due_date, evaluation_date.isoformat()),
-                ).fetchone()
-                is not None
-            )
+            retained = int(on_roster_between(conn, row["person_id"], *window))
             conn.execute(
                 """UPDATE late_cancel_shadow_observations
                    SET retained_28d=?, evaluated_at=?
@@ -1344,8 +1344,8 @@ def _create_views(conn):
     )
 
 
-def start_import_run(conn, source, extractor, window_start=None, window_end=None, metadata=None):
-    started_at = utc_now_iso()
+def start_import_run(conn, source, extractor, window_start=None, window_end=None, metadata=None, started_at=None):
+    started_at = started_at or utc_now_iso()
     cursor = conn.execute(
         """
         INSERT INTO source_import_runs
@@ -3,10 +3,12 @@
 llm_voicemail_matcher.py — Use LLM to extract student names from unmatched voicemail transcripts.
 Batch process all unmatched VMs, match extracted names to pike13_people.
 """
-import sqlite3, json, csv, re, time, requests
+import sqlite3, json, csv, re
 from pathlib import Path
 from collections import defaultdict
 
+from notesreminder.lib.llm_gateway import LLMRequest, run_completions
+
 DB_PATH = Path(__file__).parent / "reminders.db"
 MODELS_DIR = Path(__file__).parent / "models"
 BATCH_SIZE = 15
@@ -62,51 +64,46 @@ def get_unmatched_vms(con):
 def extract_names_llm(vms):
     """Extract student names from voicemail transcripts using LLM."""
     all_names = {}
-    
-    for b in range(0, len(vms), BATCH_SIZE):
-        batch = vms[b:b+BATCH_SIZE]
+    batches = [vms[b:b+BATCH_SIZE] for b in range(0, len(vms), BATCH_SIZE)]
+    requests = []
+    for batch in batches:
         snippets = []
         for i, vm in enumerate(batch):
             text = (vm["transcription_text"] or "")[:300].replace("\n", " ")
             snippets.append(f"[{i}] {text}")
         
         prompt = "Extract student names from these voicemail transcripts:\n\n" + "\n\n".join(snippets)
-        
+        requests.append(LLMRequest.chat(SYSTEM, prompt, model="gpt-4o-mini", temperature=0.1,
+                                        max_tokens=2000, json_mode=True, key=batch))
+
+    responses, summary = run_completions(requests, api_key=env.get("OPENAI_API_KEY", ""),
+                                         caller="llm_voicemail_matcher", timeout_seconds=60)
+
+    for n, response in enumerate(responses, 1):
+        batch = response.request.key
+        if not response.ok:
+            print(f"  Batch error: {response.error}")
+            continue
         try:
-            r = requests.post("https://api.openai.com/v1/chat/completions",
-                headers={"Authorization": f"Bearer {env.get('OPENAI_API_KEY','')}", "Content-Type": "application/json"},
-                json={"model": "gpt-4o-mini", "messages": [
-                    {"role": "system", "content": SYSTEM},
-                    {"role": "user", "content": prompt}
-                ], "temperature": 0.1, "max_tokens": 2000, "response_format": {"type": "json_object"}},
-                timeout=60)
-            
-            if r.status_code == 200:
-                data = r.json()
-                content = data["choices"][0]["message"]["content"]
-                results = json.loads(content)
-                if isinstance(results, dict):
-                    for k in results:
-                        if isinstance(results[k], list):
-                            results = results[k]
-                            break
-                
-                for item in results:
-                    idx = item.get("idx", -1)
-                    name = item.get("student_name")
-                    if isinstance(idx, int) and 0 <= idx < len(batch) and name:
-                        all_names[batch[idx]["call_id"]] = {
-                            "student_name": name,
-                            "confidence": item.get("confidence", "unknown"),
-                            "transcript": batch[idx]["transcription_text"][:200]
-                        }
-                
-                print(f"  Batch {b//BATCH_SIZE+1}/{(len(vms)-1)//BATCH_SIZE+1}: {len(all_names)} names found so far")
-        except Exception as e:
+            results = response.json_list()
+        except ValueError as e:
             print(f"  Batch error: {e}")
+            continue
         
-        time.sleep(0.5)
-    
+        for item in results:
+            idx = item.get("idx", -1)
+            name = item.get("student_name")
+            if isinstance(idx, int) and 0 <= idx < len(batch) and name:
+                all_names[batch[idx]["call_id"]] = {
+                    "student_name": name,
+                    "confidence": item.get("confidence", "unknown"),
+                    "transcript": batch[idx]["transcription_text"][:200]
+                }
+        
+        print(f"  Batch {n}/{len(batches)}: {len(all_names)} names found so far")
+
+    print(f"  LLM: {summary['cache_hits']} cached batches, ${summary['cost_usd']:.4f}, "
+          f"p90 {summary['latency_p90_ms']} ms")
     return all_names
 
 
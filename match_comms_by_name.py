@@ -10,7 +10,7 @@
 Output: models/comms_name_matches.json — phone/email → (student_name, confidence, pass)
 """
 
-import sqlite3, re, json, os, sys
+import sqlite3, re, json, sys
 from pathlib import Path
 from datetime import date, timedelta
 from collections import Counter, defaultdict
@@ -19,6 +19,8 @@ from dataclasses import dataclass, field
 import pandas as pd
 import numpy as np
 
+from notesreminder.lib.llm_gateway import DEEPSEEK_BASE_URL, LLMRequest, load_api_key, run_completions
+
 DB_PATH = Path(__file__).parent / "reminders.db"
 MODELS_DIR = Path(__file__).parent / "models"
 OUTPUT = MODELS_DIR / "comms_name_matches.json"
@@ -223,9 +225,15 @@ def pass2_llm_extraction(already_matched):
     if not unmatched_vms:
         return results
     
+    api_key = load_api_key("DEEPSEEK_API_KEY")
+    if not api_key:
+        print("  No DEEPSEEK_API_KEY found")
+        return results
+
     # Build prompt with name list
     name_list = "\n".join(sorted(NAMES["all_names"])[:300])  # Top 300 to stay in context
     batch_size = 20
+    requests = []
     
     for i in range(0, len(unmatched_vms), batch_size):
         batch = unmatched_vms[i:i+batch_size]
@@ -243,46 +251,26 @@ Output format: one line per transcript, "INDEX: name" or "INDEX: none"
 """
         for j, (phone, txt) in enumerate(batch):
             prompt += f"\n[{j}] {txt[:400]}\n"
-        
-        try:
-            import openai
-            # Read API key from Hermes .env if not in os.environ
-            api_key = os.environ.get("DEEPSEEK_API_KEY", "")
-            if not api_key:
-                env_file = Path.home() / ".hermes" / ".env"
-                if env_file.exists():
-                    for line in open(env_file):
-                        if line.startswith("DEEPSEEK_API_KEY="):
-                            api_key = line.strip().split("=", 1)[1].strip('"').strip("'")
-                            break
-            if not api_key:
-                print("  No DEEPSEEK_API_KEY found")
-                continue
-            client = openai.OpenAI(
-                api_key=api_key,
-                base_url="https://api.deepseek.com/v1"
-            )
-            response = client.chat.completions.create(
-                model="deepseek-chat",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=200,
-                temperature=0
-            )
-            output = response.choices[0].message.content
-            
-            # Parse output
-            for j, (phone, _) in enumerate(batch):
-                # Find line matching [j]
-                pattern = re.compile(rf'\[{j}\]\s*(.+)', re.IGNORECASE)
-                match = pattern.search(output)
-                if match:
-                    name = match.group(1).strip().lower()
-                    if name != "none" and name in NAMES["name_to_full"]:
-                        results[phone] = [(NAMES["name_to_full"][name], 0.85, "pass2")]
-            
-        except Exception as e:
-            print(f"  LLM batch {i} failed: {e}")
+        requests.append(LLMRequest.chat(None, prompt, model="deepseek-chat", max_tokens=200, key=(i, batch)))
+
+    responses, _ = run_completions(requests, api_key=api_key, base_url=DEEPSEEK_BASE_URL,
+                                   caller="match_comms_by_name")
+    for response in responses:
+        i, batch = response.request.key
+        if not response.ok:
+            print(f"  LLM batch {i} failed: {response.error}")
             continue
+        output = response.content
+        
+        # Parse output
+        for j, (phone, _) in enumerate(batch):
+            # Find line matching [j]
+            pattern = re.compile(rf'\[{j}\]\s*(.+)', re.IGNORECASE)
+            match = pattern.search(output)
+            if match:
+                name = match.group(1).strip().lower()
+                if name != "none" and name in NAMES["name_to_full"]:
+                    results[phone] = [(NAMES["name_to_full"][name], 0.85, "pass2")]
     
     print(f"  Pass 2 (LLM): {len(results)} matches")
     return results
@@ -23,8 +23,12 @@ from notesreminder.lib.person_identity import (
 )
 from notesreminder.reports.management_scorecards import build_note_quality_scorecard_for_period
 from notesreminder.reports.communication_insights import generate_insights
+from notesreminder.mcp.executor import QUERY_BUDGET_SECONDS, ToolExecutor, attach_budget
 from notesreminder.mcp.tools import register_pike13_tools
-from source_completeness import build_source_completeness_report
+from source_completeness import (
+    build_source_completeness_report,
+    source_completeness_trend as build_source_completeness_trend,
+)
 
 DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), "reminders.db")
 DB_PATH = os.getenv("REMINDERS_DB_PATH", DEFAULT_DB_PATH)
@@ -34,6 +38,21 @@ S3_KEY = os.getenv("REMINDERS_S3_KEY", "reminders.db")
 MAX_ROWS_DEFAULT = int(os.getenv("REMINDERS_MAX_ROWS", "200"))
 
 mcp = FastMCP("notesreminder")
+# Blocking tools run here instead of on the SSE event loop.
+TOOL_EXECUTOR = ToolExecutor()
+
+
+def blocking_tool(**offload_options):
+    """Register a synchronous tool that the server runs in TOOL_EXECUTOR.
+
+    The module-level function stays synchronous so scripts and tests can call it directly.
+    """
+
+    def decorator(fn):
+        mcp.tool()(TOOL_EXECUTOR.offload(**offload_options)(fn))
+        return fn
+
+    return decorator
 
 
 def _download_db():
@@ -46,7 +65,7 @@ def _connect(db_path=DB_PATH):
         raise FileNotFoundError(f"{db_path} not found.")
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
-    return conn
+    return attach_budget(conn)
 
 
 def _connect_lead():
@@ -78,7 +97,7 @@ def _query_rows(sql, params=None, max_rows=MAX_ROWS_DEFAULT):
     return _rows_as_json(columns, rows, max_rows)
 
 
-@mcp.tool()
+@blocking_tool(budget_seconds=None)
 def sync_db_from_s3() -> str:
     """Download the latest reminders.db from S3 to the local DB path."""
     _download_db()
@@ -88,7 +107,7 @@ def sync_db_from_s3() -> str:
     return f"Downloaded s3://{S3_BUCKET}/{S3_KEY} to {DB_PATH} ({size_kb:.1f} KB, mtime {timestamp})."
 
 
-@mcp.tool()
+@blocking_tool()
 def db_status() -> str:
     """Return basic info about the local SQLite file."""
     statuses = {}
@@ -106,7 +125,7 @@ def db_status() -> str:
     return json.dumps(statuses, indent=2)
 
 
-@mcp.tool()
+@blocking_tool()
 def list_tables() -> str:
     """List tables available in the SQLite database."""
     conn = _connect()
@@ -120,7 +139,7 @@ def list_tables() -> str:
     return json.dumps({"tables": table_names}, indent=2)
 
 
-@mcp.tool()
+@blocking_tool()
 def describe_table(table_name: str) -> str:
     """Describe columns for a given table."""
     if not re.fullmatch(r"[A-Za-z0-9_]+", table_name):
@@ -144,9 +163,9 @@ def describe_table(table_name: str) -> str:
     return json.dumps({"table": table_name, "columns": columns}, indent=2)
 
 
-@mcp.tool()
+@blocking_tool(budget_seconds=QUERY_BUDGET_SECONDS)
 def query_sql(sql: str, max_rows: int = MAX_ROWS_DEFAULT) -> str:
-    """Run a read-only SQL query (SELECT/CTE only) against reminders.db."""
+    """Run a read-only SQL query (SELECT/CTE only) against reminders.db. Interrupted after MCP_QUERY_BUDGET_SECONDS."""
     cleaned = sql.strip().rstrip(";")
     lowered = cleaned.lower()
     if not (lowered.startswith("select") or lowered.startswith("with")):
@@ -164,14 +183,14 @@ def query_sql(sql: str, max_rows: int = MAX_ROWS_DEFAULT) -> str:
     return _rows_as_json(columns, rows, max_rows)
 
 
-@mcp.tool()
+@blocking_tool(budget_seconds=None)
 def import_call_data(clients_csv: str, dialpad_dir: str = "Call Log", db_path: str = DB_PATH) -> str:
     """Import Dialpad + Pike13 client CSVs into the SQLite DB and build matches."""
     run_import(clients_path=clients_csv, dialpad_dir=dialpad_dir, db_path=db_path, enable_fuzzy=False)
     return "Imported Dialpad + Pike13 data and rebuilt call_client_matches."
 
 
-@mcp.tool()
+@blocking_tool(budget_seconds=None)
 def initialize_lead_followup_schema() -> str:
     """Create the additive V1 lead follow-up tables and curated views."""
     conn = _connect()
@@ -183,19 +202,40 @@ def initialize_lead_followup_schema() -> str:
     return "Lead follow-up schema and views are ready."
 
 
-@mcp.tool()
-def source_completeness(window_days: int = 7, pike13_lookahead_days: int = 30) -> str:
-    """Report whether HubSpot, Dialpad, and Pike13 are complete enough for lead timelines."""
+@blocking_tool()
+def source_completeness(window_days: int = 7, pike13_lookahead_days: int = 30, full: bool = False) -> str:
+    """Report whether HubSpot, Dialpad, and Pike13 are complete enough for lead timelines.
+
+    Sections whose source tables have not changed are served from cache unless full=True.
+    """
     conn = _connect()
     try:
-        report = build_source_completeness_report(conn, window_days, pike13_lookahead_days)
+        report = build_source_completeness_report(
+            conn,
+            window_days,
+            pike13_lookahead_days,
+            incremental=not full,
+            record_history=True,
+        )
         conn.commit()
     finally:
         conn.close()
     return json.dumps(report, indent=2, default=str)
 
 
-@mcp.tool()
+@blocking_tool()
+def source_completeness_trend(metric: str = "sources.*.field_coverage.*.fill_rate", limit: int = 60) -> str:
+    """Return recorded source-completeness metric values over time (metric accepts GLOB patterns)."""
+    conn = _connect()
+    try:
+        trend = build_source_completeness_trend(conn, metric, limit)
+        conn.commit()
+    finally:
+        conn.close()
+    return json.dumps({"metric": metric, "points": trend}, indent=2, default=str)
+
+
+@blocking_tool()
 def daily_snapshot(as_of: str = "", school: str = "West U", limit: int = 50) -> str:
     """Return the sanitized daily lead operating dashboard snapshot for yesterday/today."""
     conn = _connect_lead()
@@ -206,7 +246,7 @@ def daily_snapshot(as_of: str = "", school: str = "West U", limit: int = 50) ->
     return json.dumps(snapshot, indent=2, default=str)
 
 
-@mcp.tool()
+@blocking_tool()
 def weekly_snapshot(as_of: str = "", school: str = "West U", limit: int = 50) -> str:
     """Return the sanitized weekly lead operating dashboard snapshot for the prior closed Monday-Sunday week."""
     conn = _connect_lead()
@@ -217,7 +257,7 @@ def weekly_snapshot(as_of: str = "", school: str = "West U", limit: int = 50) ->
     return json.dumps(snapshot, indent=2, default=str)
 
 
-@mcp.tool()
+@blocking_tool()
 def monthly_snapshot(as_of: str = "", school: str = "West U", limit: int = 50) -> str:
     """Return the sanitized monthly lead operating dashboard snapshot."""
     conn = _connect_lead()
@@ -228,7 +268,7 @@ def monthly_snapshot(as_of: str = "", school: str = "West U", limit: int = 50) -
     return json.dumps(snapshot, indent=2, default=str)
 
 
-@mcp.tool()
+@blocking_tool()
 def note_quality_scorecard(
     period: str = "mtd",
     as_of: str = "",
@@ -252,7 +292,7 @@ def note_quality_scorecard(
     return json.dumps(scorecard, indent=2, default=str)
 
 
-@mcp.tool()
+@blocking_tool()
 def experimental_communication_insights(
     start_date: str,
     end_date: str,
@@ -270,6 +310,8 @@ def experimental_communication_insights(
             school=school or None,
             limit=limit,
             dry_run=dry_run,
+            # A review covers every event in the window, including ones already analyzed.
+            force=dry_run,
         )
         if not dry_run:
             conn.commit()
@@ -278,7 +320,7 @@ def experimental_communication_insights(
     return json.dumps(report, indent=2, default=str)
 
 
-@mcp.tool()
+@blocking_tool()
 def exception_queue(start_date: str, end_date: str, school: str = "West U", limit: int = 50) -> str:
     """Return sanitized lead/trial follow-up exceptions for a date window."""
     conn = _connect_lead()
@@ -289,7 +331,7 @@ def exception_queue(start_date: str, end_date: str, school: str = "West U", limi
     return json.dumps(queue, indent=2, default=str)
 
 
-@mcp.tool()
+@blocking_tool()
 def lead_evidence_timeline(
     search: str,
     start_date: str = "",
@@ -306,7 +348,7 @@ def lead_evidence_timeline(
     return json.dumps(timeline, indent=2, default=str)
 
 
-@mcp.tool()
+@blocking_tool(budget_seconds=None)
 def refresh_person_identity_layer() -> str:
     """Rebuild deterministic persons and person_identities from exact source identifiers."""
     conn = _connect()
@@ -318,7 +360,7 @@ def refresh_person_identity_layer() -> str:
     return json.dumps(summary, indent=2, default=str)
 
 
-@mcp.tool()
+@blocking_tool()
 def person_search(query: str, limit: int = 20) -> str:
     """Search resolved persons by person ID, name, email, phone, or school."""
     if not query or not query.strip():
@@ -331,7 +373,7 @@ def person_search(query: str, limit: int = 20) -> str:
     return json.dumps({"rows": rows, "row_count": len(rows)}, indent=2, default=str)
 
 
-@mcp.tool()
+@blocking_tool()
 def person_details(person_id: str) -> str:
     """Return source identities and conflicts for a resolved person."""
     if not person_id or not person_id.strip():
@@ -347,7 +389,7 @@ def person_details(person_id: str) -> str:
     return json.dumps(details, indent=2, default=str)
 
 
-@mcp.tool()
+@blocking_tool()
 def person_journey(
     search: str,
     start_date: str = "",
@@ -366,7 +408,7 @@ def person_journey(
     return json.dumps(journey, indent=2, default=str)
 
 
-@mcp.tool()
+@blocking_tool()
 def customer_lifecycle_summary(person_id: str) -> str:
     """Return a one-screen lifecycle summary for a resolved person ID."""
     if not person_id or not person_id.strip():
@@ -382,7 +424,7 @@ def customer_lifecycle_summary(person_id: str) -> str:
     return json.dumps(summary, indent=2, default=str)
 
 
-@mcp.tool()
+@blocking_tool()
 def stale_leads(school: str = "", days: int = 7, limit: int = 50) -> str:
     """Return active leads with stale touches, follow-up-needed flags, or overdue tasks."""
     limit = max(1, min(limit, MAX_ROWS_DEFAULT))
@@ -411,7 +453,7 @@ def stale_leads(school: str = "", days: int = 7, limit: int = 50) -> str:
     )
 
 
-@mcp.tool()
+@blocking_tool()
 def lead_timeline(search: str, limit: int = 100) -> str:
     """Return a cross-system timeline for a lead name, phone, deal ID, or Pike13 person ID."""
     if not search or not search.strip():
@@ -436,7 +478,7 @@ def lead_timeline(search: str, limit: int = 100) -> str:
     )
 
 
-@mcp.tool()
+@blocking_tool()
 def unanswered_messages(school: str = "", days: int = 7, limit: int = 50) -> str:
     """Return inbound SMS messages with no later outbound follow-up in the same thread."""
     limit = max(1, min(limit, MAX_ROWS_DEFAULT))
@@ -454,7 +496,7 @@ def unanswered_messages(school: str = "", days: int = 7, limit: int = 50) -> str
     )
 
 
-@mcp.tool()
+@blocking_tool()
 def unanswered_communications(school: str = "", days: int = 7, limit: int = 50) -> str:
     """Return inbound SMS, missed calls, and voicemails with no later outbound follow-up."""
     limit = max(1, min(limit, MAX_ROWS_DEFAULT))
@@ -472,7 +514,7 @@ def unanswered_communications(school: str = "", days: int = 7, limit: int = 50)
     )
 
 
-@mcp.tool()
+@blocking_tool()
 def no_show_followup(school: str = "", days: int = 30, limit: int = 50) -> str:
     """Return Pike13 no-shows with HubSpot follow-up context where available."""
     limit = max(1, min(limit, MAX_ROWS_DEFAULT))
@@ -490,7 +532,7 @@ def no_show_followup(school: str = "", days: int = 30, limit: int = 50) -> str:
     )
 
 
-@mcp.tool()
+@blocking_tool()
 def lead_conversion_path(search: str, limit: int = 50) -> str:
     """Show the lead-created to trial/enrollment path for a person, deal, school, or Pike13 ID."""
     if not search or not search.strip():
@@ -514,6 +556,12 @@ def lead_conversion_path(search: str, limit: int = 50) -> str:
     )
 
 
+@mcp.tool()
+async def server_status() -> str:
+    """Return tool executor concurrency metrics: queue depth, in-flight calls, outcomes, latency histogram."""
+    return json.dumps(TOOL_EXECUTOR.snapshot(), indent=2)
+
+
 # Register Pike13 scraping tools (cookie-based auth)
 register_pike13_tools(mcp)
 
@@ -20,7 +20,10 @@ from notesreminder.lib.cookie_auth import (
     load_cookies,
     check_cookie_freshness,
 )
+from notesreminder.lib.browser_broker import async_open_profile_context
 from notesreminder.lib.pike13_urls import pike13_note_url, pike13_lesson_url
+from notesreminder.lib.tracing import aggregate_span
+from notesreminder.lib.scrape_diagnostics import DiagnosticsPolicy, ScrapeDiagnostics
 from notesreminder.lib.note_page_probe import (
     classify_note_page,
     strip_editor_chrome,
@@ -47,7 +50,18 @@ async def scrape_lessons(
     profile_dir=None,
     interactive_login=False,
     login_timeout=300,
+    progress=None,
+    diagnostics=None,
+    failed_dates=None,
+    save_csv=True,
 ):
+    """Scrape lesson notes for each date; ``progress(dates_done, lessons_scraped)`` is called per date.
+
+    ``diagnostics`` is a ``DiagnosticsPolicy`` or mode name (``off``, ``sampled``,
+    ``on-failure``, ``always``); traces and screenshots land in ``screenshots/``.
+    Dates that were skipped or only partly scraped are appended to
+    ``failed_dates`` when a list is passed. ``save_csv=False`` skips the CSV export.
+    """
     if dates is None and start_date and end_date:
         start = datetime.strptime(start_date, "%Y-%m-%d")
         end = datetime.strptime(end_date, "%Y-%m-%d")
@@ -57,21 +71,24 @@ async def scrape_lessons(
         raise ValueError("Provide either 'dates' or 'start_date' and 'end_date'.")
 
     lessons_data = []
-    
-    # Create screenshots directory if it doesn't exist
-    os.makedirs('screenshots', exist_ok=True)
+    diag = ScrapeDiagnostics(DiagnosticsPolicy.coerce(diagnostics), verbose=verbose)
+
+    def mark_failed(date):
+        if failed_dates is not None and date not in failed_dates:
+            failed_dates.append(date)
 
     async def goto_with_retry(target_url, attempts=3, wait_ms=2000):
         last_error = None
-        for attempt in range(1, attempts + 1):
-            try:
-                await page.goto(target_url)
-                return True
-            except Exception as e:
-                last_error = e
-                if verbose:
-                    print(f"⚠️ Page.goto failed (attempt {attempt}/{attempts}) for {target_url}: {e}")
-                await page.wait_for_timeout(wait_ms)
+        with aggregate_span("navigation"):
+            for attempt in range(1, attempts + 1):
+                try:
+                    await page.goto(target_url)
+                    return True
+                except Exception as e:
+                    last_error = e
+                    if verbose:
+                        print(f"⚠️ Page.goto failed (attempt {attempt}/{attempts}) for {target_url}: {e}")
+                    await page.wait_for_timeout(wait_ms)
         if verbose:
             print(f"❌ Giving up on {target_url}: {last_error}")
         return False
@@ -83,7 +100,10 @@ async def scrape_lessons(
             "user_agent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
         }
         if profile_dir:
-            context = await p.chromium.launch_persistent_context(
+            # Leases an isolated context from a warm browser broker for this
+            # profile when one is running; otherwise launches as before.
+            context = await async_open_profile_context(
+                p,
                 profile_dir,
                 headless=not interactive_login,
                 args=['--disable-dev-shm-usage'],
@@ -125,8 +145,7 @@ async def scrape_lessons(
             # Create a new context with tracing enabled
             context = await browser.new_context(**context_options)
         
-        # Start tracing
-        await context.tracing.start(screenshots=True, snapshots=True, sources=True)
+        await diag.start(context)
         
         page = next((candidate for candidate in context.pages if not candidate.is_closed()), None)
         if page is None:
@@ -188,11 +207,7 @@ async def scrape_lessons(
             raise RuntimeError("Timed out waiting for Pike13 interactive login/MFA.")
 
         async def safe_screenshot(path, **kwargs):
-            try:
-                await page.screenshot(path=path, timeout=2000, **kwargs)
-            except Exception as exc:
-                if verbose:
-                    print(f"⚠️ Screenshot skipped for {path}: {exc}")
+            await diag.screenshot(page, path, **kwargs)
 
         async def optional_text_content(selector, default="", timeout=5000):
             try:
@@ -233,6 +248,7 @@ async def scrape_lessons(
             return False
 
         try:
+            await diag.begin_step("login")
             if verbose:
                 print(f"Logging into {school_subdomain}.pike13.com...")
             
@@ -334,15 +350,21 @@ async def scrape_lessons(
             except Exception as e:
                 print(f"⚠️ Login failed: {e}")
                 await safe_screenshot("screenshots/03_login_failed.png")
+                diag.fail()
                 raise Exception("Login failed - check screenshots")
 
-            for date in dates:
+            for dates_done, date in enumerate(dates):
+                if progress:
+                    progress(dates_done, len(lessons_data))
+                await diag.begin_step(f"schedule_{date}")
                 schedule_url = f"https://{school_subdomain}.pike13.com/schedule#/list?dt={date}&lt=staff&el=1"
                 if verbose:
                     print(f"\nNavigating to schedule for {date}...")
                 if not await goto_with_retry(schedule_url):
                     if verbose:
                         print(f"⚠️ Skipping {date} due to repeated navigation failures.")
+                    diag.fail()
+                    mark_failed(date)
                     continue
                 if not await is_authenticated():
                     await wait_for_interactive_login(schedule_url)
@@ -367,6 +389,8 @@ async def scrape_lessons(
                     if not await goto_with_retry(day_url):
                         if verbose:
                             print(f"⚠️ Skipping {date}: day view navigation failed")
+                        diag.fail()
+                        mark_failed(date)
                         continue
                     await page.wait_for_timeout(8000)
                     await safe_screenshot(f"screenshots/schedule_{date}.png", full_page=True)
@@ -612,17 +636,20 @@ async def scrape_lessons(
                         except Exception as e:
                             if verbose:
                                 print(f"⚠️ Error processing lesson {lesson_id} on {date}: {e}")
+                            diag.fail()
+                            mark_failed(date)
                             continue
 
                 except Exception as e:
                     print(f"⚠️ Error loading schedule for {date}: {e}")
-                    try:
-                        await safe_screenshot(f"screenshots/error_{date}.png")
-                    except Exception as screenshot_exc:
-                        if verbose:
-                            print(f"⚠️ Could not capture error screenshot for {date}: {screenshot_exc}")
+                    await safe_screenshot(f"screenshots/error_{date}.png")
+                    diag.fail()
+                    mark_failed(date)
                     continue
 
+            if progress:
+                progress(len(dates), len(lessons_data))
+
             # Post-scrape cookie health check
             if cookie_auth_attempted:
                 freshness = check_cookie_freshness()
@@ -639,18 +666,21 @@ async def scrape_lessons(
                     with open(alert_path, "w") as f:
                         f.write(f"{datetime.now().isoformat()} | {alert_msg}\n")
 
+        except BaseException:
+            diag.fail()
+            raise
         finally:
-            # Stop tracing and save trace
-            await context.tracing.stop(path="screenshots/trace.zip")
+            await diag.stop()
             await context.close()
             if browser:
                 await browser.close()
 
     df = pd.DataFrame(lessons_data)
-    file_name = f"{school_subdomain}_lessons_{dates[0]}_to_{dates[-1]}.csv"
-    df.to_csv(file_name, index=False)
-    if verbose:
-        print(f"📂 Data saved to {file_name}")
+    if save_csv:
+        file_name = f"{school_subdomain}_lessons_{dates[0]}_to_{dates[-1]}.csv"
+        df.to_csv(file_name, index=False)
+        if verbose:
+            print(f"📂 Data saved to {file_name}")
     
     return df
 
@@ -0,0 +1 @@
+"""Synthetic reminders.db generation and performance benchmarks for pipeline hot paths."""
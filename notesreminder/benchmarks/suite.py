@@ -0,0 +1,345 @@
+"""Repeatable timings for the pipeline's hot paths on synthetic databases.
+
+Each benchmark gets a fresh copy of the generated database for every
+repetition, so functions that rewrite tables (``backfill_reporting``,
+``refresh_person_identities``) are always timed from the same starting state.
+``prepare`` runs untimed on that copy; only ``run`` is measured.
+
+Results are plain JSON (``results_to_json``). Saving one run as the baseline
+and comparing later runs against it with ``compare_to_baseline`` flags any
+benchmark whose median grew by more than ``tolerance`` (and by more than
+``min_delta_seconds``, so millisecond noise on tiny scales is ignored).
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+from notesreminder.benchmarks.synthetic_db import (
+    DEFAULT_ANCHOR,
+    DEFAULT_SEED,
+    GENERATOR_VERSION,
+    generate_synthetic_db,
+    read_synthetic_meta,
+)
+
+
+DEFAULT_SCALES = (1.0, 10.0, 100.0)
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_MIN_DELTA_SECONDS = 0.05
+RESULTS_FORMAT_VERSION = 1
+# Share of the most recent week of lessons re-scraped by update_reminders_from_dataframe;
+# one new lesson is added for every ten re-scraped ones.
+NEW_LESSON_RATIO = 0.1
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    description: str
+    run: Callable[[sqlite3.Connection, Any], Any]
+    prepare: Optional[Callable[[sqlite3.Connection, dict], Any]] = None
+
+
+def _anchor(meta: dict) -> date:
+    return date.fromisoformat(meta["anchor"]) if meta.get("anchor") else DEFAULT_ANCHOR
+
+
+def _scraped_lessons(conn: sqlite3.Connection, meta: dict):
+    """The last week of lessons as ``scrape_lessons`` would return them, per school."""
+    import pandas as pd
+
+    anchor = _anchor(meta)
+    rows = conn.execute(
+        """
+        SELECT school, pike13_lesson_id, instructor_name, lesson_date, lesson_time,
+               lesson_type, students, location, notes_text, note_timestamp, attendance_status
+        FROM reminders
+        WHERE lesson_date BETWEEN date(?, '-7 days') AND ?
+        ORDER BY id
+        """,
+        (anchor.isoformat(), anchor.isoformat()),
+    ).fetchall()
+    frames = {}
+    for index, row in enumerate(rows):
+        record = {
+            "Lesson ID": row[1],
+            "Instructor": row[2],
+            "Date": row[3],
+            "Time": row[4],
+            "Lesson Type": row[5],
+            "Students": row[6],
+            "Location": row[7],
+            "Notes": row[8] or "No notes",
+            "Note Timestamp": row[9],
+            "Note Status": "extracted" if row[8] else "no_note",
+            "Attendance Status": row[10],
+        }
+        records = frames.setdefault(row[0], [])
+        records.append(record)
+        if index % round(1 / NEW_LESSON_RATIO) == 0:
+            records.append({**record, "Lesson ID": f"new-{row[1]}", "Time": "8:00 PM", "Notes": "First lesson, great start."})
+    return [(school, pd.DataFrame(records)) for school, records in frames.items()]
+
+
+def _update_reminders(conn: sqlite3.Connection, frames) -> int:
+    from run_daily import update_reminders_from_dataframe
+
+    changed = 0
+    for school, frame in frames:
+        counts = update_reminders_from_dataframe(conn, frame, school, skip_note_scoring=True)
+        changed += counts["rows_inserted"] + counts["rows_upserted"]
+    conn.commit()
+    return changed
+
+
+def _backfill_reporting(conn: sqlite3.Connection, _ctx) -> None:
+    from build_reporting_schema import backfill_reporting
+
+    backfill_reporting(conn)
+    conn.commit()
+
+
+def _refresh_person_identities(conn: sqlite3.Connection, _ctx):
+    from notesreminder.lib.person_identity import refresh_person_identities
+
+    conn.row_factory = sqlite3.Row
+    result = refresh_person_identities(conn)
+    conn.commit()
+    return result
+
+
+def _match_all_comms(conn: sqlite3.Connection, _ctx):
+    from comms_universal_matcher import match_all_comms
+
+    conn.row_factory = sqlite3.Row
+    with contextlib.redirect_stdout(io.StringIO()):
+        return match_all_comms(conn)
+
+
+def _featurize_universe(conn: sqlite3.Connection, meta: dict):
+    """``score_v13``'s scoring universe: students with a lesson in the 90 days before the anchor."""
+    import v13_features
+
+    anchor = _anchor(meta)
+    student_ids = [
+        row[0]
+        for row in conn.execute(
+            """
+            SELECT DISTINCT ls.student_id
+            FROM lesson_students ls
+            JOIN lessons l ON l.lesson_id = ls.lesson_id
+            WHERE l.lesson_date BETWEEN date(?, '-90 days') AND ?
+            ORDER BY ls.student_id
+            """,
+            (anchor.isoformat(), anchor.isoformat()),
+        )
+    ]
+    return v13_features.build_phone2sid(conn), student_ids, anchor
+
+
+def _featurize(conn: sqlite3.Connection, ctx) -> int:
+    import v13_features
+
+    phone2sid, student_ids, anchor = ctx
+    for student_id in student_ids:
+        v13_features.featurize(conn, phone2sid, student_id, anchor)
+    return len(student_ids)
+
+
+def _build_snapshot(conn: sqlite3.Connection, meta: dict):
+    from lead_operating_dashboard import build_snapshot
+
+    return build_snapshot(conn, "weekly", as_of=_anchor(meta).isoformat())
+
+
+def _source_completeness(conn: sqlite3.Connection, _ctx):
+    from source_completeness import build_source_completeness_report
+
+    return build_source_completeness_report(conn)
+
+
+def _meta(_conn: sqlite3.Connection, meta: dict) -> dict:
+    return meta
+
+
+BENCHMARKS = (
+    Benchmark(
+        "update_reminders_from_dataframe",
+        "Upsert one week of re-scraped lessons (plus 10% new ones) into reminders",
+        _update_reminders,
+        _scraped_lessons,
+    ),
+    Benchmark("backfill_reporting", "Rebuild lessons/lesson_students/lesson_notes from reminders", _backfill_reporting),
+    Benchmark("refresh_person_identities", "Rebuild persons and person_identities from every source", _refresh_person_identities),
+    Benchmark("match_all_comms", "comms_universal_matcher.match_all_comms over email, voicemail and SMS", _match_all_comms),
+    Benchmark("featurize", "v13 churn features for every student with a lesson in the last 90 days", _featurize, _featurize_universe),
+    Benchmark("build_snapshot", "Weekly lead operating dashboard snapshot", _build_snapshot, _meta),
+    Benchmark("build_source_completeness_report", "Full (non-incremental) source completeness report", _source_completeness),
+)
+
+
+def benchmark_names() -> list[str]:
+    return [benchmark.name for benchmark in BENCHMARKS]
+
+
+def result_key(name: str, scale: float) -> str:
+    return f"{name}@{scale:g}x"
+
+
+def synthetic_db_path(db_dir: Path, scale: float, seed: int, anchor: date) -> Path:
+    return Path(db_dir) / f"synthetic_v{GENERATOR_VERSION}_s{scale:g}_seed{seed}_{anchor.isoformat()}.db"
+
+
+def ensure_synthetic_db(db_dir: Path, scale: float, seed: int = DEFAULT_SEED, anchor: Optional[date] = None) -> Path:
+    """Generate the database for ``scale`` once and reuse it while the generator parameters match."""
+    anchor = anchor or DEFAULT_ANCHOR
+    path = synthetic_db_path(db_dir, scale, seed, anchor)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(".db.partial")
+        partial.unlink(missing_ok=True)
+        generate_synthetic_db(partial, scale=scale, seed=seed, anchor=anchor)
+        partial.replace(path)
+    return path
+
+
+def time_benchmark(benchmark: Benchmark, source_db: Path, work_dir: Path, repeat: int = DEFAULT_REPEAT) -> dict:
+    """Time ``benchmark`` ``repeat`` times, each on a fresh copy of ``source_db``."""
+    timings = []
+    work_path = Path(work_dir) / f"{benchmark.name}.db"
+    for _ in range(max(1, repeat)):
+        shutil.copyfile(source_db, work_path)
+        conn = sqlite3.connect(work_path)
+        try:
+            meta = read_synthetic_meta(conn)
+            ctx = benchmark.prepare(conn, meta) if benchmark.prepare else meta
+            started = time.perf_counter()
+            benchmark.run(conn, ctx)
+            timings.append(time.perf_counter() - started)
+        finally:
+            conn.close()
+            work_path.unlink(missing_ok=True)
+    return {
+        "benchmark": benchmark.name,
+        "runs_s": [round(value, 6) for value in timings],
+        "median_s": round(statistics.median(timings), 6),
+        "min_s": round(min(timings), 6),
+        "max_s": round(max(timings), 6),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(
+    scales: Iterable[float] = DEFAULT_SCALES,
+    names: Optional[Iterable[str]] = None,
+    repeat: int = DEFAULT_REPEAT,
+    db_dir: Path | str = "outputs/benchmarks/db",
+    seed: int = DEFAULT_SEED,
+    anchor: Optional[date] = None,
+    progress: Optional[Callable[[str], None]] = None,
+) -> dict:
+    """Run the selected benchmarks at every scale and return a JSON-ready results document."""
+    selected = list(names) if names else benchmark_names()
+    unknown = sorted(set(selected) - set(benchmark_names()))
+    if unknown:
+        raise ValueError(f"unknown benchmark(s): {', '.join(unknown)}")
+    benchmarks = [benchmark for benchmark in BENCHMARKS if benchmark.name in selected]
+    anchor = anchor or DEFAULT_ANCHOR
+    results = {}
+    databases = {}
+    for scale in scales:
+        source_db = ensure_synthetic_db(Path(db_dir), scale, seed, anchor)
+        conn = sqlite3.connect(source_db)
+        try:
+            databases[f"{scale:g}x"] = {"path": str(source_db), **read_synthetic_meta(conn)}
+        finally:
+            conn.close()
+        work_dir = source_db.parent / "work"
+        work_dir.mkdir(exist_ok=True)
+        for benchmark in benchmarks:
+            result = time_benchmark(benchmark, source_db, work_dir, repeat)
+            result["scale"] = scale
+            results[result_key(benchmark.name, scale)] = result
+            if progress:
+                progress(f"{result_key(benchmark.name, scale):<45} median {result['median_s']:.3f}s")
+    return {
+        "format_version": RESULTS_FORMAT_VERSION,
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sqlite": sqlite3.sqlite_version,
+        "repeat": repeat,
+        "seed": seed,
+        "databases": databases,
+        "results": results,
+    }
+
+
+def compare_to_baseline(
+    current: dict,
+    baseline: dict,
+    tolerance: float = DEFAULT_TOLERANCE,
+    min_delta_seconds: float = DEFAULT_MIN_DELTA_SECONDS,
+) -> list[dict]:
+    """One row per current result: ``status`` is regressed, improved, ok or new."""
+    rows = []
+    previous = baseline.get("results", {})
+    for key, result in current["results"].items():
+        before = previous.get(key)
+        row = {"key": key, "current_s": result["median_s"], "baseline_s": None, "ratio": None, "status": "new"}
+        if before and before.get("median_s"):
+            ratio = result["median_s"] / before["median_s"]
+            delta = result["median_s"] - before["median_s"]
+            if ratio > 1 + tolerance and delta > min_delta_seconds:
+                status = "regressed"
+            elif ratio < 1 - tolerance and -delta > min_delta_seconds:
+                status = "improved"
+            else:
+                status = "ok"
+            row.update({"baseline_s": before["median_s"], "ratio": round(ratio, 3), "status": status})
+        rows.append(row)
+    return rows
+
+
+def render_comparison(rows: list[dict]) -> str:
+    lines = [f"{'benchmark':<45} {'baseline':>10} {'current':>10} {'ratio':>7}  status"]
+    for row in rows:
+        baseline = f"{row['baseline_s']:.3f}s" if row["baseline_s"] is not None else "-"
+        ratio = f"{row['ratio']:.2f}" if row["ratio"] is not None else "-"
+        lines.append(f"{row['key']:<45} {baseline:>10} {row['current_s']:>9.3f}s {ratio:>7}  {row['status']}")
+    return "\n".join(lines)
+
+
+def results_to_json(results: dict) -> str:
+    return json.dumps(results, indent=2, sort_keys=True)
+
+
+def load_results(path: Path | str) -> dict:
+    return json.loads(Path(path).read_text())
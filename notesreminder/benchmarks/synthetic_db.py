@@ -0,0 +1,681 @@
+"""Seeded synthetic ``reminders.db`` generator for benchmarks.
+
+``generate_synthetic_db(path, scale)`` writes a database with the same tables
+the daily pipeline reads — ``reminders`` (and the ``lessons`` /
+``lesson_students`` reporting tables derived from it), ``pike13_*``,
+``dialpad_*``, ``hubspot_*``, ``school_email_messages`` and ``call_logs`` —
+with ``BASE_VOLUME`` rows per table at ``scale=1`` and proportionally more (or
+fewer) at other scales. The same ``seed``, ``scale`` and ``anchor`` always
+produce the same rows, so timings from different runs are comparable.
+
+Dates are laid out relative to ``anchor`` (default: ``DEFAULT_ANCHOR``, a fixed
+date so cached databases and baselines stay comparable from day to day).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import random
+import sqlite3
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+from build_reporting_schema import backfill_reporting
+from lead_followup_schema import ensure_lead_followup_schema
+
+
+GENERATOR_VERSION = 1
+DEFAULT_SEED = 7
+DEFAULT_ANCHOR = date(2026, 6, 1)
+# Roughly current production volume for the two-school deployment (about six
+# months of lessons and communications). Scale 10 and 100 multiply every table.
+BASE_VOLUME = {
+    "pike13_people": 800,
+    "instructors": 24,
+    "reminders": 15000,
+    "hubspot_deals": 1200,
+    "hubspot_contacts": 1200,
+    "dialpad_sms_threads": 700,
+    "dialpad_sms_messages": 7000,
+    "dialpad_voice_events": 5000,
+    "dialpad_voicemails": 600,
+    "school_email_messages": 4000,
+    "pike13_visits": 6000,
+    "pike13_plans_passes": 900,
+}
+HISTORY_DAYS = 182
+FUTURE_DAYS = 7
+META_TABLE = "synthetic_benchmark_meta"
+
+SCHOOLS = (
+    {"code": "westu-sor", "pike13": "West U", "hubspot": "West University Place", "mailbox": "westu@schoolofrock.com"},
+    {"code": "theheights-sor", "pike13": "The Heights", "hubspot": "The Heights", "mailbox": "heights@schoolofrock.com"},
+)
+FIRST_NAMES = (
+    "Ava", "Liam", "Olivia", "Noah", "Emma", "Mateo", "Sophia", "Elijah", "Isabella", "Lucas",
+    "Mia", "Levi", "Amelia", "Ezra", "Harper", "Asher", "Evelyn", "Leo", "Luna", "James",
+    "Camila", "Henry", "Gianna", "Owen", "Aria", "Jack", "Ella", "Wyatt", "Nora", "Caleb",
+    "Hazel", "Julian", "Riley", "Miles", "Zoey", "Gabriel", "Lily", "Hudson", "Layla", "Isaac",
+    "Aurora", "Theo", "Violet", "Rowan", "Stella", "Silas", "Maya", "Jonah", "Ruby", "Felix",
+)
+LAST_NAMES = (
+    "Garcia", "Nguyen", "Patel", "Johnson", "Martinez", "Kim", "Okafor", "Rossi", "Schmidt", "Cohen",
+    "Hernandez", "Walker", "Silva", "Tanaka", "Murphy", "Lopez", "Brooks", "Fischer", "Reyes", "Novak",
+    "Bennett", "Ramirez", "Hughes", "Singh", "Castillo", "Foster", "Dubois", "Moreno", "Price", "Ali",
+    "Sullivan", "Ortiz", "Yamamoto", "Kowalski", "Jensen", "Barnes", "Chavez", "Lindqvist", "Adeyemi", "Ward",
+)
+PARENT_FIRST_NAMES = ("Maria", "David", "Jennifer", "Michael", "Sarah", "Carlos", "Priya", "Daniel", "Laura", "Kevin")
+INSTRUMENTS = ("Guitar", "Drums", "Vocals", "Piano", "Bass Guitar", "Keys")
+LESSON_SLOTS = ("3:30 PM", "4:15 PM", "5:00 PM", "5:45 PM", "6:30 PM", "7:15 PM")
+DEAL_STAGES = ("New Lead", "Attempted Contact", "Scheduled Trial/Tour", "Trial Completed", "Enrolled", "Closed Lost")
+LEAD_SOURCES = ("Website", "Walk-in", "Referral", "Paid Social", "Google")
+NOTE_TEMPLATES = (
+    "Worked on {topic} with {first}. Great focus today; practice the chorus section at home.",
+    "{first} reviewed {topic}. Needs more work on timing, assigned metronome practice.",
+    "Started a new song with {first}. {topic} is coming along nicely.",
+    "{first} was a bit distracted today but we got through {topic}.",
+)
+NOTE_TOPICS = ("power chords", "paradiddles", "breath support", "major scales", "syncopation", "the show setlist")
+SMS_TEMPLATES = (
+    "Hi, this is {parent}. {first} can't make it Thursday, can we reschedule?",
+    "Thanks so much! {first} loved the lesson.",
+    "Reminder: {first}'s {instrument} lesson is tomorrow at {slot}.",
+    "We need to cancel lessons for {first} after this month.",
+    "Is there a makeup slot this week?",
+)
+VOICEMAIL_TEMPLATES = (
+    "Hi, this is {parent} calling about {first} {last}'s {instrument} lessons. Please call me back.",
+    "Hey, my name is {parent}, I'm interested in lessons for my son. Thanks.",
+    "This is {parent}, we won't be attending this week, {first} is sick.",
+)
+EMAIL_SUBJECTS = ("Re: {first}'s Lessons", "Schedule change for {first}", "Question about billing", "Spring show for {first}")
+
+
+def volume_for_scale(scale: float) -> dict[str, int]:
+    return {table: max(1, round(count * scale)) for table, count in BASE_VOLUME.items()}
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+
+
+def _phone(family: int) -> str:
+    return f"713{family % 10_000_000:07d}"
+
+
+def _stamp(day: date, rng: random.Random) -> str:
+    return datetime.combine(day, time(rng.randint(8, 20), rng.randint(0, 59))).isoformat(timespec="seconds")
+
+
+def _create_base_tables(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS reminders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            lesson_id TEXT UNIQUE,
+            school TEXT,
+            instructor_name TEXT,
+            lesson_date TEXT,
+            lesson_time TEXT,
+            lesson_type TEXT,
+            students TEXT,
+            location TEXT,
+            notes_text TEXT,
+            note_timestamp TEXT,
+            note_status TEXT,
+            pike13_lesson_id TEXT,
+            reminder_sent INTEGER DEFAULT 0,
+            reminder_count INTEGER DEFAULT 0,
+            note_completed INTEGER DEFAULT 0,
+            attendance_status TEXT DEFAULT 'unknown',
+            last_checked DATE,
+            last_reminder_sent TIMESTAMP,
+            note_score REAL,
+            note_score_explanation TEXT,
+            note_score_model TEXT,
+            note_score_version TEXT,
+            note_score_updated_at TEXT,
+            note_score_hash TEXT
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS call_logs (
+            call_id TEXT PRIMARY KEY,
+            office_id TEXT,
+            external_number TEXT,
+            internal_number TEXT,
+            date_started TEXT,
+            direction TEXT,
+            category TEXT,
+            name TEXT,
+            email TEXT,
+            is_internal INTEGER,
+            school_code TEXT,
+            school_name TEXT,
+            voicemail_transcript TEXT,
+            voicemail_recording_url TEXT,
+            recording_url TEXT,
+            recording_duration TEXT,
+            voicemail_date TEXT,
+            recording_date TEXT
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS dialpad_voicemails (
+            call_id TEXT,
+            external_number TEXT,
+            name TEXT,
+            transcription_text TEXT,
+            recording_url TEXT,
+            date TEXT
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS pike13_clients (
+            "Client" TEXT,
+            "Email" TEXT,
+            "Phone" TEXT,
+            "Mobile Phone" TEXT,
+            "Home Location" TEXT
+        )
+        """
+    )
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {META_TABLE} (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+
+def _insert(conn: sqlite3.Connection, table: str, rows: list[dict]) -> int:
+    if not rows:
+        return 0
+    columns = list(rows[0])
+    quoted = ", ".join(f'"{column}"' for column in columns)
+    placeholders = ", ".join("?" for _ in columns)
+    conn.executemany(
+        f"INSERT INTO {table} ({quoted}) VALUES ({placeholders})",
+        [tuple(row[column] for column in columns) for row in rows],
+    )
+    return len(rows)
+
+
+def _people(rng: random.Random, count: int, now: str) -> list[dict]:
+    people = []
+    family = 0
+    for index in range(count):
+        # About one in eight students shares a household (phone, email) with the previous one.
+        if index == 0 or rng.random() > 0.12:
+            family += 1
+            last = rng.choice(LAST_NAMES)
+        else:
+            last = people[-1]["last_name"]
+        first = rng.choice(FIRST_NAMES)
+        school = rng.choice(SCHOOLS)
+        phone = _phone(family)
+        email = f"{last.lower()}.family{family}@example.com"
+        people.append(
+            {
+                "person_id": f"p13-{index:06d}",
+                "full_name": f"{first} {last}",
+                "first_name": first,
+                "last_name": last,
+                "email": email,
+                "email_normalized": email,
+                "phone": f"({phone[:3]}) {phone[3:6]}-{phone[6:]}",
+                "phone_normalized": phone,
+                "membership_state": "active" if rng.random() < 0.75 else "inactive",
+                "school": school["pike13"],
+                "source_url": f"https://example.pike13.com/people/{index}",
+                "raw_text": None,
+                "raw_json": None,
+                "updated_at": now,
+            }
+        )
+    return people
+
+
+def _school_for(person: dict) -> dict:
+    return next(school for school in SCHOOLS if school["pike13"] == person["school"])
+
+
+def _parent(rng: random.Random, person: dict) -> str:
+    return f"{rng.choice(PARENT_FIRST_NAMES)} {person['last_name']}"
+
+
+def _reminders(rng, count, people, instructors, anchor) -> list[dict]:
+    active = [person for person in people if person["membership_state"] == "active"] or people
+    teacher_of = {person["person_id"]: rng.choice(instructors) for person in active}
+    rows = []
+    for index in range(count):
+        person = rng.choice(active)
+        school = _school_for(person)
+        lesson_day = anchor - timedelta(days=rng.randint(-FUTURE_DAYS, HISTORY_DAYS))
+        instrument = rng.choice(INSTRUMENTS)
+        lesson_type = f"Private Lesson - {instrument}"
+        students = person["full_name"]
+        roll = rng.random()
+        if roll < 0.04:
+            lesson_type = f"Group Lesson - {instrument}"
+            students = f"{students}, {rng.choice(active)['full_name']}"
+        elif roll < 0.06:
+            lesson_type = "Admin Meeting"
+        instructor = teacher_of[person["person_id"]] if rng.random() < 0.85 else rng.choice(instructors)
+        pike13_lesson_id = str(100_000_000 + index)
+        notes_text = note_status = note_timestamp = note_hash = None
+        note_score = explanation = None
+        completed = 0
+        if lesson_day < anchor and rng.random() < 0.82:
+            notes_text = rng.choice(NOTE_TEMPLATES).format(first=person["first_name"], topic=rng.choice(NOTE_TOPICS))
+            note_status = "extracted"
+            note_timestamp = _stamp(lesson_day, rng)
+            note_hash = hashlib.sha256(notes_text.encode("utf-8")).hexdigest()
+            completed = 1
+            if rng.random() < 0.6:
+                note_score = round(rng.uniform(4, 10), 1)
+                explanation = "Specific goals and practice plan."
+        elif lesson_day < anchor:
+            note_status = rng.choice(("no_note", "error"))
+        rows.append(
+            {
+                "lesson_id": f"{school['code']}-{pike13_lesson_id}",
+                "school": school["code"],
+                "instructor_name": instructor,
+                "lesson_date": lesson_day.isoformat(),
+                "lesson_time": rng.choice(LESSON_SLOTS),
+                "lesson_type": lesson_type,
+                "students": students,
+                "location": f"Room {rng.randint(1, 8)}",
+                "notes_text": notes_text,
+                "note_timestamp": note_timestamp,
+                "note_status": note_status,
+                "pike13_lesson_id": pike13_lesson_id,
+                "note_completed": completed,
+                "attendance_status": rng.choices(("present", "absent", "unknown"), (85, 8, 7))[0],
+                "last_checked": anchor.isoformat(),
+                "note_score": note_score,
+                "note_score_explanation": explanation,
+                "note_score_model": "gpt-4o-mini" if note_score is not None else None,
+                "note_score_version": "v1-note-quality" if note_score is not None else None,
+                "note_score_updated_at": note_timestamp if note_score is not None else None,
+                "note_score_hash": note_hash if note_score is not None else None,
+            }
+        )
+    return rows
+
+
+def _lead(rng: random.Random, people: list[dict], index: int) -> dict:
+    """An existing Pike13 person about 60% of the time, otherwise a brand-new prospect."""
+    if rng.random() < 0.6:
+        return rng.choice(people)
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    phone = _phone(5_000_000 + index)
+    return {
+        "person_id": None,
+        "full_name": f"{first} {last}",
+        "first_name": first,
+        "last_name": last,
+        "email_normalized": f"{first.lower()}.{last.lower()}{index}@example.net",
+        "phone_normalized": phone,
+        "school": rng.choice(SCHOOLS)["pike13"],
+    }
+
+
+def _hubspot(rng, volume, people, anchor, now) -> tuple[list[dict], list[dict]]:
+    deals, contacts = [], []
+    for index in range(max(volume["hubspot_deals"], volume["hubspot_contacts"])):
+        lead = _lead(rng, people, index)
+        school = _school_for(lead)
+        created = anchor - timedelta(days=rng.randint(0, 120))
+        if index < volume["hubspot_deals"]:
+            stage = rng.choice(DEAL_STAGES)
+            trial = created + timedelta(days=rng.randint(2, 14)) if stage != "New Lead" else None
+            deals.append(
+                {
+                    "deal_id": f"deal-{index}",
+                    "deal_name": f"{lead['full_name']} | {school['hubspot']}",
+                    "stage": stage,
+                    "school": school["hubspot"],
+                    "create_date": created.isoformat(),
+                    "last_activity_date": (created + timedelta(days=rng.randint(0, 5))).isoformat(),
+                    "last_contacted": (created + timedelta(days=rng.randint(0, 3))).isoformat() if rng.random() < 0.7 else None,
+                    "trial_date": trial.isoformat() if trial else None,
+                    "instrument_type": rng.choice(INSTRUMENTS),
+                    "lead_source": rng.choice(LEAD_SOURCES),
+                    "pike13_person_id": lead["person_id"],
+                    "source_url": f"https://app.hubspot.com/deal/{index}",
+                    "raw_text": lead["full_name"],
+                    "updated_at": now,
+                }
+            )
+        if index < volume["hubspot_contacts"]:
+            contacts.append(
+                {
+                    "contact_id": f"contact-{index}",
+                    "first_name": lead["first_name"],
+                    "last_name": lead["last_name"],
+                    "full_name": lead["full_name"],
+                    "email": lead["email_normalized"],
+                    "email_normalized": lead["email_normalized"],
+                    "phone": lead["phone_normalized"],
+                    "phone_normalized": lead["phone_normalized"],
+                    "school": school["hubspot"],
+                    "associated_deal_ids": f"deal-{index}" if index < volume["hubspot_deals"] else None,
+                    "source_url": f"https://app.hubspot.com/contact/{index}",
+                    "raw_json": json.dumps({"trusted": 1}),
+                    "updated_at": now,
+                }
+            )
+    return deals, contacts
+
+
+def _dialpad(rng, volume, people, anchor, now) -> dict[str, list[dict]]:
+    threads, messages, events, voicemails, call_logs, downloads, transcripts = [], [], [], [], [], [], []
+    for index in range(volume["dialpad_sms_threads"]):
+        person = _lead(rng, people, 8_000_000 + index)
+        threads.append(
+            {
+                "thread_id": f"thread-{index}",
+                "phone": person["phone_normalized"],
+                "phone_normalized": person["phone_normalized"],
+                "contact_name": person["full_name"] if rng.random() < 0.7 else None,
+                "last_message_at": _stamp(anchor - timedelta(days=rng.randint(0, 30)), rng),
+                "school": _school_for(person)["hubspot"],
+                "updated_at": now,
+                "_person": person,
+            }
+        )
+    for index in range(volume["dialpad_sms_messages"]):
+        thread = rng.choice(threads)
+        person = thread["_person"]
+        inbound = rng.random() < 0.5
+        messages.append(
+            {
+                "message_id": f"sms-{index}",
+                "thread_id": thread["thread_id"],
+                "message_at": _stamp(anchor - timedelta(days=rng.randint(0, HISTORY_DAYS)), rng),
+                "direction": "inbound" if inbound else "outbound",
+                "sender": person["phone_normalized"] if inbound else "school",
+                "recipient": "school" if inbound else person["phone_normalized"],
+                "body": rng.choice(SMS_TEMPLATES).format(
+                    parent=_parent(rng, person),
+                    first=person["first_name"],
+                    instrument=rng.choice(INSTRUMENTS),
+                    slot=rng.choice(LESSON_SLOTS),
+                ),
+                "updated_at": now,
+            }
+        )
+    for thread in threads:
+        del thread["_person"]
+    for index in range(volume["dialpad_voice_events"]):
+        person = _lead(rng, people, 9_000_000 + index)
+        school = _school_for(person)
+        at = _stamp(anchor - timedelta(days=rng.randint(0, HISTORY_DAYS)), rng)
+        voicemail = rng.random() < 0.1
+        recorded = not voicemail and rng.random() < 0.3
+        call_id = f"call-{index}"
+        transcript = (
+            rng.choice(VOICEMAIL_TEMPLATES).format(
+                parent=_parent(rng, person), first=person["first_name"], last=person["last_name"], instrument=rng.choice(INSTRUMENTS)
+            )
+            if voicemail
+            else None
+        )
+        recording_url = f"https://dialpad.example/recordings/{call_id}.mp3" if recorded else None
+        direction = rng.choice(("inbound", "outbound"))
+        events.append(
+            {
+                "event_id": f"voice-{index}",
+                "event_type": "voicemail" if voicemail else "call",
+                "call_id": call_id,
+                "phone": person["phone_normalized"],
+                "phone_normalized": person["phone_normalized"],
+                "contact_name": person["full_name"],
+                "direction": direction,
+                "event_at": at,
+                "school": school["hubspot"],
+                "outcome": rng.choice(("connected", "missed", "voicemail")) if not voicemail else "voicemail",
+                "voicemail_transcript": transcript,
+                "recording_url": recording_url,
+                "updated_at": now,
+            }
+        )
+        call_logs.append(
+            {
+                "call_id": call_id,
+                "external_number": f"+1{person['phone_normalized']}",
+                "date_started": at,
+                "direction": direction,
+                "category": "voicemail" if voicemail else "call",
+                "name": person["full_name"],
+                "school_code": school["code"],
+                "school_name": school["hubspot"],
+                "voicemail_transcript": transcript,
+                "recording_url": recording_url,
+            }
+        )
+        if recorded:
+            downloads.append(
+                {
+                    "call_id": call_id,
+                    "recording_url": recording_url,
+                    "file_path": f"recordings/{call_id}.mp3",
+                    "status": "success",
+                    "downloaded_at": now,
+                    "voice_event_id": f"voice-{index}",
+                    "event_at": at,
+                    "school": school["hubspot"],
+                    "file_sha256": hashlib.sha256(call_id.encode()).hexdigest(),
+                    "updated_at": now,
+                }
+            )
+            if rng.random() < 0.7:
+                transcripts.append(
+                    {
+                        "call_id": call_id,
+                        "recording_url": recording_url,
+                        "transcript_text": f"Caller asked about {person['first_name']}'s schedule.",
+                        "transcript_status": "completed",
+                        "outcome": rng.choice(("scheduled", "info_only", "no_action")),
+                        "summary": "Schedule question.",
+                        "created_at": now,
+                    }
+                )
+    for index in range(volume["dialpad_voicemails"]):
+        person = _lead(rng, people, 9_500_000 + index)
+        voicemails.append(
+            {
+                "call_id": f"vm-{index}",
+                "external_number": f"+1{person['phone_normalized']}",
+                "name": person["full_name"] if rng.random() < 0.5 else None,
+                "transcription_text": rng.choice(VOICEMAIL_TEMPLATES).format(
+                    parent=_parent(rng, person), first=person["first_name"], last=person["last_name"], instrument=rng.choice(INSTRUMENTS)
+                ),
+                "recording_url": f"https://dialpad.example/voicemails/vm-{index}.mp3",
+                "date": _stamp(anchor - timedelta(days=rng.randint(0, HISTORY_DAYS)), rng),
+            }
+        )
+    return {
+        "dialpad_sms_threads": threads,
+        "dialpad_sms_messages": messages,
+        "dialpad_voice_events": events,
+        "dialpad_voicemails": voicemails,
+        "call_logs": call_logs,
+        "recording_downloads": downloads,
+        "recording_transcripts": transcripts,
+    }
+
+
+def _emails(rng, count, people, anchor, now) -> list[dict]:
+    rows = []
+    for index in range(count):
+        person = _lead(rng, people, 9_800_000 + index // 3)
+        school = _school_for(person)
+        inbound = rng.random() < 0.55
+        external = person["email_normalized"]
+        subject = rng.choice(EMAIL_SUBJECTS).format(first=person["first_name"])
+        body = f"Hello, writing about {person['first_name']} {person['last_name']}'s lessons. " * rng.randint(1, 6)
+        rows.append(
+            {
+                "message_id": f"<msg-{index}@example.com>",
+                "thread_id": f"email-thread-{index // 3}",
+                "school_mailbox": school["mailbox"],
+                "school": school["pike13"],
+                "direction": "inbound" if inbound else "outbound",
+                "message_at": _stamp(anchor - timedelta(days=rng.randint(0, HISTORY_DAYS)), rng),
+                "from_email": external if inbound else school["mailbox"],
+                "from_email_normalized": external if inbound else school["mailbox"],
+                "to_emails": school["mailbox"] if inbound else external,
+                "to_emails_normalized": school["mailbox"] if inbound else external,
+                "cc_emails": None,
+                "cc_emails_normalized": None,
+                "external_email_normalized": external,
+                "subject": subject,
+                "snippet": body[:120],
+                "body": body,
+                "updated_at": now,
+            }
+        )
+    return rows
+
+
+def _pike13_activity(rng, volume, people, instructors, anchor, now) -> tuple[list[dict], list[dict], list[dict]]:
+    visits, plans = [], []
+    for index in range(volume["pike13_visits"]):
+        person = rng.choice(people)
+        trial = rng.random() < 0.1
+        status = rng.choices(("Complete", "NoShow", "Late Cancel"), (88, 6, 6))[0]
+        day = anchor - timedelta(days=rng.randint(-FUTURE_DAYS, HISTORY_DAYS))
+        visits.append(
+            {
+                "visit_id": f"visit-{index}",
+                "person_id": person["person_id"],
+                "service": f"Trial - {rng.choice(INSTRUMENTS)}" if trial else f"Private Lesson - {rng.choice(INSTRUMENTS)}",
+                "starts_at": f"{day.isoformat()}T{rng.randint(15, 19):02d}:00:00",
+                "status": status,
+                "no_show_flag": int(status == "NoShow"),
+                "canceled_flag": int(status == "Late Cancel"),
+                "first_visit_flag": int(trial),
+                "attendance_confirmed_flag": int(status == "Complete"),
+                "checked_in_flag": int(status == "Complete"),
+                "instructor": rng.choice(instructors),
+                "school": person["school"],
+                "updated_at": now,
+            }
+        )
+    for index in range(volume["pike13_plans_passes"]):
+        person = rng.choice(people)
+        start = anchor - timedelta(days=rng.randint(0, 365))
+        active = person["membership_state"] == "active"
+        plans.append(
+            {
+                "plan_pass_id": f"plan-{index}",
+                "person_id": person["person_id"],
+                "name": rng.choice(("Lessons Only - 45 Minute Lessons", "Performance Program", "Rookies")),
+                "status": "Active" if active else "Ended",
+                "starts_at": start.isoformat(),
+                "ends_at": None if active else (start + timedelta(days=rng.randint(30, 200))).isoformat(),
+                "school": person["school"],
+                "payer_name": _parent(rng, person),
+                "updated_at": now,
+            }
+        )
+    clients = [
+        {
+            "Client": person["full_name"],
+            "Email": person["email"],
+            "Phone": person["phone"],
+            "Mobile Phone": person["phone_normalized"] if rng.random() < 0.5 else None,
+            "Home Location": person["school"],
+        }
+        for person in people
+    ]
+    return visits, plans, clients
+
+
+def _import_runs(anchor: date) -> list[dict]:
+    finished = datetime.combine(anchor, time(6, 0), tzinfo=timezone.utc).isoformat()
+    return [
+        {
+            "source": source,
+            "extractor": "synthetic",
+            "started_at": finished,
+            "finished_at": finished,
+            "status": "success",
+            "window_start": (anchor - timedelta(days=HISTORY_DAYS)).isoformat(),
+            "window_end": anchor.isoformat(),
+            "rows_seen": 0,
+            "rows_inserted": 0,
+            "rows_updated": 0,
+        }
+        for source in ("hubspot", "dialpad", "pike13", "school_email")
+    ]
+
+
+def generate_synthetic_db(
+    path: Path | str,
+    scale: float = 1.0,
+    seed: int = DEFAULT_SEED,
+    anchor: Optional[date] = None,
+) -> dict[str, int]:
+    """Create a synthetic database at ``path`` (which must not exist); returns row counts by table."""
+    path = Path(path)
+    if path.exists():
+        raise FileExistsError(path)
+    anchor = anchor or DEFAULT_ANCHOR
+    rng = random.Random(f"{seed}:{scale}")
+    volume = volume_for_scale(scale)
+    now = utc_now_iso()
+    conn = sqlite3.connect(path)
+    try:
+        _create_base_tables(conn)
+        ensure_lead_followup_schema(conn)
+        instructors = [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" for _ in range(volume["instructors"])]
+        people = _people(rng, volume["pike13_people"], now)
+        deals, contacts = _hubspot(rng, volume, people, anchor, now)
+        visits, plans, clients = _pike13_activity(rng, volume, people, instructors, anchor, now)
+        tables = {
+            "pike13_people": people,
+            "pike13_visits": visits,
+            "pike13_plans_passes": plans,
+            "pike13_clients": clients,
+            "reminders": _reminders(rng, volume["reminders"], people, instructors, anchor),
+            "hubspot_deals": deals,
+            "hubspot_contacts": contacts,
+            **_dialpad(rng, volume, people, anchor, now),
+            "school_email_messages": _emails(rng, volume["school_email_messages"], people, anchor, now),
+            "source_import_runs": _import_runs(anchor),
+        }
+        counts = {table: _insert(conn, table, rows) for table, rows in tables.items()}
+        backfill_reporting(conn)
+        for table in ("lessons", "lesson_students", "students", "lesson_notes"):
+            counts[table] = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        meta = {
+            "generator_version": GENERATOR_VERSION,
+            "scale": scale,
+            "seed": seed,
+            "anchor": anchor.isoformat(),
+            "generated_at": now,
+            "row_counts": counts,
+        }
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {META_TABLE} (key, value) VALUES (?, ?)",
+            [(key, json.dumps(value)) for key, value in meta.items()],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return counts
+
+
+def read_synthetic_meta(conn: sqlite3.Connection) -> dict:
+    """The generator parameters stored in a synthetic database (empty for a real one)."""
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (META_TABLE,)).fetchone()
+    if not exists:
+        return {}
+    return {key: json.loads(value) for key, value in conn.execute(f"SELECT key, value FROM {META_TABLE}")}
@@ -0,0 +1,364 @@
+"""Direct client for Pike13's Desk reports ``/queries`` endpoint.
+
+The Desk report UI fetches its data from
+``/desk/api/v3/reports/<report>/queries?auth_token=...&subdomain=...``. Instead
+of driving the UI and sniffing one response per page load, this client
+captures the ``auth_token`` once from a real UI request, then POSTs query
+payloads directly and hands each page to a callback as it arrives so rows can
+be streamed into SQLite.
+
+The endpoint has no cursor: ``page.limit`` is cumulative from the first row
+(the UI's "Load more" repeats the query with a bigger limit), and the gateway
+can time out on a single request for more than 100 rows. Each query is
+therefore read as sort windows, the same coverage scrape_pike13_current_members
+uses: the first ``page_size`` rows ascending by ``key_field`` and, when the
+query has more, the first ``page_size`` rows descending. Together they cover
+up to ``2 * page_size`` rows. A date-window query with more rows than that is
+split in half and each half is read the same way. A query whose distinct rows
+do not reach ``total_count`` raises ``Pike13ReportsError``.
+
+Concurrency is across queries (date ranges, reports, fields), bounded by
+``max_concurrency``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+# Pike13's report gateway can time out on a cumulative request above 100 rows.
+MAX_PAGE_SIZE = 100
+DEFAULT_PAGE_SIZE = MAX_PAGE_SIZE
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_TOKEN_TIMEOUT_MS = 45000
+
+
+class Pike13ReportsError(RuntimeError):
+    """The queries endpoint rejected a request, returned an unexpected payload, or came up short."""
+
+
+class Pike13WindowTooLarge(Pike13ReportsError):
+    """A query has more rows than its two sort windows can cover."""
+
+    def __init__(self, query_key: str, total_count: int, limit: int):
+        super().__init__(f"{query_key}: {total_count} rows exceed the {limit}-row sort-window coverage")
+        self.total_count = total_count
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+
+
+@dataclass(frozen=True)
+class ReportQuery:
+    key: str
+    fields: tuple[str, ...]
+    report: str = "clients"
+    filter: Optional[list] = None
+    key_field: str = "person_id"  # unique per row; sort windows are ordered and deduplicated on it
+
+
+@dataclass
+class ReportPage:
+    query_key: str
+    page_number: int
+    field_names: list[str]
+    rows: list[list]
+    total_count: Optional[int]
+    has_more: bool
+
+    def records(self) -> list[dict]:
+        return [dict(zip(self.field_names, row)) for row in self.rows]
+
+
+@dataclass
+class QueryResult:
+    query: ReportQuery
+    pages: int = 0
+    row_count: int = 0
+    total_count: Optional[int] = None
+    field_names: list[str] = field(default_factory=list)
+    rows: list[list] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        return self.total_count is not None and self.row_count >= self.total_count
+
+
+def date_filter(field_name: str, start: str, end: str, operator: str = "btw") -> list:
+    """Reporting API filter for a date window, e.g. ``["btw", "last_membership_end", [a, b]]``."""
+    return [operator, field_name, [start, end]]
+
+
+def split_date_filter(query_filter: Optional[list]) -> Optional[tuple[list, list]]:
+    """Halve a ``btw`` date filter into two non-overlapping windows; None if it cannot be split."""
+    if not query_filter or len(query_filter) != 3 or str(query_filter[0]).lower() != "btw":
+        return None
+    operator, field_name, bounds = query_filter
+    try:
+        start, end = (date.fromisoformat(str(value)[:10]) for value in bounds)
+    except (TypeError, ValueError):
+        return None
+    if end <= start:
+        return None
+    middle = start + (end - start) // 2
+    return (
+        [operator, field_name, [start.isoformat(), middle.isoformat()]],
+        [operator, field_name, [(middle + timedelta(days=1)).isoformat(), end.isoformat()]],
+    )
+
+
+def build_query_payload(query: ReportQuery, limit: int, descending: bool = False) -> dict:
+    """One sort window: the first ``limit`` rows of ``query`` ordered by its key field."""
+    attributes: dict = {
+        "fields": list(query.fields),
+        "page": {"limit": limit},
+        "sort": [f"{query.key_field}-" if descending else query.key_field],
+    }
+    if query.filter:
+        attributes["filter"] = query.filter
+    return {"data": {"type": "queries", "attributes": attributes}}
+
+
+def parse_query_response(query_key: str, page_number: int, payload: dict) -> ReportPage:
+    data = payload.get("data") if isinstance(payload, dict) else None
+    if not isinstance(data, dict):
+        errors = payload.get("errors") if isinstance(payload, dict) else None
+        raise Pike13ReportsError(f"{query_key}: unexpected queries response: {errors or str(payload)[:200]}")
+    attributes = data.get("attributes") or {}
+    field_names = [item.get("name") if isinstance(item, dict) else item for item in attributes.get("fields") or []]
+    return ReportPage(
+        query_key=query_key,
+        page_number=page_number,
+        field_names=field_names,
+        rows=attributes.get("rows") or [],
+        total_count=attributes.get("total_count"),
+        has_more=bool(attributes.get("has_more")),
+    )
+
+
+def auth_token_from_url(url: str) -> Optional[str]:
+    return (parse_qs(urlparse(url).query).get("auth_token") or [None])[0]
+
+
+async def capture_auth_token(page, report_url: str, timeout_ms: int = DEFAULT_TOKEN_TIMEOUT_MS) -> str:
+    """Open a Desk report once and take the auth_token from its own /queries request."""
+
+    def is_queries_request(request) -> bool:
+        return "/queries" in request.url and "auth_token=" in request.url
+
+    async with page.expect_request(is_queries_request, timeout=timeout_ms) as request_info:
+        await page.goto(report_url, wait_until="domcontentloaded", timeout=timeout_ms)
+    request = await request_info.value
+    token = auth_token_from_url(request.url)
+    if not token:
+        raise Pike13ReportsError(f"No auth_token on captured queries request: {request.url[:120]}")
+    return token
+
+
+class PlaywrightTransport:
+    """POST JSON through a Playwright APIRequestContext (shares the browser's cookies)."""
+
+    def __init__(self, request_context):
+        self.request_context = request_context
+
+    async def post(self, url: str, payload: dict) -> dict:
+        response = await self.request_context.post(
+            url,
+            data=json.dumps(payload),
+            headers={"Content-Type": "application/json", "Accept": "application/json"},
+        )
+        if not response.ok:
+            body = await response.text()
+            raise Pike13ReportsError(f"HTTP {response.status} from {url.split('?')[0]}: {body[:200]}")
+        return await response.json()
+
+
+Transport = Callable[[str, dict], Awaitable[dict]]
+PageCallback = Callable[[ReportPage], None]
+
+
+class Pike13ReportsClient:
+    def __init__(
+        self,
+        subdomain: str,
+        auth_token: str,
+        post: Transport,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ):
+        self.subdomain = subdomain
+        self.auth_token = auth_token
+        self.post = post
+        self.page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        self.max_concurrency = max(1, max_concurrency)
+
+    @classmethod
+    def from_context(cls, context, subdomain: str, auth_token: str, **options) -> "Pike13ReportsClient":
+        return cls(subdomain, auth_token, PlaywrightTransport(context.request).post, **options)
+
+    def queries_url(self, report: str) -> str:
+        return (
+            f"https://{self.subdomain}.pike13.com/desk/api/v3/reports/{report}/queries"
+            f"?auth_token={self.auth_token}&subdomain={self.subdomain}"
+        )
+
+    async def iter_pages(self, query: ReportQuery):
+        """Yield the sort windows of one query, each holding only rows not seen before.
+
+        Raises ``Pike13WindowTooLarge`` before yielding anything when the query
+        has more than ``2 * page_size`` rows, and ``Pike13ReportsError`` when
+        the windows do not add up to ``total_count``.
+        """
+        url = self.queries_url(query.report)
+        seen: set = set()
+        total = None
+        for page_number, descending in enumerate((False, True), start=1):
+            payload = await self.post(url, build_query_payload(query, self.page_size, descending))
+            page = parse_query_response(query.key, page_number, payload)
+            if total is None:
+                total = page.total_count
+                if total is None:
+                    raise Pike13ReportsError(f"{query.key}: queries response has no total_count")
+                if total > 2 * self.page_size:
+                    raise Pike13WindowTooLarge(query.key, total, 2 * self.page_size)
+            if query.key_field not in page.field_names:
+                raise Pike13ReportsError(f"{query.key}: key field {query.key_field!r} missing from response fields")
+            key_index = page.field_names.index(query.key_field)
+            fresh = []
+            for row in page.rows:
+                row_key = row[key_index] if len(row) > key_index else None
+                if row_key is None:
+                    row_key = json.dumps(row, default=str)
+                if row_key not in seen:
+                    seen.add(row_key)
+                    fresh.append(row)
+            page.rows = fresh
+            yield page
+            if len(seen) >= total:
+                return
+        raise Pike13ReportsError(f"{query.key}: fetched {len(seen)} of {total} rows")
+
+    async def pull(
+        self,
+        query: ReportQuery,
+        on_page: Optional[PageCallback] = None,
+        collect_rows: bool = True,
+    ) -> QueryResult:
+        """Read every row of ``query``, splitting date windows too wide for the sort windows."""
+        result = QueryResult(query, total_count=0)
+        await self._pull_window(result, query, on_page, collect_rows)
+        return result
+
+    async def _pull_window(self, result: QueryResult, window: ReportQuery, on_page, collect_rows) -> None:
+        try:
+            async for page in self.iter_pages(window):
+                if page.page_number == 1:
+                    result.total_count += page.total_count
+                # Pages of split windows are numbered and keyed as one query.
+                result.pages += 1
+                page.query_key, page.page_number = result.query.key, result.pages
+                result.row_count += len(page.rows)
+                result.field_names = page.field_names or result.field_names
+                if collect_rows:
+                    result.rows.extend(page.rows)
+                if on_page is not None:
+                    on_page(page)
+        except Pike13WindowTooLarge:
+            halves = split_date_filter(window.filter)
+            if halves is None:
+                raise
+            for half in halves:
+                await self._pull_window(result, replace(window, filter=half), on_page, collect_rows)
+
+    async def pull_many(
+        self,
+        queries: list[ReportQuery],
+        on_page: Optional[PageCallback] = None,
+        collect_rows: bool = True,
+        return_exceptions: bool = False,
+    ) -> dict[str, QueryResult | BaseException]:
+        """Run ``queries`` with at most ``max_concurrency`` in flight; results keyed by query key.
+
+        With ``return_exceptions`` a failed query maps to its exception instead of
+        aborting the others.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def bounded(query: ReportQuery) -> QueryResult:
+            async with semaphore:
+                return await self.pull(query, on_page, collect_rows)
+
+        results = await asyncio.gather(*(bounded(query) for query in queries), return_exceptions=return_exceptions)
+        return {query.key: result for query, result in zip(queries, results)}
+
+
+def ensure_report_rows_schema(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS pike13_report_rows (
+            pull_id TEXT NOT NULL,
+            school TEXT NOT NULL,
+            report TEXT NOT NULL,
+            query_key TEXT NOT NULL,
+            page_number INTEGER NOT NULL,
+            row_index INTEGER NOT NULL,
+            person_id TEXT,
+            row_json TEXT NOT NULL,
+            pulled_at TEXT NOT NULL,
+            PRIMARY KEY (pull_id, query_key, page_number, row_index)
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_pike13_report_rows_person ON pike13_report_rows(person_id, pulled_at)"
+    )
+
+
+class SqliteRowSink:
+    """Page callback that writes each page to ``pike13_report_rows`` and commits it."""
+
+    def __init__(self, conn: sqlite3.Connection, pull_id: str, school: str, reports: dict[str, str]):
+        self.conn = conn
+        self.pull_id = pull_id
+        self.school = school
+        self.reports = reports  # query_key -> report name
+        self.rows_written = 0
+        ensure_report_rows_schema(conn)
+
+    def __call__(self, page: ReportPage) -> None:
+        pulled_at = utc_now_iso()
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT OR REPLACE INTO pike13_report_rows
+                (pull_id, school, report, query_key, page_number, row_index, person_id, row_json, pulled_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        self.pull_id,
+                        self.school,
+                        self.reports.get(page.query_key, ""),
+                        page.query_key,
+                        page.page_number,
+                        index,
+                        _person_id(record),
+                        json.dumps(record, default=str),
+                        pulled_at,
+                    )
+                    for index, record in enumerate(page.records())
+                ],
+            )
+        self.rows_written += len(page.rows)
+
+
+def _person_id(record: dict) -> Optional[str]:
+    value = record.get("person_id")
+    return str(value) if value not in (None, "") else None
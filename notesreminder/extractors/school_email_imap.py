@@ -0,0 +1,427 @@
+"""In-process IMAP extractor for the school mailbox with UID high-water marks."""
+
+from __future__ import annotations
+
+import email
+import imaplib
+import json
+import re
+import sqlite3
+from datetime import datetime, timezone
+from email import policy
+from email.utils import getaddresses, parsedate_to_datetime
+from typing import Iterable
+
+from lead_followup_schema import normalize_email, upsert_school_email_message, utc_now_iso
+from school_email import json_email_list
+
+
+OUR_EMAIL = "huscott@schoolofrock.com"
+OUR_EMAIL_N = normalize_email(OUR_EMAIL)
+DEFAULT_ACCOUNT = "sor"
+DEFAULT_MAILBOX = "INBOX"
+DEFAULT_IMAP_HOST = "imap.gmail.com"
+DEFAULT_BATCH_SIZE = 100
+FETCH_ITEMS = "(UID INTERNALDATE BODY.PEEK[])"
+
+# Domains/senders we skip (notifications picked up by other scrapers)
+SKIP_FROM_DOMAINS = {
+    "pike13.com", "hubspot.com", "dialpad.com",
+    "instagram.com", "mail.instagram.com", "zapier.com", "markel.com",
+    "linkedin.com", "facebookmail.com",
+}
+SKIP_SENDERS = {"no-reply@", "noreply@", "notifications@", "alert@"}
+# Subject patterns that indicate notifications (not customer comms)
+SKIP_SUBJECT_PATTERNS = [
+    r"added a note about",         # Pike13 lesson notes
+    r"booked you for",              # Pike13 booking confirmations
+    r"New Trial/Tour Booking",       # Pike13 trial bookings
+    r"New Lead - Contact -",         # HubSpot new lead
+    r"^HubSpot",                     # HubSpot generic
+    r"^Follow-Up for",               # HubSpot follow-up sequences
+    r"New login for your",           # Dialpad login notification
+    r"^Your verification code",      # 2FA codes
+    r"^Re: Update:",                 # forwarded internal threads (via Pike13)
+    r"^Re: Following Up on",         # HubSpot follow-up via forward
+    r"stories-recap",                # Instagram
+    r"recently added to their stories", # Instagram
+    r"Payment Confirmation",         # Markel/billing
+    r"held Tasks are still waiting", # Zapier alerts
+    r"unread messages.*instagram",   # Instagram
+]
+
+UID_RE = re.compile(rb"UID (\d+)")
+UIDVALIDITY_RE = re.compile(rb"(\d+)")
+PHONE_RE = re.compile(r"(?:\+?1[-\s.]?)?\(?\d{3}\)?[-\s.]?\d{3}[-\s.]?\d{4}")
+
+
+def should_skip(actual_from, subject):
+    """Return True if this email should be filtered out (notification/system)."""
+    from_lower = (actual_from or "").lower()
+    subj = (subject or "").lower()
+    for d in SKIP_FROM_DOMAINS:
+        if d in from_lower:
+            return True
+    for s in SKIP_SENDERS:
+        if from_lower.startswith(s):
+            return True
+    for pat in SKIP_SUBJECT_PATTERNS:
+        if re.search(pat, subj, re.IGNORECASE):
+            return True
+    return False
+
+
+def strip_html(raw_text):
+    """Very basic HTML tag stripping for plain-text extraction."""
+    return re.sub(r"<[^>]+>", "", raw_text).strip()
+
+
+def extract_phone_numbers(text):
+    """Extract US phone numbers from text."""
+    return list(set(PHONE_RE.findall(text)))
+
+
+def ensure_imap_sync_schema(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS imap_sync_state (
+            account TEXT NOT NULL,
+            mailbox TEXT NOT NULL,
+            uidvalidity INTEGER NOT NULL,
+            last_uid INTEGER NOT NULL DEFAULT 0,
+            last_synced_at TEXT,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (account, mailbox)
+        )
+        """
+    )
+
+
+def load_watermark(conn: sqlite3.Connection, account: str, mailbox: str) -> tuple[int | None, int]:
+    row = conn.execute(
+        "SELECT uidvalidity, last_uid FROM imap_sync_state WHERE account = ? AND mailbox = ?",
+        (account, mailbox),
+    ).fetchone()
+    if not row:
+        return None, 0
+    return int(row[0]), int(row[1])
+
+
+def save_watermark(
+    conn: sqlite3.Connection,
+    account: str,
+    mailbox: str,
+    uidvalidity: int,
+    last_uid: int,
+) -> None:
+    now = utc_now_iso()
+    conn.execute(
+        """
+        INSERT INTO imap_sync_state (account, mailbox, uidvalidity, last_uid, last_synced_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(account, mailbox) DO UPDATE SET
+            uidvalidity = excluded.uidvalidity,
+            last_uid = excluded.last_uid,
+            last_synced_at = excluded.last_synced_at,
+            updated_at = excluded.updated_at
+        """,
+        (account, mailbox, uidvalidity, last_uid, now, now),
+    )
+
+
+def connect_imap(host: str, user: str, password: str, port: int | None = None, use_ssl: bool = True):
+    """Open one authenticated IMAP connection for the whole sync."""
+    if use_ssl:
+        client = imaplib.IMAP4_SSL(host, port or imaplib.IMAP4_SSL_PORT)
+    else:
+        client = imaplib.IMAP4(host, port or imaplib.IMAP4_PORT)
+    client.login(user, password)
+    return client
+
+
+def _check(typ, data, action):
+    if typ != "OK":
+        raise imaplib.IMAP4.error(f"IMAP {action} failed: {typ} {data!r}")
+    return data
+
+
+def select_mailbox(client, mailbox: str) -> int:
+    """Select the mailbox read-only and return its UIDVALIDITY."""
+    _check(*client.select(mailbox, readonly=True), f"SELECT {mailbox}")
+    _typ, data = client.response("UIDVALIDITY")
+    for item in data or []:
+        if item:
+            match = UIDVALIDITY_RE.search(item if isinstance(item, bytes) else str(item).encode())
+            if match:
+                return int(match.group(1))
+    _typ, data = client.status(mailbox, "(UIDVALIDITY)")
+    match = re.search(rb"UIDVALIDITY (\d+)", (data or [b""])[0] or b"")
+    if not match:
+        raise imaplib.IMAP4.error(f"IMAP server did not report UIDVALIDITY for {mailbox}")
+    return int(match.group(1))
+
+
+def search_new_uids(client, after_uid: int) -> list[int]:
+    data = _check(*client.uid("SEARCH", None, f"UID {after_uid + 1}:*"), "UID SEARCH")
+    uids = []
+    for chunk in data or []:
+        uids.extend(int(value) for value in (chunk or b"").split())
+    # ``N:*`` always matches the highest UID even when it is below N.
+    return sorted(uid for uid in set(uids) if uid > after_uid)
+
+
+def _uid_set(uids: Iterable[int]) -> str:
+    """Compress sorted UIDs into an IMAP sequence set (``1:3,7,9:10``)."""
+    ranges = []
+    start = prev = None
+    for uid in sorted(uids):
+        if start is None:
+            start = prev = uid
+        elif uid == prev + 1:
+            prev = uid
+        else:
+            ranges.append((start, prev))
+            start = prev = uid
+    if start is not None:
+        ranges.append((start, prev))
+    return ",".join(str(a) if a == b else f"{a}:{b}" for a, b in ranges)
+
+
+def fetch_messages(client, uids: list[int]) -> dict[int, bytes]:
+    """Fetch headers and bodies for a batch of UIDs with one ``UID FETCH``."""
+    if not uids:
+        return {}
+    data = _check(*client.uid("FETCH", _uid_set(uids), FETCH_ITEMS), "UID FETCH")
+    messages = {}
+    for item in data or []:
+        if not isinstance(item, tuple) or len(item) < 2:
+            continue
+        match = UID_RE.search(item[0])
+        if match:
+            messages[int(match.group(1))] = item[1]
+    return messages
+
+
+def _message_text(message) -> str:
+    part = message.get_body(preferencelist=("plain", "html"))
+    if part is None:
+        return ""
+    try:
+        content = part.get_content()
+    except (LookupError, UnicodeDecodeError):
+        payload = part.get_payload(decode=True) or b""
+        content = payload.decode("utf-8", errors="replace")
+    if part.get_content_subtype() == "html":
+        content = strip_html(content)
+    return str(content)
+
+
+def _addresses(message, header: str) -> list[str]:
+    return [address for _name, address in getaddresses(message.get_all(header, [])) if address]
+
+
+def _message_at(message) -> str:
+    value = message.get("Date")
+    if value:
+        try:
+            return parsedate_to_datetime(str(value)).isoformat()
+        except (TypeError, ValueError, IndexError):
+            pass
+    return utc_now_iso()
+
+
+def imap_message_key(
+    account: str,
+    mailbox: str,
+    uidvalidity: int | None,
+    uid: int,
+    rfc822_message_id: str | None = None,
+) -> str:
+    """Stable ``school_email_messages.message_id`` for an IMAP message.
+
+    Keyed on the RFC 822 Message-ID when the message has one, so the same mail
+    seen in another mailbox or after a UIDVALIDITY reset maps to one row;
+    otherwise on account, mailbox, UIDVALIDITY and UID, which IMAP guarantees
+    unique. Rows the Himalaya extractor stored as ``sor-{id}`` are matched by
+    ``existing_message_key`` before writing.
+    """
+    message_id = (rfc822_message_id or "").strip().strip("<>").strip()
+    if message_id:
+        return f"{account}-mid-{message_id}"
+    return f"{account}-{mailbox}-{uidvalidity if uidvalidity is not None else 0}-{uid}"
+
+
+def _minute_utc(value: str | None):
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.replace(second=0, microsecond=0)
+
+
+def existing_message_key(conn: sqlite3.Connection, row: dict) -> str | None:
+    """The key of a row already holding this message under a different key, if any.
+
+    The Himalaya extractor stored the same mail as ``sor-{id}`` without a
+    Message-ID column, so candidates from the same sender with the same subject
+    match on the Message-ID (in their IMAP metadata or raw headers) or, for
+    Himalaya rows, on the send time to the minute, which is all Himalaya keeps.
+    """
+    if conn.execute("SELECT 1 FROM school_email_messages WHERE message_id = ?", (row["message_id"],)).fetchone():
+        return None
+    message_id = json.loads(row["raw_json"]).get("rfc822_message_id")
+    normalized_id = (message_id or "").strip().strip("<>").strip()
+    sent_at = _minute_utc(row["message_at"])
+    candidates = conn.execute(
+        """
+        SELECT message_id, message_at, raw_text, raw_json
+        FROM school_email_messages
+        WHERE from_email_normalized = ? AND subject = ?
+        ORDER BY message_id
+        """,
+        (row["from_email_normalized"], row["subject"]),
+    ).fetchall()
+    for key, message_at, raw_text, raw_json in candidates:
+        try:
+            meta = json.loads(raw_json or "{}")
+        except ValueError:
+            meta = {}
+        stored_id = (meta.get("rfc822_message_id") or "").strip().strip("<>").strip()
+        if normalized_id and (stored_id == normalized_id or f"<{normalized_id}>" in (raw_text or "")):
+            return key
+        if "himalaya_id" in meta and sent_at is not None and _minute_utc(message_at) == sent_at:
+            return key
+    return None
+
+
+def parse_message(
+    uid: int,
+    raw: bytes,
+    account: str = DEFAULT_ACCOUNT,
+    mailbox: str = DEFAULT_MAILBOX,
+    uidvalidity: int | None = None,
+):
+    """Parse one RFC 822 message into a ``school_email_messages`` row, or None if filtered."""
+    message = email.message_from_bytes(raw, policy=policy.default)
+    subject = str(message.get("Subject") or "")
+    from_list = _addresses(message, "From")
+    actual_from = from_list[0] if from_list else ""
+    if should_skip(actual_from, subject):
+        return None
+
+    to_list = _addresses(message, "To")
+    cc_list = _addresses(message, "Cc")
+    direction = "inbound" if normalize_email(actual_from) != OUR_EMAIL_N else "outbound"
+    if direction == "inbound":
+        to_emails_list = [OUR_EMAIL]
+        external = actual_from
+    else:
+        to_emails_list = to_list[:1]
+        external = to_emails_list[0] if to_emails_list else ""
+
+    text = _message_text(message)
+    plain = text.strip()
+    snippet = re.sub(r"\s+", " ", plain[:200]).strip()
+    header_text = "".join(f"{key}: {value}\n" for key, value in message.items())
+    raw_text = header_text + "\n" + plain
+    thread_id = str(message.get("In-Reply-To") or message.get("Message-ID") or "").strip() or None
+    rfc822_message_id = str(message.get("Message-ID") or "").strip() or None
+
+    return {
+        "message_id": imap_message_key(account, mailbox, uidvalidity, uid, rfc822_message_id),
+        "thread_id": thread_id,
+        "school_mailbox": OUR_EMAIL,
+        "school": None,
+        "direction": direction,
+        "message_at": _message_at(message),
+        "from_email": actual_from,
+        "from_email_normalized": normalize_email(actual_from),
+        "to_emails": json_email_list(to_emails_list),
+        "to_emails_normalized": json_email_list(to_emails_list),
+        "cc_emails": json_email_list(cc_list),
+        "cc_emails_normalized": json_email_list(cc_list),
+        "external_email_normalized": normalize_email(external),
+        "subject": subject,
+        "snippet": snippet,
+        "body": plain[:200],
+        "source_url": None,
+        "raw_text": raw_text[:10000],
+        "raw_json": json.dumps(
+            {
+                "imap_uid": uid,
+                "imap_mailbox": mailbox,
+                "imap_uidvalidity": uidvalidity,
+                "rfc822_message_id": rfc822_message_id,
+                "phones": extract_phone_numbers(raw_text),
+            },
+            sort_keys=True,
+        ),
+        "updated_at": utc_now_iso(),
+    }
+
+
+def sync_mailbox(
+    conn: sqlite3.Connection,
+    client,
+    account: str = DEFAULT_ACCOUNT,
+    mailbox: str = DEFAULT_MAILBOX,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    limit: int | None = None,
+) -> dict:
+    """Fetch only messages above the stored UID watermark and upsert them in batches.
+
+    Each batch of UIDs is fetched with a single ``UID FETCH`` and written in one
+    transaction together with the advanced watermark, so an interrupted sync
+    resumes after the last committed batch.
+    """
+    ensure_imap_sync_schema(conn)
+    uidvalidity = select_mailbox(client, mailbox)
+    stored_validity, last_uid = load_watermark(conn, account, mailbox)
+    reset = stored_validity is not None and stored_validity != uidvalidity
+    if stored_validity is None or reset:
+        last_uid = 0
+
+    uids = search_new_uids(client, last_uid)
+    if limit is not None and limit > 0:
+        uids = uids[:limit]
+    stats = {
+        "account": account,
+        "mailbox": mailbox,
+        "uidvalidity": uidvalidity,
+        "uidvalidity_reset": reset,
+        "start_uid": last_uid,
+        "new_uids": len(uids),
+        "fetched": 0,
+        "stored": 0,
+        "skipped": 0,
+        "batches": 0,
+    }
+    for offset in range(0, len(uids), max(batch_size, 1)):
+        batch = uids[offset : offset + max(batch_size, 1)]
+        messages = fetch_messages(client, batch)
+        rows = []
+        for uid in batch:
+            raw = messages.get(uid)
+            if raw is None:
+                continue
+            stats["fetched"] += 1
+            row = parse_message(uid, raw, account=account, mailbox=mailbox, uidvalidity=uidvalidity)
+            if row is None:
+                stats["skipped"] += 1
+            else:
+                rows.append(row)
+        with conn:
+            for row in rows:
+                row["message_id"] = existing_message_key(conn, row) or row["message_id"]
+                upsert_school_email_message(conn, row)
+            save_watermark(conn, account, mailbox, uidvalidity, batch[-1])
+        stats["stored"] += len(rows)
+        stats["batches"] += 1
+        last_uid = batch[-1]
+    if not uids:
+        with conn:
+            save_watermark(conn, account, mailbox, uidvalidity, last_uid)
+    stats["end_uid"] = last_uid
+    return stats
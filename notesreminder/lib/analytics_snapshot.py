@@ -0,0 +1,276 @@
+"""Columnar snapshot of the tables the retention and churn reports read.
+
+``export_snapshot`` writes each table as an uncompressed Arrow IPC file under
+``<snapshot_dir>/<version>/``, where the version is derived from the source
+tables' row counts, max rowids and change columns. ``load_frames`` computes the
+same version for the database it is given and memory-maps the matching files,
+so every report run after a pipeline run shares one copy of the data in the
+page cache. When pyarrow is missing or no snapshot matches the database, the
+frames are read from SQLite and the derived columns are built the same way.
+
+Derived tables and columns:
+
+- ``lessons`` carries the ``lesson_notes`` columns the reports join on.
+- ``student_lessons`` has one row per student per lesson (``students_raw``
+  split on commas) with ``student_name`` and lower-cased ``student_key``.
+- Phone columns get a digits-only ``<column>_key`` companion.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import shutil
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Optional
+from uuid import uuid4
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401  (registers pa.ipc)
+    HAS_PYARROW = True
+except ImportError:
+    pa = None
+    HAS_PYARROW = False
+
+
+SNAPSHOT_FORMAT = 1
+DEFAULT_KEEP = 2
+MANIFEST_NAME = "manifest.json"
+STUDENT_LESSONS = "student_lessons"
+SOURCE_TABLES = (
+    "lessons",
+    "lesson_notes",
+    "pike13_people",
+    "pike13_clients",
+    "dialpad_voicemails",
+    "dialpad_sms_threads",
+    "dialpad_sms_messages",
+    "dialpad_call_reviews",
+    "school_email_messages",
+)
+SNAPSHOT_TABLES = SOURCE_TABLES + (STUDENT_LESSONS,)
+PHONE_COLUMNS = {
+    "pike13_people": ("phone", "phone_normalized"),
+    "dialpad_voicemails": ("external_number",),
+    "dialpad_sms_threads": ("phone", "phone_normalized"),
+}
+LESSON_NOTE_COLUMNS = ("note_completed", "note_score", "notes_text", "note_score_explanation")
+# Large capture blobs no report reads.
+DROPPED_COLUMNS = ("raw_json", "raw_text")
+# Not carried onto every student row; join back to ``lessons`` when needed.
+STUDENT_LESSON_DROPPED_COLUMNS = ("students_raw", "notes_text", "note_score_explanation")
+CHANGE_COLUMNS = ("updated_at", "imported_at", "note_score_updated_at", "note_timestamp")
+# In-place edits that leave row count, rowid and change columns alone.
+VALUE_CHECKSUMS = {
+    "lessons": ("students_raw", "lesson_date", "lesson_type", "instructor_id"),
+    "lesson_notes": ("note_score", "note_completed", "notes_text"),
+    "pike13_clients": ("Has Plan on Hold?",),
+}
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def default_snapshot_dir(db_path) -> Path:
+    return Path(db_path).resolve().parent / "outputs" / "analytics_snapshot"
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> list[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({_quote(table)})").fetchall()]
+
+
+def _checksum(column: str, declared_type: str) -> str:
+    numeric = any(token in declared_type.upper() for token in ("INT", "REAL", "FLOA", "DOUB", "NUM"))
+    return f"TOTAL({_quote(column)})" if numeric else f"TOTAL(LENGTH({_quote(column)}))"
+
+
+def _table_state(conn: sqlite3.Connection, table: str) -> Optional[list]:
+    types = {row[1]: row[2] or "" for row in conn.execute(f"PRAGMA table_info({_quote(table)})").fetchall()}
+    columns = set(types)
+    if not columns:
+        return None
+    parts = ["COUNT(*)"]
+    parts += [f"MAX({_quote(column)})" for column in CHANGE_COLUMNS if column in columns]
+    parts += [_checksum(column, types[column]) for column in VALUE_CHECKSUMS.get(table, ()) if column in columns]
+    sql = ", ".join(parts)
+    try:
+        row = conn.execute(f"SELECT MAX(rowid), {sql} FROM {_quote(table)}").fetchone()
+    except sqlite3.OperationalError:
+        # WITHOUT ROWID tables have no rowid to compare.
+        row = conn.execute(f"SELECT NULL, {sql} FROM {_quote(table)}").fetchone()
+    return [sorted(columns), *row]
+
+
+def db_version(conn: sqlite3.Connection) -> str:
+    """Short hash of the snapshot's source tables; changes whenever a report would see different rows."""
+    state = {"format": SNAPSHOT_FORMAT, "tables": {table: _table_state(conn, table) for table in SOURCE_TABLES}}
+    return hashlib.sha256(json.dumps(state, default=str).encode()).hexdigest()[:16]
+
+
+def phone_key(values: pd.Series) -> pd.Series:
+    """Digits-only phone key, matching ``re.sub(r"\\D", "", str(value))`` per value."""
+    return values.astype(object).map(str).str.replace(r"\D", "", regex=True)
+
+
+def explode_students(lessons: pd.DataFrame) -> pd.DataFrame:
+    """One row per comma-separated student in ``students_raw``; blank names are dropped."""
+    rows = lessons[lessons["students_raw"].notna() & (lessons["students_raw"] != "")]
+    names = rows["students_raw"].astype(str).str.split(r",\s*", regex=True)
+    exploded = rows.drop(columns=[c for c in STUDENT_LESSON_DROPPED_COLUMNS if c in rows.columns]).assign(student_name=names)
+    exploded = exploded.explode("student_name", ignore_index=True)
+    exploded["student_name"] = exploded["student_name"].str.strip()
+    exploded = exploded[exploded["student_name"] != ""].reset_index(drop=True)
+    exploded["student_key"] = exploded["student_name"].str.lower()
+    return exploded
+
+
+def iter_rows(frame: pd.DataFrame, columns: Iterable[str]):
+    """Tuples of ``columns`` with missing values as None, the way sqlite3 rows hold them."""
+    values = [frame[column].astype(object).where(frame[column].notna(), None) for column in columns]
+    return zip(*values)
+
+
+def read_table(conn: sqlite3.Connection, name: str) -> pd.DataFrame:
+    """One snapshot table read straight from SQLite, with its derived columns."""
+    if name == STUDENT_LESSONS:
+        return explode_students(read_table(conn, "lessons"))
+    if name not in SOURCE_TABLES:
+        raise ValueError(f"unknown snapshot table: {name}")
+    columns = [column for column in _columns(conn, name) if column not in DROPPED_COLUMNS]
+    if not columns:
+        raise sqlite3.OperationalError(f"no such table: {name}")
+    select = ", ".join(f"t.{_quote(column)}" for column in columns)
+    sql = f"SELECT {select} FROM {_quote(name)} t"
+    if name == "lessons":
+        note_columns = [c for c in LESSON_NOTE_COLUMNS if c in set(_columns(conn, "lesson_notes")) and c not in columns]
+        if note_columns:
+            select += "".join(f", ln.{_quote(column)}" for column in note_columns)
+            sql = f"SELECT {select} FROM lessons t LEFT JOIN lesson_notes ln ON ln.lesson_id = t.lesson_id"
+    frame = pd.read_sql_query(sql, conn)
+    for column in PHONE_COLUMNS.get(name, ()):
+        if column in frame.columns:
+            frame[f"{column}_key"] = phone_key(frame[column])
+    return frame
+
+
+def _to_arrow(frame: pd.DataFrame):
+    try:
+        return pa.Table.from_pandas(frame, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # SQLite lets one column hold mixed types; store those as text.
+        frame = frame.copy()
+        for column in frame.columns:
+            try:
+                pa.array(frame[column], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                frame[column] = frame[column].map(lambda value: None if pd.isna(value) else str(value))
+        return pa.Table.from_pandas(frame, preserve_index=False)
+
+
+def _read_arrow(path: Path) -> pd.DataFrame:
+    # The memory map stays alive for as long as the Arrow buffers reference it.
+    table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def snapshot_path(db_path, snapshot_dir=None, version: Optional[str] = None) -> Path:
+    base = Path(snapshot_dir) if snapshot_dir else default_snapshot_dir(db_path)
+    return base / version if version else base
+
+
+def export_snapshot(db_path, snapshot_dir=None, keep: int = DEFAULT_KEEP) -> dict:
+    """Write the snapshot for the database's current version (no-op when it already exists).
+
+    Returns the manifest. Older versions beyond ``keep`` are removed.
+    """
+    if not HAS_PYARROW:
+        raise RuntimeError("pyarrow is required to export the analytics snapshot: pip install pyarrow")
+    base = snapshot_path(db_path, snapshot_dir)
+    conn = sqlite3.connect(str(db_path))
+    try:
+        version = db_version(conn)
+        target = base / version
+        if (target / MANIFEST_NAME).exists():
+            return json.loads((target / MANIFEST_NAME).read_text())
+        base.mkdir(parents=True, exist_ok=True)
+        staging = base / f".tmp-{version}-{uuid4().hex[:8]}"
+        staging.mkdir()
+        manifest = {"version": version, "format": SNAPSHOT_FORMAT, "db_path": str(db_path), "created_at": utc_now_iso(), "tables": {}}
+        lessons = None
+        try:
+            for name in SNAPSHOT_TABLES:
+                if name == STUDENT_LESSONS:
+                    if lessons is None:
+                        continue
+                    frame = explode_students(lessons)
+                else:
+                    try:
+                        frame = read_table(conn, name)
+                    except sqlite3.OperationalError:
+                        continue
+                    if name == "lessons":
+                        lessons = frame
+                table = _to_arrow(frame)
+                with pa.OSFile(str(staging / f"{name}.arrow"), "wb") as sink:
+                    with pa.ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+                manifest["tables"][name] = {"rows": table.num_rows, "columns": table.num_columns}
+            (staging / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2) + "\n")
+            staging.rename(target)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+    finally:
+        conn.close()
+    prune_snapshots(base, keep=keep, current=version)
+    return manifest
+
+
+def prune_snapshots(base: Path, keep: int = DEFAULT_KEEP, current: Optional[str] = None) -> list[str]:
+    """Remove all but the ``keep`` newest snapshot versions (never ``current``)."""
+    versions = sorted(
+        (path for path in base.iterdir() if path.is_dir() and (path / MANIFEST_NAME).exists()),
+        key=lambda path: (path / MANIFEST_NAME).stat().st_mtime,
+        reverse=True,
+    )
+    removed = []
+    for path in versions[max(keep, 1):]:
+        if path.name != current:
+            shutil.rmtree(path, ignore_errors=True)
+            removed.append(path.name)
+    return removed
+
+
+def load_frames(db_path, tables: Iterable[str], snapshot_dir=None) -> dict[str, pd.DataFrame]:
+    """Frames for ``tables``, memory-mapped from the snapshot matching the database when one exists."""
+    conn = sqlite3.connect(str(db_path))
+    try:
+        directory = snapshot_path(db_path, snapshot_dir, db_version(conn)) if HAS_PYARROW else None
+        frames = {}
+        for name in tables:
+            path = directory / f"{name}.arrow" if directory else None
+            frames[name] = _read_arrow(path) if path is not None and path.exists() else read_table(conn, name)
+        return frames
+    finally:
+        conn.close()
+
+
+def snapshot_is_current(db_path, snapshot_dir=None) -> bool:
+    if not HAS_PYARROW:
+        return False
+    conn = sqlite3.connect(str(db_path))
+    try:
+        version = db_version(conn)
+    finally:
+        conn.close()
+    return (snapshot_path(db_path, snapshot_dir, version) / MANIFEST_NAME).exists()
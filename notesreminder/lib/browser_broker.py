@@ -0,0 +1,343 @@
+"""Shared long-lived Chromium per browser profile, leased to extractors over CDP.
+
+A broker process (``scripts/browser_broker.py``) keeps one warm persistent
+context open per SSO profile with a localhost CDP port, health-checks it, and
+records its endpoint in ``browser_profiles/.broker/<profile>.json``.
+
+Extractors call ``open_profile_context`` (sync) or
+``async_open_profile_context`` instead of ``launch_persistent_context``. When a
+healthy broker owns the profile they get an isolated context seeded with the
+profile's cookies and local storage; otherwise they launch their own browser
+exactly as before. Headed (``headless=False``) callers, such as interactive
+MFA logins, always launch the persistent profile themselves, so the login can
+be completed on screen and is saved to the profile. A broker whose last health
+check was not ``ready`` (e.g. ``needs_auth``) is not leased from. Closing a
+leased context disconnects from the broker but never closes its browser.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Optional
+
+
+DEFAULT_STATE_DIR = Path(os.getenv("BROWSER_BROKER_DIR", "browser_profiles/.broker"))
+DEFAULT_PORT = 9333
+DEFAULT_HEALTH_INTERVAL_SECONDS = 300
+# Options only valid when launching a browser; they are dropped for leased contexts.
+LAUNCH_ONLY_OPTIONS = {
+    "headless",
+    "channel",
+    "args",
+    "executable_path",
+    "slow_mo",
+    "chromium_sandbox",
+    "devtools",
+    "downloads_path",
+    "ignore_default_args",
+    "handle_sigint",
+    "handle_sigterm",
+    "handle_sighup",
+    "timeout",
+    "env",
+    "traces_dir",
+}
+
+Classifier = Callable[[str, str], str]
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+
+
+def broker_disabled() -> bool:
+    return os.getenv("BROWSER_BROKER_DISABLED", "").strip().lower() in {"1", "true", "yes"}
+
+
+def profile_key(profile_dir) -> str:
+    resolved = str(Path(profile_dir).expanduser().resolve())
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", resolved).strip("_")[-120:]
+
+
+def record_path(profile_dir, state_dir: Path | str | None = None) -> Path:
+    return Path(state_dir or DEFAULT_STATE_DIR) / f"{profile_key(profile_dir)}.json"
+
+
+def read_broker_record(profile_dir, state_dir: Path | str | None = None) -> Optional[dict]:
+    path = record_path(profile_dir, state_dir)
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def write_broker_record(profile_dir, record: dict, state_dir: Path | str | None = None) -> Path:
+    path = record_path(profile_dir, state_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(record, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def cdp_endpoint_alive(endpoint: str, timeout: float = 2.0) -> bool:
+    try:
+        with urllib.request.urlopen(f"{endpoint.rstrip('/')}/json/version", timeout=timeout) as response:
+            return response.status == 200 and bool(json.loads(response.read() or b"{}"))
+    except (OSError, urllib.error.URLError, ValueError):
+        return False
+
+
+def broker_endpoint(profile_dir, state_dir: Path | str | None = None) -> Optional[str]:
+    """Return the CDP endpoint of a live broker owning ``profile_dir``, else None."""
+    if broker_disabled():
+        return None
+    record = read_broker_record(profile_dir, state_dir)
+    if not record or record.get("status") != "ready":
+        return None
+    endpoint = record.get("cdp_endpoint")
+    if not endpoint or not cdp_endpoint_alive(endpoint):
+        return None
+    return endpoint
+
+
+def _context_options(options: dict) -> dict:
+    return {key: value for key, value in options.items() if key not in LAUNCH_ONLY_OPTIONS}
+
+
+def _wants_own_browser(options: dict) -> bool:
+    # A headed launch is an interactive login; it must be visible and persist to the profile.
+    return options.get("headless") is False
+
+
+def lease_context(playwright, profile_dir, state_dir: Path | str | None = None, **options):
+    """Open an isolated context on the brokered browser, or None when no broker is live."""
+    endpoint = broker_endpoint(profile_dir, state_dir)
+    if not endpoint:
+        return None
+    browser = playwright.chromium.connect_over_cdp(endpoint)
+    try:
+        base = browser.contexts[0] if browser.contexts else None
+        storage_state = base.storage_state() if base is not None else None
+        context = browser.new_context(storage_state=storage_state, **_context_options(options))
+    except Exception:
+        browser.close()
+        raise
+    close_context = context.close
+
+    def close(*args, **kwargs):
+        # Disconnects this CDP client only; the broker's browser keeps running.
+        try:
+            return close_context(*args, **kwargs)
+        finally:
+            browser.close()
+
+    context.close = close
+    return context
+
+
+async def async_lease_context(playwright, profile_dir, state_dir: Path | str | None = None, **options):
+    endpoint = broker_endpoint(profile_dir, state_dir)
+    if not endpoint:
+        return None
+    browser = await playwright.chromium.connect_over_cdp(endpoint)
+    try:
+        base = browser.contexts[0] if browser.contexts else None
+        storage_state = await base.storage_state() if base is not None else None
+        context = await browser.new_context(storage_state=storage_state, **_context_options(options))
+    except Exception:
+        await browser.close()
+        raise
+    close_context = context.close
+
+    async def close(*args, **kwargs):
+        try:
+            return await close_context(*args, **kwargs)
+        finally:
+            await browser.close()
+
+    context.close = close
+    return context
+
+
+def open_profile_context(playwright, profile_dir, **options):
+    """Leased broker context when available and headless, else ``launch_persistent_context``."""
+    if not _wants_own_browser(options):
+        leased = lease_context(playwright, profile_dir, **options)
+        if leased is not None:
+            return leased
+    return playwright.chromium.launch_persistent_context(str(profile_dir), **options)
+
+
+async def async_open_profile_context(playwright, profile_dir, **options):
+    if not _wants_own_browser(options):
+        leased = await async_lease_context(playwright, profile_dir, **options)
+        if leased is not None:
+            return leased
+    return await playwright.chromium.launch_persistent_context(str(profile_dir), **options)
+
+
+def load_storage_cookies(storage_state_path) -> list[dict]:
+    path = Path(storage_state_path) if storage_state_path else None
+    if not path or not path.exists():
+        return []
+    try:
+        return json.loads(path.read_text(encoding="utf-8")).get("cookies", [])
+    except (OSError, json.JSONDecodeError):
+        return []
+
+
+class BrowserBroker:
+    """Own one persistent Chromium for a profile and keep it warm and authenticated."""
+
+    def __init__(
+        self,
+        profile_dir,
+        port: int = DEFAULT_PORT,
+        probe_url: str | None = None,
+        classify: Classifier | None = None,
+        storage_state_path=None,
+        reauth: Callable[[object], bool] | None = None,
+        on_auth_change: Callable[[str], None] | None = None,
+        headless: bool = True,
+        state_dir: Path | str | None = None,
+    ):
+        self.profile_dir = Path(profile_dir)
+        self.port = port
+        self.probe_url = probe_url
+        self.classify = classify
+        self.storage_state_path = storage_state_path
+        self.reauth_hook = reauth
+        self.on_auth_change = on_auth_change
+        self.headless = headless
+        self.state_dir = state_dir
+        self.cdp_endpoint = f"http://127.0.0.1:{port}"
+        self._playwright = None
+        self._context = None
+        self._probe_page = None
+        self.record = {
+            "profile": str(self.profile_dir.resolve()),
+            "cdp_endpoint": self.cdp_endpoint,
+            "port": port,
+            "pid": os.getpid(),
+            "status": "starting",
+            "auth_status": "unknown",
+            "restarts": 0,
+            "reauth_attempts": 0,
+        }
+
+    def _write(self, **updates) -> dict:
+        self.record.update(updates)
+        self.record["updated_at"] = utc_now_iso()
+        write_broker_record(self.profile_dir, self.record, self.state_dir)
+        return self.record
+
+    def _launch(self) -> None:
+        from playwright.sync_api import sync_playwright
+
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        self._context = self._playwright.chromium.launch_persistent_context(
+            str(self.profile_dir),
+            headless=self.headless,
+            viewport={"width": 1440, "height": 1000},
+            args=[
+                f"--remote-debugging-port={self.port}",
+                "--remote-debugging-address=127.0.0.1",
+                "--disable-dev-shm-usage",
+            ],
+        )
+        self._probe_page = None
+        cookies = load_storage_cookies(self.storage_state_path)
+        if cookies:
+            self._context.add_cookies(cookies)
+        self._write(started_at=utc_now_iso())
+
+    def start(self) -> dict:
+        self._launch()
+        return self.health_check()
+
+    def _probe(self) -> str:
+        if not self.probe_url or self.classify is None:
+            return "unchecked"
+        if self._probe_page is None or self._probe_page.is_closed():
+            self._probe_page = self._context.new_page()
+        page = self._probe_page
+        page.goto(self.probe_url, wait_until="domcontentloaded", timeout=60000)
+        try:
+            body = page.locator("body").inner_text(timeout=5000)
+        except Exception:
+            body = ""
+        return self.classify(page.url, body)
+
+    def reauth(self) -> bool:
+        """Re-seed saved cookies, then run the optional hook; True if it reports success."""
+        self.record["reauth_attempts"] = self.record.get("reauth_attempts", 0) + 1
+        cookies = load_storage_cookies(self.storage_state_path)
+        if cookies:
+            self._context.add_cookies(cookies)
+        if self.reauth_hook is not None:
+            return bool(self.reauth_hook(self._context))
+        return bool(cookies)
+
+    def health_check(self) -> dict:
+        started = time.monotonic()
+        if self._context is None or not cdp_endpoint_alive(self.cdp_endpoint):
+            if self._context is not None:
+                self.record["restarts"] = self.record.get("restarts", 0) + 1
+                self._close_context()
+            self._launch()
+        previous = self.record.get("auth_status")
+        try:
+            auth_status = self._probe()
+            if auth_status not in {"authenticated", "unchecked"} and self.reauth():
+                auth_status = self._probe()
+            detail = None
+        except Exception as exc:
+            auth_status, detail = "error", str(exc)
+        status = "ready" if auth_status in {"authenticated", "unchecked"} else "needs_auth"
+        if auth_status != previous and self.on_auth_change is not None:
+            self.on_auth_change(auth_status)
+        return self._write(
+            status=status,
+            auth_status=auth_status,
+            detail=detail,
+            last_health_at=utc_now_iso(),
+            health_check_ms=round((time.monotonic() - started) * 1000),
+        )
+
+    def serve_forever(self, interval: float = DEFAULT_HEALTH_INTERVAL_SECONDS) -> None:
+        try:
+            while True:
+                time.sleep(interval)
+                self.health_check()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def _close_context(self) -> None:
+        try:
+            if self._context is not None:
+                self._context.close()
+        except Exception:
+            pass
+        self._context = None
+        self._probe_page = None
+
+    def stop(self) -> None:
+        self._close_context()
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+        self._write(status="stopped", stopped_at=utc_now_iso())
@@ -0,0 +1,516 @@
+"""Shared gateway for chat-completions calls.
+
+Callers describe each prompt as an ``LLMRequest`` and hand a batch to
+``run_completions`` (or an ``LLMGateway`` inside their own event loop). The
+gateway keeps one pooled HTTP client, runs requests with bounded concurrency,
+backs off using the provider's rate-limit headers instead of fixed sleeps,
+serves repeats from a SQLite response cache keyed by (model, prompt hash,
+params), parses JSON content leniently, and writes one telemetry row per run
+with tokens, cost and latency percentiles.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+from uuid import uuid4
+
+import httpx
+
+
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+DEEPSEEK_BASE_URL = "https://api.deepseek.com/v1"
+DEFAULT_CACHE_DB_PATH = os.getenv("LLM_CACHE_DB_PATH", "llm_cache.db")
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+DEFAULT_TIMEOUT_SECONDS = 120.0
+DEFAULT_MAX_RETRIES = 3
+HERMES_ENV_PATH = Path.home() / ".hermes" / ".env"
+# USD per million (prompt, completion) tokens; unknown models are costed at zero.
+PRICING_PER_MILLION = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "deepseek-chat": (0.27, 1.10),
+}
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+# Pause new requests when the provider reports this little headroom left.
+LOW_REMAINING_REQUESTS = 1
+LOW_REMAINING_TOKENS = 2000
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+
+
+def load_api_key(name: str, env_path: Path = HERMES_ENV_PATH) -> str:
+    """Read ``name`` from the environment, falling back to the shared ~/.hermes/.env file."""
+    value = os.environ.get(name, "")
+    if value or not env_path.exists():
+        return value
+    for line in env_path.read_text().splitlines():
+        if "=" in line and not line.startswith("#"):
+            key, _, raw = line.partition("=")
+            if key.strip() == name:
+                return raw.strip().strip('"').strip("'")
+    return ""
+
+
+@dataclass(frozen=True)
+class LLMRequest:
+    messages: tuple[dict, ...]
+    model: str = "gpt-4o-mini"
+    temperature: float = 0.0
+    max_tokens: Optional[int] = None
+    json_mode: bool = False
+    key: Any = None  # caller's handle for matching responses back to inputs
+
+    @classmethod
+    def chat(cls, system: Optional[str], user: str, **options) -> "LLMRequest":
+        messages = ([{"role": "system", "content": system}] if system else []) + [{"role": "user", "content": user}]
+        return cls(messages=tuple(messages), **options)
+
+    def params(self) -> dict:
+        params: dict = {"temperature": self.temperature}
+        if self.max_tokens is not None:
+            params["max_tokens"] = self.max_tokens
+        if self.json_mode:
+            params["response_format"] = {"type": "json_object"}
+        return params
+
+    def prompt_hash(self) -> str:
+        return hashlib.sha256(json.dumps(list(self.messages), sort_keys=True).encode()).hexdigest()
+
+    def cache_key(self) -> str:
+        material = json.dumps([self.model, self.prompt_hash(), self.params()], sort_keys=True)
+        return hashlib.sha256(material.encode()).hexdigest()
+
+
+@dataclass
+class LLMResponse:
+    request: LLMRequest
+    content: Optional[str] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_ms: float = 0.0
+    cached: bool = False
+    attempts: int = 0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.content is not None
+
+    def json(self) -> Any:
+        """Parsed JSON content (see ``parse_json_content``); raises ValueError if none."""
+        return parse_json_content(self.content or "")
+
+    def json_list(self) -> list:
+        return json_list(self.json())
+
+
+def parse_json_content(text: str) -> Any:
+    """Parse model output that should be JSON, tolerating code fences and surrounding prose."""
+    text = (text or "").strip()
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1).strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    for opener, closer in (("{", "}"), ("[", "]")):
+        start, end = text.find(opener), text.rfind(closer)
+        if start != -1 and end > start:
+            try:
+                return json.loads(text[start : end + 1])
+            except json.JSONDecodeError:
+                continue
+    raise ValueError(f"No JSON object in model output: {text[:120]!r}")
+
+
+def json_list(parsed: Any) -> list:
+    """JSON-mode responses wrap arrays in an object; return the first list found."""
+    if isinstance(parsed, list):
+        return parsed
+    if isinstance(parsed, dict):
+        for value in parsed.values():
+            if isinstance(value, list):
+                return value
+    return []
+
+
+def parse_reset_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse rate-limit reset values such as ``"1s"``, ``"6m0s"``, ``"20ms"`` or ``"2.5"``."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    units = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    parts = re.findall(r"([\d.]+)(ms|h|m|s)", value)
+    if not parts:
+        return None
+    return sum(float(number) * units[unit] for number, unit in parts)
+
+
+class AdaptiveRateLimiter:
+    """Concurrency gate that shrinks on 429s and pauses when rate-limit headers run low.
+
+    The limit halves on every throttled response and grows back by one after
+    ``recover_after`` consecutive successes, up to ``max_concurrency``.
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, recover_after: int = 5):
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = self.max_concurrency
+        self.recover_after = recover_after
+        self.in_flight = 0
+        self.pause_until = 0.0
+        self.throttled = 0
+        self._successes = 0
+        self._released = asyncio.Event()
+
+    async def acquire(self) -> None:
+        while True:
+            delay = self.pause_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            if self.in_flight < self.limit:
+                self.in_flight += 1
+                return
+            self._released.clear()
+            await self._released.wait()
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._released.set()
+
+    def pause(self, seconds: float) -> None:
+        self.pause_until = max(self.pause_until, time.monotonic() + max(0.0, seconds))
+
+    def observe(self, headers) -> None:
+        remaining_requests = _int_header(headers, "x-ratelimit-remaining-requests")
+        remaining_tokens = _int_header(headers, "x-ratelimit-remaining-tokens")
+        if remaining_requests is not None and remaining_requests <= LOW_REMAINING_REQUESTS:
+            self.pause(parse_reset_seconds(headers.get("x-ratelimit-reset-requests")) or 1.0)
+        if remaining_tokens is not None and remaining_tokens <= LOW_REMAINING_TOKENS:
+            self.pause(parse_reset_seconds(headers.get("x-ratelimit-reset-tokens")) or 1.0)
+
+    def succeeded(self) -> None:
+        self._successes += 1
+        if self.limit < self.max_concurrency and self._successes >= self.recover_after:
+            self.limit += 1
+            self._successes = 0
+            self._released.set()
+
+    def throttle(self, retry_after: Optional[float]) -> None:
+        self.throttled += 1
+        self._successes = 0
+        self.limit = max(1, self.limit // 2)
+        self.pause(retry_after if retry_after is not None else 1.0)
+
+
+def _int_header(headers, name: str) -> Optional[int]:
+    try:
+        return int(float(headers.get(name)))
+    except (TypeError, ValueError):
+        return None
+
+
+def ensure_llm_gateway_schema(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS llm_response_cache (
+            cache_key TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            prompt_hash TEXT NOT NULL,
+            params_json TEXT NOT NULL,
+            content TEXT NOT NULL,
+            prompt_tokens INTEGER NOT NULL DEFAULT 0,
+            completion_tokens INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL,
+            last_hit_at TEXT,
+            hits INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS llm_run_telemetry (
+            run_id TEXT PRIMARY KEY,
+            caller TEXT NOT NULL,
+            base_url TEXT NOT NULL,
+            started_at TEXT NOT NULL,
+            finished_at TEXT NOT NULL,
+            requests INTEGER NOT NULL,
+            cache_hits INTEGER NOT NULL,
+            errors INTEGER NOT NULL,
+            throttled INTEGER NOT NULL,
+            prompt_tokens INTEGER NOT NULL,
+            completion_tokens INTEGER NOT NULL,
+            cost_usd REAL NOT NULL,
+            latency_p50_ms REAL,
+            latency_p90_ms REAL,
+            latency_p99_ms REAL,
+            models_json TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_run_telemetry_caller ON llm_run_telemetry(caller, started_at)")
+
+
+class ResponseCache:
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or DEFAULT_CACHE_DB_PATH
+        self.conn = sqlite3.connect(self.db_path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        ensure_llm_gateway_schema(self.conn)
+
+    def get(self, request: LLMRequest) -> Optional[LLMResponse]:
+        key = request.cache_key()
+        row = self.conn.execute(
+            "SELECT content, prompt_tokens, completion_tokens FROM llm_response_cache WHERE cache_key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        with self.conn:
+            self.conn.execute(
+                "UPDATE llm_response_cache SET hits = hits + 1, last_hit_at = ? WHERE cache_key = ?",
+                (utc_now_iso(), key),
+            )
+        return LLMResponse(request, content=row[0], prompt_tokens=row[1], completion_tokens=row[2], cached=True)
+
+    def put(self, response: LLMResponse) -> None:
+        request = response.request
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO llm_response_cache
+                (cache_key, model, prompt_hash, params_json, content, prompt_tokens, completion_tokens, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    request.cache_key(),
+                    request.model,
+                    request.prompt_hash(),
+                    json.dumps(request.params(), sort_keys=True),
+                    response.content,
+                    response.prompt_tokens,
+                    response.completion_tokens,
+                    utc_now_iso(),
+                ),
+            )
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def percentile(values: list[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return round(ordered[index], 1)
+
+
+def cost_usd(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prompt_rate, completion_rate = PRICING_PER_MILLION.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_rate + completion_tokens * completion_rate) / 1_000_000
+
+
+@dataclass
+class RunTelemetry:
+    run_id: str
+    caller: str
+    base_url: str
+    started_at: str = field(default_factory=utc_now_iso)
+    responses: list[LLMResponse] = field(default_factory=list)
+
+    def summary(self, throttled: int = 0) -> dict:
+        fresh = [response for response in self.responses if not response.cached]
+        billed = [response for response in fresh if response.ok]
+        latencies = [response.latency_ms for response in fresh]
+        models: dict[str, int] = {}
+        for response in self.responses:
+            models[response.request.model] = models.get(response.request.model, 0) + 1
+        return {
+            "run_id": self.run_id,
+            "caller": self.caller,
+            "requests": len(self.responses),
+            "cache_hits": len(self.responses) - len(fresh),
+            "errors": sum(1 for response in self.responses if not response.ok),
+            "throttled": throttled,
+            "prompt_tokens": sum(response.prompt_tokens for response in billed),
+            "completion_tokens": sum(response.completion_tokens for response in billed),
+            "cost_usd": round(
+                sum(cost_usd(r.request.model, r.prompt_tokens, r.completion_tokens) for r in billed), 6
+            ),
+            "latency_p50_ms": percentile(latencies, 50),
+            "latency_p90_ms": percentile(latencies, 90),
+            "latency_p99_ms": percentile(latencies, 99),
+            "models": models,
+        }
+
+
+class LLMGateway:
+    """Async chat-completions client; use as ``async with LLMGateway(...) as gateway``."""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = OPENAI_BASE_URL,
+        caller: str = "llm",
+        cache_db_path: Optional[str] = None,
+        use_cache: bool = True,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_seconds: float = 1.0,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.caller = caller
+        self.cache_db_path = cache_db_path
+        self.use_cache = use_cache
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.cache: Optional[ResponseCache] = None
+        self.client: Optional[httpx.AsyncClient] = None
+        self.limiter: Optional[AdaptiveRateLimiter] = None
+        self.telemetry = RunTelemetry(f"llm_{uuid4().hex[:12]}", caller, self.base_url)
+
+    async def __aenter__(self) -> "LLMGateway":
+        self.cache = ResponseCache(self.cache_db_path)
+        self.limiter = AdaptiveRateLimiter(self.max_concurrency)
+        self.client = httpx.AsyncClient(
+            timeout=self.timeout_seconds,
+            limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+            headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        try:
+            await self.client.aclose()
+            self.record_telemetry()
+        finally:
+            self.cache.close()
+
+    async def complete(self, request: LLMRequest) -> LLMResponse:
+        response = self.cache.get(request) if self.use_cache else None
+        if response is None:
+            response = await self._post(request)
+            if response.ok:
+                self.cache.put(response)
+        self.telemetry.responses.append(response)
+        return response
+
+    async def complete_many(self, requests: list[LLMRequest]) -> list[LLMResponse]:
+        """Complete ``requests`` concurrently; responses come back in input order."""
+        return list(await asyncio.gather(*(self.complete(request) for request in requests)))
+
+    async def _post(self, request: LLMRequest) -> LLMResponse:
+        payload = {"model": request.model, "messages": list(request.messages), **request.params()}
+        url = f"{self.base_url}/chat/completions"
+        result = LLMResponse(request)
+        for attempt in range(1, self.max_retries + 2):
+            result.attempts = attempt
+            await self.limiter.acquire()
+            started = time.monotonic()
+            try:
+                http_response = await self.client.post(url, json=payload)
+            except httpx.HTTPError as exc:
+                result.error = f"{type(exc).__name__}: {exc}"
+                retry_after = None
+            else:
+                self.limiter.observe(http_response.headers)
+                if http_response.status_code == 200:
+                    self.limiter.succeeded()
+                    return _fill_from_body(result, http_response)
+                result.error = f"HTTP {http_response.status_code}: {http_response.text[:200]}"
+                if http_response.status_code not in RETRY_STATUSES:
+                    return result
+                retry_after = parse_reset_seconds(http_response.headers.get("retry-after"))
+                if http_response.status_code == 429:
+                    self.limiter.throttle(retry_after)
+            finally:
+                result.latency_ms = (time.monotonic() - started) * 1000
+                self.limiter.release()
+            if attempt <= self.max_retries:
+                await asyncio.sleep(retry_after if retry_after is not None else self.backoff_seconds * 2 ** (attempt - 1))
+        return result
+
+    def summary(self) -> dict:
+        return self.telemetry.summary(self.limiter.throttled if self.limiter else 0)
+
+    def record_telemetry(self) -> dict:
+        summary = self.summary()
+        with self.cache.conn:
+            self.cache.conn.execute(
+                """
+                INSERT OR REPLACE INTO llm_run_telemetry
+                (run_id, caller, base_url, started_at, finished_at, requests, cache_hits, errors, throttled,
+                 prompt_tokens, completion_tokens, cost_usd, latency_p50_ms, latency_p90_ms, latency_p99_ms,
+                 models_json)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    summary["run_id"],
+                    summary["caller"],
+                    self.base_url,
+                    self.telemetry.started_at,
+                    utc_now_iso(),
+                    summary["requests"],
+                    summary["cache_hits"],
+                    summary["errors"],
+                    summary["throttled"],
+                    summary["prompt_tokens"],
+                    summary["completion_tokens"],
+                    summary["cost_usd"],
+                    summary["latency_p50_ms"],
+                    summary["latency_p90_ms"],
+                    summary["latency_p99_ms"],
+                    json.dumps(summary["models"], sort_keys=True),
+                ),
+            )
+        return summary
+
+
+def _fill_from_body(result: LLMResponse, http_response: httpx.Response) -> LLMResponse:
+    try:
+        body = http_response.json()
+        result.content = body["choices"][0]["message"]["content"]
+    except (ValueError, KeyError, IndexError, TypeError) as exc:
+        result.error = f"Unexpected completion body: {exc}"
+        return result
+    usage = body.get("usage") or {}
+    result.prompt_tokens = int(usage.get("prompt_tokens") or 0)
+    result.completion_tokens = int(usage.get("completion_tokens") or 0)
+    result.error = None
+    return result
+
+
+def run_completions(requests: list[LLMRequest], **gateway_options) -> tuple[list[LLMResponse], dict]:
+    """Synchronous entry point for scripts: returns (responses in input order, run summary)."""
+
+    async def run() -> tuple[list[LLMResponse], dict]:
+        async with LLMGateway(**gateway_options) as gateway:
+            responses = await gateway.complete_many(requests)
+        return responses, gateway.summary()
+
+    return asyncio.run(run())
@@ -0,0 +1,404 @@
+"""Type-2 history of the Pike13 current-member roster.
+
+Each member's attributes are stored once per change in
+``pike13_member_history`` with ``valid_from``/``valid_to`` scrape timestamps
+(``valid_to`` is NULL for the current version). A scrape that finds a member
+unchanged writes nothing for them; a member who drops off the roster has their
+open version closed at that scrape. ``pike13_roster_scrapes`` records every
+scrape, so the roster "as of" any scrape is one indexed range query.
+
+``days_since_last_visit`` moves every day without anything changing, so it is
+not stored; reads derive it from ``last_visit_date`` and the scrape date.
+
+Databases that still hold full per-scrape rosters in
+``pike13_current_member_snapshots`` are read through the same functions until
+``migrate_snapshots`` merges them into the history, including scrapes older
+than ones the history already holds.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+from datetime import date
+from typing import Any, Iterable, Mapping, Optional
+
+
+LEGACY_SNAPSHOT_TABLE = "pike13_current_member_snapshots"
+MEMBER_COLUMNS = (
+    "full_name",
+    "person_state",
+    "current_plans",
+    "current_plan_types",
+    "revenue_categories",
+    "client_since_date",
+    "last_visit_date",
+    "completed_visits",
+    "future_visits",
+    "has_membership",
+    "has_plan_on_hold",
+    "primary_staff_name",
+    "account_manager_names",
+    "account_manager_emails",
+    "account_manager_phones",
+    "guardian_name",
+    "guardian_email",
+)
+# Raw report keys that change with the calendar rather than with the member.
+VOLATILE_RAW_KEYS = ("days_since_last_visit",)
+
+
+def ensure_member_history_schema(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS pike13_member_history (
+            history_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            school_slug TEXT NOT NULL,
+            school_name TEXT NOT NULL,
+            person_id TEXT NOT NULL,
+            valid_from TEXT NOT NULL,
+            valid_to TEXT,
+            full_name TEXT NOT NULL,
+            person_state TEXT,
+            current_plans TEXT,
+            current_plan_types TEXT,
+            revenue_categories TEXT,
+            client_since_date TEXT,
+            last_visit_date TEXT,
+            completed_visits INTEGER,
+            future_visits INTEGER,
+            has_membership INTEGER NOT NULL,
+            has_plan_on_hold INTEGER,
+            primary_staff_name TEXT,
+            account_manager_names TEXT,
+            account_manager_emails TEXT,
+            account_manager_phones TEXT,
+            guardian_name TEXT,
+            guardian_email TEXT,
+            raw_json TEXT,
+            row_hash TEXT NOT NULL,
+            UNIQUE (school_slug, person_id, valid_from)
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_pmh_as_of "
+        "ON pike13_member_history(school_slug, valid_from, valid_to)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_pmh_open "
+        "ON pike13_member_history(school_slug, person_id) WHERE valid_to IS NULL"
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS pike13_roster_scrapes (
+            school_slug TEXT NOT NULL,
+            scraped_at TEXT NOT NULL,
+            school_name TEXT NOT NULL,
+            member_count INTEGER NOT NULL,
+            versions_added INTEGER NOT NULL,
+            versions_closed INTEGER NOT NULL,
+            unchanged INTEGER NOT NULL,
+            PRIMARY KEY (school_slug, scraped_at)
+        )
+        """
+    )
+
+
+def _has_table(conn: sqlite3.Connection, name: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,)).fetchone() is not None
+
+
+def latest_recorded_scrape(conn: sqlite3.Connection, school_slug: str) -> Optional[str]:
+    return conn.execute(
+        "SELECT MAX(scraped_at) FROM pike13_roster_scrapes WHERE school_slug=?", (school_slug,)
+    ).fetchone()[0]
+
+
+def stable_raw_json(raw: Any) -> Optional[str]:
+    """Raw report row as JSON without calendar-driven keys, so it only changes with the member."""
+    if raw is None:
+        return None
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError:
+            return raw
+    if isinstance(raw, Mapping):
+        raw = {key: value for key, value in raw.items() if key not in VOLATILE_RAW_KEYS}
+    return json.dumps(raw, ensure_ascii=True, sort_keys=True, default=str)
+
+
+def member_hash(member: Mapping[str, Any]) -> str:
+    values = [member.get(column) for column in MEMBER_COLUMNS]
+    return hashlib.sha256(json.dumps(values, default=str).encode()).hexdigest()
+
+
+def record_roster(
+    conn: sqlite3.Connection,
+    school_slug: str,
+    school_name: str,
+    scraped_at: str,
+    members: Iterable[Mapping[str, Any]],
+) -> dict[str, int]:
+    """Apply one complete roster scrape to the history; returns what changed.
+
+    ``members`` carry ``person_id``, the ``MEMBER_COLUMNS`` and optionally
+    ``raw_json``. Scrapes must arrive in order per school; re-applying the
+    latest scrape replaces what it wrote. The caller owns the transaction.
+    """
+    ensure_member_history_schema(conn)
+    latest = latest_recorded_scrape(conn, school_slug)
+    if latest and scraped_at < latest:
+        raise ValueError(f"Roster scrape {scraped_at} for {school_slug} is older than the recorded {latest}")
+
+    open_versions = {
+        row[0]: (row[1], row[2], row[3])
+        for row in conn.execute(
+            "SELECT person_id, history_id, row_hash, valid_from FROM pike13_member_history "
+            "WHERE school_slug=? AND valid_to IS NULL",
+            (school_slug,),
+        )
+    }
+    added = closed = unchanged = count = 0
+
+    def end_version(history_id: int, valid_from: str) -> None:
+        if valid_from == scraped_at:
+            # Re-applied scrape: the version it wrote is replaced, not closed.
+            conn.execute("DELETE FROM pike13_member_history WHERE history_id=?", (history_id,))
+        else:
+            conn.execute("UPDATE pike13_member_history SET valid_to=? WHERE history_id=?", (scraped_at, history_id))
+
+    for member in members:
+        count += 1
+        person_id = str(member["person_id"])
+        row_hash = member_hash(member)
+        current = open_versions.pop(person_id, None)
+        if current and current[1] == row_hash:
+            unchanged += 1
+            continue
+        if current:
+            end_version(current[0], current[2])
+            closed += 1
+        conn.execute(
+            f"""
+            INSERT INTO pike13_member_history (
+                school_slug, school_name, person_id, valid_from, valid_to,
+                {", ".join(MEMBER_COLUMNS)}, raw_json, row_hash
+            ) VALUES (?, ?, ?, ?, NULL, {", ".join("?" for _ in MEMBER_COLUMNS)}, ?, ?)
+            """,
+            (
+                school_slug,
+                school_name,
+                person_id,
+                scraped_at,
+                *(member.get(column) for column in MEMBER_COLUMNS),
+                stable_raw_json(member.get("raw_json")),
+                row_hash,
+            ),
+        )
+        added += 1
+    # Members missing from this scrape have left the roster.
+    for history_id, _row_hash, valid_from in open_versions.values():
+        end_version(history_id, valid_from)
+        closed += 1
+
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO pike13_roster_scrapes (
+            school_slug, scraped_at, school_name, member_count, versions_added, versions_closed, unchanged
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        (school_slug, scraped_at, school_name, count, added, closed, unchanged),
+    )
+    return {"members": count, "versions_added": added, "versions_closed": closed, "unchanged": unchanged}
+
+
+def latest_scrape(conn: sqlite3.Connection, school_slug: str, on_or_before: Optional[date] = None) -> Optional[str]:
+    """Most recent roster scrape for a school (optionally on or before a date), from either store."""
+    date_filter = " AND DATE(scraped_at) <= DATE(?)" if on_or_before else ""
+    params = (school_slug, on_or_before.isoformat()) if on_or_before else (school_slug,)
+    stamps = []
+    for table in ("pike13_roster_scrapes", LEGACY_SNAPSHOT_TABLE):
+        if _has_table(conn, table):
+            stamps.append(
+                conn.execute(f"SELECT MAX(scraped_at) FROM {table} WHERE school_slug=?{date_filter}", params).fetchone()[0]
+            )
+    return max((stamp for stamp in stamps if stamp), default=None)
+
+
+def roster_as_of(conn: sqlite3.Connection, school_slug: str, scraped_at: str) -> list:
+    """The roster as it stood at ``scraped_at``, with the legacy snapshot columns."""
+    return conn.execute(
+        f"""
+        SELECT school_slug, school_name, ? AS scraped_at, SUBSTR(?, 1, 10) AS snapshot_date, person_id,
+               {", ".join(MEMBER_COLUMNS)},
+               CAST(JULIANDAY(SUBSTR(?, 1, 10)) - JULIANDAY(last_visit_date) AS INTEGER) AS days_since_last_visit,
+               raw_json, valid_from, valid_to
+        FROM pike13_member_history
+        WHERE school_slug = ? AND valid_from <= ? AND (valid_to IS NULL OR valid_to > ?)
+        ORDER BY person_id
+        """,
+        (scraped_at, scraped_at, scraped_at, school_slug, scraped_at, scraped_at),
+    ).fetchall()
+
+
+def roster_rows(conn: sqlite3.Connection, school_slug: str, scraped_at: str) -> list:
+    """Roster rows for one recorded scrape, from the history or the legacy snapshot table."""
+    if _has_table(conn, "pike13_roster_scrapes") and conn.execute(
+        "SELECT 1 FROM pike13_roster_scrapes WHERE school_slug=? AND scraped_at=?", (school_slug, scraped_at)
+    ).fetchone():
+        return roster_as_of(conn, school_slug, scraped_at)
+    if _has_table(conn, LEGACY_SNAPSHOT_TABLE):
+        return conn.execute(
+            f"SELECT * FROM {LEGACY_SNAPSHOT_TABLE} WHERE school_slug=? AND scraped_at=?", (school_slug, scraped_at)
+        ).fetchall()
+    return []
+
+
+def scraped_between(conn: sqlite3.Connection, school_slug: str, start: str, end: str) -> bool:
+    """Whether a complete roster for the school was scraped on a date in ``[start, end]``."""
+    if _has_table(conn, "pike13_roster_scrapes") and conn.execute(
+        "SELECT 1 FROM pike13_roster_scrapes WHERE school_slug=? AND SUBSTR(scraped_at, 1, 10) BETWEEN ? AND ? LIMIT 1",
+        (school_slug, start, end),
+    ).fetchone():
+        return True
+    return _has_table(conn, LEGACY_SNAPSHOT_TABLE) and conn.execute(
+        f"SELECT 1 FROM {LEGACY_SNAPSHOT_TABLE} WHERE school_slug=? AND snapshot_date BETWEEN ? AND ? LIMIT 1",
+        (school_slug, start, end),
+    ).fetchone() is not None
+
+
+def on_roster_between(conn: sqlite3.Connection, person_id: str, start: str, end: str) -> bool:
+    """Whether the person was on any school's roster in a scrape dated within ``[start, end]``."""
+    if _has_table(conn, "pike13_roster_scrapes") and conn.execute(
+        """
+        SELECT 1 FROM pike13_roster_scrapes s
+        JOIN pike13_member_history h
+          ON h.school_slug = s.school_slug
+         AND h.valid_from <= s.scraped_at
+         AND (h.valid_to IS NULL OR h.valid_to > s.scraped_at)
+        WHERE h.person_id = ? AND SUBSTR(s.scraped_at, 1, 10) BETWEEN ? AND ?
+        LIMIT 1
+        """,
+        (str(person_id), start, end),
+    ).fetchone():
+        return True
+    return _has_table(conn, LEGACY_SNAPSHOT_TABLE) and conn.execute(
+        f"SELECT 1 FROM {LEGACY_SNAPSHOT_TABLE} WHERE person_id=? AND snapshot_date BETWEEN ? AND ? LIMIT 1",
+        (str(person_id), start, end),
+    ).fetchone() is not None
+
+
+def _fetch_dicts(cursor: sqlite3.Cursor) -> list[dict[str, Any]]:
+    names = [column[0] for column in cursor.description]
+    return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+def _legacy_roster(
+    conn: sqlite3.Connection, school_slug: str, scraped_at: str, legacy_columns: set[str]
+) -> tuple[str, list[dict[str, Any]]]:
+    rows = _fetch_dicts(
+        conn.execute(
+            f"SELECT * FROM {LEGACY_SNAPSHOT_TABLE} WHERE school_slug=? AND scraped_at=?", (school_slug, scraped_at)
+        )
+    )
+    members = [
+        {
+            "person_id": row["person_id"],
+            "raw_json": row.get("raw_json"),
+            **{column: row.get(column) for column in MEMBER_COLUMNS if column in legacy_columns},
+        }
+        for row in rows
+    ]
+    return rows[0].get("school_name") or school_slug, members
+
+
+def _rewind_history(
+    conn: sqlite3.Connection, school_slug: str, since: str
+) -> dict[str, tuple[str, list[dict[str, Any]]]]:
+    """Undo recorded scrapes at or after ``since`` and return their rosters for re-applying.
+
+    Versions those scrapes opened are deleted and versions they closed are
+    reopened, which leaves the history as it stood after the last earlier scrape.
+    """
+    rosters: dict[str, tuple[str, list[dict[str, Any]]]] = {}
+    for school_name, scraped_at in conn.execute(
+        "SELECT school_name, scraped_at FROM pike13_roster_scrapes WHERE school_slug=? AND scraped_at>=?",
+        (school_slug, since),
+    ).fetchall():
+        members = _fetch_dicts(
+            conn.execute(
+                f"""
+                SELECT person_id, {", ".join(MEMBER_COLUMNS)}, raw_json FROM pike13_member_history
+                WHERE school_slug = ? AND valid_from <= ? AND (valid_to IS NULL OR valid_to > ?)
+                """,
+                (school_slug, scraped_at, scraped_at),
+            )
+        )
+        rosters[scraped_at] = (school_name, members)
+    if rosters:
+        conn.execute("DELETE FROM pike13_member_history WHERE school_slug=? AND valid_from>=?", (school_slug, since))
+        conn.execute(
+            "UPDATE pike13_member_history SET valid_to=NULL WHERE school_slug=? AND valid_to>=?", (school_slug, since)
+        )
+        conn.execute("DELETE FROM pike13_roster_scrapes WHERE school_slug=? AND scraped_at>=?", (school_slug, since))
+    return rosters
+
+
+def unreplayed_legacy_scrapes(conn: sqlite3.Connection) -> list[tuple[str, str]]:
+    """Legacy (school_slug, scraped_at) snapshots that are not yet part of the history."""
+    if not _has_table(conn, LEGACY_SNAPSHOT_TABLE):
+        return []
+    ensure_member_history_schema(conn)
+    return conn.execute(
+        f"""
+        SELECT DISTINCT l.school_slug, l.scraped_at FROM {LEGACY_SNAPSHOT_TABLE} l
+        WHERE NOT EXISTS (
+            SELECT 1 FROM pike13_roster_scrapes s WHERE s.school_slug = l.school_slug AND s.scraped_at = l.scraped_at
+        )
+        ORDER BY l.school_slug, l.scraped_at
+        """
+    ).fetchall()
+
+
+def migrate_snapshots(conn: sqlite3.Connection, drop_legacy: bool = False) -> dict[str, int]:
+    """Merge legacy full-roster snapshots into the history in scrape order.
+
+    A legacy scrape older than scrapes already in the history is not skipped:
+    those later scrapes are rewound and re-applied after it, so every version
+    boundary lands where it would have had the scrapes been recorded in order.
+    ``drop_legacy`` drops the legacy table only once every scrape in it is in
+    the history, and raises ``ValueError`` otherwise.
+    """
+    ensure_member_history_schema(conn)
+    if not _has_table(conn, LEGACY_SNAPSHOT_TABLE):
+        return {"scrapes": 0, "versions_added": 0}
+    legacy_columns = {row[1] for row in conn.execute(f"PRAGMA table_info({LEGACY_SNAPSHOT_TABLE})")}
+    pending: dict[str, list[str]] = {}
+    for school_slug, scraped_at in unreplayed_legacy_scrapes(conn):
+        pending.setdefault(school_slug, []).append(scraped_at)
+    scrapes = added = 0
+    with conn:
+        for school_slug, stamps in pending.items():
+            replay = _rewind_history(conn, school_slug, stamps[0])
+            replay.update(
+                (scraped_at, _legacy_roster(conn, school_slug, scraped_at, legacy_columns)) for scraped_at in stamps
+            )
+            for scraped_at in sorted(replay):
+                school_name, members = replay[scraped_at]
+                result = record_roster(conn, school_slug, school_name, scraped_at, members)
+                if scraped_at in stamps:
+                    added += result["versions_added"]
+                    scrapes += 1
+    if drop_legacy:
+        missing = unreplayed_legacy_scrapes(conn)
+        if missing:
+            raise ValueError(
+                f"Not dropping {LEGACY_SNAPSHOT_TABLE}: {len(missing)} scrapes are not in the history, "
+                f"first {missing[0][0]} {missing[0][1]}"
+            )
+        with conn:
+            conn.execute(f"DROP TABLE {LEGACY_SNAPSHOT_TABLE}")
+    return {"scrapes": scrapes, "versions_added": added}
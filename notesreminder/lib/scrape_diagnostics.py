@@ -0,0 +1,201 @@
+"""Failure-focused Playwright diagnostics for the lesson scraper.
+
+The scraper used to record a full screenshot + DOM trace of every page load on
+every run. ``ScrapeDiagnostics`` applies a policy instead:
+
+- ``off``: no tracing and no screenshots.
+- ``on-failure``: each step (login, one schedule date) is recorded as its own
+  trace chunk, and step screenshots go to an in-memory ring buffer of the last
+  ``ring_size`` captures. Both are written to disk only when the step fails.
+- ``sampled``: like ``on-failure``, but a successful step is also kept with
+  probability ``sample_rate``.
+- ``always``: every step's trace chunk and every screenshot is written.
+
+Trace chunks larger than ``max_trace_bytes`` are deleted after writing. Once a
+run has written ``max_total_bytes`` of artifacts, further ones are dropped.
+``DiagnosticsPolicy.from_env`` reads ``NOTES_SCRAPE_DIAGNOSTICS`` (mode),
+``NOTES_SCRAPE_DIAGNOSTICS_SAMPLE_RATE``, ``NOTES_SCRAPE_DIAGNOSTICS_RING``,
+``NOTES_SCRAPE_TRACE_MAX_MB`` and ``NOTES_SCRAPE_DIAGNOSTICS_MAX_MB``.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+
+DIAGNOSTICS_MODES = ("off", "sampled", "on-failure", "always")
+# Buffered screenshots are JPEG so the ring stays small in memory.
+BUFFERED_SCREENSHOT_OPTIONS = {"type": "jpeg", "quality": 60}
+MB = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class DiagnosticsPolicy:
+    mode: str = "on-failure"
+    sample_rate: float = 0.05
+    ring_size: int = 12
+    max_trace_bytes: int = 50 * MB
+    max_total_bytes: int = 200 * MB
+
+    def __post_init__(self):
+        if self.mode not in DIAGNOSTICS_MODES:
+            raise ValueError(f"Unknown diagnostics mode {self.mode!r}; expected one of {', '.join(DIAGNOSTICS_MODES)}")
+
+    @classmethod
+    def from_env(cls, mode: Optional[str] = None) -> "DiagnosticsPolicy":
+        """Policy from ``NOTES_SCRAPE_DIAGNOSTICS*`` variables; ``mode`` overrides the env mode."""
+        return cls(
+            mode=mode or os.getenv("NOTES_SCRAPE_DIAGNOSTICS", cls.mode),
+            sample_rate=float(os.getenv("NOTES_SCRAPE_DIAGNOSTICS_SAMPLE_RATE", cls.sample_rate)),
+            ring_size=int(os.getenv("NOTES_SCRAPE_DIAGNOSTICS_RING", cls.ring_size)),
+            max_trace_bytes=int(float(os.getenv("NOTES_SCRAPE_TRACE_MAX_MB", 50)) * MB),
+            max_total_bytes=int(float(os.getenv("NOTES_SCRAPE_DIAGNOSTICS_MAX_MB", 200)) * MB),
+        )
+
+    @classmethod
+    def coerce(cls, value: "DiagnosticsPolicy | str | None") -> "DiagnosticsPolicy":
+        return value if isinstance(value, cls) else cls.from_env(value)
+
+    @property
+    def tracing(self) -> bool:
+        return self.mode != "off"
+
+    @property
+    def buffered(self) -> bool:
+        return self.mode in ("sampled", "on-failure")
+
+
+def _slug(label: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", label).strip("_") or "step"
+
+
+@dataclass
+class ScrapeDiagnostics:
+    """Per-run diagnostics recorder; one instance per browser context."""
+
+    policy: DiagnosticsPolicy = field(default_factory=DiagnosticsPolicy.from_env)
+    output_dir: Path = Path("screenshots")
+    verbose: bool = False
+    sample: Callable[[], float] = random.random
+    context: object = None
+    step: Optional[str] = None
+    step_failed: bool = False
+    bytes_written: int = 0
+    written: list = field(default_factory=list)
+    dropped: list = field(default_factory=list)
+
+    def __post_init__(self):
+        self.output_dir = Path(self.output_dir)
+        self.ring: deque[tuple[str, bytes]] = deque(maxlen=max(self.policy.ring_size, 1))
+
+    async def start(self, context) -> None:
+        if not self.policy.tracing:
+            return
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.context = context
+        # Screencast frames are the bulk of a trace; only "always" keeps them.
+        await context.tracing.start(screenshots=self.policy.mode == "always", snapshots=True, sources=False)
+
+    async def stop(self) -> None:
+        if self.context is None:
+            return
+        if self.step is not None:
+            await self.end_step()
+        await self.context.tracing.stop()
+        self.context = None
+
+    async def begin_step(self, label: str) -> None:
+        if self.step is not None:
+            await self.end_step()
+        self.step, self.step_failed = label, False
+        if self.context is not None:
+            await self.context.tracing.start_chunk(title=label)
+
+    def fail(self) -> None:
+        self.step_failed = True
+
+    def _keep(self, failed: bool) -> bool:
+        mode = self.policy.mode
+        if mode == "always":
+            return True
+        if mode == "off":
+            return False
+        return failed or (mode == "sampled" and self.sample() < self.policy.sample_rate)
+
+    def _budget_allows(self, size: int, name: str) -> bool:
+        if self.bytes_written + size > self.policy.max_total_bytes:
+            self.dropped.append(name)
+            return False
+        return True
+
+    def _write(self, name: str, data: bytes) -> None:
+        if not self._budget_allows(len(data), name):
+            return
+        path = self.output_dir / name
+        path.write_bytes(data)
+        self.bytes_written += len(data)
+        self.written.append(path)
+
+    async def end_step(self, failed: bool = False) -> list[Path]:
+        """Close the current step, writing its artifacts if the policy keeps them."""
+        if self.step is None:
+            return []
+        failed = failed or self.step_failed
+        keep = self._keep(failed)
+        label, self.step = self.step, None
+        before = len(self.written)
+        if self.context is not None:
+            if keep:
+                await self._save_trace_chunk(f"trace_{_slug(label)}.zip")
+            else:
+                await self.context.tracing.stop_chunk()
+        if keep and self.policy.buffered:
+            while self.ring:
+                self._write(*self.ring.popleft())
+        if keep and self.verbose and len(self.written) > before:
+            print(f"🧾 Saved {'failure' if failed else self.policy.mode} diagnostics for {label} in {self.output_dir}")
+        return self.written[before:]
+
+    async def _save_trace_chunk(self, name: str) -> None:
+        path = self.output_dir / name
+        await self.context.tracing.stop_chunk(path=str(path))
+        if not path.exists():
+            return
+        size = path.stat().st_size
+        if size > self.policy.max_trace_bytes or not self._budget_allows(size, name):
+            path.unlink()
+            if name not in self.dropped:
+                self.dropped.append(name)
+            return
+        self.bytes_written += size
+        self.written.append(path)
+
+    async def screenshot(self, page, name: str, **kwargs) -> None:
+        """Capture ``name`` according to the policy; never raises."""
+        if self.policy.mode == "off":
+            return
+        try:
+            if self.policy.buffered:
+                options = {**kwargs, **BUFFERED_SCREENSHOT_OPTIONS}
+                data = await page.screenshot(timeout=2000, **options)
+                self.ring.append((f"{Path(name).stem}.jpg", data))
+            else:
+                data = await page.screenshot(timeout=2000, **kwargs)
+                self._write(Path(name).name, data)
+        except Exception as exc:
+            if self.verbose:
+                print(f"⚠️ Screenshot skipped for {name}: {exc}")
+
+    def summary(self) -> dict:
+        return {
+            "mode": self.policy.mode,
+            "files_written": [str(path) for path in self.written],
+            "bytes_written": self.bytes_written,
+            "dropped": list(self.dropped),
+        }
@@ -0,0 +1,301 @@
+"""Proactive keep-alive for the shared SSO browser session.
+
+``scripts/session_keepalive.py`` runs ``keepalive_pass`` on an interval against
+the shared Okta profile (leasing the browser broker's context when one is up).
+Each pass:
+
+- sends one cheap authenticated GET per site (no page render, redirects not
+  followed) and classifies the response as ``authenticated``, ``needs_login``,
+  ``blocked`` or ``error``;
+- reads the remaining TTL of each site's auth cookie from the live context
+  (bot-management and analytics cookies such as ``__cf_bm`` or ``_gat`` expire
+  within the hour and say nothing about the login);
+- saves the context's storage_state, when no site reported a logout, so the
+  sliding-session cookies the probes just refreshed are what scrapers seed
+  from next (a logged-out pass never overwrites the last good state);
+- flags ``refresh_due`` when a Pike13 site is logged out, or is still
+  authenticated but its auth cookie expires within ``refresh_before_seconds``;
+- writes liveness and TTL per site to the status file read by the
+  ``pike13_cookie_status`` MCP tool, with the pass interval so readers judge
+  staleness against the configured cadence.
+
+A pass that raises (profile locked by a scraper, failed CDP lease, ...) is
+recorded with ``record_pass_error`` so the service keeps running and the
+status file shows the failure instead of the last good pass.
+
+``apply_refresh`` then runs the Pike13 re-login command (email 2FA, no push)
+for a flagged pass, at most once per ``min_refresh_interval_seconds``. Okta
+sites (Dialpad, HubSpot) cannot be re-logged in unattended; their result is
+passed to ``on_okta_status`` so the script can keep the ``.session_ready`` flag
+honest and the Telegram MFA flow is prompted instead.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+
+DEFAULT_STATUS_PATH = Path(os.getenv("SESSION_KEEPALIVE_STATUS", "browser_profiles/.keepalive/status.json"))
+DEFAULT_STORAGE_STATE = Path("browser_profiles/sor_shared_storage.json")
+DEFAULT_INTERVAL_SECONDS = 20 * 60
+DEFAULT_REFRESH_BEFORE_SECONDS = 6 * 3600
+DEFAULT_MIN_REFRESH_INTERVAL_SECONDS = 2 * 3600
+PROBE_TIMEOUT_MS = 15000
+# Without a named auth cookie, cookies with less than this left are treated as trackers, not the login.
+MIN_SESSION_COOKIE_TTL_SECONDS = 3600
+PIKE13_REFRESH_COMMAND = (sys.executable, "refresh_pike13_session.py")
+LOGIN_MARKERS = ("/login", "/signin", "/sign_in", "/two_factor", "okta.com/signin", "accounts.google.com")
+
+
+@dataclass(frozen=True)
+class SiteProbe:
+    name: str
+    url: str
+    kind: str  # "pike13" sites can be re-logged in unattended; "okta" sites need the MFA flow.
+    auth_cookies: tuple[str, ...] = ()  # Cookies that carry the login; the TTL is read from these.
+
+
+SITES = (
+    SiteProbe("pike13-westu", "https://westu-sor.pike13.com/today", "pike13", ("cwr_u",)),
+    SiteProbe("pike13-theheights", "https://theheights-sor.pike13.com/today", "pike13", ("cwr_u",)),
+    SiteProbe("dialpad", "https://dialpad.com/app/history/messages", "okta"),
+    SiteProbe("hubspot", "https://app.hubspot.com/home-beta", "okta"),
+)
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def classify_probe(status: int, location: str = "", body: str = "") -> str:
+    """Classify a non-followed GET by status code and redirect target."""
+    target = (location or "").lower()
+    if 300 <= status < 400:
+        return "needs_login" if any(marker in target for marker in LOGIN_MARKERS) else "authenticated"
+    if status in (401, 407, 419, 440):
+        return "needs_login"
+    if status == 403:
+        return "blocked"
+    if 200 <= status < 300:
+        return "needs_login" if "okta-signin-username" in (body or "").lower() else "authenticated"
+    return "error"
+
+
+def cookie_ttl_seconds(
+    cookies: Iterable[dict],
+    now: Optional[float] = None,
+    names: Iterable[str] = (),
+    min_ttl_seconds: int = MIN_SESSION_COOKIE_TTL_SECONDS,
+) -> Optional[int]:
+    """Seconds until the soonest login cookie expires; None when none of them is persistent.
+
+    With ``names`` only those cookies count. Otherwise cookies with less than
+    ``min_ttl_seconds`` left are skipped, so short-lived tracking cookies do
+    not stand in for the session.
+    """
+    now = time.time() if now is None else now
+    names = set(names)
+    expiries = [
+        cookie["expires"]
+        for cookie in cookies
+        if (cookie.get("expires") or -1) > 0 and (cookie.get("name") in names if names else True)
+    ]
+    if not names:
+        expiries = [expires for expires in expiries if expires - now >= min_ttl_seconds]
+    return max(int(min(expiries) - now), 0) if expiries else None
+
+
+async def probe_site(context, site: SiteProbe) -> dict:
+    started = time.monotonic()
+    result = {"url": site.url, "kind": site.kind, "checked_at": utc_now().isoformat()}
+    try:
+        response = await context.request.get(site.url, max_redirects=0, timeout=PROBE_TIMEOUT_MS)
+        body = ""
+        if 200 <= response.status < 300:
+            body = (await response.text())[:20000]
+        result.update(
+            status=classify_probe(response.status, response.headers.get("location", ""), body),
+            http_status=response.status,
+        )
+    except Exception as exc:
+        result.update(status="error", detail=str(exc)[:300])
+    result["latency_ms"] = round((time.monotonic() - started) * 1000)
+    ttl = cookie_ttl_seconds(await context.cookies(site.url), names=site.auth_cookies)
+    result["ttl_seconds"] = ttl
+    result["expires_at"] = (utc_now() + timedelta(seconds=ttl)).isoformat() if ttl is not None else None
+    return result
+
+
+def needs_pike13_refresh(sites: dict, refresh_before_seconds: int) -> bool:
+    """A Pike13 site is logged out, or authenticated with an auth cookie about to expire."""
+    for result in sites.values():
+        if result.get("kind") != "pike13":
+            continue
+        if result.get("status") == "needs_login":
+            return True
+        ttl = result.get("ttl_seconds")
+        if result.get("status") == "authenticated" and ttl is not None and ttl < refresh_before_seconds:
+            return True
+    return False
+
+
+def read_status(path: Path | str | None = None) -> dict:
+    path = Path(path or DEFAULT_STATUS_PATH)
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def write_status(status: dict, path: Path | str | None = None) -> Path:
+    path = Path(path or DEFAULT_STATUS_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(status, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def record_pass_error(
+    error: BaseException,
+    status_path: Path | str | None = None,
+    interval_seconds: float = DEFAULT_INTERVAL_SECONDS,
+) -> dict:
+    """Write a status for a pass that failed before probing; every site reads as ``error``."""
+    previous = read_status(status_path)
+    detail = f"{type(error).__name__}: {error}"[:300]
+    now = utc_now().isoformat()
+    sites = {
+        name: {**result, "status": "error", "checked_at": now, "detail": detail}
+        for name, result in previous.get("sites", {}).items()
+    }
+    status = {
+        **previous,
+        "updated_at": now,
+        "interval_seconds": interval_seconds,
+        "sites": sites,
+        "refresh_due": False,
+        "pass_error": detail,
+    }
+    write_status(status, status_path)
+    return status
+
+
+def status_summary(status: dict, max_age_seconds: Optional[float] = None, now: Optional[datetime] = None) -> dict:
+    """Liveness view of a status file, flagging results older than ``max_age_seconds`` as stale.
+
+    ``max_age_seconds`` defaults to two of the intervals the keep-alive recorded.
+    """
+    if not status:
+        return {"available": False}
+    if max_age_seconds is None:
+        max_age_seconds = 2 * status.get("interval_seconds", DEFAULT_INTERVAL_SECONDS)
+    now = now or utc_now()
+    updated_at = status.get("updated_at")
+    age = None
+    if updated_at:
+        age = int((now - datetime.fromisoformat(updated_at)).total_seconds())
+    sites = {}
+    for name, result in status.get("sites", {}).items():
+        expires_at = result.get("expires_at")
+        remaining = int((datetime.fromisoformat(expires_at) - now).total_seconds()) if expires_at else None
+        sites[name] = {
+            "live": result.get("status") == "authenticated",
+            "status": result.get("status"),
+            "checked_at": result.get("checked_at"),
+            "ttl_seconds": max(remaining, 0) if remaining is not None else None,
+        }
+    return {
+        "available": True,
+        "updated_at": updated_at,
+        "age_seconds": age,
+        "stale": age is None or age > max_age_seconds,
+        "sites": sites,
+        "last_refresh": status.get("last_refresh"),
+        "pass_error": status.get("pass_error"),
+    }
+
+
+def run_refresh_command(command: Iterable[str] = PIKE13_REFRESH_COMMAND, timeout: int = 900) -> dict:
+    started = utc_now()
+    try:
+        completed = subprocess.run(list(command), capture_output=True, text=True, timeout=timeout)
+        ok, detail = completed.returncode == 0, (completed.stdout or completed.stderr)[-500:]
+    except (OSError, subprocess.TimeoutExpired) as exc:
+        ok, detail = False, str(exc)
+    return {"started_at": started.isoformat(), "ok": ok, "detail": detail}
+
+
+async def save_storage_state(context, path: Path | str) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    await context.storage_state(path=str(tmp))
+    os.replace(tmp, path)
+
+
+async def keepalive_pass(
+    context,
+    *,
+    sites: Iterable[SiteProbe] = SITES,
+    storage_state_path: Path | str | None = DEFAULT_STORAGE_STATE,
+    status_path: Path | str | None = None,
+    refresh_before_seconds: int = DEFAULT_REFRESH_BEFORE_SECONDS,
+    on_okta_status: Callable[[bool], None] | None = None,
+    interval_seconds: float = DEFAULT_INTERVAL_SECONDS,
+) -> dict:
+    """Probe every site once, persist storage_state and the status file; returns the status."""
+    sites = list(sites)
+    previous = read_status(status_path)
+    probes = await asyncio.gather(*(probe_site(context, site) for site in sites))
+    results = {site.name: result for site, result in zip(sites, probes)}
+    status = {
+        "updated_at": utc_now().isoformat(),
+        "interval_seconds": interval_seconds,
+        "sites": results,
+        "refresh_due": needs_pike13_refresh(results, refresh_before_seconds),
+        "last_refresh": previous.get("last_refresh"),
+        "storage_state_saved_at": previous.get("storage_state_saved_at"),
+    }
+    outcomes = {result["status"] for result in results.values()}
+    if storage_state_path and "authenticated" in outcomes and outcomes <= {"authenticated", "error"}:
+        await save_storage_state(context, storage_state_path)
+        status["storage_state_saved_at"] = utc_now().isoformat()
+
+    okta = [result for result in results.values() if result["kind"] == "okta"]
+    if on_okta_status is not None and okta and all(result["status"] != "error" for result in okta):
+        on_okta_status(all(result["status"] == "authenticated" for result in okta))
+
+    write_status(status, status_path)
+    return status
+
+
+def apply_refresh(
+    status: dict,
+    *,
+    status_path: Path | str | None = None,
+    refresh: Callable[[], dict] = run_refresh_command,
+    min_refresh_interval_seconds: int = DEFAULT_MIN_REFRESH_INTERVAL_SECONDS,
+) -> dict:
+    """Run the Pike13 re-login when the last pass flagged it, rate-limited for MFA sends.
+
+    Call this with the keep-alive's own browser context closed: the refresh
+    opens the same persistent profile.
+    """
+    if not status.get("refresh_due"):
+        return status
+    last = (status.get("last_refresh") or {}).get("started_at")
+    if last and (utc_now() - datetime.fromisoformat(last)).total_seconds() < min_refresh_interval_seconds:
+        return status
+    status = {**status, "last_refresh": refresh(), "refresh_due": False}
+    write_status(status, status_path)
+    return status
@@ -0,0 +1,389 @@
+"""Lightweight span tracing for pipeline stages, persisted to ``pipeline_spans``.
+
+Usage::
+
+    tracer = Tracer("run_daily")
+    with tracer.activate():
+        with span("scrape", school=school) as current:
+            ...
+            current.add_rows(len(df))
+    save_traced_run(conn, tracer, "notes", "run_daily.py")   # source_import_runs row + spans
+
+``span`` is a no-op when no tracer is active, so library code (scrapers,
+upserts) can be instrumented unconditionally. ``aggregate_span`` folds many
+short repeated operations (page navigations, per-note scoring calls) into one
+child span per parent with a ``calls`` count instead of one row each.
+
+Each span records wall time, rows, SQL time and statement count (for
+connections opened with ``factory=TracedConnection``) and the process RSS
+high-water mark when it closed. SQL time is credited to every open span, so a
+parent's figure includes its children's, just like its duration.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import json
+import resource
+import sqlite3
+import sys
+import time
+import traceback
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Iterator, Optional
+from uuid import uuid4
+
+
+_active_tracer: contextvars.ContextVar[Optional["Tracer"]] = contextvars.ContextVar("active_tracer", default=None)
+_open_spans: contextvars.ContextVar[tuple["Span", ...]] = contextvars.ContextVar("open_spans", default=())
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+def peak_rss_kb() -> int:
+    """Process RSS high-water mark in KiB (``ru_maxrss`` is bytes on macOS, KiB elsewhere)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+@dataclass
+class Span:
+    name: str
+    parent: Optional["Span"] = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    span_id: str = field(default_factory=lambda: uuid4().hex)
+    started_at: str = field(default_factory=utc_now_iso)
+    duration_ms: float = 0.0
+    status: str = "ok"
+    error: Optional[str] = None
+    calls: int = 0
+    rows: Optional[int] = None
+    sql_ms: float = 0.0
+    sql_statements: int = 0
+    start_rss_kb: int = 0
+    peak_rss_kb: int = 0
+    children: list["Span"] = field(default_factory=list)
+    _aggregates: dict[str, "Span"] = field(default_factory=dict, repr=False)
+
+    def set(self, **attributes: Any) -> "Span":
+        self.attributes.update(attributes)
+        return self
+
+    def add_rows(self, count: int) -> "Span":
+        self.rows = (self.rows or 0) + int(count)
+        return self
+
+    @property
+    def self_ms(self) -> float:
+        return max(0.0, self.duration_ms - sum(child.duration_ms for child in self.children))
+
+    def walk(self) -> Iterator["Span"]:
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+class _NoopSpan:
+    """Stand-in returned by ``span`` when tracing is off."""
+
+    def set(self, **attributes: Any) -> "_NoopSpan":
+        return self
+
+    def add_rows(self, count: int) -> "_NoopSpan":
+        return self
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    def __init__(self, name: str, **attributes: Any):
+        self.root = Span(name, attributes=dict(attributes))
+        self._started = time.perf_counter()
+        self.root.start_rss_kb = peak_rss_kb()
+
+    @contextlib.contextmanager
+    def activate(self) -> Iterator[Span]:
+        """Make this tracer current; the root span stays open until the block exits."""
+        tracer_token = _active_tracer.set(self)
+        spans_token = _open_spans.set((self.root,))
+        try:
+            yield self.root
+        except BaseException as exc:
+            _mark_error(self.root, exc)
+            raise
+        finally:
+            self.close()
+            _open_spans.reset(spans_token)
+            _active_tracer.reset(tracer_token)
+
+    def close(self) -> None:
+        self.root.duration_ms = (time.perf_counter() - self._started) * 1000
+        self.root.calls = 1
+        self.root.peak_rss_kb = peak_rss_kb()
+
+    def spans(self) -> list[Span]:
+        return list(self.root.walk())
+
+    def save(self, conn: sqlite3.Connection, run_id: Optional[int] = None) -> int:
+        """Write every span (root first) to ``pipeline_spans``; returns the number written."""
+        if not self.root.duration_ms:
+            self.close()
+        ensure_pipeline_spans_schema(conn)
+        rows = [_span_row(item, run_id, self.root.span_id) for item in self.spans()]
+        conn.executemany(
+            f"INSERT OR REPLACE INTO pipeline_spans ({', '.join(SPAN_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in SPAN_COLUMNS)})",
+            [tuple(row[column] for column in SPAN_COLUMNS) for row in rows],
+        )
+        conn.commit()
+        return len(rows)
+
+
+def save_traced_run(
+    conn: sqlite3.Connection,
+    tracer: Tracer,
+    source: str,
+    extractor: str,
+    rows_seen: int = 0,
+    metadata: Optional[dict] = None,
+) -> Optional[int]:
+    """Record the traced run in ``source_import_runs`` (when that table exists) and save its spans.
+
+    Returns the import run id, or None when the database has no
+    ``source_import_runs`` table; the spans are saved either way.
+    """
+    from lead_followup_schema import finish_import_run, start_import_run
+
+    root = tracer.root
+    if not root.duration_ms:
+        tracer.close()
+    run_id = None
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'source_import_runs'").fetchone():
+        run_id = start_import_run(conn, source, extractor, metadata=metadata, started_at=root.started_at)
+        finish_import_run(
+            conn,
+            run_id,
+            "success" if root.status == "ok" else "error",
+            rows_seen=rows_seen,
+            error=root.error,
+            metadata={**(metadata or {}), "trace_id": root.span_id, "duration_ms": round(root.duration_ms, 1)},
+        )
+    tracer.save(conn, run_id)
+    return run_id
+
+
+def current_tracer() -> Optional[Tracer]:
+    return _active_tracer.get()
+
+
+def _mark_error(item: Span, exc: BaseException) -> None:
+    item.status = "error"
+    item.error = "".join(traceback.format_exception_only(type(exc), exc)).strip()[:500]
+
+
+@contextlib.contextmanager
+def _open(item: Span, parent: Span) -> Iterator[Span]:
+    started = time.perf_counter()
+    start_rss = peak_rss_kb()
+    token = _open_spans.set(_open_spans.get() + (item,))
+    try:
+        yield item
+    except BaseException as exc:
+        _mark_error(item, exc)
+        raise
+    finally:
+        _open_spans.reset(token)
+        item.duration_ms += (time.perf_counter() - started) * 1000
+        item.calls += 1
+        item.start_rss_kb = item.start_rss_kb or start_rss
+        item.peak_rss_kb = peak_rss_kb()
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span | _NoopSpan]:
+    """Time a stage as a child of the innermost open span (no-op without an active tracer)."""
+    open_spans = _open_spans.get()
+    if current_tracer() is None or not open_spans:
+        yield NOOP_SPAN
+        return
+    parent = open_spans[-1]
+    item = Span(name, parent=parent, attributes=dict(attributes))
+    parent.children.append(item)
+    with _open(item, parent):
+        yield item
+
+
+@contextlib.contextmanager
+def aggregate_span(name: str, **attributes: Any) -> Iterator[Span | _NoopSpan]:
+    """Like ``span`` but repeated calls under one parent accumulate into a single span."""
+    open_spans = _open_spans.get()
+    if current_tracer() is None or not open_spans:
+        yield NOOP_SPAN
+        return
+    parent = open_spans[-1]
+    item = parent._aggregates.get(name)
+    if item is None:
+        item = parent._aggregates[name] = Span(name, parent=parent, attributes=dict(attributes))
+        parent.children.append(item)
+    with _open(item, parent):
+        yield item
+
+
+def _record_sql(elapsed: float, statements: int = 0) -> None:
+    for item in _open_spans.get():
+        item.sql_ms += elapsed * 1000
+        item.sql_statements += statements
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that credits statement execution and row fetching time to the open spans."""
+
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _record_sql(time.perf_counter() - started, 1)
+
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _record_sql(time.perf_counter() - started, 1)
+
+    def executescript(self, sql_script):
+        started = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            _record_sql(time.perf_counter() - started, 1)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            _record_sql(time.perf_counter() - started)
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        try:
+            return super().fetchmany(self.arraysize if size is None else size)
+        finally:
+            _record_sql(time.perf_counter() - started)
+
+    def fetchall(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            _record_sql(time.perf_counter() - started)
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            return super().__next__()
+        finally:
+            _record_sql(time.perf_counter() - started)
+
+
+class TracedConnection(sqlite3.Connection):
+    """``sqlite3.connect(path, factory=TracedConnection)`` to measure SQL time inside spans."""
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+    def commit(self):
+        started = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            _record_sql(time.perf_counter() - started)
+
+
+SPAN_COLUMNS = (
+    "span_id",
+    "trace_id",
+    "run_id",
+    "parent_span_id",
+    "name",
+    "started_at",
+    "duration_ms",
+    "self_ms",
+    "status",
+    "error",
+    "calls",
+    "rows",
+    "sql_ms",
+    "sql_statements",
+    "peak_rss_kb",
+    "rss_growth_kb",
+    "attributes_json",
+)
+
+
+def ensure_pipeline_spans_schema(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS pipeline_spans (
+            span_id TEXT PRIMARY KEY,
+            trace_id TEXT NOT NULL,
+            run_id INTEGER,
+            parent_span_id TEXT,
+            name TEXT NOT NULL,
+            started_at TEXT NOT NULL,
+            duration_ms REAL NOT NULL,
+            self_ms REAL NOT NULL,
+            status TEXT NOT NULL,
+            error TEXT,
+            calls INTEGER NOT NULL DEFAULT 1,
+            rows INTEGER,
+            sql_ms REAL NOT NULL DEFAULT 0,
+            sql_statements INTEGER NOT NULL DEFAULT 0,
+            peak_rss_kb INTEGER,
+            rss_growth_kb INTEGER,
+            attributes_json TEXT,
+            FOREIGN KEY(run_id) REFERENCES source_import_runs(id)
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_pipeline_spans_run ON pipeline_spans(run_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_pipeline_spans_trace ON pipeline_spans(trace_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_pipeline_spans_name_started ON pipeline_spans(name, started_at)")
+
+
+def _span_row(item: Span, run_id: Optional[int], trace_id: str) -> dict:
+    return {
+        "span_id": item.span_id,
+        "trace_id": trace_id,
+        "run_id": run_id,
+        "parent_span_id": item.parent.span_id if item.parent else None,
+        "name": item.name,
+        "started_at": item.started_at,
+        "duration_ms": round(item.duration_ms, 3),
+        "self_ms": round(item.self_ms, 3),
+        "status": item.status,
+        "error": item.error,
+        "calls": item.calls,
+        "rows": item.rows,
+        "sql_ms": round(item.sql_ms, 3),
+        "sql_statements": item.sql_statements,
+        "peak_rss_kb": item.peak_rss_kb or None,
+        "rss_growth_kb": max(0, item.peak_rss_kb - item.start_rss_kb) if item.peak_rss_kb else None,
+        "attributes_json": json.dumps(item.attributes, sort_keys=True, default=str) if item.attributes else None,
+    }
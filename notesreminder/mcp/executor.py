@@ -0,0 +1,189 @@
+"""Bounded thread executor, query time budgets and metrics for MCP tools.
+
+FastMCP calls synchronous tools directly on the event loop, so under
+``--transport sse`` one slow report stalls every connected client. Tools
+wrapped with ``ToolExecutor.offload`` run in a bounded thread pool instead.
+Connections opened during a tool call and passed to ``attach_budget`` get a
+SQLite progress handler that aborts the statement once the call's time budget
+is spent or the client has gone away.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+
+DEFAULT_MAX_WORKERS = int(os.getenv("MCP_MAX_WORKERS", "4"))
+DEFAULT_TOOL_BUDGET_SECONDS = float(os.getenv("MCP_TOOL_BUDGET_SECONDS", "300"))
+QUERY_BUDGET_SECONDS = float(os.getenv("MCP_QUERY_BUDGET_SECONDS", "30"))
+# SQLite VM instructions between budget checks; small enough to react within milliseconds.
+PROGRESS_HANDLER_OPS = 10_000
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+CURRENT_CALL: contextvars.ContextVar[Optional["ToolCall"]] = contextvars.ContextVar("mcp_tool_call", default=None)
+_DEFAULT = object()
+
+
+class ToolTimeoutError(TimeoutError):
+    """A tool call ran past its time budget and its SQLite work was interrupted."""
+
+
+class ToolCall:
+    def __init__(self, name: str, budget_seconds: Optional[float]):
+        self.name = name
+        self.budget_seconds = budget_seconds
+        self.deadline: Optional[float] = None
+        self.cancelled = False
+        self.dequeued = False  # Left the queue: picked up by a worker, or abandoned before that.
+        self.connections: list[sqlite3.Connection] = []
+
+    def start(self) -> None:
+        if self.budget_seconds:
+            self.deadline = time.monotonic() + self.budget_seconds
+
+    def expired(self) -> bool:
+        return self.cancelled or (self.deadline is not None and time.monotonic() > self.deadline)
+
+    def attach(self, conn: sqlite3.Connection) -> None:
+        conn.set_progress_handler(lambda: 1 if self.expired() else 0, PROGRESS_HANDLER_OPS)
+        self.connections.append(conn)
+
+    def interrupt(self) -> None:
+        self.cancelled = True
+        for conn in self.connections:
+            try:
+                conn.interrupt()
+            except sqlite3.Error:
+                pass  # already closed
+
+
+def attach_budget(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """Bind ``conn`` to the current tool call's time budget (no-op outside a tool call)."""
+    call = CURRENT_CALL.get()
+    if call is not None:
+        call.attach(conn)
+    return conn
+
+
+class ToolExecutor:
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        default_budget_seconds: Optional[float] = DEFAULT_TOOL_BUDGET_SECONDS,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.default_budget_seconds = default_budget_seconds
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="mcp-tool")
+        self._lock = threading.Lock()
+        self.queue_depth = 0
+        self.in_flight = 0
+        self.outcomes = {"ok": 0, "error": 0, "timed_out": 0, "cancelled": 0}
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.tools: dict[str, dict] = {}
+
+    def _dequeue(self, call: ToolCall) -> None:
+        # Caller holds self._lock; whichever of the worker or ``run`` gets here first counts it.
+        if not call.dequeued:
+            call.dequeued = True
+            self.queue_depth -= 1
+
+    def _invoke(self, call: ToolCall, fn: Callable, args, kwargs):
+        with self._lock:
+            self._dequeue(call)
+            self.in_flight += 1
+        try:
+            if call.cancelled:
+                raise asyncio.CancelledError()
+            CURRENT_CALL.set(call)
+            call.start()
+            try:
+                return fn(*args, **kwargs)
+            except sqlite3.OperationalError as exc:
+                if call.expired() and not call.cancelled and "interrupted" in str(exc):
+                    raise ToolTimeoutError(
+                        f"{call.name} exceeded its {call.budget_seconds:g}s time budget and was interrupted."
+                    ) from exc
+                raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    async def run(self, name: str, fn: Callable, args=(), kwargs=None, budget_seconds=_DEFAULT):
+        budget = self.default_budget_seconds if budget_seconds is _DEFAULT else budget_seconds
+        call = ToolCall(name, budget)
+        with self._lock:
+            self.queue_depth += 1
+        started = time.monotonic()
+        context = contextvars.copy_context()
+        future = asyncio.get_running_loop().run_in_executor(
+            self._pool, context.run, self._invoke, call, fn, args, kwargs or {}
+        )
+        outcome = "error"
+        try:
+            result = await future
+            outcome = "ok"
+            return result
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            call.interrupt()
+            raise
+        except ToolTimeoutError:
+            outcome = "timed_out"
+            raise
+        finally:
+            # A call cancelled or timed out before a worker picked it up never reaches _invoke.
+            with self._lock:
+                self._dequeue(call)
+            self._record(name, outcome, (time.monotonic() - started) * 1000)
+
+    def offload(self, budget_seconds=_DEFAULT):
+        """Decorator turning a blocking tool into an async one that runs in the pool."""
+
+        def decorator(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                return await self.run(fn.__name__, fn, args, kwargs, budget_seconds)
+
+            return wrapper
+
+        return decorator
+
+    def _record(self, name: str, outcome: str, elapsed_ms: float) -> None:
+        bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if elapsed_ms <= bound), len(LATENCY_BUCKETS_MS))
+        with self._lock:
+            self.outcomes[outcome] += 1
+            self.histogram[bucket] += 1
+            stats = self.tools.setdefault(name, {"calls": 0, "failures": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stats["calls"] += 1
+            stats["failures"] += outcome != "ok"
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+    def snapshot(self) -> dict:
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self.queue_depth,
+                "in_flight": self.in_flight,
+                "default_budget_seconds": self.default_budget_seconds,
+                "outcomes": dict(self.outcomes),
+                "latency_histogram": dict(zip(labels, self.histogram)),
+                "tools": {
+                    name: {
+                        "calls": stats["calls"],
+                        "failures": stats["failures"],
+                        "avg_ms": round(stats["total_ms"] / stats["calls"], 1),
+                        "max_ms": round(stats["max_ms"], 1),
+                    }
+                    for name, stats in sorted(self.tools.items())
+                },
+            }
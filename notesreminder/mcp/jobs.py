@@ -0,0 +1,226 @@
+"""Persistent background jobs for long-running MCP tools.
+
+Submit tools return a job ID immediately; the work runs as an asyncio task on
+the server's event loop. Jobs sharing a lock key (the Pike13 school) run one at
+a time, different schools run concurrently. Job state lives in SQLite so a
+restarted ``notesreminder-mcp.service`` re-queues jobs that were still queued
+or running when it went down.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+from uuid import uuid4
+
+
+DEFAULT_JOBS_DB_PATH = os.getenv("MCP_JOBS_DB_PATH", "mcp_jobs.db")
+ACTIVE_STATUSES = ("queued", "running")
+PROGRESS_FIELDS = ("dates_total", "dates_done", "lessons_scraped")
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+
+
+def ensure_jobs_schema(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS mcp_jobs (
+            job_id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            lock_key TEXT NOT NULL,
+            params_json TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            dates_total INTEGER,
+            dates_done INTEGER NOT NULL DEFAULT 0,
+            lessons_scraped INTEGER NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            result_json TEXT,
+            error TEXT,
+            created_at TEXT NOT NULL,
+            started_at TEXT,
+            finished_at TEXT,
+            updated_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_mcp_jobs_status ON mcp_jobs(status, created_at)")
+
+
+class JobProgress:
+    """Callable handed to a job runner for persisting its progress counters."""
+
+    def __init__(self, manager: "JobManager", job_id: str):
+        self.manager = manager
+        self.job_id = job_id
+
+    def __call__(self, **counters) -> None:
+        fields = {key: value for key, value in counters.items() if key in PROGRESS_FIELDS and value is not None}
+        if fields:
+            self.manager._update(self.job_id, **fields)
+
+
+JobRunner = Callable[[dict, JobProgress], Awaitable[dict]]
+
+
+class JobManager:
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or DEFAULT_JOBS_DB_PATH
+        self.runners: dict[str, JobRunner] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._cancel_requested: set[str] = set()
+        self._recovered = False
+
+    def register(self, kind: str, runner: JobRunner) -> None:
+        self.runners[kind] = runner
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        ensure_jobs_schema(conn)
+        return conn
+
+    def _update(self, job_id: str, **fields) -> None:
+        fields["updated_at"] = utc_now_iso()
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(f"UPDATE mcp_jobs SET {assignments} WHERE job_id = ?", [*fields.values(), job_id])
+        finally:
+            conn.close()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM mcp_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return _job_dict(row) if row else None
+
+    def list_jobs(self, status: str = "", limit: int = 20) -> list[dict]:
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                """
+                SELECT * FROM mcp_jobs
+                WHERE (:status = '' OR status = :status)
+                ORDER BY created_at DESC, rowid DESC
+                LIMIT :limit
+                """,
+                {"status": status or "", "limit": max(1, limit)},
+            ).fetchall()
+        finally:
+            conn.close()
+        return [_job_dict(row) for row in rows]
+
+    def submit(self, kind: str, lock_key: str, params: dict) -> dict:
+        """Persist a queued job and schedule it; must be called on the running event loop."""
+        if kind not in self.runners:
+            raise ValueError(f"Unknown job kind: {kind}")
+        self.recover()
+        job_id = f"job_{uuid4().hex[:12]}"
+        now = utc_now_iso()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    """
+                    INSERT INTO mcp_jobs (job_id, kind, lock_key, params_json, status, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, 'queued', ?, ?)
+                    """,
+                    (job_id, kind, lock_key, json.dumps(params, sort_keys=True), now, now),
+                )
+        finally:
+            conn.close()
+        self._start(job_id)
+        return self.get(job_id)
+
+    def recover(self) -> int:
+        """Re-queue jobs left queued/running by a previous server process (once per manager)."""
+        if self._recovered:
+            return 0
+        self._recovered = True
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT job_id, kind FROM mcp_jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        finally:
+            conn.close()
+        resumed = 0
+        for row in rows:
+            if row["job_id"] in self._tasks:
+                continue
+            if row["kind"] not in self.runners:
+                self._update(row["job_id"], status="failed", error="no runner registered after restart",
+                             finished_at=utc_now_iso())
+                continue
+            self._update(row["job_id"], status="queued")
+            self._start(row["job_id"])
+            resumed += 1
+        return resumed
+
+    def _start(self, job_id: str) -> None:
+        self._tasks[job_id] = asyncio.get_running_loop().create_task(self._run(job_id))
+
+    async def _run(self, job_id: str) -> None:
+        job = self.get(job_id)
+        lock = self._locks.setdefault(job["lock_key"], asyncio.Lock())
+        try:
+            async with lock:
+                if self.get(job_id)["status"] != "queued":
+                    return
+                self._update(job_id, status="running", started_at=utc_now_iso(), attempts=job["attempts"] + 1)
+                result = await self.runners[job["kind"]](job["params"], JobProgress(self, job_id))
+            self._update(
+                job_id,
+                status="succeeded",
+                result_json=json.dumps(result, default=str),
+                finished_at=utc_now_iso(),
+            )
+        except asyncio.CancelledError:
+            if job_id in self._cancel_requested:
+                self._update(job_id, status="cancelled", finished_at=utc_now_iso())
+                return
+            # Server shutdown: leave the row active so the next process resumes it.
+            raise
+        except Exception as exc:  # noqa: BLE001
+            self._update(job_id, status="failed", error=str(exc), finished_at=utc_now_iso())
+        finally:
+            self._tasks.pop(job_id, None)
+            self._cancel_requested.discard(job_id)
+
+    async def wait(self, job_id: str) -> Optional[dict]:
+        """Wait for a job to finish without cancelling it if the caller goes away."""
+        task = self._tasks.get(job_id)
+        if task is not None:
+            await asyncio.shield(task)
+        return self.get(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[dict]:
+        job = self.get(job_id)
+        if job is None or job["status"] not in ACTIVE_STATUSES:
+            return job
+        task = self._tasks.get(job_id)
+        if task is not None and not task.done():
+            self._cancel_requested.add(job_id)
+            task.cancel()
+            await asyncio.wait({task})
+        else:
+            self._update(job_id, status="cancelled", finished_at=utc_now_iso())
+        return self.get(job_id)
+
+
+def _job_dict(row: sqlite3.Row) -> dict:
+    job = dict(row)
+    job["params"] = json.loads(job.pop("params_json") or "{}")
+    result = job.pop("result_json")
+    job["result"] = json.loads(result) if result else None
+    return job
@@ -3,12 +3,95 @@ import asyncio
 import json
 import os
 import sqlite3
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from notesreminder.lib.cookie_auth import check_cookie_freshness, load_cookies
+from notesreminder.lib.session_keepalive import read_status as read_keepalive_status, status_summary
+from notesreminder.mcp.jobs import JobManager
 
 
-PIKE13_SCRAPE_LOCK = asyncio.Lock()  # prevent concurrent scrapes
+JOBS = JobManager()
+
+
+def _resolve_window(start_date, end_date, limit_days):
+    if not start_date:
+        end_dt = datetime.strptime(end_date, "%Y-%m-%d") if end_date else datetime.now()
+        start_date = (end_dt - timedelta(days=limit_days)).strftime("%Y-%m-%d")
+    if not end_date:
+        end_date = datetime.now().strftime("%Y-%m-%d")
+    return start_date, end_date
+
+
+async def _scrape(params, progress):
+    from noteschecker import scrape_lessons
+
+    start = datetime.strptime(params["start_date"], "%Y-%m-%d")
+    end = datetime.strptime(params["end_date"], "%Y-%m-%d")
+    progress(dates_total=(end - start).days + 1)
+    return await scrape_lessons(
+        school_subdomain=params["school"],
+        start_date=params["start_date"],
+        end_date=params["end_date"],
+        verbose=True,
+        progress=lambda dates_done, lessons: progress(dates_done=dates_done, lessons_scraped=lessons),
+    )
+
+
+async def run_scrape_job(params, progress):
+    df = await _scrape(params, progress)
+    return {
+        "status": "success",
+        **params,
+        "lessons_scraped": len(df),
+        "columns": list(df.columns),
+    }
+
+
+def _update_reminders(df, school):
+    # Import the refactored DB update function from run_daily
+    from run_daily import update_reminders_from_dataframe
+
+    db_path = os.getenv("REMINDERS_DB_PATH", "reminders.db")
+    # Jobs for different schools merge concurrently; wait out the other writer instead of
+    # failing with "database is locked" after sqlite's default 5 seconds.
+    conn = sqlite3.connect(db_path, timeout=60)
+    try:
+        return update_reminders_from_dataframe(conn, df, school)
+    finally:
+        conn.close()
+
+
+async def run_import_job(params, progress):
+    df = await _scrape(params, progress)
+    if df.empty:
+        return {"status": "no_data", "school": params["school"], "lessons": 0}
+    # The DB update is synchronous; keep it off the event loop.
+    result = await asyncio.to_thread(_update_reminders, df, params["school"])
+    return {
+        "status": "success",
+        **params,
+        "lessons_scraped": len(df),
+        **result,
+    }
+
+
+JOBS.register("pike13_scrape_lessons", run_scrape_job)
+JOBS.register("pike13_import_and_update_db", run_import_job)
+
+
+async def _run_and_wait(kind, school, start_date, end_date, limit_days):
+    start_date, end_date = _resolve_window(start_date, end_date, limit_days)
+    job = JOBS.submit(kind, school, {"school": school, "start_date": start_date, "end_date": end_date})
+    job = await JOBS.wait(job["job_id"])
+    if job["status"] != "succeeded":
+        return json.dumps({"status": "error", "job_id": job["job_id"], "error": job["error"] or job["status"]}, indent=2)
+    return json.dumps({**job["result"], "job_id": job["job_id"]}, default=str, indent=2)
+
+
+def _submit(kind, school, start_date, end_date, limit_days):
+    start_date, end_date = _resolve_window(start_date, end_date, limit_days)
+    job = JOBS.submit(kind, school, {"school": school, "start_date": start_date, "end_date": end_date})
+    return json.dumps(job, default=str, indent=2)
 
 
 def register_pike13_tools(mcp):
@@ -23,47 +106,34 @@ def register_pike13_tools(mcp):
     ) -> str:
         """Scrape Pike13 lesson data for a school/date range. Uses injected Okta cookies for auth.
 
+        Waits for the scrape to finish; use pike13_submit_scrape_lessons to get a job ID instead.
+
         Args:
             school: Pike13 subdomain (westu-sor or theheights-sor)
             start_date: Start date YYYY-MM-DD (defaults to limit_days ago)
             end_date: End date YYYY-MM-DD (defaults to today)
             limit_days: If start_date is empty, scrape this many days back from now
         """
-        from datetime import timedelta
-
-        if not start_date:
-            end_dt = datetime.strptime(end_date, "%Y-%m-%d") if end_date else datetime.now()
-            start_dt = end_dt - timedelta(days=limit_days)
-            start_date = start_dt.strftime("%Y-%m-%d")
-        if not end_date:
-            end_date = datetime.now().strftime("%Y-%m-%d")
-
-        async with PIKE13_SCRAPE_LOCK:
-            from noteschecker import scrape_lessons
-            try:
-                df = await scrape_lessons(
-                    school_subdomain=school,
-                    start_date=start_date,
-                    end_date=end_date,
-                    verbose=True,
-                )
-            except Exception as e:
-                return json.dumps({
-                    "status": "error",
-                    "error": str(e),
-                }, indent=2)
-        return json.dumps({
-            "status": "success",
-            "school": school,
-            "start_date": start_date,
-            "end_date": end_date,
-            "lessons_scraped": len(df),
-            "columns": list(df.columns),
-        }, default=str, indent=2)
+        return await _run_and_wait("pike13_scrape_lessons", school, start_date, end_date, limit_days)
+
+    @mcp.tool()
+    async def pike13_submit_scrape_lessons(
+        school: str = "westu-sor",
+        start_date: str = "",
+        end_date: str = "",
+        limit_days: int = 7,
+    ) -> str:
+        """Queue a Pike13 lesson scrape as a background job and return its job ID immediately."""
+        return _submit("pike13_scrape_lessons", school, start_date, end_date, limit_days)
 
     @mcp.tool()
     async def pike13_cookie_status() -> str:
-        """Check the health of stored Pike13 auth cookies. Returns freshness, expiry, and cookie count."""
+        """Check Pike13 auth health: cookie-file freshness plus live session status and remaining TTL.
+
+        ``session`` comes from the keep-alive service (scripts/session_keepalive.py),
+        which probes each site with an authenticated request; ``stale`` is true when
+        it has not run recently.
+        """
         try:
             payload = load_cookies()
             freshness = check_cookie_freshness(payload)
@@ -78,6 +148,7 @@ def register_pike13_tools(mcp):
                 "cookies_available": False,
                 "error": str(e),
             }
+        result["session"] = status_summary(read_keepalive_status())
         return json.dumps(result, indent=2, default=str)
 
     @mcp.tool()
@@ -91,49 +162,40 @@ def register_pike13_tools(mcp):
 
         This is the primary tool for keeping the notes database current from Pike13.
         After scraping, it updates the reminders table and runs reporting schema sync.
+        Waits for completion; pike13_submit_import_and_update_db returns a job ID instead.
         """
-        from datetime import timedelta
-
-        if not start_date:
-            end_dt = datetime.strptime(end_date, "%Y-%m-%d") if end_date else datetime.now()
-            start_dt = end_dt - timedelta(days=limit_days)
-            start_date = start_dt.strftime("%Y-%m-%d")
-        if not end_date:
-            end_date = datetime.now().strftime("%Y-%m-%d")
-
-        async with PIKE13_SCRAPE_LOCK:
-            from noteschecker import scrape_lessons
-            try:
-                df = await scrape_lessons(
-                    school_subdomain=school,
-                    start_date=start_date,
-                    end_date=end_date,
-                    verbose=True,
-                )
-            except Exception as e:
-                return json.dumps({
-                    "status": "error",
-                    "error": str(e),
-                }, indent=2)
-
-        if df.empty:
-            return json.dumps({"status": "no_data", "school": school, "lessons": 0}, indent=2)
-
-        # Import the refactored DB update function from run_daily
-        from run_daily import update_reminders_from_dataframe
-
-        db_path = os.getenv("REMINDERS_DB_PATH", "reminders.db")
-        conn = sqlite3.connect(db_path)
-        try:
-            result = update_reminders_from_dataframe(conn, df, school)
-        finally:
-            conn.close()
-
-        return json.dumps({
-            "status": "success",
-            "school": school,
-            "start_date": start_date,
-            "end_date": end_date,
-            "lessons_scraped": len(df),
-            **result,
-        }, default=str, indent=2)
+        return await _run_and_wait("pike13_import_and_update_db", school, start_date, end_date, limit_days)
+
+    @mcp.tool()
+    async def pike13_submit_import_and_update_db(
+        school: str = "westu-sor",
+        start_date: str = "",
+        end_date: str = "",
+        limit_days: int = 7,
+    ) -> str:
+        """Queue a Pike13 scrape + reminders.db update as a background job and return its job ID."""
+        return _submit("pike13_import_and_update_db", school, start_date, end_date, limit_days)
+
+    @mcp.tool()
+    async def job_status(job_id: str) -> str:
+        """Return status, progress counters (dates done, lessons scraped) and result for a background job."""
+        JOBS.recover()
+        job = JOBS.get(job_id)
+        if job is None:
+            return json.dumps({"job_id": job_id, "found": False}, indent=2)
+        return json.dumps({**job, "found": True}, default=str, indent=2)
+
+    @mcp.tool()
+    async def list_jobs(status: str = "", limit: int = 20) -> str:
+        """List recent background jobs, optionally filtered by status (queued, running, succeeded, failed, cancelled)."""
+        JOBS.recover()
+        jobs = JOBS.list_jobs(status, limit)
+        return json.dumps({"jobs": jobs, "job_count": len(jobs)}, default=str, indent=2)
+
+    @mcp.tool()
+    async def cancel_job(job_id: str) -> str:
+        """Cancel a queued or running background job."""
+        job = await JOBS.cancel(job_id)
+        if job is None:
+            return json.dumps({"job_id": job_id, "found": False}, indent=2)
+        return json.dumps({**job, "found": True}, default=str, indent=2)
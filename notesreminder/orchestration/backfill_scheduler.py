@@ -0,0 +1,320 @@
+"""Parallel, resumable chunk scheduler with SQLite-backed state for backfills."""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+from uuid import uuid4
+
+
+DEFAULT_SITE_CAP = 1
+
+
+@dataclass(frozen=True)
+class ChunkSpec:
+    key: str
+    source: str
+    school: str | None
+    start: str
+    end: str
+    site: str
+    priority: int = 0
+
+
+ChunkRunner = Callable[[ChunkSpec], dict]
+
+
+def now_iso() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def connect_state(path: Path | str) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    ensure_backfill_state_schema(conn)
+    return conn
+
+
+def ensure_backfill_state_schema(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS backfill_chunks (
+            chunk_key TEXT PRIMARY KEY,
+            source TEXT NOT NULL,
+            school TEXT,
+            window_start TEXT NOT NULL,
+            window_end TEXT NOT NULL,
+            site TEXT NOT NULL,
+            priority INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT 'pending',
+            verdict TEXT,
+            rc INTEGER,
+            rows_before INTEGER,
+            rows_after INTEGER,
+            rows_delta INTEGER,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            run_id TEXT,
+            started_at TEXT,
+            finished_at TEXT,
+            duration_s REAL,
+            detail TEXT,
+            updated_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_backfill_chunks_status_priority ON backfill_chunks(status, priority)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_backfill_chunks_run ON backfill_chunks(run_id, source)")
+
+
+def register_chunks(conn: sqlite3.Connection, specs: list[ChunkSpec]) -> None:
+    """Add new chunks and refresh priority/window on chunks that are not done yet."""
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            """
+            INSERT INTO backfill_chunks
+            (chunk_key, source, school, window_start, window_end, site, priority, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(chunk_key) DO UPDATE SET
+                window_end = excluded.window_end,
+                site = excluded.site,
+                priority = excluded.priority,
+                updated_at = excluded.updated_at
+            WHERE backfill_chunks.status != 'done'
+            """,
+            [
+                (spec.key, spec.source, spec.school, spec.start, spec.end, spec.site, spec.priority, now_iso())
+                for spec in specs
+            ],
+        )
+
+
+def import_progress_json(conn: sqlite3.Connection, progress: dict) -> int:
+    """Carry verdicts from the legacy backfill_progress.json into the state table."""
+    imported = 0
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        for key, chunk in (progress or {}).get("chunks", {}).items():
+            if chunk.get("verdict") != "PASS":
+                continue
+            before, after = chunk.get("before"), chunk.get("after")
+            cursor = conn.execute(
+                """
+                UPDATE backfill_chunks
+                SET status = 'done', verdict = 'PASS', rc = ?, rows_before = ?, rows_after = ?,
+                    rows_delta = ?, finished_at = ?, detail = ?, updated_at = ?
+                WHERE chunk_key = ? AND status != 'done'
+                """,
+                (
+                    chunk.get("rc"),
+                    before,
+                    after,
+                    (after - before) if before is not None and after is not None else None,
+                    chunk.get("finished_at"),
+                    chunk.get("deepseek"),
+                    now_iso(),
+                    key,
+                ),
+            )
+            imported += cursor.rowcount
+    return imported
+
+
+def reset_interrupted(conn: sqlite3.Connection) -> int:
+    """Chunks left 'running' by a killed scheduler go back to the queue."""
+    with conn:
+        cursor = conn.execute(
+            "UPDATE backfill_chunks SET status = 'pending', updated_at = ? WHERE status = 'running'",
+            (now_iso(),),
+        )
+    return cursor.rowcount
+
+
+def claim_next(
+    conn: sqlite3.Connection,
+    keys: set[str],
+    running_by_site: dict[str, int],
+    site_caps: dict[str, int],
+    run_id: str,
+) -> ChunkSpec | None:
+    """Atomically move the best runnable chunk from pending/failed to running."""
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        rows = conn.execute(
+            """
+            SELECT * FROM backfill_chunks
+            WHERE status IN ('pending', 'failed')
+            ORDER BY priority, window_start, chunk_key
+            """
+        ).fetchall()
+        for row in rows:
+            if row["chunk_key"] not in keys:
+                continue
+            if running_by_site.get(row["site"], 0) >= site_caps.get(row["site"], DEFAULT_SITE_CAP):
+                continue
+            conn.execute(
+                """
+                UPDATE backfill_chunks
+                SET status = 'running', attempts = attempts + 1, run_id = ?, started_at = ?,
+                    finished_at = NULL, duration_s = NULL, updated_at = ?
+                WHERE chunk_key = ?
+                """,
+                (run_id, now_iso(), now_iso(), row["chunk_key"]),
+            )
+            return ChunkSpec(
+                key=row["chunk_key"],
+                source=row["source"],
+                school=row["school"],
+                start=row["window_start"],
+                end=row["window_end"],
+                site=row["site"],
+                priority=row["priority"],
+            )
+    return None
+
+
+def record_result(conn: sqlite3.Connection, key: str, result: dict, duration_s: float) -> None:
+    before, after = result.get("before"), result.get("after")
+    verdict = result.get("verdict")
+    with conn:
+        conn.execute(
+            """
+            UPDATE backfill_chunks
+            SET status = ?, verdict = ?, rc = ?, rows_before = ?, rows_after = ?, rows_delta = ?,
+                finished_at = ?, duration_s = ?, detail = ?, updated_at = ?
+            WHERE chunk_key = ?
+            """,
+            (
+                "done" if verdict == "PASS" else "failed",
+                verdict,
+                result.get("rc"),
+                before,
+                after,
+                (after - before) if before is not None and after is not None else None,
+                now_iso(),
+                round(duration_s, 3),
+                result.get("detail") or result.get("deepseek"),
+                now_iso(),
+                key,
+            ),
+        )
+
+
+def throughput(conn: sqlite3.Connection, run_id: str | None = None) -> dict[str, dict]:
+    """Rows added per wall-clock minute for each source (optionally for one run)."""
+    where, params = ("WHERE run_id = ? AND finished_at IS NOT NULL", (run_id,)) if run_id else (
+        "WHERE finished_at IS NOT NULL AND started_at IS NOT NULL",
+        (),
+    )
+    rows = conn.execute(
+        f"""
+        SELECT source,
+               COUNT(*) AS chunks,
+               SUM(COALESCE(rows_delta, 0)) AS rows_added,
+               SUM(COALESCE(duration_s, 0)) AS busy_s,
+               MIN(started_at) AS first_started,
+               MAX(finished_at) AS last_finished
+        FROM backfill_chunks
+        {where}
+        GROUP BY source
+        ORDER BY source
+        """,
+        params,
+    ).fetchall()
+    stats = {}
+    for row in rows:
+        try:
+            span_s = (
+                datetime.fromisoformat(row["last_finished"]) - datetime.fromisoformat(row["first_started"])
+            ).total_seconds()
+        except (TypeError, ValueError):
+            span_s = 0
+        minutes = max(span_s, row["busy_s"] or 0, 1) / 60
+        stats[row["source"]] = {
+            "chunks": row["chunks"],
+            "rows_added": row["rows_added"],
+            "minutes": round(minutes, 2),
+            "rows_per_minute": round((row["rows_added"] or 0) / minutes, 2),
+        }
+    return stats
+
+
+def status_counts(conn: sqlite3.Connection) -> dict[str, int]:
+    return {
+        row["status"]: row["n"]
+        for row in conn.execute("SELECT status, COUNT(*) AS n FROM backfill_chunks GROUP BY status")
+    }
+
+
+def run_scheduler(
+    state_path: Path | str,
+    specs: list[ChunkSpec],
+    run_chunk: ChunkRunner,
+    site_caps: dict[str, int] | None = None,
+    max_workers: int = 1,
+    on_event: Callable[[str, ChunkSpec, dict | None], None] | None = None,
+) -> dict:
+    """Run every not-yet-passed chunk in ``specs`` concurrently within per-site caps.
+
+    ``run_chunk`` executes one chunk in a worker thread and returns a dict with
+    ``verdict`` (PASS/FAIL/UNKNOWN), ``rc``, ``before`` and ``after``. State is
+    committed after every claim and result, so killing the scheduler at any
+    point loses at most the chunks that were in flight.
+    """
+    site_caps = site_caps or {}
+    conn = connect_state(state_path)
+    run_id = f"backfill_{uuid4().hex[:12]}"
+    try:
+        register_chunks(conn, specs)
+        reset_interrupted(conn)
+        keys = {spec.key for spec in specs}
+        running: dict = {}
+        running_by_site: dict[str, int] = {}
+        attempted: set[str] = set()
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as pool:
+            while True:
+                while len(running) < max(max_workers, 1):
+                    spec = claim_next(conn, keys - attempted, running_by_site, site_caps, run_id)
+                    if spec is None:
+                        break
+                    attempted.add(spec.key)
+                    running_by_site[spec.site] = running_by_site.get(spec.site, 0) + 1
+                    running[pool.submit(_timed, run_chunk, spec)] = spec
+                    if on_event:
+                        on_event("start", spec, None)
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    spec = running.pop(future)
+                    running_by_site[spec.site] -= 1
+                    try:
+                        result, duration_s = future.result()
+                    except Exception as exc:  # noqa: BLE001
+                        result, duration_s = {"verdict": "FAIL", "rc": None, "detail": f"scheduler error: {exc}"}, 0.0
+                    record_result(conn, spec.key, result, duration_s)
+                    if on_event:
+                        live = throughput(conn, run_id).get(spec.source, {})
+                        on_event("finish", spec, {**result, "duration_s": duration_s, "throughput": live})
+        return {
+            "run_id": run_id,
+            "attempted": len(attempted),
+            "status_counts": status_counts(conn),
+            "throughput": throughput(conn, run_id),
+        }
+    finally:
+        conn.close()
+
+
+def _timed(run_chunk: ChunkRunner, spec: ChunkSpec) -> tuple[dict, float]:
+    started = time.monotonic()
+    result = run_chunk(spec)
+    return result, time.monotonic() - started
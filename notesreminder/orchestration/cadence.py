@@ -3,14 +3,19 @@
 from __future__ import annotations
 
 import json
+import os
 import subprocess
-from dataclasses import dataclass
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
 from datetime import date, datetime
 from pathlib import Path
 from typing import Callable
 
 
 Runner = Callable[[list[str], Path], subprocess.CompletedProcess]
+DEFAULT_MAX_WORKERS = 4
 
 
 @dataclass(frozen=True)
@@ -21,6 +26,11 @@ class CadenceTask:
     requires_mfa: bool = False
     mutates_db: bool = False
     sends_email: bool = False
+    depends_on: tuple[str, ...] = ()
+
+    @property
+    def exclusive(self) -> bool:
+        return self.mutates_db or self.requires_mfa
 
 
 def _python(root: Path) -> str:
@@ -28,12 +38,29 @@ def _python(root: Path) -> str:
     return str(venv_python if venv_python.exists() else "python3")
 
 
+def with_dependencies(tasks: list[CadenceTask]) -> list[CadenceTask]:
+    """Derive DAG edges from ``mutates_db``/``requires_mfa``.
+
+    Every task waits for the exclusive (DB-mutating or MFA) tasks planned
+    before it, and an exclusive task also waits for everything planned before
+    it. Read-only tasks between two exclusive steps are free to run together.
+    """
+    planned = []
+    for task in tasks:
+        deps = list(task.depends_on)
+        for earlier in planned:
+            if (earlier.exclusive or task.exclusive) and earlier.name not in deps:
+                deps.append(earlier.name)
+        planned.append(replace(task, depends_on=tuple(deps)))
+    return planned
+
+
 def build_cadence_plan(run_date: str, root: Path | None = None) -> list[CadenceTask]:
     root = root or Path.cwd()
     py = _python(root)
     dashboard_root = Path("outputs/progress/cadence_dashboards") / run_date
     scorecard_root = Path("outputs/progress/cadence_scorecards") / run_date
-    return [
+    return with_dependencies([
         CadenceTask(
             name="production_notes_local_mfa",
             command=["scripts/run_notes_local_mfa.sh", "--date", run_date],
@@ -44,7 +71,14 @@ def build_cadence_plan(run_date: str, root: Path | None = None) -> list[CadenceT
         ),
         CadenceTask(
             name="notes_pipeline_health",
-            command=[py, "scripts/notes_pipeline_health.py", "--db", "reminders.db"],
+            command=[
+                py,
+                "scripts/notes_pipeline_health.py",
+                "--db",
+                "reminders.db",
+                "--state-db",
+                "notes_pipeline_state.db",
+            ],
             category="shadow_report",
         ),
         CadenceTask(
@@ -103,11 +137,37 @@ def build_cadence_plan(run_date: str, root: Path | None = None) -> list[CadenceT
             )
             for school, slug in (("West U", "westu"), ("The Heights", "heights"))
         ],
-    ]
+    ])
 
 
 def _default_runner(command: list[str], cwd: Path) -> subprocess.CompletedProcess:
-    return subprocess.run(command, cwd=cwd, check=False, text=True, capture_output=True)
+    """Run one command and attach its own CPU time and peak RSS from ``wait4``."""
+    if not hasattr(os, "wait4"):
+        return subprocess.run(command, cwd=cwd, check=False, text=True, capture_output=True)
+    proc = subprocess.Popen(command, cwd=cwd, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    output = {}
+    readers = [
+        threading.Thread(target=lambda name=name, stream=stream: output.__setitem__(name, stream.read()))
+        for name, stream in (("stdout", proc.stdout), ("stderr", proc.stderr))
+    ]
+    for reader in readers:
+        reader.start()
+    _pid, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    for reader in readers:
+        reader.join()
+    proc.stdout.close()
+    proc.stderr.close()
+    completed = subprocess.CompletedProcess(
+        command, proc.returncode, stdout=output.get("stdout", ""), stderr=output.get("stderr", "")
+    )
+    completed.resource_usage = {
+        "cpu_user_seconds": round(usage.ru_utime, 3),
+        "cpu_system_seconds": round(usage.ru_stime, 3),
+        # Linux reports ru_maxrss in KiB.
+        "peak_rss_kb": usage.ru_maxrss,
+    }
+    return completed
 
 
 def _task_metadata(task: CadenceTask) -> dict:
@@ -118,6 +178,7 @@ def _task_metadata(task: CadenceTask) -> dict:
         "requires_mfa": task.requires_mfa,
         "mutates_db": task.mutates_db,
         "sends_email": task.sends_email,
+        "depends_on": list(task.depends_on),
     }
 
 
@@ -127,6 +188,79 @@ def write_metadata(metadata: dict, output_path: Path) -> Path:
     return output_path
 
 
+def _execute_task(
+    task: CadenceTask,
+    root: Path,
+    runner: Runner,
+    execute_shadow: bool,
+    execute_production: bool,
+    simulate_expired_auth: bool,
+) -> dict:
+    result = _task_metadata(task)
+    result["started_at"] = datetime.now().isoformat(timespec="seconds")
+    if simulate_expired_auth and task.requires_mfa:
+        result.update(
+            {
+                "status": "action_required",
+                "error": "MFA/auth session is expired; approve or renew the browser session before production notes run.",
+                "ended_at": datetime.now().isoformat(timespec="seconds"),
+            }
+        )
+    elif task.category == "production_notes" and not execute_production:
+        result.update(
+            {
+                "status": "skipped_requires_approval",
+                "error": "Production notes/email execution requires explicit approval.",
+                "ended_at": datetime.now().isoformat(timespec="seconds"),
+            }
+        )
+    elif task.category == "shadow_report" and not execute_shadow:
+        result.update(
+            {
+                "status": "dry_run",
+                "ended_at": datetime.now().isoformat(timespec="seconds"),
+            }
+        )
+    else:
+        started = time.perf_counter()
+        completed = runner(task.command, root)
+        result.update(
+            {
+                "status": "success" if completed.returncode == 0 else "failed",
+                "returncode": completed.returncode,
+                "stdout_tail": (completed.stdout or "")[-2000:],
+                "stderr_tail": (completed.stderr or "")[-2000:],
+                "ended_at": datetime.now().isoformat(timespec="seconds"),
+                "wall_seconds": round(time.perf_counter() - started, 3),
+            }
+        )
+        result.update(getattr(completed, "resource_usage", None) or {})
+    return result
+
+
+def _run_graph(tasks: list[CadenceTask], execute: Callable[[CadenceTask], dict], max_workers: int) -> dict:
+    """Run tasks as soon as their dependencies finish, at most ``max_workers`` at a time."""
+    known = {task.name for task in tasks}
+    pending = list(tasks)
+    results: dict[str, dict] = {}
+    with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as pool:
+        running = {}
+        while pending or running:
+            for task in list(pending):
+                if len(running) >= max(max_workers, 1):
+                    break
+                if all(dep in results or dep not in known for dep in task.depends_on):
+                    running[pool.submit(execute, task)] = task.name
+                    pending.remove(task)
+            if not running:
+                names = ", ".join(task.name for task in pending)
+                raise ValueError(f"Cadence plan has unsatisfiable dependencies: {names}")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+    return results
+
+
 def run_cadence(
     run_date: str | None = None,
     root: Path | None = None,
@@ -134,52 +268,20 @@ def run_cadence(
     execute_production: bool = False,
     simulate_expired_auth: bool = False,
     runner: Runner | None = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
 ) -> dict:
     root = root or Path.cwd()
     run_date = run_date or date.today().isoformat()
     runner = runner or _default_runner
     started_at = datetime.now().isoformat(timespec="seconds")
+    started = time.perf_counter()
     tasks = build_cadence_plan(run_date, root)
-    task_results = []
-
-    for task in tasks:
-        result = _task_metadata(task)
-        result["started_at"] = datetime.now().isoformat(timespec="seconds")
-        if simulate_expired_auth and task.requires_mfa:
-            result.update(
-                {
-                    "status": "action_required",
-                    "error": "MFA/auth session is expired; approve or renew the browser session before production notes run.",
-                    "ended_at": datetime.now().isoformat(timespec="seconds"),
-                }
-            )
-        elif task.category == "production_notes" and not execute_production:
-            result.update(
-                {
-                    "status": "skipped_requires_approval",
-                    "error": "Production notes/email execution requires explicit approval.",
-                    "ended_at": datetime.now().isoformat(timespec="seconds"),
-                }
-            )
-        elif task.category == "shadow_report" and not execute_shadow:
-            result.update(
-                {
-                    "status": "dry_run",
-                    "ended_at": datetime.now().isoformat(timespec="seconds"),
-                }
-            )
-        else:
-            completed = runner(task.command, root)
-            result.update(
-                {
-                    "status": "success" if completed.returncode == 0 else "failed",
-                    "returncode": completed.returncode,
-                    "stdout_tail": (completed.stdout or "")[-2000:],
-                    "stderr_tail": (completed.stderr or "")[-2000:],
-                    "ended_at": datetime.now().isoformat(timespec="seconds"),
-                }
-            )
-        task_results.append(result)
+    results = _run_graph(
+        tasks,
+        lambda task: _execute_task(task, root, runner, execute_shadow, execute_production, simulate_expired_auth),
+        max_workers,
+    )
+    task_results = [results[task.name] for task in tasks]
 
     failure_statuses = {"failed", "action_required"}
     if any(task["status"] in failure_statuses for task in task_results):
@@ -193,6 +295,8 @@ def run_cadence(
         "run_date": run_date,
         "started_at": started_at,
         "ended_at": datetime.now().isoformat(timespec="seconds"),
+        "wall_seconds": round(time.perf_counter() - started, 3),
+        "max_workers": max_workers,
         "status": status,
         "execute_shadow": execute_shadow,
         "execute_production": execute_production,
@@ -0,0 +1,172 @@
+"""Per-day fan-out for multi-week Pike13 lesson backfills.
+
+``backfill.py --parallel`` splits the requested range into one shard per
+(school, day) and runs them through ``run_scheduler``:
+
+- every shard scrapes a single date with ``scrape_lessons`` in its own event
+  loop, so each worker holds its own browser context (leased from the browser
+  broker when one owns the profile, seeded with the saved Pike13 cookies);
+- the scheduler's per-site cap bounds concurrent shards per school, and
+  ``SiteRateLimiter`` spaces shard starts on the same school so the pool does
+  not burst Pike13 with logins;
+- scraped rows are merged with ``update_reminders_from_dataframe`` under one
+  writer lock, the same contract ``run_daily.py`` uses;
+- shard state lives in the ``backfill_chunks`` table of the state DB, so an
+  interrupted run re-queues only the shards that had not passed.
+
+A shard passes when its date scraped cleanly, even if the day had no lessons;
+a skipped or partly scraped date fails and is retried on the next run.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from notesreminder.orchestration.backfill_scheduler import ChunkSpec
+
+
+SOURCE = "pike13_day"
+DEFAULT_MIN_INTERVAL_SECONDS = float(os.getenv("BACKFILL_SITE_MIN_INTERVAL_S", "2"))
+
+# (school, day, failed_dates) -> DataFrame of scraped lessons.
+DayScraper = Callable[[str, str, list], object]
+# update_reminders_from_dataframe(conn, df, school, verbose=..., skip_note_scoring=...) -> counts
+Merge = Callable[..., dict]
+
+
+def site_for(school: str) -> str:
+    return f"pike13:{school}"
+
+
+def shard_key(school: str, day: str) -> str:
+    return f"{SOURCE}:{school}:{day}"
+
+
+def day_shards(schools: Iterable[str], start: date, end: date, order: str = "oldest") -> list[ChunkSpec]:
+    """One shard per school per day; both schools share a priority so they run side by side."""
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    if order == "newest":
+        days.reverse()
+    return [
+        ChunkSpec(
+            key=shard_key(school, day.isoformat()),
+            source=SOURCE,
+            school=school,
+            start=day.isoformat(),
+            end=day.isoformat(),
+            site=site_for(school),
+            priority=rank,
+        )
+        for rank, day in enumerate(days)
+        for school in schools
+    ]
+
+
+class SiteRateLimiter:
+    """Spaces starts on the same site at least ``min_interval`` seconds apart, across threads."""
+
+    def __init__(
+        self,
+        min_interval: float = DEFAULT_MIN_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.min_interval = max(min_interval, 0.0)
+        self.clock = clock
+        self.sleep = sleep
+        self._next_slot: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, site: str) -> float:
+        """Block until ``site`` may start again; returns the seconds waited."""
+        with self._lock:
+            now = self.clock()
+            slot = max(now, self._next_slot.get(site, now))
+            self._next_slot[site] = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            self.sleep(delay)
+        return delay
+
+
+def pike13_day_scraper(
+    profile_dir: Optional[str] = None,
+    diagnostics=None,
+    verbose: bool = False,
+) -> DayScraper:
+    """Scraper for one school-day, run in a fresh event loop on the calling worker thread."""
+    from noteschecker import scrape_lessons
+
+    def scrape(school: str, day: str, failed_dates: list):
+        return asyncio.run(
+            scrape_lessons(
+                school,
+                dates=[day],
+                verbose=verbose,
+                profile_dir=profile_dir,
+                diagnostics=diagnostics,
+                failed_dates=failed_dates,
+                save_csv=False,
+            )
+        )
+
+    return scrape
+
+
+def count_day_rows(conn: sqlite3.Connection, school: str, day: str) -> int:
+    try:
+        row = conn.execute(
+            "SELECT COUNT(*) FROM reminders WHERE school = ? AND lesson_date = ?", (school, day)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] if row else 0
+
+
+class DayShardRunner:
+    """``run_scheduler`` chunk runner: scrape one school-day and merge it into reminders.db."""
+
+    def __init__(
+        self,
+        db_path: Path | str,
+        scrape: DayScraper,
+        merge: Merge,
+        rate_limiter: Optional[SiteRateLimiter] = None,
+        verbose: bool = False,
+    ):
+        self.db_path = str(db_path)
+        self.scrape = scrape
+        self.merge = merge
+        self.rate_limiter = rate_limiter or SiteRateLimiter()
+        self.verbose = verbose
+        # Scrapes run in parallel; SQLite takes one writer, so merges are serialized.
+        self._write_lock = threading.Lock()
+
+    def __call__(self, spec: ChunkSpec) -> dict:
+        self.rate_limiter.wait(spec.site)
+        failed_dates: list = []
+        df = self.scrape(spec.school, spec.start, failed_dates)
+        with self._write_lock:
+            conn = sqlite3.connect(self.db_path, timeout=60)
+            try:
+                before = count_day_rows(conn, spec.school, spec.start)
+                counts = self.merge(conn, df, spec.school, verbose=self.verbose, skip_note_scoring=True)
+                conn.commit()
+                after = count_day_rows(conn, spec.school, spec.start)
+            finally:
+                conn.close()
+        detail = (
+            f"{len(df)} lessons scraped, {counts.get('rows_inserted', 0)} inserted, "
+            f"{counts.get('rows_upserted', 0)} updated"
+        )
+        if failed_dates:
+            return {"verdict": "FAIL", "rc": 1, "before": before, "after": after,
+                    "detail": f"scrape incomplete for {', '.join(failed_dates)}; {detail}"}
+        return {"verdict": "PASS", "rc": 0, "before": before, "after": after, "detail": detail}
@@ -6,8 +6,11 @@ import hashlib
 import json
 import re
 import sqlite3
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from itertools import islice
+from typing import Iterable, Iterator
 
 from lead_followup_schema import ensure_lead_followup_schema
 
@@ -15,6 +18,7 @@ from lead_followup_schema import ensure_lead_followup_schema
 PROMPT_VERSION = "phase19-communication-insights-v1"
 DEFAULT_MODEL = "heuristic-reviewer-v1"
 MAX_TEXT_CHARS = 6000
+DEFAULT_CHUNK_SIZE = 500
 SUPPORTED_SOURCE_TABLES = (
     "dialpad_call_reviews",
     "dialpad_voice_events",
@@ -66,15 +70,116 @@ def build_prompt(event: SourceEvent) -> str:
     )
 
 
-def _append_events(rows: list[SourceEvent], seen: set[tuple[str, str]], candidates: list[SourceEvent], limit: int) -> None:
-    for event in candidates:
-        if len(rows) >= limit:
-            return
-        key = (event.source_table, event.source_id)
-        if key in seen or not compact_text(event.source_text):
+# (source table, evidence label, query). Each query returns source_id, event_at,
+# school, source_url and source_text, newest first, at most :limit rows (-1 = all).
+SOURCE_QUERIES = (
+    (
+        "dialpad_call_reviews",
+        "Dialpad call review",
+        """
+        SELECT
+            cr.call_review_id AS source_id,
+            cr.event_at,
+            COALESCE(v.school, '') AS school,
+            cr.call_review_url AS source_url,
+            TRIM(COALESCE(cr.recap_text, '') || ' ' || COALESCE(cr.transcript_text, '')) AS source_text
+        FROM dialpad_call_reviews cr
+        LEFT JOIN dialpad_voice_events v ON v.event_id = cr.voice_event_id
+        WHERE date(COALESCE(cr.event_at, cr.updated_at)) BETWEEN date(:start_date) AND date(:end_date)
+          AND (:school = '' OR LOWER(COALESCE(v.school, '')) LIKE '%' || LOWER(:school) || '%')
+          AND TRIM(COALESCE(cr.recap_text, '') || COALESCE(cr.transcript_text, '')) <> ''
+        ORDER BY COALESCE(cr.event_at, cr.updated_at) DESC
+        LIMIT :limit
+        """,
+    ),
+    (
+        "school_email_messages",
+        "School email",
+        """
+        SELECT
+            message_id AS source_id,
+            message_at AS event_at,
+            school,
+            source_url,
+            TRIM(COALESCE(subject, '') || ' ' || COALESCE(snippet, '') || ' ' || COALESCE(body, '')) AS source_text
+        FROM school_email_messages
+        WHERE date(COALESCE(message_at, updated_at)) BETWEEN date(:start_date) AND date(:end_date)
+          AND (:school = '' OR LOWER(COALESCE(school, '')) LIKE '%' || LOWER(:school) || '%')
+          AND TRIM(COALESCE(subject, '') || COALESCE(snippet, '') || COALESCE(body, '')) <> ''
+        ORDER BY COALESCE(message_at, updated_at) DESC
+        LIMIT :limit
+        """,
+    ),
+    (
+        "dialpad_sms_messages",
+        "Dialpad SMS",
+        """
+        SELECT
+            m.message_id AS source_id,
+            m.message_at AS event_at,
+            t.school,
+            m.source_url,
+            m.body AS source_text
+        FROM dialpad_sms_messages m
+        LEFT JOIN dialpad_sms_threads t ON t.thread_id = m.thread_id
+        WHERE date(COALESCE(m.message_at, m.updated_at)) BETWEEN date(:start_date) AND date(:end_date)
+          AND (:school = '' OR LOWER(COALESCE(t.school, '')) LIKE '%' || LOWER(:school) || '%')
+          AND TRIM(COALESCE(m.body, '')) <> ''
+        ORDER BY COALESCE(m.message_at, m.updated_at) DESC
+        LIMIT :limit
+        """,
+    ),
+    (
+        "dialpad_voice_events",
+        "Dialpad voice",
+        """
+        SELECT
+            event_id AS source_id,
+            event_at,
+            school,
+            source_url,
+            TRIM(COALESCE(transcript_summary, '') || ' ' || COALESCE(voicemail_transcript, '') || ' ' || COALESCE(raw_text, '')) AS source_text
+        FROM dialpad_voice_events
+        WHERE date(COALESCE(event_at, updated_at)) BETWEEN date(:start_date) AND date(:end_date)
+          AND (:school = '' OR LOWER(COALESCE(school, '')) LIKE '%' || LOWER(:school) || '%')
+          AND TRIM(COALESCE(transcript_summary, '') || COALESCE(voicemail_transcript, '') || COALESCE(raw_text, '')) <> ''
+        ORDER BY COALESCE(event_at, updated_at) DESC
+        LIMIT :limit
+        """,
+    ),
+)
+
+
+def iter_source_events(
+    conn: sqlite3.Connection,
+    start_date: str,
+    end_date: str,
+    school: str | None = None,
+    limit: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[SourceEvent]:
+    """Stream source events newest-first per source, ``chunk_size`` rows at a time.
+
+    ``limit`` caps each source query; ``None`` reads the whole window.
+    """
+    params = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "school": school or "",
+        "limit": -1 if limit is None else limit,
+    }
+    seen: set[tuple[str, str]] = set()
+    for source_table, label, sql in SOURCE_QUERIES:
+        if not table_exists(conn, source_table):
             continue
-        seen.add(key)
-        rows.append(event)
+        cursor = conn.execute(sql, params)
+        while rows := cursor.fetchmany(chunk_size):
+            for source_id, event_at, event_school, source_url, source_text in rows:
+                key = (source_table, source_id)
+                if key in seen or not compact_text(source_text):
+                    continue
+                seen.add(key)
+                yield SourceEvent(source_table, source_id, event_at, event_school, source_url, source_text, label)
 
 
 def collect_source_events(
@@ -84,157 +189,7 @@ def collect_source_events(
     school: str | None = None,
     limit: int = 50,
 ) -> list[SourceEvent]:
-    params = {"start_date": start_date, "end_date": end_date, "school": school or ""}
-    events: list[SourceEvent] = []
-    seen: set[tuple[str, str]] = set()
-
-    if table_exists(conn, "dialpad_call_reviews"):
-        rows = conn.execute(
-            """
-            SELECT
-                cr.call_review_id AS source_id,
-                cr.event_at,
-                COALESCE(v.school, '') AS school,
-                cr.call_review_url AS source_url,
-                TRIM(COALESCE(cr.recap_text, '') || ' ' || COALESCE(cr.transcript_text, '')) AS source_text
-            FROM dialpad_call_reviews cr
-            LEFT JOIN dialpad_voice_events v ON v.event_id = cr.voice_event_id
-            WHERE date(COALESCE(cr.event_at, cr.updated_at)) BETWEEN date(:start_date) AND date(:end_date)
-              AND (:school = '' OR LOWER(COALESCE(v.school, '')) LIKE '%' || LOWER(:school) || '%')
-              AND TRIM(COALESCE(cr.recap_text, '') || COALESCE(cr.transcript_text, '')) <> ''
-            ORDER BY COALESCE(cr.event_at, cr.updated_at) DESC
-            LIMIT :limit
-            """,
-            {**params, "limit": limit},
-        ).fetchall()
-        _append_events(
-            events,
-            seen,
-            [
-                SourceEvent(
-                    "dialpad_call_reviews",
-                    row["source_id"],
-                    row["event_at"],
-                    row["school"],
-                    row["source_url"],
-                    row["source_text"],
-                    "Dialpad call review",
-                )
-                for row in rows
-            ],
-            limit,
-        )
-
-    if len(events) < limit and table_exists(conn, "school_email_messages"):
-        rows = conn.execute(
-            """
-            SELECT
-                message_id AS source_id,
-                message_at AS event_at,
-                school,
-                source_url,
-                TRIM(COALESCE(subject, '') || ' ' || COALESCE(snippet, '') || ' ' || COALESCE(body, '')) AS source_text
-            FROM school_email_messages
-            WHERE date(COALESCE(message_at, updated_at)) BETWEEN date(:start_date) AND date(:end_date)
-              AND (:school = '' OR LOWER(COALESCE(school, '')) LIKE '%' || LOWER(:school) || '%')
-              AND TRIM(COALESCE(subject, '') || COALESCE(snippet, '') || COALESCE(body, '')) <> ''
-            ORDER BY COALESCE(message_at, updated_at) DESC
-            LIMIT :limit
-            """,
-            {**params, "limit": limit},
-        ).fetchall()
-        _append_events(
-            events,
-            seen,
-            [
-                SourceEvent(
-                    "school_email_messages",
-                    row["source_id"],
-                    row["event_at"],
-                    row["school"],
-                    row["source_url"],
-                    row["source_text"],
-                    "School email",
-                )
-                for row in rows
-            ],
-            limit,
-        )
-
-    if len(events) < limit and table_exists(conn, "dialpad_sms_messages"):
-        rows = conn.execute(
-            """
-            SELECT
-                m.message_id AS source_id,
-                m.message_at AS event_at,
-                t.school,
-                m.source_url,
-                m.body AS source_text
-            FROM dialpad_sms_messages m
-            LEFT JOIN dialpad_sms_threads t ON t.thread_id = m.thread_id
-            WHERE date(COALESCE(m.message_at, m.updated_at)) BETWEEN date(:start_date) AND date(:end_date)
-              AND (:school = '' OR LOWER(COALESCE(t.school, '')) LIKE '%' || LOWER(:school) || '%')
-              AND TRIM(COALESCE(m.body, '')) <> ''
-            ORDER BY COALESCE(m.message_at, m.updated_at) DESC
-            LIMIT :limit
-            """,
-            {**params, "limit": limit},
-        ).fetchall()
-        _append_events(
-            events,
-            seen,
-            [
-                SourceEvent(
-                    "dialpad_sms_messages",
-                    row["source_id"],
-                    row["event_at"],
-                    row["school"],
-                    row["source_url"],
-                    row["source_text"],
-                    "Dialpad SMS",
-                )
-                for row in rows
-            ],
-            limit,
-        )
-
-    if len(events) < limit and table_exists(conn, "dialpad_voice_events"):
-        rows = conn.execute(
-            """
-            SELECT
-                event_id AS source_id,
-                event_at,
-                school,
-                source_url,
-                TRIM(COALESCE(transcript_summary, '') || ' ' || COALESCE(voicemail_transcript, '') || ' ' || COALESCE(raw_text, '')) AS source_text
-            FROM dialpad_voice_events
-            WHERE date(COALESCE(event_at, updated_at)) BETWEEN date(:start_date) AND date(:end_date)
-              AND (:school = '' OR LOWER(COALESCE(school, '')) LIKE '%' || LOWER(:school) || '%')
-              AND TRIM(COALESCE(transcript_summary, '') || COALESCE(voicemail_transcript, '') || COALESCE(raw_text, '')) <> ''
-            ORDER BY COALESCE(event_at, updated_at) DESC
-            LIMIT :limit
-            """,
-            {**params, "limit": limit},
-        ).fetchall()
-        _append_events(
-            events,
-            seen,
-            [
-                SourceEvent(
-                    "dialpad_voice_events",
-                    row["source_id"],
-                    row["event_at"],
-                    row["school"],
-                    row["source_url"],
-                    row["source_text"],
-                    "Dialpad voice",
-                )
-                for row in rows
-            ],
-            limit,
-        )
-
-    return events[:limit]
+    return list(islice(iter_source_events(conn, start_date, end_date, school, limit), limit))
 
 
 def heuristic_insight(event: SourceEvent) -> dict:
@@ -304,6 +259,111 @@ def build_evidence(event: SourceEvent) -> dict:
     }
 
 
+UPSERT_INSIGHT_SQL = """
+    INSERT INTO communication_ai_insights (
+        source_table, source_id, insight_run_id, model, prompt_version,
+        sentiment, intent, outcome, urgency, topic, action_items, summary,
+        recommendation, confidence, evidence_json, review_status,
+        raw_response_json, created_at
+    )
+    VALUES (
+        :source_table, :source_id, :insight_run_id, :model, :prompt_version,
+        :sentiment, :intent, :outcome, :urgency, :topic, :action_items, :summary,
+        :recommendation, :confidence, :evidence_json, 'pending_human_review',
+        :raw_response_json, :created_at
+    )
+    ON CONFLICT(source_table, source_id, model, prompt_version) DO UPDATE SET
+        insight_run_id = excluded.insight_run_id,
+        sentiment = excluded.sentiment,
+        intent = excluded.intent,
+        outcome = excluded.outcome,
+        urgency = excluded.urgency,
+        topic = excluded.topic,
+        action_items = excluded.action_items,
+        summary = excluded.summary,
+        recommendation = excluded.recommendation,
+        confidence = excluded.confidence,
+        evidence_json = excluded.evidence_json,
+        review_status = excluded.review_status,
+        raw_response_json = excluded.raw_response_json,
+        created_at = excluded.created_at
+"""
+
+
+@dataclass(frozen=True)
+class AnalyzedEvent:
+    event: SourceEvent
+    insight: dict
+    evidence: dict
+    prompt_hash: str
+
+
+def analyze_event(event: SourceEvent) -> AnalyzedEvent:
+    """All per-event work (classification and hashing); safe to run in a worker process."""
+    return AnalyzedEvent(event, heuristic_insight(event), build_evidence(event), text_sha256(build_prompt(event)))
+
+
+def _upsert_params(
+    analyzed: AnalyzedEvent,
+    *,
+    model: str,
+    prompt_version: str,
+    insight_run_id: str,
+    created_at: str,
+) -> dict:
+    insight = analyzed.insight
+    raw_response = {
+        "provider": "deterministic_heuristic",
+        "prompt_hash": analyzed.prompt_hash,
+        "source_text_sha256": analyzed.evidence["source_text_sha256"],
+        "signals": insight.get("signals", {}),
+    }
+    return {
+        "source_table": analyzed.event.source_table,
+        "source_id": analyzed.event.source_id,
+        "insight_run_id": insight_run_id,
+        "model": model,
+        "prompt_version": prompt_version,
+        "sentiment": insight["sentiment"],
+        "intent": insight["intent"],
+        "outcome": insight["outcome"],
+        "urgency": insight["urgency"],
+        "topic": insight["topic"],
+        "action_items": insight["action_items"],
+        "summary": insight["summary"],
+        "recommendation": insight["recommendation"],
+        "confidence": insight["confidence"],
+        "evidence_json": json.dumps(analyzed.evidence, sort_keys=True),
+        "raw_response_json": json.dumps(raw_response, sort_keys=True),
+        "created_at": created_at,
+    }
+
+
+def upsert_insights(
+    conn: sqlite3.Connection,
+    analyzed: Iterable[AnalyzedEvent],
+    *,
+    model: str = DEFAULT_MODEL,
+    prompt_version: str = PROMPT_VERSION,
+    insight_run_id: str,
+) -> int:
+    """Upsert a batch of insights with one ``executemany``; the caller commits."""
+    created_at = utc_now_iso()
+    params = [
+        _upsert_params(
+            item,
+            model=model,
+            prompt_version=prompt_version,
+            insight_run_id=insight_run_id,
+            created_at=created_at,
+        )
+        for item in analyzed
+    ]
+    if params:
+        conn.executemany(UPSERT_INSIGHT_SQL, params)
+    return len(params)
+
+
 def upsert_insight(
     conn: sqlite3.Connection,
     event: SourceEvent,
@@ -314,63 +374,51 @@ def upsert_insight(
     insight_run_id: str,
 ) -> None:
     ensure_lead_followup_schema(conn)
-    evidence = build_evidence(event)
-    raw_response = {
-        "provider": "deterministic_heuristic",
-        "prompt_hash": text_sha256(build_prompt(event)),
-        "source_text_sha256": evidence["source_text_sha256"],
-        "signals": insight.get("signals", {}),
-    }
-    conn.execute(
-        """
-        INSERT INTO communication_ai_insights (
-            source_table, source_id, insight_run_id, model, prompt_version,
-            sentiment, intent, outcome, urgency, topic, action_items, summary,
-            recommendation, confidence, evidence_json, review_status,
-            raw_response_json, created_at
-        )
-        VALUES (
-            :source_table, :source_id, :insight_run_id, :model, :prompt_version,
-            :sentiment, :intent, :outcome, :urgency, :topic, :action_items, :summary,
-            :recommendation, :confidence, :evidence_json, 'pending_human_review',
-            :raw_response_json, :created_at
-        )
-        ON CONFLICT(source_table, source_id, model, prompt_version) DO UPDATE SET
-            insight_run_id = excluded.insight_run_id,
-            sentiment = excluded.sentiment,
-            intent = excluded.intent,
-            outcome = excluded.outcome,
-            urgency = excluded.urgency,
-            topic = excluded.topic,
-            action_items = excluded.action_items,
-            summary = excluded.summary,
-            recommendation = excluded.recommendation,
-            confidence = excluded.confidence,
-            evidence_json = excluded.evidence_json,
-            review_status = excluded.review_status,
-            raw_response_json = excluded.raw_response_json,
-            created_at = excluded.created_at
+    analyzed = AnalyzedEvent(event, insight, build_evidence(event), text_sha256(build_prompt(event)))
+    upsert_insights(conn, [analyzed], model=model, prompt_version=prompt_version, insight_run_id=insight_run_id)
+
+
+def stored_text_hashes(
+    conn: sqlite3.Connection,
+    events: list[SourceEvent],
+    *,
+    model: str = DEFAULT_MODEL,
+    prompt_version: str = PROMPT_VERSION,
+) -> dict[tuple[str, str], str | None]:
+    """Source text hash of the stored insight for each event that already has one."""
+    if not events:
+        return {}
+    wanted = {(event.source_table, event.source_id) for event in events}
+    placeholders = ", ".join("?" for _ in wanted)
+    rows = conn.execute(
+        f"""
+        SELECT source_table, source_id, json_extract(evidence_json, '$.source_text_sha256')
+        FROM communication_ai_insights
+        WHERE model = ? AND prompt_version = ? AND source_id IN ({placeholders})
         """,
-        {
-            "source_table": event.source_table,
-            "source_id": event.source_id,
-            "insight_run_id": insight_run_id,
-            "model": model,
-            "prompt_version": prompt_version,
-            "sentiment": insight["sentiment"],
-            "intent": insight["intent"],
-            "outcome": insight["outcome"],
-            "urgency": insight["urgency"],
-            "topic": insight["topic"],
-            "action_items": insight["action_items"],
-            "summary": insight["summary"],
-            "recommendation": insight["recommendation"],
-            "confidence": insight["confidence"],
-            "evidence_json": json.dumps(evidence, sort_keys=True),
-            "raw_response_json": json.dumps(raw_response, sort_keys=True),
-            "created_at": utc_now_iso(),
-        },
-    )
+        (model, prompt_version, *{source_id for _table, source_id in wanted}),
+    ).fetchall()
+    return {(row[0], row[1]): row[2] for row in rows if (row[0], row[1]) in wanted}
+
+
+def _report_row(analyzed: AnalyzedEvent) -> dict:
+    event, insight = analyzed.event, analyzed.insight
+    return {
+        "source_table": event.source_table,
+        "source_id": event.source_id,
+        "event_at": event.event_at,
+        "school": event.school,
+        "sentiment": insight["sentiment"],
+        "intent": insight["intent"],
+        "outcome": insight["outcome"],
+        "urgency": insight["urgency"],
+        "topic": insight["topic"],
+        "summary": insight["summary"],
+        "recommendation": insight["recommendation"],
+        "confidence": insight["confidence"],
+        "review_status": "pending_human_review",
+        "evidence": analyzed.evidence,
+    }
 
 
 def generate_insights(
@@ -382,40 +430,64 @@ def generate_insights(
     model: str = DEFAULT_MODEL,
     prompt_version: str = PROMPT_VERSION,
     dry_run: bool = False,
+    force: bool = False,
+    max_workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
 ) -> dict:
+    """Generate insights for up to ``limit`` new or edited events in the window.
+
+    Events whose stored insight has the same model, prompt version and source
+    text hash are skipped before any analysis, so ``limit`` counts only events
+    that need work. ``force`` re-analyzes every event (capped by ``limit``).
+    Events are streamed in ``chunk_size`` batches; ``max_workers > 1`` analyzes
+    each batch in a process pool. Writes are batched upserts inside the
+    caller's transaction.
+    """
     ensure_lead_followup_schema(conn)
-    events = collect_source_events(conn, start_date, end_date, school, limit)
     insight_run_id = f"insight_{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}"
+    source = iter_source_events(
+        conn,
+        start_date,
+        end_date,
+        school,
+        limit=limit if force else None,
+        chunk_size=chunk_size,
+    )
+    if force:
+        source = islice(source, limit)
     rows = []
-    for event in events:
-        insight = heuristic_insight(event)
-        evidence = build_evidence(event)
-        row = {
-            "source_table": event.source_table,
-            "source_id": event.source_id,
-            "event_at": event.event_at,
-            "school": event.school,
-            "sentiment": insight["sentiment"],
-            "intent": insight["intent"],
-            "outcome": insight["outcome"],
-            "urgency": insight["urgency"],
-            "topic": insight["topic"],
-            "summary": insight["summary"],
-            "recommendation": insight["recommendation"],
-            "confidence": insight["confidence"],
-            "review_status": "pending_human_review",
-            "evidence": evidence,
-        }
-        rows.append(row)
-        if not dry_run:
-            upsert_insight(
-                conn,
-                event,
-                insight,
-                model=model,
-                prompt_version=prompt_version,
-                insight_run_id=insight_run_id,
-            )
+    seen = skipped = written = 0
+    pool = ProcessPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+    try:
+        while len(rows) < limit:
+            chunk = list(islice(source, chunk_size))
+            if not chunk:
+                break
+            seen += len(chunk)
+            if not force:
+                stored = stored_text_hashes(conn, chunk, model=model, prompt_version=prompt_version)
+                fresh = [
+                    event
+                    for event in chunk
+                    if stored.get((event.source_table, event.source_id), "")
+                    != text_sha256(compact_text(event.source_text))
+                ]
+                skipped += len(chunk) - len(fresh)
+                chunk = fresh
+            chunk = chunk[: limit - len(rows)]
+            analyzed = list(pool.map(analyze_event, chunk)) if pool else [analyze_event(event) for event in chunk]
+            rows.extend(_report_row(item) for item in analyzed)
+            if not dry_run:
+                written += upsert_insights(
+                    conn,
+                    analyzed,
+                    model=model,
+                    prompt_version=prompt_version,
+                    insight_run_id=insight_run_id,
+                )
+    finally:
+        if pool:
+            pool.shutdown()
     return {
         "status": "ready",
         "mode": "experimental",
@@ -425,8 +497,9 @@ def generate_insights(
         "model": model,
         "prompt_version": prompt_version,
         "dry_run": dry_run,
-        "rows_seen": len(events),
-        "rows_written": 0 if dry_run else len(events),
+        "rows_seen": seen,
+        "rows_skipped_unchanged": skipped,
+        "rows_written": written,
         "insights": rows,
         "sensitive_content_included": False,
     }
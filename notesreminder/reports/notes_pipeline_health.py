@@ -1,20 +1,30 @@
 """Notes pipeline health reporting.
 
-This module is intentionally read-only. It summarizes whether the production
-notes pipeline is current enough to trust before broader refactor work proceeds.
+This module is read-only against the pipeline tables. It summarizes whether the
+production notes pipeline is current enough to trust before broader refactor
+work proceeds. Its only writes go to its own log index in a separate state DB
+(``notes_pipeline_state.db``, override with ``NOTES_PIPELINE_STATE_DB_PATH``),
+so replacing reminders.db from S3 cannot wipe it: ``notes_log_files``
+checkpoints how far each ``logs/*.log`` file has been parsed, and
+``notes_send_events`` holds the SMTP delivery confirmations found so far, so
+each run only reads log bytes appended since the last one.
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
+import os
 import re
 import sqlite3
+from collections import deque
 from datetime import date, datetime, timedelta
 from pathlib import Path
 from typing import Iterable
 
 
+DEFAULT_STATE_DB_PATH = os.getenv("NOTES_PIPELINE_STATE_DB_PATH", "notes_pipeline_state.db")
 DEFAULT_SCHOOLS = ("westu-sor", "theheights-sor")
 SCHOOL_LABELS = {
     "westu-sor": "West U",
@@ -24,6 +34,11 @@ SUMMARY_RE = re.compile(
     r"Lesson notes summary for (?P<school>West U|The Heights) "
     r"\((?P<start>\d{4}-\d{2}-\d{2}) to (?P<end>\d{4}-\d{2}-\d{2})\)"
 )
+DELIVERED_MARKER = "Email delivered to SMTP server"
+# A summary counts as delivered when the marker is within this many following lines.
+DELIVERY_LOOKAHEAD_LINES = 5
+# Leading bytes fingerprinted to notice a log rewritten in place (copytruncate and regrow).
+HEAD_FINGERPRINT_BYTES = 1024
 
 
 def normalize_lesson_time(value: str | None) -> str:
@@ -73,6 +88,10 @@ def _safe_date(value: str | None) -> date | None:
         return None
 
 
+def _school_code(label: str) -> str:
+    return next((code for code, name in SCHOOL_LABELS.items() if name == label), label)
+
+
 def scan_notes_send_logs(logs_dir: str | Path = "logs") -> dict[str, dict[str, dict[str, str]]]:
     """Scan local logs for successful notes-summary SMTP deliveries."""
     root = Path(logs_dir)
@@ -86,15 +105,11 @@ def scan_notes_send_logs(logs_dir: str | Path = "logs") -> dict[str, dict[str, d
             match = SUMMARY_RE.search(line)
             if not match:
                 continue
-            school_label = match.group("school")
-            school_code = next(
-                (code for code, label in SCHOOL_LABELS.items() if label == school_label),
-                school_label,
-            )
+            school_code = _school_code(match.group("school"))
             start = match.group("start")
             delivered = any(
-                "Email delivered to SMTP server" in later
-                for later in lines[index + 1 : index + 6]
+                DELIVERED_MARKER in later
+                for later in lines[index + 1 : index + 1 + DELIVERY_LOOKAHEAD_LINES]
             )
             if delivered:
                 results.setdefault(school_code, {})[start] = {
@@ -104,6 +119,173 @@ def scan_notes_send_logs(logs_dir: str | Path = "logs") -> dict[str, dict[str, d
     return results
 
 
+def ensure_log_index_schema(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS notes_log_files (
+            path TEXT PRIMARY KEY,
+            logs_dir TEXT NOT NULL,
+            inode INTEGER,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            head_sha TEXT NOT NULL,
+            byte_offset INTEGER NOT NULL,
+            indexed_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS notes_send_events (
+            log_file TEXT NOT NULL,
+            byte_offset INTEGER NOT NULL,
+            school TEXT NOT NULL,
+            summary_start TEXT NOT NULL,
+            summary_end TEXT NOT NULL,
+            status TEXT NOT NULL,
+            indexed_at TEXT NOT NULL,
+            PRIMARY KEY (log_file, byte_offset)
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_notes_send_events_school_date "
+        "ON notes_send_events(school, summary_start)"
+    )
+
+
+def _head_sha(path: Path, size: int) -> str:
+    with path.open("rb") as handle:
+        return hashlib.sha256(handle.read(min(size, HEAD_FINGERPRINT_BYTES))).hexdigest()
+
+
+def parse_send_log(path: Path, offset: int = 0) -> tuple[list[dict], int]:
+    """Stream ``path`` from ``offset`` and return delivered summaries plus the next checkpoint.
+
+    Only complete lines are consumed. The checkpoint stops before any summary
+    whose delivery lookahead window is still open, so re-reading from it later
+    sees the same lines the full scan would.
+    """
+    events: list[dict] = []
+    pending: deque[tuple[int, int, re.Match]] = deque()  # (line number, byte offset, match)
+    line_number = 0
+    position = offset
+    with path.open("rb") as handle:
+        handle.seek(offset)
+        for raw in handle:
+            if not raw.endswith(b"\n"):
+                break
+            line_start, position = position, position + len(raw)
+            line_number += 1
+            line = raw.decode("utf-8", errors="replace")
+            while pending and line_number - pending[0][0] > DELIVERY_LOOKAHEAD_LINES:
+                pending.popleft()
+            if DELIVERED_MARKER in line:
+                for _number, summary_offset, match in pending:
+                    events.append(
+                        {
+                            "byte_offset": summary_offset,
+                            "school": _school_code(match.group("school")),
+                            "summary_start": match.group("start"),
+                            "summary_end": match.group("end"),
+                        }
+                    )
+                pending.clear()
+            match = SUMMARY_RE.search(line)
+            if match:
+                pending.append((line_number, line_start, match))
+    # Summaries that already saw their full lookahead without a delivery are settled.
+    while pending and line_number - pending[0][0] >= DELIVERY_LOOKAHEAD_LINES:
+        pending.popleft()
+    return events, pending[0][1] if pending else position
+
+
+def index_notes_send_logs(conn: sqlite3.Connection, logs_dir: str | Path = "logs") -> dict[str, int]:
+    """Bring the delivery index up to date with ``logs_dir``, reading only new bytes."""
+    ensure_log_index_schema(conn)
+    root = Path(logs_dir)
+    stats = {"files": 0, "files_read": 0, "bytes_indexed": 0, "events_added": 0, "files_reset": 0}
+    now = datetime.now().isoformat(timespec="seconds")
+    paths = sorted(root.glob("*.log")) if root.exists() else []
+    checkpoints = {
+        row[0]: row[1:]
+        for row in conn.execute(
+            "SELECT path, inode, size, mtime_ns, head_sha, byte_offset FROM notes_log_files WHERE logs_dir = ?",
+            (str(root),),
+        )
+    }
+    with conn:
+        for gone in set(checkpoints) - {str(path) for path in paths}:
+            conn.execute("DELETE FROM notes_send_events WHERE log_file = ?", (gone,))
+            conn.execute("DELETE FROM notes_log_files WHERE path = ?", (gone,))
+        for path in paths:
+            stats["files"] += 1
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            offset = 0
+            previous = checkpoints.get(str(path))
+            if previous is not None:
+                inode, size, mtime_ns, head_sha, byte_offset = previous
+                if (inode, size, mtime_ns) == (stat.st_ino, stat.st_size, stat.st_mtime_ns):
+                    continue
+                rewritten = (
+                    inode != stat.st_ino
+                    or stat.st_size < size
+                    or _head_sha(path, size) != head_sha
+                )
+                if rewritten:
+                    conn.execute("DELETE FROM notes_send_events WHERE log_file = ?", (str(path),))
+                    stats["files_reset"] += 1
+                else:
+                    offset = byte_offset
+            events, checkpoint = parse_send_log(path, offset)
+            stats["files_read"] += 1
+            stats["bytes_indexed"] += checkpoint - offset
+            for event in events:
+                stats["events_added"] += conn.execute(
+                    """
+                    INSERT OR IGNORE INTO notes_send_events
+                        (log_file, byte_offset, school, summary_start, summary_end, status, indexed_at)
+                    VALUES (?, ?, ?, ?, ?, 'delivered', ?)
+                    """,
+                    (str(path), event["byte_offset"], event["school"], event["summary_start"], event["summary_end"], now),
+                ).rowcount
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO notes_log_files
+                    (path, logs_dir, inode, size, mtime_ns, head_sha, byte_offset, indexed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (str(path), str(root), stat.st_ino, stat.st_size, stat.st_mtime_ns, _head_sha(path, stat.st_size), checkpoint, now),
+            )
+    return stats
+
+
+def indexed_notes_sends(
+    conn: sqlite3.Connection,
+    start: str,
+    end: str,
+    logs_dir: str | Path = "logs",
+) -> dict[str, dict[str, dict[str, str]]]:
+    """Delivered summaries from the index, shaped like ``scan_notes_send_logs``."""
+    results: dict[str, dict[str, dict[str, str]]] = {}
+    rows = conn.execute(
+        """
+        SELECT e.school, e.summary_start, e.status, e.log_file
+        FROM notes_send_events e
+        JOIN notes_log_files f ON f.path = e.log_file
+        WHERE f.logs_dir = ? AND e.summary_start BETWEEN ? AND ?
+        ORDER BY e.log_file, e.byte_offset
+        """,
+        (str(Path(logs_dir)), start, end),
+    )
+    for school, summary_start, status, log_file in rows:
+        results.setdefault(school, {})[summary_start] = {"status": status, "log_file": log_file}
+    return results
+
+
 def build_notes_pipeline_health(
     conn: sqlite3.Connection,
     *,
@@ -112,8 +294,12 @@ def build_notes_pipeline_health(
     expected_lag_days: int = 1,
     schools: Iterable[str] = DEFAULT_SCHOOLS,
     logs_dir: str | Path = "logs",
+    state_conn: sqlite3.Connection | None = None,
 ) -> dict:
-    """Build a sanitized notes pipeline health snapshot."""
+    """Build a sanitized notes pipeline health snapshot.
+
+    The send-log index is kept in ``state_conn`` (defaults to ``conn``).
+    """
     if as_of is None:
         as_of_date = date.today()
     elif isinstance(as_of, date):
@@ -124,7 +310,9 @@ def build_notes_pipeline_health(
     end_date = as_of_date - timedelta(days=1)
     start_date = end_date - timedelta(days=max(0, lookback_days - 1))
     expected_dates = [item.isoformat() for item in date_range(start_date, end_date)]
-    log_sends = scan_notes_send_logs(logs_dir)
+    state_conn = state_conn or conn
+    index_notes_send_logs(state_conn, logs_dir)
+    log_sends = indexed_notes_sends(state_conn, start_date.isoformat(), end_date.isoformat(), logs_dir)
 
     conn.row_factory = sqlite3.Row
     rows = conn.execute(
@@ -302,6 +490,7 @@ def write_report(report: dict, output_dir: str | Path = "outputs/progress") -> t
 def main(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser(description="Generate notes pipeline health dashboard.")
     parser.add_argument("--db", default="reminders.db")
+    parser.add_argument("--state-db", default=DEFAULT_STATE_DB_PATH, help="SQLite DB holding the send-log index")
     parser.add_argument("--logs-dir", default="logs")
     parser.add_argument("--output-dir", default="outputs/progress")
     parser.add_argument("--as-of", default="")
@@ -309,14 +498,17 @@ def main(argv: list[str] | None = None) -> int:
     args = parser.parse_args(argv)
 
     conn = sqlite3.connect(args.db)
+    state_conn = sqlite3.connect(args.state_db)
     try:
         report = build_notes_pipeline_health(
             conn,
             as_of=args.as_of or None,
             lookback_days=args.lookback_days,
             logs_dir=args.logs_dir,
+            state_conn=state_conn,
         )
     finally:
+        state_conn.close()
         conn.close()
     json_path, md_path = write_report(report, args.output_dir)
     print(f"Wrote {json_path}")
@@ -0,0 +1,164 @@
+"""Rank pipeline stages by where run time goes, from ``pipeline_spans``.
+
+Stages are grouped by span name across every traced run in the window and
+ranked by total self time (a span's duration minus its children's), so a
+parent stage is not credited for time spent in the stages it wraps.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from notesreminder.lib.tracing import ensure_pipeline_spans_schema
+
+
+DEFAULT_LOOKBACK_DAYS = 30
+
+
+def _percentile(values: list[float], fraction: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def build_stage_report(
+    conn: sqlite3.Connection,
+    lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+    pipeline: str | None = None,
+    limit: int = 20,
+    now: datetime | None = None,
+) -> dict:
+    """Slowest stages across runs of ``pipeline`` (root span name; default: all) in the window."""
+    ensure_pipeline_spans_schema(conn)
+    now = now or datetime.now(timezone.utc)
+    since = (now - timedelta(days=lookback_days)).isoformat(timespec="milliseconds")
+    roots = {
+        row[0]: {"name": row[1], "duration_ms": row[2], "status": row[3]}
+        for row in conn.execute(
+            """
+            SELECT trace_id, name, duration_ms, status
+            FROM pipeline_spans
+            WHERE parent_span_id IS NULL AND started_at >= ? AND (? IS NULL OR name = ?)
+            """,
+            (since, pipeline, pipeline),
+        )
+    }
+    per_stage = defaultdict(lambda: defaultdict(lambda: {"duration_ms": 0.0, "self_ms": 0.0, "sql_ms": 0.0, "calls": 0, "rows": 0, "errors": 0, "rss_growth_kb": 0}))
+    if roots:
+        placeholders = ", ".join("?" for _ in roots)
+        for trace_id, name, duration, self_ms, sql_ms, calls, rows, status, rss_growth in conn.execute(
+            f"""
+            SELECT trace_id, name, duration_ms, self_ms, sql_ms, calls, rows, status, rss_growth_kb
+            FROM pipeline_spans
+            WHERE parent_span_id IS NOT NULL AND trace_id IN ({placeholders})
+            """,
+            list(roots),
+        ):
+            bucket = per_stage[name][trace_id]
+            bucket["duration_ms"] += duration
+            bucket["self_ms"] += self_ms
+            bucket["sql_ms"] += sql_ms
+            bucket["calls"] += calls
+            bucket["rows"] += rows or 0
+            bucket["errors"] += int(status == "error")
+            bucket["rss_growth_kb"] = max(bucket["rss_growth_kb"], rss_growth or 0)
+    total_run_ms = sum(root["duration_ms"] for root in roots.values())
+    stages = []
+    for name, runs in per_stage.items():
+        durations = [run["duration_ms"] for run in runs.values()]
+        total_self = sum(run["self_ms"] for run in runs.values())
+        total_duration = sum(durations)
+        total_sql = sum(run["sql_ms"] for run in runs.values())
+        stages.append(
+            {
+                "stage": name,
+                "runs": len(runs),
+                "calls": sum(run["calls"] for run in runs.values()),
+                "rows": sum(run["rows"] for run in runs.values()),
+                "errors": sum(run["errors"] for run in runs.values()),
+                "total_self_ms": round(total_self, 1),
+                "share_of_run_time": round(total_self / total_run_ms, 4) if total_run_ms else None,
+                "avg_ms": round(total_duration / len(runs), 1),
+                "p50_ms": round(_percentile(durations, 0.5), 1),
+                "p90_ms": round(_percentile(durations, 0.9), 1),
+                "max_ms": round(max(durations), 1),
+                "sql_share": round(total_sql / total_duration, 4) if total_duration else None,
+                "max_rss_growth_kb": max(run["rss_growth_kb"] for run in runs.values()),
+            }
+        )
+    stages.sort(key=lambda stage: stage["total_self_ms"], reverse=True)
+    run_durations = [root["duration_ms"] for root in roots.values()]
+    return {
+        "generated_at": now.isoformat(timespec="seconds"),
+        "window": {"since": since, "lookback_days": lookback_days},
+        "pipeline": pipeline,
+        "runs": {
+            "count": len(roots),
+            "failed": sum(1 for root in roots.values() if root["status"] == "error"),
+            "avg_ms": round(total_run_ms / len(roots), 1) if roots else None,
+            "p90_ms": round(_percentile(run_durations, 0.9), 1) if roots else None,
+        },
+        "stages": stages[:limit],
+    }
+
+
+def _seconds(value) -> str:
+    return "" if value is None else f"{value / 1000:.2f}s"
+
+
+def _percent(value) -> str:
+    return "" if value is None else f"{value:.0%}"
+
+
+def render_markdown(report: dict) -> str:
+    runs = report["runs"]
+    lines = [
+        "# Slowest Pipeline Stages",
+        "",
+        f"- Pipeline: `{report['pipeline'] or 'all'}`",
+        f"- Window: last {report['window']['lookback_days']} days",
+        f"- Runs: {runs['count']} ({runs['failed']} failed), avg {_seconds(runs['avg_ms'])}, p90 {_seconds(runs['p90_ms'])}",
+        "",
+        "| Rank | Stage | Runs | Calls | Self Time | Share | Avg | p90 | Max | SQL | Rows | Errors |",
+        "| ---: | --- | ---: | ---: | ---: | ---: | ---: | ---: | ---: | ---: | ---: | ---: |",
+    ]
+    for rank, stage in enumerate(report["stages"], start=1):
+        lines.append(
+            f"| {rank} | {stage['stage']} | {stage['runs']} | {stage['calls']} | {_seconds(stage['total_self_ms'])} | "
+            f"{_percent(stage['share_of_run_time'])} | {_seconds(stage['avg_ms'])} | {_seconds(stage['p90_ms'])} | "
+            f"{_seconds(stage['max_ms'])} | {_percent(stage['sql_share'])} | {stage['rows']} | {stage['errors']} |"
+        )
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Rank pipeline stages by time spent, from pipeline_spans.")
+    parser.add_argument("--db", default="reminders.db")
+    parser.add_argument("--pipeline", default="", help="Root span name, e.g. run_daily (default: all)")
+    parser.add_argument("--lookback-days", type=int, default=DEFAULT_LOOKBACK_DAYS)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--output-dir", default="outputs/progress")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of markdown")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        report = build_stage_report(conn, args.lookback_days, args.pipeline or None, args.limit)
+    finally:
+        conn.close()
+    out_dir = Path(args.output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / "pipeline_stage_report.json").write_text(json.dumps(report, indent=2) + "\n")
+    (out_dir / "pipeline_stage_report.md").write_text(render_markdown(report))
+    print(json.dumps(report, indent=2) if args.json else render_markdown(report))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
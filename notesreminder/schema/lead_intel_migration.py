@@ -115,6 +115,75 @@ def validate_required_columns(conn, table, columns):
         )
 
 
+def sync_table(conn, source_schema, table, columns):
+    """Make ``main.table`` match ``source_schema.table`` on ``columns``, writing only changed rows.
+
+    Rows are matched on the target's primary key; matched rows are rewritten
+    only when a column differs (``IS NOT``, so NULLs compare as values).
+    Tables without a primary key are compared as whole-row sets and replaced
+    only when they differ. Returns the inserted/updated/deleted row counts.
+    """
+    target = quote_identifier(table)
+    source = f"{quote_identifier(source_schema)}.{target}"
+    column_sql = ", ".join(quote_identifier(column) for column in columns)
+    pk_columns = primary_key_columns(conn, "main", table)
+    if not pk_columns or not set(pk_columns) <= set(columns):
+        differs = scalar(
+            conn,
+            f"""
+            SELECT EXISTS (SELECT {column_sql} FROM {source} EXCEPT SELECT {column_sql} FROM main.{target})
+                OR EXISTS (SELECT {column_sql} FROM main.{target} EXCEPT SELECT {column_sql} FROM {source})
+                OR (SELECT COUNT(*) FROM {source}) != (SELECT COUNT(*) FROM main.{target})
+            """,
+        )
+        if not differs:
+            return {"inserted": 0, "updated": 0, "deleted": 0}
+        return _reload_table(conn, source, target, column_sql)
+    try:
+        return _sync_keyed_rows(conn, source, target, columns, pk_columns)
+    except sqlite3.IntegrityError:
+        # A secondary UNIQUE constraint tripped mid-diff (e.g. a value moved
+        # between keys); reloading the table is always consistent.
+        return _reload_table(conn, source, target, column_sql)
+
+
+def _reload_table(conn, source, target, column_sql):
+    deleted = conn.execute(f"DELETE FROM main.{target}").rowcount
+    inserted = conn.execute(f"INSERT INTO main.{target} ({column_sql}) SELECT {column_sql} FROM {source}").rowcount
+    return {"inserted": inserted, "updated": 0, "deleted": deleted}
+
+
+def _sync_keyed_rows(conn, source, target, columns, pk_columns):
+    column_sql = ", ".join(quote_identifier(column) for column in columns)
+    match = " AND ".join(f"target.{quote_identifier(c)} IS source.{quote_identifier(c)}" for c in pk_columns)
+    value_columns = [column for column in columns if column not in pk_columns]
+    deleted = conn.execute(
+        f"DELETE FROM main.{target} AS target WHERE NOT EXISTS (SELECT 1 FROM {source} AS source WHERE {match})"
+    ).rowcount
+    updated = 0
+    if value_columns:
+        changed = " OR ".join(
+            f"target.{quote_identifier(c)} IS NOT source.{quote_identifier(c)}" for c in value_columns
+        )
+        value_sql = ", ".join(quote_identifier(column) for column in value_columns)
+        source_values = ", ".join(f"source.{quote_identifier(column)}" for column in value_columns)
+        updated = conn.execute(
+            f"""
+            UPDATE main.{target} AS target
+            SET ({value_sql}) = (SELECT {source_values} FROM {source} AS source WHERE {match})
+            WHERE EXISTS (SELECT 1 FROM {source} AS source WHERE {match} AND ({changed}))
+            """
+        ).rowcount
+    inserted = conn.execute(
+        f"""
+        INSERT INTO main.{target} ({column_sql})
+        SELECT {column_sql} FROM {source} AS source
+        WHERE NOT EXISTS (SELECT 1 FROM main.{target} AS target WHERE {match})
+        """
+    ).rowcount
+    return {"inserted": inserted, "updated": updated, "deleted": deleted}
+
+
 def replace_table(conn, table):
     if not table_exists(conn, "lead_source", table):
         raise RuntimeError(f"Lead source is missing required table: {table}")
@@ -124,27 +193,37 @@ def replace_table(conn, table):
     columns = common_columns(conn, table)
     validate_required_columns(conn, table, columns)
 
-    column_sql = ", ".join(quote_identifier(column) for column in columns)
-    conn.execute(f"DELETE FROM {quote_identifier(table)}")
-    if columns:
-        conn.execute(
-            f"""
-            INSERT INTO {quote_identifier(table)} ({column_sql})
-            SELECT {column_sql}
-            FROM lead_source.{quote_identifier(table)}
-            """
-        )
+    if columns and columns == table_columns(conn, "main", table):
+        # Every target column comes from the source, so a row-level diff leaves
+        # the same contents as delete-and-reinsert while rewriting only changes.
+        strategy = "replace_sync"
+        changes = sync_table(conn, "lead_source", table, columns)
+    else:
+        strategy = "replace"
+        column_sql = ", ".join(quote_identifier(column) for column in columns)
+        deleted = conn.execute(f"DELETE FROM {quote_identifier(table)}").rowcount
+        inserted = 0
+        if columns:
+            inserted = conn.execute(
+                f"""
+                INSERT INTO {quote_identifier(table)} ({column_sql})
+                SELECT {column_sql}
+                FROM lead_source.{quote_identifier(table)}
+                """
+            ).rowcount
+        changes = {"inserted": inserted, "updated": 0, "deleted": deleted}
 
     after = count_rows(conn, "main", table)
     status = "ok" if after == source else "mismatch"
     return {
         "table": table,
-        "strategy": "replace",
+        "strategy": strategy,
         "source_rows": source,
         "target_rows_before": before,
         "target_rows_after": after,
         "missing_source_rows": 0 if status == "ok" else source - after,
         "status": status,
+        **changes,
     }
 
 
@@ -0,0 +1,463 @@
+"""Cheap audio pre-screen run before Whisper transcription.
+
+Each recording is decoded once to 8 kHz mono and measured for:
+- duration
+- RMS level
+- voice-activity ratio, from frame energy against the file's own noise floor
+- the span between the first and last audible frame (used for trimming)
+- a compact Haitsma-Kalker style fingerprint: one 16-bit word per 64 ms of
+  band-energy sign changes
+
+Results are stored in ``recording_prescreen`` keyed by call ID and reused
+while the file's size and mtime are unchanged. ``transcription_queue`` uses
+them to skip near-silent recordings, short hang-ups and re-downloads of audio
+already queued, and returns the rest shortest-job-first with trim bounds. When
+an original later fails to transcribe, ``release_duplicates`` re-queues the
+recordings that were skipped as its duplicates.
+"""
+
+from __future__ import annotations
+
+import shutil
+import sqlite3
+import subprocess
+import wave
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+
+SAMPLE_RATE = 8000
+FRAME_SECONDS = 0.03
+MIN_DURATION_SECONDS = 3.0
+MIN_VOICE_RATIO = 0.03
+SILENT_RMS_DBFS = -50.0
+# Audio this loud is never called silent, even if it has no quiet frames to measure a floor from.
+LOUD_RMS_DBFS = -30.0
+# A frame is voiced when it is this far above the quiet-frame floor and above an absolute floor.
+VOICE_MARGIN_DB = 12.0
+VOICE_FLOOR_DBFS = -45.0
+TRIM_PADDING_SECONDS = 0.3
+# Only bother writing trimmed audio when it removes at least this much.
+MIN_TRIM_SAVING_SECONDS = 1.0
+FINGERPRINT_FRAME = 1024
+FINGERPRINT_HOP = 512
+FINGERPRINT_BANDS = 17  # 16 bits per word
+FINGERPRINT_MAX_SECONDS = 120
+DUPLICATE_SIMILARITY = 0.75
+DUPLICATE_DURATION_TOLERANCE_SECONDS = 1.5
+# OpenAI's transcription upload limit.
+UPLOAD_LIMIT_BYTES = 25 * 1024 * 1024
+TRIM_SAMPLE_RATE = 16000
+# Speech-grade mono MP3 (about 4 KB/s, so ~100 minutes fit under the upload limit).
+TRIM_MP3_BITRATE = "32k"
+
+
+class PrescreenError(RuntimeError):
+    """The recording could not be decoded."""
+
+
+@dataclass
+class AudioProfile:
+    duration_s: float
+    rms_dbfs: float
+    voice_ratio: float
+    speech_start_s: float
+    speech_end_s: float
+    fingerprint: bytes
+    fingerprint_frames: int
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+
+
+def ensure_prescreen_schema(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS recording_prescreen (
+            call_id TEXT PRIMARY KEY,
+            file_path TEXT NOT NULL,
+            file_size_bytes INTEGER,
+            file_mtime REAL,
+            duration_s REAL,
+            rms_dbfs REAL,
+            voice_ratio REAL,
+            speech_start_s REAL,
+            speech_end_s REAL,
+            fingerprint BLOB,
+            fingerprint_frames INTEGER,
+            verdict TEXT NOT NULL,
+            duplicate_of TEXT,
+            error_message TEXT,
+            analyzed_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_recording_prescreen_duration ON recording_prescreen(verdict, duration_s)"
+    )
+
+
+def decode_audio(path: Path, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Mono float32 samples in [-1, 1]; WAV is read directly, anything else through ffmpeg."""
+    path = Path(path)
+    if path.suffix.lower() == ".wav":
+        try:
+            return _decode_wav(path, sample_rate)
+        except (wave.Error, EOFError, ValueError):
+            pass  # e.g. compressed WAV; let ffmpeg handle it
+    if shutil.which("ffmpeg") is None:
+        raise PrescreenError(f"ffmpeg is required to decode {path.suffix or path.name}")
+    completed = subprocess.run(
+        ["ffmpeg", "-nostdin", "-v", "error", "-i", str(path), "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "-"],
+        capture_output=True,
+        check=False,
+    )
+    if completed.returncode != 0:
+        raise PrescreenError(completed.stderr.decode(errors="replace").strip()[:300] or "ffmpeg failed")
+    return np.frombuffer(completed.stdout, dtype="<i2").astype(np.float32) / 32768.0
+
+
+def _decode_wav(path: Path, sample_rate: int) -> np.ndarray:
+    with wave.open(str(path), "rb") as handle:
+        width = handle.getsampwidth()
+        channels = handle.getnchannels()
+        source_rate = handle.getframerate()
+        raw = handle.readframes(handle.getnframes())
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128.0
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"unsupported sample width {width}")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if source_rate != sample_rate and len(samples):
+        positions = np.arange(0, len(samples), source_rate / sample_rate)
+        samples = np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+    return samples
+
+
+def _dbfs(power: np.ndarray) -> np.ndarray:
+    return 10 * np.log10(np.maximum(power, 1e-12))
+
+
+def fingerprint(samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> tuple[bytes, int]:
+    """Packed sign bits of band-energy differences across frequency and time."""
+    samples = samples[: FINGERPRINT_MAX_SECONDS * sample_rate]
+    if len(samples) < FINGERPRINT_FRAME * 2:
+        return b"", 0
+    count = 1 + (len(samples) - FINGERPRINT_FRAME) // FINGERPRINT_HOP
+    index = np.arange(FINGERPRINT_FRAME)[None, :] + FINGERPRINT_HOP * np.arange(count)[:, None]
+    spectrum = np.abs(np.fft.rfft(samples[index] * np.hanning(FINGERPRINT_FRAME), axis=1)) ** 2
+    freqs = np.fft.rfftfreq(FINGERPRINT_FRAME, 1 / sample_rate)
+    edges = np.geomspace(300, 3000, FINGERPRINT_BANDS + 1)
+    bands = np.stack(
+        [spectrum[:, (freqs >= low) & (freqs < high)].sum(axis=1) for low, high in zip(edges[:-1], edges[1:])],
+        axis=1,
+    )
+    across_frequency = bands[:, :-1] - bands[:, 1:]
+    bits = (across_frequency[1:] - across_frequency[:-1]) > 0
+    return np.packbits(bits.astype(np.uint8), axis=None).tobytes(), len(bits)
+
+
+def fingerprint_similarity(left: bytes, left_frames: int, right: bytes, right_frames: int) -> float:
+    """Fraction of matching bits over the overlapping frames (about 0.5 for unrelated audio)."""
+    frames = min(left_frames or 0, right_frames or 0)
+    if frames == 0:
+        return 0.0
+    width = FINGERPRINT_BANDS - 1
+    a = np.unpackbits(np.frombuffer(left, dtype=np.uint8))[: frames * width]
+    b = np.unpackbits(np.frombuffer(right, dtype=np.uint8))[: frames * width]
+    return float(np.mean(a == b))
+
+
+def analyze_samples(samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> AudioProfile:
+    duration = len(samples) / sample_rate if sample_rate else 0.0
+    frame = max(1, int(sample_rate * FRAME_SECONDS))
+    usable = len(samples) - len(samples) % frame
+    if usable == 0:
+        return AudioProfile(duration, -120.0, 0.0, 0.0, duration, b"", 0)
+    frame_power = np.mean(samples[:usable].reshape(-1, frame) ** 2, axis=1)
+    frame_db = _dbfs(frame_power)
+    noise_floor = float(np.percentile(frame_db, 10))
+    voiced = (frame_db > noise_floor + VOICE_MARGIN_DB) & (frame_db > VOICE_FLOOR_DBFS)
+    # Trim only edges below the absolute floor so uniformly loud audio is never cut.
+    audible_index = np.flatnonzero(frame_db > VOICE_FLOOR_DBFS)
+    if len(audible_index):
+        start = max(0.0, audible_index[0] * FRAME_SECONDS - TRIM_PADDING_SECONDS)
+        end = min(duration, (audible_index[-1] + 1) * FRAME_SECONDS + TRIM_PADDING_SECONDS)
+    else:
+        start, end = 0.0, duration
+    print_bytes, print_frames = fingerprint(samples, sample_rate)
+    return AudioProfile(
+        duration_s=round(duration, 3),
+        rms_dbfs=round(float(_dbfs(np.mean(samples**2))), 2),
+        voice_ratio=round(float(voiced.mean()), 4),
+        speech_start_s=round(start, 3),
+        speech_end_s=round(end, 3),
+        fingerprint=print_bytes,
+        fingerprint_frames=print_frames,
+    )
+
+
+def verdict_for(profile: AudioProfile) -> str:
+    if profile.duration_s < MIN_DURATION_SECONDS:
+        return "too_short"
+    if profile.rms_dbfs < SILENT_RMS_DBFS:
+        return "silent"
+    if profile.voice_ratio < MIN_VOICE_RATIO and profile.rms_dbfs < LOUD_RMS_DBFS:
+        return "silent"
+    return "transcribe"
+
+
+def find_duplicate(conn: sqlite3.Connection, call_id: str, profile: AudioProfile) -> Optional[str]:
+    if not profile.fingerprint_frames:
+        return None
+    for other_id, other_print, other_frames in conn.execute(
+        """
+        SELECT call_id, fingerprint, fingerprint_frames
+        FROM recording_prescreen
+        WHERE verdict = 'transcribe'
+          AND call_id != ?
+          AND duration_s BETWEEN ? AND ?
+        ORDER BY analyzed_at, call_id
+        """,
+        (
+            call_id,
+            profile.duration_s - DUPLICATE_DURATION_TOLERANCE_SECONDS,
+            profile.duration_s + DUPLICATE_DURATION_TOLERANCE_SECONDS,
+        ),
+    ).fetchall():
+        similarity = fingerprint_similarity(profile.fingerprint, profile.fingerprint_frames, other_print, other_frames)
+        if similarity >= DUPLICATE_SIMILARITY:
+            return other_id
+    return None
+
+
+def prescreen_file(conn: sqlite3.Connection, call_id: str, path: Path) -> dict:
+    """Analyze ``path`` unless an up-to-date row exists; returns the ``recording_prescreen`` row."""
+    path = Path(path)
+    stat = path.stat()
+    row = _prescreen_row(conn, call_id)
+    if row and row["file_path"] == str(path) and row["file_size_bytes"] == stat.st_size and row["file_mtime"] == stat.st_mtime:
+        return row
+    values = {
+        "call_id": call_id,
+        "file_path": str(path),
+        "file_size_bytes": stat.st_size,
+        "file_mtime": stat.st_mtime,
+        "duration_s": None,
+        "rms_dbfs": None,
+        "voice_ratio": None,
+        "speech_start_s": None,
+        "speech_end_s": None,
+        "fingerprint": None,
+        "fingerprint_frames": None,
+        "verdict": "error",
+        "duplicate_of": None,
+        "error_message": None,
+        "analyzed_at": utc_now_iso(),
+    }
+    try:
+        profile = analyze_samples(decode_audio(path))
+    except (PrescreenError, OSError) as exc:
+        values["error_message"] = str(exc)[:300]
+    else:
+        verdict = verdict_for(profile)
+        duplicate_of = find_duplicate(conn, call_id, profile) if verdict == "transcribe" else None
+        values.update(
+            {
+                "duration_s": profile.duration_s,
+                "rms_dbfs": profile.rms_dbfs,
+                "voice_ratio": profile.voice_ratio,
+                "speech_start_s": profile.speech_start_s,
+                "speech_end_s": profile.speech_end_s,
+                "fingerprint": profile.fingerprint,
+                "fingerprint_frames": profile.fingerprint_frames,
+                "verdict": "duplicate" if duplicate_of else verdict,
+                "duplicate_of": duplicate_of,
+            }
+        )
+    columns = ", ".join(values)
+    placeholders = ", ".join(f":{column}" for column in values)
+    conn.execute(f"INSERT OR REPLACE INTO recording_prescreen ({columns}) VALUES ({placeholders})", values)
+    conn.commit()
+    return values
+
+
+def _prescreen_row(conn: sqlite3.Connection, call_id: str) -> Optional[dict]:
+    cursor = conn.execute("SELECT * FROM recording_prescreen WHERE call_id = ?", (call_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return dict(zip([column[0] for column in cursor.description], row))
+
+
+@dataclass(frozen=True)
+class QueuedRecording:
+    call_id: str
+    path: Path
+    duration_s: Optional[float]
+    trim_start_s: Optional[float] = None
+    trim_end_s: Optional[float] = None
+
+    @property
+    def trimmed(self) -> bool:
+        return self.trim_start_s is not None
+
+
+def transcription_queue(
+    conn: sqlite3.Connection,
+    paths: Iterable[Path | str],
+    call_id_for: Callable[[Path], str] = lambda path: path.stem,
+    limit: Optional[int] = None,
+) -> tuple[list[QueuedRecording], list[dict]]:
+    """Pre-screen ``paths``; return (recordings to transcribe shortest first, skipped prescreen rows).
+
+    With ``limit``, paths are screened in order only until ``limit`` recordings
+    are queued, so a small run does not decode the whole backlog. Files that
+    could not be decoded are kept in the queue untrimmed so the transcriber,
+    which has its own decoder, still gets a chance at them.
+    """
+    ensure_prescreen_schema(conn)
+    queue, skipped = [], []
+    for raw_path in paths:
+        if limit and len(queue) >= limit:
+            break
+        path = Path(raw_path)
+        call_id = call_id_for(path)
+        row = prescreen_file(conn, call_id, path)
+        if row["verdict"] in ("silent", "too_short", "duplicate"):
+            skipped.append(row)
+            continue
+        start, end, duration = row["speech_start_s"], row["speech_end_s"], row["duration_s"]
+        if row["verdict"] == "transcribe" and duration and duration - (end - start) >= MIN_TRIM_SAVING_SECONDS:
+            queue.append(QueuedRecording(call_id, path, end - start, start, end))
+        else:
+            queue.append(QueuedRecording(call_id, path, duration))
+    queue.sort(key=lambda item: (item.duration_s is None, item.duration_s or 0.0, item.call_id))
+    return queue, skipped
+
+
+def release_duplicates(conn: sqlite3.Connection, call_id: str) -> list[str]:
+    """Re-queue recordings skipped as duplicates of ``call_id`` after it failed to transcribe.
+
+    Their prescreen rows become ``transcribe`` and, where ``recording_transcripts``
+    exists, their ``skipped`` transcript rows go back to ``pending``.
+    """
+    ensure_prescreen_schema(conn)
+    released = [
+        row[0]
+        for row in conn.execute(
+            "SELECT call_id FROM recording_prescreen WHERE verdict = 'duplicate' AND duplicate_of = ? ORDER BY call_id",
+            (call_id,),
+        )
+    ]
+    if not released:
+        return []
+    placeholders = ", ".join("?" for _ in released)
+    conn.execute(
+        f"UPDATE recording_prescreen SET verdict = 'transcribe', duplicate_of = NULL WHERE call_id IN ({placeholders})",
+        released,
+    )
+    has_transcripts = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'recording_transcripts'"
+    ).fetchone()
+    if has_transcripts:
+        conn.execute(
+            f"""
+            UPDATE recording_transcripts
+            SET transcript_status = 'pending', error_message = ?
+            WHERE call_id IN ({placeholders}) AND transcript_status = 'skipped'
+            """,
+            [f"prescreen: re-queued, original {call_id} failed", *released],
+        )
+    conn.commit()
+    return released
+
+
+def recordable_skips(conn: sqlite3.Connection, skipped: Iterable[dict]) -> list[dict]:
+    """Skipped rows whose call has no completed transcript to overwrite with ``skipped``.
+
+    ``--force`` and explicit call ids pre-screen calls that were already
+    transcribed; their transcript stays as it is.
+    """
+    skipped = list(skipped)
+    has_transcripts = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'recording_transcripts'"
+    ).fetchone()
+    if not skipped or not has_transcripts:
+        return skipped
+    placeholders = ", ".join("?" for _ in skipped)
+    completed = {
+        row[0]
+        for row in conn.execute(
+            f"SELECT call_id FROM recording_transcripts WHERE transcript_status = 'completed' AND call_id IN ({placeholders})",
+            [row["call_id"] for row in skipped],
+        )
+    }
+    return [row for row in skipped if row["call_id"] not in completed]
+
+
+def skip_reason(row: dict) -> str:
+    if row["verdict"] == "duplicate":
+        return f"prescreen: duplicate of {row['duplicate_of']}"
+    if row["verdict"] == "too_short":
+        return f"prescreen: too short ({row['duration_s']}s)"
+    return f"prescreen: silent (rms {row['rms_dbfs']} dBFS, voice {row['voice_ratio']:.0%})"
+
+
+def write_trimmed_audio(
+    path: Path,
+    item: QueuedRecording,
+    directory: Path,
+    max_bytes: int = UPLOAD_LIMIT_BYTES,
+) -> Path:
+    """Return the file to upload for ``item``: its voiced span, compressed, or ``path`` itself.
+
+    The span is encoded as 16 kHz mono MP3 with ffmpeg. Without ffmpeg it is
+    written as 16-bit WAV (about 32 KB/s) only when that stays under
+    ``max_bytes``; otherwise, or if the trimmed file would still be too big,
+    the original file is uploaded untrimmed.
+    """
+    path, directory = Path(path), Path(directory)
+    span = item.trim_end_s - item.trim_start_s
+    if shutil.which("ffmpeg") is not None:
+        destination = directory / f"{item.call_id}.mp3"
+        completed = subprocess.run(
+            [
+                "ffmpeg", "-nostdin", "-v", "error", "-y",
+                "-ss", f"{item.trim_start_s:.3f}", "-t", f"{span:.3f}", "-i", str(path),
+                "-ac", "1", "-ar", str(TRIM_SAMPLE_RATE), "-c:a", "libmp3lame", "-b:a", TRIM_MP3_BITRATE,
+                str(destination),
+            ],
+            capture_output=True,
+            check=False,
+        )
+        if completed.returncode == 0 and destination.exists():
+            return destination if destination.stat().st_size <= max_bytes else path
+    if span * TRIM_SAMPLE_RATE * 2 + 44 > max_bytes:
+        return path
+    try:
+        return write_trimmed_wav(path, item, directory / f"{item.call_id}.wav")
+    except (PrescreenError, OSError):
+        return path
+
+
+def write_trimmed_wav(path: Path, item: QueuedRecording, destination: Path, sample_rate: int = TRIM_SAMPLE_RATE) -> Path:
+    """Write the voiced span of ``path`` as 16-bit mono WAV (the rate Whisper resamples to anyway)."""
+    samples = decode_audio(path, sample_rate)
+    clip = samples[int(item.trim_start_s * sample_rate) : int(item.trim_end_s * sample_rate)]
+    with wave.open(str(destination), "wb") as handle:
+        handle.setnchannels(1)
+        handle.setsampwidth(2)
+        handle.setframerate(sample_rate)
+        handle.writeframes((np.clip(clip, -1, 1) * 32767).astype("<i2").tobytes())
+    return destination
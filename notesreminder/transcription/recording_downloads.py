@@ -0,0 +1,190 @@
+"""Concurrent, resumable recording downloads over a pooled authenticated HTTP client.
+
+Recording URLs are collected first (from the browser), then fetched here with
+``max_workers`` concurrent streams sharing one ``httpx.Client``. Each file is
+written to ``<call_id>.part`` and hashed while it streams; an interrupted
+transfer resumes with a ``Range`` request on the next run, and the part file is
+renamed into place only once it is complete.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mimetypes
+import os
+import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+import httpx
+
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_CHUNK_SIZE = 256 * 1024
+DEFAULT_TIMEOUT_SECONDS = 60.0
+AUDIO_EXTENSIONS = {".mp3", ".wav", ".m4a", ".ogg", ".webm", ".mp4", ".aac", ".flac"}
+
+
+class RecordingDownloadError(RuntimeError):
+    """The server did not return the complete recording."""
+
+
+@dataclass(frozen=True)
+class RecordingJob:
+    call_id: str
+    url: str
+    metadata: dict = field(default_factory=dict, compare=False)
+
+
+@dataclass
+class DownloadResult:
+    job: RecordingJob
+    path: Optional[Path] = None
+    sha256: Optional[str] = None
+    size: int = 0
+    content_type: Optional[str] = None
+    resumed_from: int = 0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def authenticated_client(
+    cookies: Iterable[dict],
+    user_agent: Optional[str] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+) -> httpx.Client:
+    """HTTP client carrying the browser session's cookies (Playwright ``context.cookies()`` shape)."""
+    jar = httpx.Cookies()
+    for cookie in cookies:
+        jar.set(cookie["name"], cookie["value"], domain=cookie.get("domain", ""), path=cookie.get("path", "/"))
+    headers = {"User-Agent": user_agent} if user_agent else {}
+    return httpx.Client(
+        cookies=jar,
+        headers=headers,
+        follow_redirects=True,
+        timeout=timeout_seconds,
+        limits=httpx.Limits(max_connections=max_workers, max_keepalive_connections=max_workers),
+    )
+
+
+def recording_extension(url: str, content_type: Optional[str], disposition: Optional[str]) -> str:
+    match = re.search(r'filename\*?=(?:UTF-8\'\')?"?([^";]+)', disposition or "", re.IGNORECASE)
+    candidates = [match.group(1) if match else "", httpx.URL(url).path]
+    for name in candidates:
+        suffix = Path(name).suffix.lower()
+        if suffix in AUDIO_EXTENSIONS:
+            return suffix
+    guessed = mimetypes.guess_extension((content_type or "").split(";")[0].strip()) or ""
+    return guessed if guessed in AUDIO_EXTENSIONS else ".mp3"
+
+
+def _hash_existing(path: Path, digest) -> int:
+    size = 0
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(DEFAULT_CHUNK_SIZE), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    return size
+
+
+def stream_recording(
+    client: httpx.Client,
+    job: RecordingJob,
+    output_dir: Path,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> DownloadResult:
+    """Download one recording, resuming ``<call_id>.part`` if a previous run left one."""
+    part_path = output_dir / f"{job.call_id}.part"
+    digest = hashlib.sha256()
+    offset = _hash_existing(part_path, digest) if part_path.exists() else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    result = DownloadResult(job)
+    with client.stream("GET", job.url, headers=headers) as response:
+        if response.status_code == 416 and offset:
+            # The part file already holds every byte; only the rename was missed.
+            content_type, disposition, expected_total = None, None, offset
+            mode = None
+        elif response.status_code == 206 and offset:
+            content_type = response.headers.get("content-type")
+            disposition = response.headers.get("content-disposition")
+            expected_total = _content_range_total(response.headers.get("content-range"))
+            mode = "ab"
+            result.resumed_from = offset
+        elif response.status_code == 200:
+            content_type = response.headers.get("content-type")
+            disposition = response.headers.get("content-disposition")
+            length = response.headers.get("content-length")
+            expected_total = int(length) if length and length.isdigit() else None
+            mode = "wb"
+            if offset:
+                # Server ignored the Range header: start over.
+                digest, offset = hashlib.sha256(), 0
+        else:
+            raise RecordingDownloadError(f"HTTP {response.status_code} for {job.call_id}")
+        size = offset
+        if mode:
+            with open(part_path, mode) as handle:
+                for chunk in response.iter_bytes(chunk_size):
+                    handle.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+    if expected_total is not None and size < expected_total:
+        raise RecordingDownloadError(f"{job.call_id}: got {size} of {expected_total} bytes; will resume")
+    destination = output_dir / f"{job.call_id}{recording_extension(job.url, content_type, disposition)}"
+    os.replace(part_path, destination)
+    result.path = destination
+    result.sha256 = digest.hexdigest()
+    result.size = size
+    result.content_type = content_type
+    return result
+
+
+def _content_range_total(value: Optional[str]) -> Optional[int]:
+    match = re.search(r"/(\d+)\s*$", value or "")
+    return int(match.group(1)) if match else None
+
+
+def download_recordings(
+    client: httpx.Client,
+    jobs: list[RecordingJob],
+    output_dir: Path,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> Iterator[DownloadResult]:
+    """Fetch ``jobs`` concurrently and yield results as they finish (in completion order).
+
+    Results are yielded on the calling thread, so callers can write them to
+    SQLite without sharing a connection across workers.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="recording") as pool:
+        futures = {pool.submit(stream_recording, client, job, output_dir): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except (httpx.HTTPError, OSError, RecordingDownloadError) as exc:
+                yield DownloadResult(futures[future], error=f"{type(exc).__name__}: {exc}"[:300])
+
+
+def known_recording_by_hash(conn: sqlite3.Connection, sha256: str, call_id: str) -> Optional[sqlite3.Row]:
+    """Another call's successful download with the same content, if it is still on disk."""
+    for row in conn.execute(
+        """
+        SELECT call_id, file_path
+        FROM recording_downloads
+        WHERE file_sha256 = ?
+          AND call_id != ?
+          AND status = 'success'
+          AND COALESCE(file_path, '') != ''
+        """,
+        (sha256, call_id),
+    ).fetchall():
+        if Path(row[1]).exists():
+            return row
+    return None
@@ -13,6 +13,7 @@ from typing import Optional
 
 from playwright.async_api import async_playwright, BrowserContext
 
+from notesreminder.lib.browser_broker import async_open_profile_context
 from okta_auth.session_state import consume_session
 
 
@@ -47,12 +48,18 @@ async def launch_okta_context(
     Path(profile).mkdir(parents=True, exist_ok=True)
     pw = await async_playwright().start()
     try:
-        context: BrowserContext = await pw.chromium.launch_persistent_context(
+        # A running browser broker on this profile hands out an isolated
+        # context seeded with the warm session instead of a fresh Chromium.
+        context: BrowserContext = await async_open_profile_context(
+            pw,
             profile,
             headless=headless,
             viewport=viewport or {"width": 1920, "height": 1080},
             args=["--disable-dev-shm-usage"],
         )
-        yield context
+        try:
+            yield context
+        finally:
+            await context.close()
     finally:
         await pw.stop()
@@ -2,21 +2,34 @@
 """
 pike13_pull_all.py — Pull ALL Pike13 people with current_plans.
 
-Strategy: Split into monthly date ranges to avoid Pike13's opaque pagination.
-Each range returns up to 964 rows; we aggregate and deduplicate.
-
-Usage: python3 pike13_pull_all.py --school westu-sor
+Strategy: split history into date ranges, capture the reports auth_token once,
+then POST every range's query concurrently through Pike13ReportsClient, which
+reads each range in <=100-row person_id sort windows up to total_count. Ranges
+are aggregated, deduplicated by person_id and ordered by last membership end,
+newest first, as the Desk report sorts them. A range that fails or comes up
+short of total_count fails the pull and the models file is left untouched.
+With --db, rows are also streamed into pike13_report_rows as pages arrive;
+rows of failed ranges are removed again.
+
+Usage: python3 pike13_pull_all.py --school westu-sor [--db reminders.db]
 """
-import asyncio, sys, json, urllib.parse
+import asyncio, sys, json, sqlite3
 from pathlib import Path
 from datetime import date, datetime, timedelta
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 import pike13_auto_auth
+from notesreminder.extractors.pike13_reports import (
+    Pike13ReportsClient,
+    ReportQuery,
+    SqliteRowSink,
+    capture_auth_token,
+    date_filter,
+)
+from pike13_report_puller import build_report_url
 from playwright.async_api import async_playwright
 
 MODELS = Path(__file__).resolve().parent / "models"
-HIDE = "1,70,71,72,73,74,75,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22,23,24,25,26,28,29,30,31,33,34,58,32,59,60,61,62,35,36,37,38,39,63,64,65,66,67,57,56.163802,56.163803,56.163805,56.163806,56.163810,56.163812,56.163813,56.166237,56.163800,56.163804,56.163807,56.163808,56.163814"
 
 FIELDS = ["full_name", "email", "phone", "address", "current_plans",
           "person_id", "status", "last_membership_end_date", "next_plan_end",
@@ -35,77 +48,95 @@ def month_ranges(start="2020-01-01", end=None, step_months=6):
         current = next_date
 
 
-async def pull_range(school, frm, to, page):
-    """Pull one date range via URL navigation, return (rows, total)."""
-    filt = f"(last_membership_end:!((btw:!('{frm}','{to}'))))"
-    sort = "(col:last_membership_end,order:d)"
-    frag = f"/people/details?filters={urllib.parse.quote(filt, safe='(),:!')}&sort={urllib.parse.quote(sort, safe='(),:!')}&hide={HIDE}"
-    report_url = f"https://{school}.pike13.com/desk/reports#{frag}"
-
-    captured = {}
-    async def on_response(resp):
-        url = resp.url
-        if "/queries" in url and "auth_token" in url:
-            try:
-                body = await resp.body()
-                d = json.loads(body[:400000])
-                attrs = d.get("data", {}).get("attributes", {})
-                captured["rows"] = attrs.get("rows") or []
-                captured["total"] = attrs.get("total_count", 0)
-            except:
-                pass
-
-    page.on("response", on_response)
-    await page.goto(report_url, wait_until="networkidle", timeout=30000)
-    await page.wait_for_timeout(5000)
-
-    rows = captured.get("rows", [])
-    total = captured.get("total", 0)
-    return rows, total
-
-
-async def pull_all(school="westu-sor"):
+async def pull_all(school="westu-sor", db_path=None, max_concurrency=4):
     async with async_playwright() as p:
         context = await pike13_auto_auth.authenticate_pike13(
             p, school_subdomain=school, headless=True, verbose=False
         )
-        page = context.pages[0]
-
-        all_rows = []
-        seen_ids = set()
-        # Rows are lists: [full_name, email, phone, address, current_plans, person_id, ...]
-        # person_id is at index 5
-
         ranges = list(month_ranges("2020-01-01", step_months=6))
         print(f"Pulling {len(ranges)} date ranges for {school}...")
-
-        for i, (frm, to) in enumerate(ranges):
-            rows, total = await pull_range(school, frm, to, page)
-            new = 0
-            for row in rows:
-                pid = row[5] if len(row) > 5 else None  # person_id at index 5
-                if pid and pid not in seen_ids:
-                    seen_ids.add(pid)
-                    all_rows.append(row)
-                    new += 1
-            print(f"  Range {i+1}/{len(ranges)}: {frm}→{to}: {len(rows)} rows ({new} new, total deduped: {len(all_rows)})")
-
-        out = MODELS / f"pike13_people_plans_{school}.json"
-        out.write_text(json.dumps({
-            "school": school, "pulled_at": date.today().isoformat(),
-            "total": len(all_rows), "fields": FIELDS, "rows": all_rows,
-        }, indent=2, default=str))
-        print(f"  Done: {len(all_rows)} unique people saved to {out}")
-        await context.close()
-        return all_rows
+        queries = [
+            ReportQuery(
+                key=f"{frm}_{to}",
+                fields=tuple(FIELDS),
+                filter=date_filter("last_membership_end", frm, to),
+            )
+            for frm, to in ranges
+        ]
+
+        conn = sink = None
+        if db_path:
+            conn = sqlite3.connect(str(db_path))
+            pull_id = f"pull_all_{school}_{datetime.now().strftime('%Y%m%dT%H%M%S')}"
+            sink = SqliteRowSink(conn, pull_id, school, {query.key: "clients" for query in queries})
+        try:
+            frm, to = ranges[0]
+            token = await capture_auth_token(context.pages[0], build_report_url(school, frm, to))
+            client = Pike13ReportsClient.from_context(context, school, token, max_concurrency=max_concurrency)
+            results = await client.pull_many(queries, on_page=sink, return_exceptions=True)
+            failed = {}
+            for key, result in results.items():
+                if isinstance(result, BaseException):
+                    failed[key] = result
+                elif not result.complete:
+                    failed[key] = f"incomplete: {result.row_count}/{result.total_count} rows"
+            if conn is not None and failed:
+                with conn:
+                    conn.executemany(
+                        "DELETE FROM pike13_report_rows WHERE pull_id = ? AND query_key = ?",
+                        [(sink.pull_id, key) for key in failed],
+                    )
+        finally:
+            if conn is not None:
+                conn.close()
+            await context.close()
+
+    if failed:
+        for key, error in failed.items():
+            print(f"  !! Range {key} failed: {error}")
+        raise SystemExit(f"{len(failed)}/{len(queries)} ranges incomplete for {school}; "
+                         f"not writing pike13_people_plans_{school}.json")
+
+    all_rows = []
+    seen_ids = set()
+    for i, query in enumerate(queries):
+        result = results[query.key]
+        names = result.field_names or FIELDS
+        pid_index = names.index("person_id") if "person_id" in names else 5
+        # The client reads sort windows by person_id; restore the report's
+        # (col:last_membership_end,order:d) order within each range.
+        end_index = names.index("last_membership_end_date") if "last_membership_end_date" in names else None
+        rows = result.rows
+        if end_index is not None:
+            rows = sorted(rows, key=lambda row: str(row[end_index] or ""), reverse=True)
+        new = 0
+        for row in rows:
+            pid = row[pid_index] if len(row) > pid_index else None
+            if pid and pid not in seen_ids:
+                seen_ids.add(pid)
+                all_rows.append(row)
+                new += 1
+        print(f"  Range {i+1}/{len(queries)}: {query.key}: {result.row_count}/{result.total_count} rows "
+              f"in {result.pages} page(s) ({new} new, total deduped: {len(all_rows)})")
+
+    out = MODELS / f"pike13_people_plans_{school}.json"
+    out.write_text(json.dumps({
+        "school": school, "pulled_at": date.today().isoformat(),
+        "total": len(all_rows), "fields": FIELDS, "rows": all_rows,
+    }, indent=2, default=str))
+    print(f"  Done: {len(all_rows)} unique people saved to {out}")
+    if sink is not None:
+        print(f"  Streamed {sink.rows_written} rows into {db_path} (pike13_report_rows, pull_id={sink.pull_id})")
+    return all_rows
 
 
 async def main():
     school = "westu-sor"
     if "--school" in sys.argv:
         school = sys.argv[sys.argv.index("--school") + 1]
+    db_path = sys.argv[sys.argv.index("--db") + 1] if "--db" in sys.argv else None
     print(f"Pulling all Pike13 people for {school}...")
-    await pull_all(school)
+    await pull_all(school, db_path=db_path)
 
 
 if __name__ == "__main__":
@@ -20,6 +20,13 @@ Default field/op is last_membership_end / btW (between) — i.e. "Last
 Memberships" report. Other reports use the same shape with a different
 field (e.g. last_visited, first_membership_start, created_at).
 
+Rows are fetched by pike13_reports.Pike13ReportsClient: the auth_token is
+taken from the first report page's own /queries request, then each field's
+query is POSTed directly and read to total_count in <=100-row sort windows (no
+UI navigation per field, no 400 KB body truncation). A field that fails or
+does not reach total_count comes back with no rows, complete=False and an
+error in its meta.
+
 Join key: the numeric `person_id` in the rows matches `pike13_people.person_id`
 (8-digit Pike13 people ID) — NOT the 23-char Client hash on /api/v2 paths.
 
@@ -40,6 +47,12 @@ from datetime import datetime, timezone
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 import pike13_auto_auth
+from notesreminder.extractors.pike13_reports import (
+    Pike13ReportsClient,
+    ReportQuery,
+    capture_auth_token,
+    date_filter,
+)
 from playwright.async_api import async_playwright
 
 SCHOOL_TO_NAME = {
@@ -47,6 +60,9 @@ SCHOOL_TO_NAME = {
     "theheights-sor": "The Heights",
 }
 
+# Columns requested from /queries; matches the people/details report layout.
+REPORT_COLUMNS = ["full_name", "email", "phone", "address", "current_plans", "person_id"]
+
 # Pike13's own filter encoding, captured from the live address bar.
 HIDE = ("1,70,71,72,73,74,75,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21,22,23,24,"
          "25,26,28,29,30,31,33,34,58,32,59,60,61,62,35,36,37,38,39,63,64,65,66,67,57,"
@@ -64,82 +80,64 @@ def build_report_url(subdomain: str, frm: str, to: str,
     return f"https://{subdomain}.pike13.com/desk/reports#{frag}"
 
 
-async def _capture_queries(page):
-    captured = {}
-
-    async def on_response(resp):
-        url = resp.url
-        if "/queries" in url and "auth_token" in url:
-            try:
-                body = await resp.body()
-                d = json.loads(body[:400000])
-                rows, total, fields = None, None, None
-                if isinstance(d, dict) and isinstance(d.get("data"), dict):
-                    attrs = d["data"].get("attributes", {})
-                    rows = attrs.get("rows") or []
-                    total = attrs.get("total_count")
-                    fields = attrs.get("fields")
-                captured["payload"] = {
-                    "url": url, "status": resp.status,
-                    "rows": rows, "total_count": total, "fields": fields,
-                }
-            except Exception as e:
-                captured["error"] = str(e)
-
-    page.on("response", on_response)
-    return captured
-
-
 async def pull_reports_batch(subdomain: str, frm: str, to: str,
                              fields: list, op: str = "btw",
-                             headless: bool = True, verbose: bool = False):
+                             headless: bool = True, verbose: bool = False,
+                             columns: list = None, max_concurrency: int = 4):
     """
-    Authenticate ONCE, then pull every (field, op, from, to) in one session.
-    Returns {field_token: (rows, meta)}. Tokens that return rows are real.
+    Authenticate ONCE, capture the report auth_token from one page load, then
+    read one /queries query per field token concurrently, in sort windows up
+    to total_count. Returns {field_token: (rows, meta)}; a field that failed or
+    came up short has no rows and meta["complete"] False.
     """
-    # Build all target URLs up front
-    urls = {f: build_report_url(subdomain, frm, to, f, op) for f in fields}
-    if verbose:
-        for f, u in urls.items():
-            print(f"[pull] {f}: {u[:90]}...")
+    if not fields:
+        raise ValueError("pull_reports_batch needs at least one date field token")
+    columns = list(columns or REPORT_COLUMNS)
+    queries = [
+        ReportQuery(key=f, fields=tuple(columns), filter=date_filter(f, frm, to, op))
+        for f in fields
+    ]
 
     async with async_playwright() as p:
         context = await pike13_auto_auth.authenticate_pike13(
             p, school_subdomain=subdomain, headless=headless, verbose=verbose
         )
-        page = context.pages[0]
-        out = {}
-        for f, url in urls.items():
-            cap = await _capture_queries(page)   # re-arm listener per field
-            await page.goto(url, wait_until="networkidle", timeout=30000)
-            await page.wait_for_timeout(6000)
-            if "payload" not in cap:
-                try:
-                    await page.locator("body").click(timeout=3000)
-                    await page.wait_for_timeout(4000)
-                except Exception:
-                    pass
-            rows = cap.get("payload", {}).get("rows") or []
-            fields_seen = cap.get("payload", {}).get("fields") or []
-            total = cap.get("payload", {}).get("total_count")
-            status = cap.get("payload", {}).get("status")
-            field_names = [x.get("name") for x in fields_seen] if fields_seen else None
-            meta = {
-                "subdomain": subdomain,
-                "school": SCHOOL_TO_NAME.get(subdomain, subdomain),
-                "field": f, "op": op, "from": frm, "to": to,
-                "report_url": url,
-                "http_status": status,
-                "returned_rows": len(rows),
-                "total_count": total,
-                "field_names": field_names,
-                "pulled_at": datetime.now(timezone.utc).isoformat(),
-                "error": cap.get("error"),
-            }
-            out[f] = (rows, meta)
-            if verbose:
-                print(f"    {f}: HTTP {status} rows={len(rows)} total={total} names={field_names}")
-        await context.close()
+        try:
+            token = await capture_auth_token(
+                context.pages[0], build_report_url(subdomain, frm, to, fields[0], op))
+            client = Pike13ReportsClient.from_context(
+                context, subdomain, token, max_concurrency=max_concurrency)
+            results = await client.pull_many(queries, return_exceptions=True)
+        finally:
+            await context.close()
+
+    out = {}
+    for f in fields:
+        result = results[f]
+        failed = isinstance(result, BaseException)
+        error = str(result) if failed else None
+        if not failed and not result.complete:
+            # A truncated field is reported as a failure, never as rows.
+            error = f"incomplete: {result.row_count}/{result.total_count} rows"
+        rows = [] if error else result.rows
+        meta = {
+            "subdomain": subdomain,
+            "school": SCHOOL_TO_NAME.get(subdomain, subdomain),
+            "field": f, "op": op, "from": frm, "to": to,
+            "report_url": build_report_url(subdomain, frm, to, f, op),
+            "http_status": None if failed else 200,
+            "returned_rows": len(rows),
+            "total_count": None if failed else result.total_count,
+            "pages": None if failed else result.pages,
+            "field_names": None if failed else (result.field_names or columns),
+            "complete": error is None,
+            "pulled_at": datetime.now(timezone.utc).isoformat(),
+            "error": error,
+        }
+        out[f] = (rows, meta)
+        if verbose:
+            print(f"    {f}: rows={len(rows)} total={meta['total_count']} "
+                  f"pages={meta['pages']} error={meta['error']}")
     return out
 
 
@@ -12,13 +12,15 @@
     - No action? (flagged as stale — escalating urgency)
 """
 
-import sqlite3, re, json, pickle, warnings
+import sqlite3, re, json, warnings
 from pathlib import Path
-from datetime import date, timedelta
-from collections import defaultdict, Counter
+from datetime import date
+from collections import defaultdict
 import pandas as pd
 import numpy as np
 
+from notesreminder.lib.analytics_snapshot import load_frames
+
 warnings.filterwarnings("ignore")
 
 DB_PATH = Path(__file__).parent / "reminders.db"
@@ -189,12 +191,9 @@ def categorize_text(text):
 # ═══════════════════════════════════════════════════════════
 
 def load_all_data():
-    con = sqlite3.connect(str(DB_PATH))
-    lessons = pd.read_sql_query("""
-        SELECT l.*, ln.note_score, ln.notes_text, ln.note_completed
-        FROM lessons l LEFT JOIN lesson_notes ln ON l.lesson_id = ln.lesson_id
-        WHERE l.lesson_date IS NOT NULL ORDER BY l.lesson_date DESC
-    """, con)
+    frames = load_frames(DB_PATH, ["lessons", "pike13_people", "dialpad_voicemails", "dialpad_sms_threads", "dialpad_sms_messages", "dialpad_call_reviews"])
+    lessons = frames["lessons"].drop(columns=["note_score_explanation"], errors="ignore")
+    lessons = lessons[lessons["lesson_date"].notna()].sort_values("lesson_date", ascending=False, kind="stable").reset_index(drop=True)
     lessons["lesson_date"] = pd.to_datetime(lessons["lesson_date"])
     
     phone_student = {}
@@ -202,30 +201,35 @@ def load_all_data():
     for k, v in matches["matches"].items():
         if not k.startswith("call_") and "@" not in k and not k.startswith("sms_"):
             phone_student[k] = v["student"]
-    ppl = pd.read_sql_query("SELECT full_name, phone, phone_normalized FROM pike13_people WHERE phone IS NOT NULL OR phone_normalized IS NOT NULL", con)
-    for _, r in ppl.iterrows():
-        n = str(r["full_name"]).strip()
-        for c in ["phone", "phone_normalized"]:
-            p = re.sub(r"\D", "", str(r.get(c, "") or ""))
+    ppl = frames["pike13_people"]
+    with_phone = ppl[ppl["phone"].notna() | ppl["phone_normalized"].notna()]
+    for full_name, phone, phone_normalized in zip(with_phone["full_name"], with_phone["phone_key"], with_phone["phone_normalized_key"]):
+        n = str(full_name).strip()
+        for p in (phone, phone_normalized):
             if p and n: phone_student[p] = n
     
     call_student = {k.replace("call_", ""): v["student"] for k, v in matches["matches"].items() if k.startswith("call_")}
     
     vms_by_phone = defaultdict(list)
-    vms = pd.read_sql_query("SELECT external_number, transcription_text, date as created_at FROM dialpad_voicemails WHERE transcription_text IS NOT NULL", con)
-    for _, r in vms.iterrows():
-        phone = re.sub(r"\D", "", str(r["external_number"]))
-        if phone: vms_by_phone[phone].append({"text": str(r["transcription_text"])[:1000], "date": str(r.get("created_at", ""))[:10]})
-    
-    sms_threads = pd.read_sql_query("SELECT thread_id, phone FROM dialpad_sms_threads WHERE phone IS NOT NULL", con)
-    thread_phone = {str(r["thread_id"]): str(r["phone"]).strip() for _, r in sms_threads.iterrows()}
+    vms = frames["dialpad_voicemails"]
+    vms = vms[vms["transcription_text"].notna()]
+    for phone, text, created_at in zip(vms["external_number_key"], vms["transcription_text"], vms["date"]):
+        if phone: vms_by_phone[phone].append({"text": str(text)[:1000], "date": str(created_at)[:10]})
+    
+    sms_threads = frames["dialpad_sms_threads"]
+    sms_threads = sms_threads[sms_threads["phone"].notna()]
+    thread_phone = {str(thread_id): str(phone).strip() for thread_id, phone in zip(sms_threads["thread_id"], sms_threads["phone"])}
     sms_by_thread = defaultdict(list)
-    sms = pd.read_sql_query("SELECT thread_id, body, message_at FROM dialpad_sms_messages WHERE body IS NOT NULL AND body != ''", con)
-    for _, r in sms.iterrows(): sms_by_thread[str(r["thread_id"])].append({"text": str(r["body"])[:500], "date": str(r.get("message_at", ""))[:10]})
+    sms = frames["dialpad_sms_messages"]
+    sms = sms[sms["body"].notna() & (sms["body"] != "")]
+    for thread_id, body, message_at in zip(sms["thread_id"], sms["body"], sms["message_at"]):
+        sms_by_thread[str(thread_id)].append({"text": str(body)[:500], "date": str(message_at)[:10]})
     
     reviews_by_call = {}
-    reviews = pd.read_sql_query("SELECT call_id, transcript_text, recap_text, event_at FROM dialpad_call_reviews WHERE transcript_text IS NOT NULL OR recap_text IS NOT NULL", con)
-    for _, r in reviews.iterrows(): reviews_by_call[str(r["call_id"])] = {"text": (str(r.get("transcript_text", "") or "") + " " + str(r.get("recap_text", "") or ""))[:1000], "date": str(r.get("event_at", ""))[:10]}
+    reviews = frames["dialpad_call_reviews"]
+    reviews = reviews[reviews["transcript_text"].notna() | reviews["recap_text"].notna()]
+    for call_id, transcript, recap, event_at in zip(reviews["call_id"], reviews["transcript_text"], reviews["recap_text"], reviews["event_at"]):
+        reviews_by_call[str(call_id)] = {"text": (str(transcript or "") + " " + str(recap or ""))[:1000], "date": str(event_at)[:10]}
     
     holds = {}
     for path in [HOLDS_PATH_WU, HOLDS_PATH_TH]:
@@ -234,18 +238,15 @@ def load_all_data():
                 c = r.get("Client", "").strip()
                 if c: holds[c.lower()] = {"on_hold": r.get("On Hold?", "") == "Yes", "hold_start": r.get("Last Hold Start Date", ""), "hold_end": r.get("Last Hold End Date", ""), "hold_by": r.get("Last Hold By", ""), "plan": r.get("Plan Name", ""), "base_price": r.get("Base Price", ""), "account_managers": r.get("Account Managers", ""), "account_emails": r.get("Account Manager Emails", ""), "account_phones": r.get("Account Manager Phones", "")}
     
-    con.close()
     print(f"  Lessons: {len(lessons)} | Phone→student: {len(phone_student)} | Holds: {len(holds)}")
     
     # Load Pike13 membership states for trial/enrolled detection
-    con = sqlite3.connect(str(DB_PATH))
-    ppl_states = pd.read_sql_query("SELECT full_name, membership_state FROM pike13_people WHERE full_name IS NOT NULL", con)
-    con.close()
     pike13_states = {}
-    for _, r in ppl_states.iterrows():
-        name = str(r["full_name"]).strip().lower()
+    named = ppl[ppl["full_name"].notna()]
+    for full_name, membership_state in zip(named["full_name"], named["membership_state"]):
+        name = str(full_name).strip().lower()
         if name not in pike13_states:
-            pike13_states[name] = str(r.get("membership_state", "") or "")
+            pike13_states[name] = str(membership_state or "")
     
     # Load Pike13 leaver data (last_membership_end dates)
     leavers = {}
@@ -253,10 +254,8 @@ def load_all_data():
         leavers = json.load(open(LEAVERS_PATH))
     
     # Load current plans from DB backfill
-    con = sqlite3.connect(str(DB_PATH))
-    current_plans_raw = con.execute("SELECT full_name, current_plan FROM pike13_people WHERE current_plan IS NOT NULL").fetchall()
-    con.close()
-    current_plans = {row[0].strip().lower(): row[1] for row in current_plans_raw if row[0]}
+    planned = ppl[ppl["current_plan"].notna()]
+    current_plans = {full_name.strip().lower(): plan for full_name, plan in zip(planned["full_name"], planned["current_plan"]) if isinstance(full_name, str) and full_name}
     
     return {"lessons": lessons, "phone_student": phone_student, "call_student": call_student, "vms_by_phone": vms_by_phone, "sms_thread_phone": thread_phone, "sms_by_thread": sms_by_thread, "reviews_by_call": reviews_by_call, "holds": holds, "pike13_states": pike13_states, "leavers": leavers, "current_plans": current_plans}
 
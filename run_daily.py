@@ -19,6 +19,7 @@ load_dotenv()
 
 from build_reporting_schema import backfill_reporting  # noqa: E402
 from noteschecker import scrape_lessons
+from notesreminder.lib.scrape_diagnostics import DIAGNOSTICS_MODES
 
 VERBOSE = False
 DELAY_NOTICE_FALLBACK_EMAIL = "hughrscott@mac.com"
@@ -68,6 +69,9 @@ def parse_args():
                         help='Open a headed Pike13 browser and wait for manual login/MFA before scraping.')
     parser.add_argument('--login-timeout', type=int, default=300,
                         help='Seconds to wait for interactive Pike13 login/MFA.')
+    parser.add_argument('--scrape-diagnostics', choices=DIAGNOSTICS_MODES,
+                        help='Playwright trace/screenshot policy for the lesson scrape '
+                             '(default: $NOTES_SCRAPE_DIAGNOSTICS or on-failure).')
     parser.add_argument('--db-path', default=DB_PATH,
                         help='SQLite DB path to read/write (default: reminders.db).')
     parser.add_argument('--skip-s3-sync', action='store_true',
@@ -78,6 +82,8 @@ def parse_args():
 
 
 from notesreminder.lib.note_page_probe import VALID_STATUSES
+from notesreminder.lib.analytics_snapshot import HAS_PYARROW, export_snapshot
+from notesreminder.lib.tracing import Tracer, TracedConnection, aggregate_span, save_traced_run, span
 
 
 def assert_no_uncertain_recent_notes(db_path, days=7):
@@ -88,7 +94,7 @@ def assert_no_uncertain_recent_notes(db_path, days=7):
     unresolved scrape failure.  Raise RuntimeError — the pipeline must not
     silently default to 'No notes'.
     """
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path, factory=TracedConnection)
     try:
         bad = conn.execute(
             "SELECT COUNT(*) FROM reminders r "
@@ -109,7 +115,7 @@ def assert_no_uncertain_recent_notes(db_path, days=7):
 
 
 def sync_reporting_tables(db_path):
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path, factory=TracedConnection)
     try:
         backfill_reporting(conn)
         conn.commit()
@@ -119,7 +125,7 @@ def sync_reporting_tables(db_path):
 
 def sync_lesson_notes_to_reminders(db_path):
     """Sync reminders.note_completed = 1 where lesson_notes exists, and update compliance table."""
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path, factory=TracedConnection)
     try:
         # Sync reminders.note_completed flag from lesson_notes
         updated = conn.execute('''
@@ -181,7 +187,7 @@ def sync_lesson_notes_to_reminders(db_path):
 
 def get_lessons_without_notes(school_subdomain, start_date=None, end_date=None):
     """Get all lessons from the database that don't have notes for a specific school."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, factory=TracedConnection)
     cursor = conn.cursor()
     
     params = [school_subdomain]
@@ -209,7 +215,7 @@ def get_lessons_without_notes(school_subdomain, start_date=None, end_date=None):
 
 def update_lesson_status(lesson_id, has_notes):
     """Update the note_completed status in the database."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, factory=TracedConnection)
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -626,7 +632,9 @@ def upload_db_to_s3(local_path, bucket, s3_key):
     try:
         s3 = boto3.client('s3')
         log(f"\n📤 Uploading {local_path} to s3://{bucket}/{s3_key}")
-        s3.upload_file(local_path, bucket, s3_key)
+        with span("s3_sync", direction="upload", key=s3_key) as current:
+            s3.upload_file(local_path, bucket, s3_key)
+            current.set(size_bytes=os.path.getsize(local_path))
         log("✅ Database uploaded successfully")
     except Exception as e:
         print(f"⚠️ Error uploading to S3: {str(e)}")
@@ -635,13 +643,15 @@ def upload_db_to_s3(local_path, bucket, s3_key):
 def download_db_from_s3(local_path, bucket, s3_key):
     s3 = boto3.client('s3')
     try:
-        s3.download_file(bucket, s3_key, local_path)
+        with span("s3_sync", direction="download", key=s3_key) as current:
+            s3.download_file(bucket, s3_key, local_path)
+            current.set(size_bytes=os.path.getsize(local_path))
         log(f"✅ Downloaded {s3_key} from s3://{bucket} to {local_path}")
     except Exception as e:
         print(f"⚠️ Could not download {s3_key} from s3://{bucket}: {e}")
 
 def ensure_location_column():
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, factory=TracedConnection)
     cursor = conn.cursor()
     cursor.execute("PRAGMA table_info(reminders)")
     columns = [row[1] for row in cursor.fetchall()]
@@ -685,7 +695,7 @@ def ensure_location_column():
     conn.close()
 
 def ensure_unique_lesson_ids():
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, factory=TracedConnection)
     cursor = conn.cursor()
     cursor.execute("SELECT COUNT(*) FROM reminders WHERE lesson_id LIKE school || '-%'")
     prefixed_count = cursor.fetchone()[0]
@@ -698,7 +708,7 @@ def ensure_unique_lesson_ids():
     conn.close()
 
 def ensure_notes_columns():
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, factory=TracedConnection)
     cursor = conn.cursor()
     cursor.execute("PRAGMA table_info(reminders)")
     columns = [row[1] for row in cursor.fetchall()]
@@ -711,7 +721,7 @@ def ensure_notes_columns():
 
 
 def ensure_note_score_columns():
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, factory=TracedConnection)
     cursor = conn.cursor()
     cursor.execute("PRAGMA table_info(reminders)")
     columns = [row[1] for row in cursor.fetchall()]
@@ -731,7 +741,7 @@ def ensure_note_score_columns():
     conn.close()
 
 def ensure_pike13_column():
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, factory=TracedConnection)
     cursor = conn.cursor()
     cursor.execute("PRAGMA table_info(reminders)")
     columns = [row[1] for row in cursor.fetchall()]
@@ -903,11 +913,12 @@ def update_reminders_from_dataframe(
                 note_score_explanation = None
             else:
                 try:
-                    note_score, note_score_explanation = score_note_quality(
-                        notes_text,
-                        lesson_type,
-                        note_score_model,
-                    )
+                    with aggregate_span("scoring", model=note_score_model):
+                        note_score, note_score_explanation = score_note_quality(
+                            notes_text,
+                            lesson_type,
+                            note_score_model,
+                        )
                 except FatalScoringError:
                     raise
 
@@ -984,7 +995,7 @@ def update_reminders_from_dataframe(
                     note_score_hash,
                     last_checked
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_DATE)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_DATE)
             ''', (
                 lesson_id,
                 school,
@@ -1055,6 +1066,54 @@ async def main():
             log("Fresh database initialized; skipped S3 upload")
         return
 
+    tracer = Tracer("run_daily", school=school_subdomain)
+    try:
+        with tracer.activate():
+            await run_pipeline(args, school_subdomain)
+    finally:
+        run_id = record_pipeline_trace(tracer, school_subdomain)
+
+    # At the end, upload the DB to S3
+    if not args.skip_s3_sync:
+        with tracer.activate():
+            upload_db_to_s3(DB_PATH, S3_BUCKET, S3_KEY)
+        # Spans were saved before the upload so they reach S3; the upload's own
+        # span is added to the local copy only.
+        record_pipeline_trace(tracer, school_subdomain, run_id)
+    else:
+        log(f"Skipping S3 upload; local DB validation completed at {DB_PATH}", force=True)
+
+
+def refresh_analytics_snapshot():
+    """Export the Arrow snapshot the retention/churn reports load; never fails the run."""
+    if not HAS_PYARROW:
+        return
+    try:
+        with span("analytics_snapshot"):
+            manifest = export_snapshot(DB_PATH)
+        log(f"Analytics snapshot {manifest['version']} is current")
+    except Exception as exc:
+        print(f"⚠️ Could not export analytics snapshot: {exc}")
+
+
+def record_pipeline_trace(tracer, school_subdomain, run_id=None):
+    """Store this run's stage timings in pipeline_spans, linked to its source_import_runs row."""
+    if not os.path.exists(DB_PATH):
+        return run_id
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        if run_id is None:
+            run_id = save_traced_run(conn, tracer, "notes", "run_daily.py", metadata={"school": school_subdomain})
+        else:
+            tracer.save(conn, run_id)
+    except sqlite3.Error as exc:
+        print(f"⚠️ Could not save pipeline spans: {exc}")
+    finally:
+        conn.close()
+    return run_id
+
+
+async def run_pipeline(args, school_subdomain):
     # Download the latest DB from S3 (if it exists)
     if not args.skip_s3_sync:
         download_db_from_s3(DB_PATH, S3_BUCKET, S3_KEY)
@@ -1093,15 +1152,17 @@ async def main():
 
     if args.verbose:
         print(f"🔍 Scraping lessons from {start_date} to {end_date} for {school_subdomain}")
-    await scrape_lessons(
-        school_subdomain,
-        start_date=start_date,
-        end_date=end_date,
-        verbose=args.verbose,
-        profile_dir=args.pike13_profile_dir,
-        interactive_login=args.interactive_login,
-        login_timeout=args.login_timeout,
-    )
+    with span("scrape", start_date=start_date, end_date=end_date):
+        await scrape_lessons(
+            school_subdomain,
+            start_date=start_date,
+            end_date=end_date,
+            verbose=args.verbose,
+            profile_dir=args.pike13_profile_dir,
+            interactive_login=args.interactive_login,
+            login_timeout=args.login_timeout,
+            diagnostics=args.scrape_diagnostics,
+        )
 
     # Read the scraped data
     csv_file = f"{school_subdomain}_lessons_{start_date}_to_{end_date}.csv"
@@ -1111,23 +1172,27 @@ async def main():
             "Scrape likely failed (login/permissions/network)."
         )
     try:
-        df = pd.read_csv(csv_file)
+        with span("parse", file=csv_file) as current:
+            df = pd.read_csv(csv_file)
+            current.add_rows(len(df))
     except pd.errors.EmptyDataError:
         raise SystemExit(
             f"CSV file {csv_file} has no columns. "
             "Scrape likely returned no data (login/permissions/network)."
         )
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, factory=TracedConnection)
     try:
-        result = update_reminders_from_dataframe(
-            conn, df, school_subdomain,
-            verbose=args.verbose,
-            skip_note_scoring=args.skip_note_scoring,
-            note_score_model=args.note_score_model,
-            note_score_version=args.note_score_version,
-            return_completed_lessons=True,
-        )
-        conn.commit()
+        with span("upsert") as current:
+            result = update_reminders_from_dataframe(
+                conn, df, school_subdomain,
+                verbose=args.verbose,
+                skip_note_scoring=args.skip_note_scoring,
+                note_score_model=args.note_score_model,
+                note_score_version=args.note_score_version,
+                return_completed_lessons=True,
+            )
+            conn.commit()
+            current.add_rows(len(df)).set(inserted=result["rows_inserted"], updated=result["rows_upserted"])
     except FatalScoringError as exc:
         conn.close()
         if not args.no_email:
@@ -1148,12 +1213,16 @@ async def main():
     completed_lessons = result.get("completed_lessons", [])
 
     if not args.skip_reporting_sync:
-        sync_reporting_tables(DB_PATH)
-        sync_lesson_notes_to_reminders(DB_PATH)
+        with span("reporting_sync"):
+            sync_reporting_tables(DB_PATH)
+            sync_lesson_notes_to_reminders(DB_PATH)
+        refresh_analytics_snapshot()
         log("✅ Normalized reporting tables synced from reminders.", force=args.verbose)
 
     # Now, retrieve missing notes from the DB within the requested window
-    all_missing_notes = get_lessons_without_notes(school_subdomain, start_date, end_date)
+    with span("missing_notes_query") as current:
+        all_missing_notes = get_lessons_without_notes(school_subdomain, start_date, end_date)
+        current.add_rows(len(all_missing_notes))
 
     # Filter the notes for the report based on your criteria
     report_missing_notes = []
@@ -1232,11 +1301,6 @@ async def main():
     if include_missing_section and not report_missing_notes:
         log(f"✅ All lessons for {school_subdomain} (from {start_date} to {end_date}) have notes (or were filtered out)!")
 
-    # At the end, upload the DB to S3
-    if not args.skip_s3_sync:
-        upload_db_to_s3(DB_PATH, S3_BUCKET, S3_KEY)
-    else:
-        log(f"Skipping S3 upload; local DB validation completed at {DB_PATH}", force=True)
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -80,35 +80,21 @@ def refresh_sources(as_of: date) -> None:
             ],
             timeout=1200,
         )
-    for school in SCHOOLS:
-        run_step(
-            f"REFRESH CURRENT MEMBERS - {school}",
-            [DATA_PYTHON, "scrape_pike13_current_members.py", "--school", school],
-        )
+    # One Pike13 login per school; members, holds and late cancels load in parallel tabs.
     run_step(
-        "REFRESH LATE-CANCELLATION SHADOW SOURCE",
+        "REFRESH PIKE13 MEMBERS, HOLDS AND LATE CANCELLATIONS",
         [
             DATA_PYTHON,
-            "scrape_pike13_late_cancels.py",
-            "--start-date",
-            (as_of - timedelta(days=59)).isoformat(),
-            "--end-date",
+            "scrape_pike13_bundle.py",
+            "--db",
+            str(DB_PATH),
+            "--as-of",
             as_of.isoformat(),
+            "--late-cancel-start",
+            (as_of - timedelta(days=59)).isoformat(),
         ],
         timeout=1200,
     )
-    for school in SCHOOLS:
-        run_step(
-            f"REFRESH HOLD STATUS - {school}",
-            [
-                DATA_PYTHON,
-                "scrape_pike13_holds.py",
-                "--school",
-                school,
-                "--as-of",
-                as_of.isoformat(),
-            ],
-        )
     run_step(
         "REFRESH DETERMINISTIC PERSON IDENTITIES",
         [
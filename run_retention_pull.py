@@ -92,6 +92,9 @@ def run(school, frm, to, db_path=DB_DEFAULT, dry_run=False, verbose=False):
     total_ins = 0
     joins = 0
     for f, (rows, meta) in batch.items():
+        if meta.get("error"):
+            print(f"  !! {FIELDS[f]}: not stored ({meta['error']})")
+            continue
         field_names = meta.get("field_names") or [
             "full_name", "email", "phone", "address", "current_plans", "person_id"]
         for r in rows:
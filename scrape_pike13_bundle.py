@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""Run a bundle of Pike13 Desk reports with one login per school.
+
+Each report is a ``ReportSpec`` (school, report, date window). The runner
+authenticates once per school, opens every report of that school in its own
+tab of the same browser context, and finishes each tab as soon as the report's
+own ``/queries`` response arrives instead of sleeping a fixed time. Short
+reports are completed by replaying the captured request, exactly as the
+single-report scrapers do, and each result is handed to that scraper's writer:
+
+- ``current_members`` -> ``scrape_pike13_current_members.store_snapshot``
+- ``active_holds`` / ``recent_holds`` -> ``scrape_pike13_holds`` JSON
+- ``late_cancels`` -> ``late_cancel_shadow.ingest_late_cancel_records``
+- ``leavers`` / ``new_members`` -> ``pike13_member_snapshots``
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sqlite3
+import sys
+import urllib.parse
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+ROOT = Path(__file__).resolve().parent
+DB_PATH = ROOT / "reminders.db"
+MODELS_DIR = ROOT / "models"
+SCHOOLS = {"westu-sor": "West U", "theheights-sor": "The Heights"}
+DEFAULT_MAX_TABS = 4
+QUERY_TIMEOUT_MS = 60_000
+
+sys.path.insert(0, str(ROOT))
+from playwright.async_api import async_playwright  # noqa: E402
+import pike13_auto_auth  # noqa: E402
+from scrape_pike13_current_members import (  # noqa: E402
+    FULL_ROSTER_TIMEOUT_MS,
+    REPORT_PATH as CURRENT_MEMBERS_PATH,
+    coverage_request_bodies,
+    full_roster_request,
+    rows_to_records,
+    store_snapshot as store_current_members,
+)
+from scrape_pike13_late_cancels import build_report_path as late_cancel_path, record_run  # noqa: E402
+from scrape_pike13_holds import combine_hold_records  # noqa: E402
+from late_cancel_shadow import ensure_schema as ensure_late_cancel_schema, ingest_late_cancel_records  # noqa: E402
+
+
+@dataclass(frozen=True)
+class ReportDefinition:
+    endpoint: str
+    path: Callable[[Optional[str], Optional[str]], str]
+    required_fields: tuple[str, ...] = ()
+    needs_window: bool = False
+    # Pike13's gateway times out on one 100+ row roster query; cover it from both ends.
+    coverage_replay: bool = False
+    dedupe_field: Optional[str] = None
+
+
+def _desk_path(fragment: str, filters: str, sort: str = "") -> str:
+    path = f"/desk/reports#/{fragment}?filters={urllib.parse.quote(filters, safe='(),:!')}"
+    return path + (f"&sort={urllib.parse.quote(sort, safe='(),:!')}" if sort else "")
+
+
+REPORTS: dict[str, ReportDefinition] = {
+    "current_members": ReportDefinition(
+        endpoint="/api/v3/reports/clients/queries",
+        path=lambda start, end: CURRENT_MEMBERS_PATH,
+        required_fields=("person_id",),
+        coverage_replay=True,
+        dedupe_field="person_id",
+    ),
+    "active_holds": ReportDefinition(
+        endpoint="/api/v3/reports/person_plans/queries",
+        path=lambda start, end: _desk_path("person_plans/details", "(is_on_hold:!((eq:!(t))))"),
+        required_fields=("Client", "Last Hold End Date"),
+    ),
+    "recent_holds": ReportDefinition(
+        endpoint="/api/v3/reports/person_plans/queries",
+        path=lambda start, end: _desk_path(
+            "person_plans/details", f"(last_hold_end_date:!((btw:!('{start}','{end}'))))"
+        ),
+        required_fields=("Client", "Last Hold End Date"),
+        needs_window=True,
+    ),
+    "late_cancels": ReportDefinition(
+        endpoint="/api/v3/reports/enrollments/queries",
+        path=lambda start, end: late_cancel_path(start, end),
+        needs_window=True,
+    ),
+    "leavers": ReportDefinition(
+        endpoint="/api/v3/reports/clients/queries",
+        path=lambda start, end: _desk_path(
+            "people/details",
+            f"(last_membership_end:!((btw:!('{start}','{end}'))))",
+            "(col:last_membership_end,order:d)",
+        ),
+        needs_window=True,
+    ),
+    "new_members": ReportDefinition(
+        endpoint="/api/v3/reports/person_plans/queries",
+        path=lambda start, end: _desk_path(
+            "person_plans/details",
+            f"(is_first_membership:!((eq:!(t))),start_date:!((btw:!('{start}','{end}'))))",
+            "(col:start_date,order:d)",
+        ),
+        needs_window=True,
+    ),
+}
+
+
+@dataclass(frozen=True)
+class ReportSpec:
+    school: str
+    report: str
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if self.school not in SCHOOLS:
+            raise ValueError(f"Unknown Pike13 school: {self.school}")
+        definition = REPORTS.get(self.report)
+        if definition is None:
+            raise ValueError(f"Unknown Pike13 report: {self.report}")
+        if definition.needs_window and not (self.start_date and self.end_date):
+            raise ValueError(f"Pike13 report {self.report} needs start_date and end_date")
+
+    @property
+    def key(self) -> str:
+        window = f"[{self.start_date}..{self.end_date}]" if self.start_date else ""
+        return f"{self.school}/{self.report}{window}"
+
+    @property
+    def url(self) -> str:
+        return f"https://{self.school}.pike13.com{REPORTS[self.report].path(self.start_date, self.end_date)}"
+
+    @classmethod
+    def parse(cls, text: str) -> "ReportSpec":
+        """``school:report`` or ``school:report:start:end`` from the command line."""
+        parts = text.split(":")
+        if len(parts) not in (2, 4):
+            raise ValueError(f"Expected school:report[:start:end], got {text!r}")
+        return cls(*parts)
+
+
+@dataclass
+class ReportResult:
+    spec: ReportSpec
+    field_names: list[str] = field(default_factory=list)
+    rows: list[list[Any]] = field(default_factory=list)
+    total_count: int = 0
+
+    def records(self) -> list[dict[str, Any]]:
+        records = rows_to_records(self.field_names, self.rows) if self.rows else []
+        dedupe_field = REPORTS[self.spec.report].dedupe_field
+        if dedupe_field:
+            records = list({str(r.get(dedupe_field)): r for r in records}.values())
+        return records
+
+
+def nightly_specs(
+    as_of: date,
+    schools: Iterable[str] = SCHOOLS,
+    late_cancel_start: Optional[date] = None,
+    hold_days: int = 30,
+) -> list[ReportSpec]:
+    """The membership, hold and late-cancel reports the retention refresh needs."""
+    end = as_of.isoformat()
+    late_start = (late_cancel_start or as_of - timedelta(days=59)).isoformat()
+    hold_start = (as_of - timedelta(days=hold_days)).isoformat()
+    specs = []
+    for school in schools:
+        specs += [
+            ReportSpec(school, "current_members"),
+            ReportSpec(school, "active_holds"),
+            ReportSpec(school, "recent_holds", hold_start, end),
+            ReportSpec(school, "late_cancels", late_start, end),
+        ]
+    return specs
+
+
+async def fetch_report(context, spec: ReportSpec, timeout_ms: int = QUERY_TIMEOUT_MS) -> ReportResult:
+    """Open one report in a new tab and return every row, finishing on its ``/queries`` response."""
+    definition = REPORTS[spec.report]
+    loop = asyncio.get_running_loop()
+    captured: asyncio.Future = loop.create_future()
+
+    async def on_response(response) -> None:
+        if captured.done() or definition.endpoint not in response.url or response.request.method != "POST":
+            return
+        try:
+            attrs = (await response.json()).get("data", {}).get("attributes", {})
+            names = [f.get("name") if isinstance(f, dict) else f for f in attrs.get("fields") or []]
+            if not names or any(name not in names for name in definition.required_fields):
+                return
+            if any(not name for name in names):
+                raise ValueError("Pike13 returned an unnamed report field")
+            body = json.loads(response.request.post_data or "{}")
+            if not captured.done():
+                captured.set_result((response.url, body, names, attrs))
+        except Exception as exc:  # surfaced to the awaiting tab
+            if not captured.done():
+                captured.set_exception(exc)
+
+    page = await context.new_page()
+    page.on("response", on_response)
+    try:
+        await page.goto(spec.url, wait_until="domcontentloaded", timeout=30000)
+        if "sign_in" in page.url or "two_factor" in page.url:
+            raise RuntimeError(f"Pike13 session expired while loading {spec.key}: {page.url}")
+        try:
+            api_url, request_body, names, attrs = await asyncio.wait_for(captured, timeout_ms / 1000)
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"Pike13 did not answer the {spec.key} query within {timeout_ms} ms") from None
+    finally:
+        page.remove_listener("response", on_response)
+        await page.close()
+
+    rows = attrs.get("rows") or []
+    total = int(attrs.get("total_count") if attrs.get("total_count") is not None else len(rows))
+    if len(rows) < total:
+        bodies = (
+            coverage_request_bodies(request_body, total)
+            if definition.coverage_replay
+            else [full_roster_request(request_body, total)]
+        )
+        rows = []
+        for body in bodies:
+            replay = await context.request.post(
+                api_url,
+                headers={"Accept": "application/vnd.api+json", "Content-Type": "application/vnd.api+json"},
+                data=json.dumps(body),
+                timeout=FULL_ROSTER_TIMEOUT_MS,
+            )
+            if not replay.ok:
+                raise RuntimeError(f"Pike13 {spec.key} replay failed: HTTP {replay.status}")
+            replay_attrs = (await replay.json()).get("data", {}).get("attributes", {})
+            replay_fields = [f.get("name") if isinstance(f, dict) else f for f in replay_attrs.get("fields") or []]
+            if replay_fields != names:
+                raise RuntimeError(f"Pike13 field order changed while replaying {spec.key}")
+            rows.extend(replay_attrs.get("rows") or [])
+    result = ReportResult(spec, names, rows, total)
+    captured_count = len(result.records()) if definition.dedupe_field else len(rows)
+    if captured_count != total:
+        raise RuntimeError(f"Partial Pike13 {spec.key}: captured {captured_count} of {total}")
+    return result
+
+
+async def run_school(
+    context, specs: list[ReportSpec], max_tabs: int = DEFAULT_MAX_TABS
+) -> dict[str, ReportResult | Exception]:
+    """All of one school's reports concurrently, in at most ``max_tabs`` tabs of ``context``.
+
+    A report that fails maps to its exception so the school's other reports still come back.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_tabs))
+
+    async def bounded(spec: ReportSpec) -> ReportResult:
+        async with semaphore:
+            return await fetch_report(context, spec)
+
+    results = await asyncio.gather(*(bounded(spec) for spec in specs), return_exceptions=True)
+    return {spec.key: result for spec, result in zip(specs, results)}
+
+
+async def run_bundle(
+    specs: list[ReportSpec],
+    authenticate,
+    max_tabs: int = DEFAULT_MAX_TABS,
+    on_school: Callable[[str, dict[str, ReportResult | Exception]], None] | None = None,
+) -> dict[str, ReportResult | Exception]:
+    """Authenticate once per school (schools in turn, so MFA codes never cross) and run its reports.
+
+    ``on_school`` sees each school's results as soon as its tab group finishes, so they can be
+    stored before the next school logs in; a failed login maps every report of that school to the error.
+    """
+    results: dict[str, ReportResult | Exception] = {}
+    for school in dict.fromkeys(spec.school for spec in specs):
+        school_specs = [s for s in specs if s.school == school]
+        try:
+            context = await authenticate(school)
+        except Exception as exc:
+            school_results = {spec.key: exc for spec in school_specs}
+        else:
+            try:
+                school_results = await run_school(context, school_specs, max_tabs)
+            finally:
+                await context.close()
+        results.update(school_results)
+        if on_school is not None:
+            on_school(school, school_results)
+    return results
+
+
+def store_results(
+    db_path: Path,
+    results: Iterable[ReportResult],
+    scraped_at: str,
+    models_dir: Path = MODELS_DIR,
+) -> dict[str, str]:
+    """Hand each result to the writer its single-report scraper uses; returns a summary per spec."""
+    results = list(results)
+    summary: dict[str, str] = {}
+    holds: dict[str, dict[str, list[dict[str, Any]]]] = {}
+    conn = sqlite3.connect(str(db_path))
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA busy_timeout=30000")
+    try:
+        for result in results:
+            spec = result.spec
+            records = result.records()
+            if spec.report == "current_members":
+                changes = store_current_members(db_path, spec.school, SCHOOLS[spec.school], scraped_at, records)
+                summary[spec.key] = f"{len(records)} members; {changes['versions_added']} new versions"
+            elif spec.report in ("active_holds", "recent_holds"):
+                holds.setdefault(spec.school, {}).setdefault(spec.report, []).extend(records)
+                summary[spec.key] = f"{len(records)} hold rows"
+            elif spec.report == "late_cancels":
+                ensure_late_cancel_schema(conn)
+                stored = ingest_late_cancel_records(conn, spec.school, scraped_at, records)
+                with conn:
+                    record_run(conn, spec.school, spec.start_date, spec.end_date, scraped_at, result.total_count)
+                summary[spec.key] = f"{result.total_count} captured; {stored} unique events"
+            else:
+                from scripts.extract_pike13_memberships import store_snapshot as store_member_rows
+
+                store_member_rows(conn, spec.school, {"rows": result.rows}, spec.report, scraped_at[:10])
+                summary[spec.key] = f"{len(result.rows)} rows"
+    finally:
+        conn.close()
+    for school, reports in holds.items():
+        records = combine_hold_records(
+            reports.get("active_holds", []), reports.get("recent_holds", []), school, scraped_at[:10]
+        )
+        models_dir.mkdir(exist_ok=True)
+        out_path = models_dir / f"pike13_holds_{school}.json"
+        out_path.write_text(json.dumps(records, indent=2, sort_keys=True) + "\n")
+        summary[f"{school}/holds"] = f"{len(records)} hold records -> {out_path}"
+    return summary
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--school", action="append", choices=SCHOOLS)
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date.today())
+    parser.add_argument(
+        "--late-cancel-start",
+        type=date.fromisoformat,
+        help="Start of the late-cancel window (default: 59 days before --as-of)",
+    )
+    parser.add_argument(
+        "--spec",
+        action="append",
+        type=ReportSpec.parse,
+        help="school:report[:start:end]; replaces the nightly set (reports: %s)" % ", ".join(REPORTS),
+    )
+    parser.add_argument("--max-tabs", type=int, default=DEFAULT_MAX_TABS)
+    args = parser.parse_args()
+
+    specs = args.spec or nightly_specs(args.as_of, args.school or SCHOOLS, args.late_cancel_start)
+    scraped_at = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+    async with async_playwright() as playwright:
+
+        async def authenticate(school: str):
+            print(f"Authenticating {SCHOOLS[school]} ({school})")
+            return await pike13_auto_auth.authenticate_pike13(
+                playwright, school_subdomain=school, headless=True, verbose=False
+            )
+
+        failures: dict[str, Exception] = {}
+
+        def store_school(school: str, school_results: dict[str, ReportResult | Exception]) -> None:
+            done = [result for result in school_results.values() if isinstance(result, ReportResult)]
+            failures.update((key, result) for key, result in school_results.items() if isinstance(result, Exception))
+            for key, line in store_results(args.db, done, scraped_at).items():
+                print(f"  {key}: {line}")
+
+        await run_bundle(specs, authenticate, max_tabs=args.max_tabs, on_school=store_school)
+    for key, exc in failures.items():
+        print(f"  {key}: FAILED {exc}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
@@ -41,6 +41,7 @@ load_env()
 sys.path.insert(0, str(ROOT))
 from playwright.async_api import async_playwright  # noqa: E402
 import pike13_auto_auth  # noqa: E402
+from notesreminder.lib.member_history import record_roster  # noqa: E402
 
 
 def rows_to_records(field_names: list[str], rows: list[list[Any]]) -> list[dict[str, Any]]:
@@ -103,8 +104,12 @@ def store_snapshot(
     school_name: str,
     scraped_at: str,
     records: list[dict[str, Any]],
-) -> None:
-    """Atomically replace one school's snapshot for this scrape timestamp."""
+) -> dict[str, int]:
+    """Atomically apply one school's roster scrape to the membership history.
+
+    Only members whose attributes changed since the previous scrape get a new
+    version; see ``notesreminder.lib.member_history``.
+    """
     if not records:
         raise ValueError(f"Refusing to store empty roster for {school_slug}")
     person_ids = [str(r.get("person_id") or "").strip() for r in records]
@@ -113,100 +118,49 @@ def store_snapshot(
     if len(set(person_ids)) != len(person_ids):
         raise ValueError(f"Roster for {school_slug} contains duplicate person_id values")
 
+    def as_int(value: Any) -> int | None:
+        if value in (None, ""):
+            return None
+        if value in (True, "t", "true", "True"):
+            return 1
+        if value in (False, "f", "false", "False"):
+            return 0
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    members = [
+        {
+            "person_id": str(r["person_id"]),
+            "full_name": str(r.get("full_name") or "").strip(),
+            "person_state": r.get("person_state"),
+            "current_plans": r.get("current_plans"),
+            "current_plan_types": r.get("current_plan_types"),
+            "revenue_categories": r.get("current_plan_revenue_category"),
+            "client_since_date": r.get("client_since_date"),
+            "last_visit_date": r.get("last_visit_date"),
+            "completed_visits": as_int(r.get("completed_visits")),
+            "future_visits": as_int(r.get("future_visits")),
+            "has_membership": as_int(r.get("has_membership")) or 0,
+            "has_plan_on_hold": as_int(r.get("has_plan_on_hold")),
+            "primary_staff_name": r.get("primary_staff_name"),
+            "account_manager_names": r.get("account_manager_names"),
+            "account_manager_emails": r.get("account_manager_emails"),
+            "account_manager_phones": r.get("account_manager_phones"),
+            "guardian_name": r.get("guardian_name"),
+            "guardian_email": r.get("guardian_email"),
+            "raw_json": r,
+        }
+        for r in records
+    ]
+
     conn = sqlite3.connect(str(db_path))
     try:
         conn.execute("PRAGMA journal_mode=WAL")
         conn.execute("PRAGMA busy_timeout=30000")
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS pike13_current_member_snapshots (
-                school_slug TEXT NOT NULL,
-                school_name TEXT NOT NULL,
-                scraped_at TEXT NOT NULL,
-                snapshot_date TEXT NOT NULL,
-                person_id TEXT NOT NULL,
-                full_name TEXT NOT NULL,
-                person_state TEXT,
-                current_plans TEXT,
-                current_plan_types TEXT,
-                revenue_categories TEXT,
-                client_since_date TEXT,
-                last_visit_date TEXT,
-                days_since_last_visit INTEGER,
-                completed_visits INTEGER,
-                future_visits INTEGER,
-                has_membership INTEGER NOT NULL,
-                has_plan_on_hold INTEGER,
-                primary_staff_name TEXT,
-                account_manager_names TEXT,
-                account_manager_emails TEXT,
-                account_manager_phones TEXT,
-                guardian_name TEXT,
-                guardian_email TEXT,
-                raw_json TEXT NOT NULL,
-                PRIMARY KEY (school_slug, scraped_at, person_id)
-            )
-            """
-        )
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_pcm_latest "
-            "ON pike13_current_member_snapshots(school_slug, scraped_at)"
-        )
-        snapshot_date = scraped_at[:10]
         with conn:
-            for r in records:
-                def as_int(value: Any) -> int | None:
-                    if value in (None, ""):
-                        return None
-                    if value in (True, "t", "true", "True"):
-                        return 1
-                    if value in (False, "f", "false", "False"):
-                        return 0
-                    try:
-                        return int(value)
-                    except (TypeError, ValueError):
-                        return None
-
-                conn.execute(
-                    """
-                    INSERT OR REPLACE INTO pike13_current_member_snapshots (
-                        school_slug, school_name, scraped_at, snapshot_date,
-                        person_id, full_name, person_state, current_plans,
-                        current_plan_types, revenue_categories, client_since_date,
-                        last_visit_date, days_since_last_visit, completed_visits,
-                        future_visits, has_membership, has_plan_on_hold,
-                        primary_staff_name, account_manager_names,
-                        account_manager_emails, account_manager_phones,
-                        guardian_name, guardian_email, raw_json
-                    ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-                    """,
-                    (
-                        school_slug,
-                        school_name,
-                        scraped_at,
-                        snapshot_date,
-                        str(r["person_id"]),
-                        str(r.get("full_name") or "").strip(),
-                        r.get("person_state"),
-                        r.get("current_plans"),
-                        r.get("current_plan_types"),
-                        r.get("current_plan_revenue_category"),
-                        r.get("client_since_date"),
-                        r.get("last_visit_date"),
-                        as_int(r.get("days_since_last_visit")),
-                        as_int(r.get("completed_visits")),
-                        as_int(r.get("future_visits")),
-                        as_int(r.get("has_membership")) or 0,
-                        as_int(r.get("has_plan_on_hold")),
-                        r.get("primary_staff_name"),
-                        r.get("account_manager_names"),
-                        r.get("account_manager_emails"),
-                        r.get("account_manager_phones"),
-                        r.get("guardian_name"),
-                        r.get("guardian_email"),
-                        json.dumps(r, ensure_ascii=True, default=str),
-                    ),
-                )
+            return record_roster(conn, school_slug, school_name, scraped_at, members)
     finally:
         conn.close()
 
@@ -177,6 +177,21 @@ def normalize_record(row: dict[str, Any], slug: str, scraped_at: str) -> dict[st
     }
 
 
+def combine_hold_records(
+    active_rows: list[dict[str, Any]],
+    recent_rows: list[dict[str, Any]],
+    slug: str,
+    scraped_at: str,
+) -> list[dict[str, Any]]:
+    """Normalize active and recently ended hold rows, keeping one record per hold."""
+    combined: dict[tuple[str, str, str, bool], dict[str, Any]] = {}
+    for row in active_rows + recent_rows:
+        record = normalize_record(row, slug, scraped_at)
+        key = (record["client"].lower(), record["plan"].lower(), record["hold_end"], record["on_hold"])
+        combined[key] = record
+    return list(combined.values())
+
+
 async def scrape_holds(slug: str, as_of: date) -> list[dict[str, Any]]:
     async with async_playwright() as playwright:
         context: BrowserContext = await pike13_auto_auth.authenticate_pike13(
@@ -202,13 +217,7 @@ async def scrape_holds(slug: str, as_of: date) -> list[dict[str, Any]]:
         finally:
             await context.close()
 
-    scraped_at = date.today().isoformat()
-    combined: dict[tuple[str, str, str, bool], dict[str, Any]] = {}
-    for row in active_rows + recent_rows:
-        record = normalize_record(row, slug, scraped_at)
-        key = (record["client"].lower(), record["plan"].lower(), record["hold_end"], record["on_hold"])
-        combined[key] = record
-    records = list(combined.values())
+    records = combine_hold_records(active_rows, recent_rows, slug, date.today().isoformat())
     active_count = sum(1 for row in records if row["on_hold"])
     recent_count = sum(1 for row in records if not row["on_hold"] and row["hold_end"])
     print(
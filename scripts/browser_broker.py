@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Keep one warm, authenticated Chromium per SSO profile for the extractors.
+
+Run one broker per profile, e.g.:
+  python scripts/browser_broker.py --profile browser_profiles/sor_shared --port 9333 \
+      --probe-url https://westu-sor.pike13.com/today \
+      --storage-state browser_profiles/sor_shared_storage.json
+
+Extractors that use notesreminder.lib.browser_broker.open_profile_context lease
+isolated contexts from it instead of launching their own browser.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from notesreminder.lib.browser_broker import (  # noqa: E402
+    DEFAULT_HEALTH_INTERVAL_SECONDS,
+    DEFAULT_PORT,
+    BrowserBroker,
+)
+from okta_auth.auth_trigger import classify_url  # noqa: E402
+from okta_auth.session_state import set_session_ready, shared_profile_path  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared long-lived browser session broker.")
+    parser.add_argument("--profile", default="browser_profiles/sor_shared", help="Persistent browser profile dir")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Localhost CDP port")
+    parser.add_argument("--probe-url", help="Authenticated URL used for health checks")
+    parser.add_argument("--storage-state", help="storage_state JSON used to re-seed cookies on re-auth")
+    parser.add_argument("--interval", type=float, default=DEFAULT_HEALTH_INTERVAL_SECONDS)
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    parser.add_argument("--once", action="store_true", help="Run one health check and exit")
+    args = parser.parse_args()
+
+    if Path(args.profile).resolve() == shared_profile_path():
+
+        def on_auth_change(status):
+            # Keep the warm-session flag honest for scrapers and the Telegram flow.
+            if status in {"authenticated", "needs_login", "blocked"}:
+                set_session_ready(status == "authenticated")
+
+    else:
+        on_auth_change = None
+
+    broker = BrowserBroker(
+        args.profile,
+        port=args.port,
+        probe_url=args.probe_url,
+        classify=classify_url,
+        storage_state_path=args.storage_state,
+        on_auth_change=on_auth_change,
+        headless=not args.headed,
+    )
+    record = broker.start()
+    print(json.dumps(record, indent=2, sort_keys=True))
+    if args.once:
+        broker.stop()
+        return 0 if record["status"] == "ready" else 2
+    broker.serve_forever(args.interval)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
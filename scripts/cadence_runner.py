@@ -6,7 +6,7 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
-from notesreminder.orchestration.cadence import run_cadence, write_metadata  # noqa: E402
+from notesreminder.orchestration.cadence import DEFAULT_MAX_WORKERS, run_cadence, write_metadata  # noqa: E402
 
 
 DEFAULT_OUTPUT_DIR = "outputs/progress/cadence_runs"
@@ -26,6 +26,12 @@ def main():
         action="store_true",
         help="Simulate an expired MFA/browser session and verify actionable failure metadata.",
     )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+        help="Read-only report tasks to run concurrently once the DB-mutating step is done.",
+    )
     parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR)
     args = parser.parse_args()
 
@@ -35,6 +41,7 @@ def main():
         execute_shadow=args.execute_shadow,
         execute_production=args.execute_production,
         simulate_expired_auth=args.simulate_expired_auth,
+        max_workers=args.max_workers,
     )
     output_path = Path(args.output_dir) / f"cadence_{metadata['run_date']}_{metadata['status']}.json"
     write_metadata(metadata, output_path)
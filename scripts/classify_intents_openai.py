@@ -1,12 +1,17 @@
 import argparse
 import json
+import os
 import sqlite3
-import time
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 
 from dotenv import load_dotenv
-from openai import OpenAI
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from notesreminder.lib.llm_gateway import LLMRequest, parse_json_content, run_completions  # noqa: E402
 
 
 load_dotenv()
@@ -50,7 +55,8 @@ def parse_args():
     parser.add_argument("--db", default="reminders.db")
     parser.add_argument("--limit", type=int, default=100)
     parser.add_argument("--model", default="gpt-4o-mini")
-    parser.add_argument("--sleep", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=4, help="Requests in flight at once.")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore cached responses for identical prompts")
     parser.add_argument("--run-id", default=datetime.now(timezone.utc).isoformat(timespec="seconds"))
     parser.add_argument("--version", default="v2-direction-school-context")
     parser.add_argument("--force", action="store_true", help="Reclassify even if intent_bucket_ai is set")
@@ -86,20 +92,8 @@ def build_payload(row):
     }
 
 
-def parse_json(text):
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        start = text.find("{")
-        end = text.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            return json.loads(text[start : end + 1])
-        raise
-
-
 def main():
     args = parse_args()
-    client = OpenAI()
     log_path = Path(args.log_file)
     log_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -134,62 +128,69 @@ def main():
             print("No transcripts to classify.")
             return
 
-        for row in rows:
-            payload = build_payload(row)
-            retries = 3
-            while True:
-                try:
-                    response = client.responses.create(
-                        model=args.model,
-                        input=[
-                            {"role": "system", "content": SYSTEM_PROMPT},
-                            {"role": "user", "content": json.dumps(payload, ensure_ascii=True)},
-                        ],
-                        temperature=0,
-                    )
-                    text = response.output_text
-                    data = parse_json(text)
-                    bucket = data.get("bucket", "Unknown / Unclear")
-                    confidence = data.get("confidence", "low")
-                    reason = data.get("reason", "")
-                    if bucket not in BUCKETS:
-                        bucket = "Unknown / Unclear"
-                    conn.execute(
-                        """
-                        UPDATE recording_transcripts
-                        SET intent_bucket_ai = ?,
-                            intent_bucket_ai_confidence = ?,
-                            intent_bucket_ai_reason = ?,
-                            intent_bucket_ai_run_id = ?,
-                            intent_bucket_ai_version = ?,
-                            intent_bucket_ai_updated_at = ?
-                        WHERE call_id = ?
-                        """,
-                        (
-                            bucket,
-                            confidence,
-                            reason,
-                            args.run_id,
-                            args.version,
-                            datetime.now(timezone.utc).isoformat(timespec="seconds"),
-                            row["call_id"],
-                        ),
+        requests = [
+            LLMRequest.chat(
+                SYSTEM_PROMPT,
+                json.dumps(build_payload(row), ensure_ascii=True),
+                model=args.model,
+                json_mode=True,
+                key=row["call_id"],
+            )
+            for row in rows
+        ]
+        responses, summary = run_completions(
+            requests,
+            api_key=os.environ.get("OPENAI_API_KEY", ""),
+            caller="classify_intents_openai",
+            max_concurrency=args.concurrency,
+            use_cache=not args.no_cache,
+        )
+        for response in responses:
+            call_id = response.request.key
+            try:
+                if not response.ok:
+                    raise RuntimeError(response.error)
+                data = parse_json_content(response.content)
+            except (RuntimeError, ValueError) as exc:
+                with log_path.open("a", encoding="utf-8") as f:
+                    f.write(
+                        f"{datetime.now(timezone.utc).isoformat(timespec='seconds')} "
+                        f"call_id={call_id} error={exc}\n"
                     )
-                    conn.commit()
-                    print(f"{row['call_id']} -> {bucket} ({confidence})")
-                    break
-                except Exception as exc:
-                    with log_path.open("a", encoding="utf-8") as f:
-                        f.write(
-                            f"{datetime.now(timezone.utc).isoformat(timespec='seconds')} "
-                            f"call_id={row['call_id']} error={exc}\n"
-                        )
-                    retries -= 1
-                    if retries < 0:
-                        print(f"{row['call_id']} failed after retries: {exc}")
-                        break
-                    time.sleep(2)
-            time.sleep(args.sleep)
+                print(f"{call_id} failed after {response.attempts} attempts: {exc}")
+                continue
+            bucket = data.get("bucket", "Unknown / Unclear")
+            confidence = data.get("confidence", "low")
+            reason = data.get("reason", "")
+            if bucket not in BUCKETS:
+                bucket = "Unknown / Unclear"
+            conn.execute(
+                """
+                UPDATE recording_transcripts
+                SET intent_bucket_ai = ?,
+                    intent_bucket_ai_confidence = ?,
+                    intent_bucket_ai_reason = ?,
+                    intent_bucket_ai_run_id = ?,
+                    intent_bucket_ai_version = ?,
+                    intent_bucket_ai_updated_at = ?
+                WHERE call_id = ?
+                """,
+                (
+                    bucket,
+                    confidence,
+                    reason,
+                    args.run_id,
+                    args.version,
+                    datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    call_id,
+                ),
+            )
+            conn.commit()
+            print(f"{call_id} -> {bucket} ({confidence})")
+        print(
+            f"{summary['requests']} requests, {summary['cache_hits']} cached, {summary['errors']} errors, "
+            f"${summary['cost_usd']:.4f}, p50/p90 {summary['latency_p50_ms']}/{summary['latency_p90_ms']} ms"
+        )
     finally:
         conn.close()
 
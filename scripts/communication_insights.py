@@ -29,6 +29,8 @@ def main():
     parser.add_argument("--model", default=DEFAULT_MODEL)
     parser.add_argument("--prompt-version", default=PROMPT_VERSION)
     parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--force", action="store_true", help="Re-analyze events whose stored insight is unchanged.")
+    parser.add_argument("--workers", type=int, default=1, help="Analyze each batch in this many processes.")
     parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR)
     parser.add_argument("--prefix", default="communication_insights")
     parser.add_argument("--print", action="store_true", dest="print_output")
@@ -46,6 +48,8 @@ def main():
             model=args.model,
             prompt_version=args.prompt_version,
             dry_run=args.dry_run,
+            force=args.force,
+            max_workers=args.workers,
         )
         if not args.dry_run:
             conn.commit()
@@ -23,6 +23,7 @@ from lead_followup_schema import (  # noqa: E402
     start_import_run,
     utc_now_iso,
 )
+from notesreminder.lib.browser_broker import open_profile_context  # noqa: E402
 from scripts.extract_dialpad_voice import (  # noqa: E402
     HISTORY_URLS,
     PHONE_RE,
@@ -655,12 +656,12 @@ def launch_browser_context(playwright, profile_dir, headless=False, chrome_chann
     if chrome_channel:
         kwargs["channel"] = "chrome"
     try:
-        return playwright.chromium.launch_persistent_context(str(profile_dir), **kwargs)
+        return open_profile_context(playwright, profile_dir, **kwargs)
     except Exception:
         if not chrome_channel:
             raise
         fallback_kwargs = {"headless": headless}
-        return playwright.chromium.launch_persistent_context(str(profile_dir), **fallback_kwargs)
+        return open_profile_context(playwright, profile_dir, **fallback_kwargs)
 
 
 def run_route_discovery(db_path, profile_dir, school, interactive_login, headless, chrome_channel):
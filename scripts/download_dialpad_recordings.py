@@ -1,13 +1,10 @@
 #!/usr/bin/env python3
 import argparse
-import hashlib
 import json
-import re
 import sqlite3
 import sys
 from pathlib import Path
 
-from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from playwright.sync_api import sync_playwright
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -19,6 +16,13 @@ from lead_followup_schema import (  # noqa: E402
     start_import_run,
     utc_now_iso,
 )
+from notesreminder.transcription.recording_downloads import (  # noqa: E402
+    DEFAULT_MAX_WORKERS,
+    RecordingJob,
+    authenticated_client,
+    download_recordings,
+    known_recording_by_hash,
+)
 from scripts.extract_dialpad_voice import (  # noqa: E402
     conversation_history_row_from_dom,
     upsert_voice_event,
@@ -33,21 +37,6 @@ DEFAULT_OUTPUT_DIR = "outputs/lead_intelligence/dialpad_recordings"
 CONVERSATION_HISTORY_URL = "https://dialpad.com/conversationhistory"
 
 
-def file_sha256(path):
-    digest = hashlib.sha256()
-    with open(path, "rb") as handle:
-        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
-            digest.update(chunk)
-    return digest.hexdigest()
-
-
-def safe_extension(filename):
-    suffix = Path(filename or "").suffix.lower()
-    if suffix and re.fullmatch(r"\.[a-z0-9]{2,5}", suffix):
-        return suffix
-    return ".mp3"
-
-
 def row_duration(parsed):
     try:
         metadata = json.loads(parsed.get("raw_json") or "{}")
@@ -178,19 +167,75 @@ def ensure_transcription_pending(conn, call_id, recording_url, duration):
     )
 
 
-def click_download_for_row(page, dom_index):
-    row_locator = page.locator("table tr").nth(dom_index + 1)
-    buttons = row_locator.locator("button")
-    if buttons.count() == 0:
-        raise RuntimeError("No row action button found.")
-    row_locator.scroll_into_view_if_needed(timeout=10000)
-    buttons.last.click(timeout=10000, force=True)
-    menu_item = page.get_by_text(re.compile(r"Download recordings?", re.IGNORECASE))
-    if menu_item.count() == 0:
-        raise RuntimeError("Download recordings menu item was not visible.")
-    with page.expect_download(timeout=30000) as download_info:
-        menu_item.first.click(timeout=10000)
-    return download_info.value
+def is_recording_url(url):
+    """A direct recording link, as opposed to the call review page that only embeds the player."""
+    value = (url or "").lower()
+    return value.startswith("http") and "callhistory/callreview" not in value and (
+        "recording" in value or "download" in value
+    )
+
+
+def dom_recording_url(dom_row):
+    return next((link["href"] for link in dom_row.get("links") or [] if is_recording_url(link.get("href"))), None)
+
+
+def recording_urls_from_payload(payload, found=None):
+    """Map call ids to recording URLs anywhere in a Dialpad JSON response."""
+    found = {} if found is None else found
+    if isinstance(payload, list):
+        for item in payload:
+            recording_urls_from_payload(item, found)
+    elif isinstance(payload, dict):
+        call_id = payload.get("call_id") or payload.get("id")
+        urls = payload.get("recording_url") or payload.get("recording_urls") or [
+            detail.get("url") for detail in payload.get("recording_details") or [] if isinstance(detail, dict)
+        ]
+        urls = [urls] if isinstance(urls, str) else urls
+        url = next((url for url in urls or [] if isinstance(url, str) and url.startswith("http")), None)
+        if call_id and url:
+            found.setdefault(str(call_id), url)
+        for value in payload.values():
+            if isinstance(value, (dict, list)):
+                recording_urls_from_payload(value, found)
+    return found
+
+
+def stored_recording_urls(conn, call_ids):
+    """Recording URLs already known from the Dialpad call export or earlier voice extracts."""
+    call_ids = [str(call_id) for call_id in call_ids if call_id]
+    if not call_ids:
+        return {}
+    placeholders = ",".join("?" for _ in call_ids)
+    sources = (
+        ("dialpad_recordings", "recording_url"),
+        ("call_logs", "recording_url"),
+        ("dialpad_voice_events", "recording_url"),
+    )
+    found = {}
+    for table, column in sources:
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone():
+            continue
+        for call_id, url in conn.execute(
+            f"SELECT call_id, {column} FROM {table} WHERE call_id IN ({placeholders}) AND {column} LIKE 'http%'",
+            call_ids,
+        ):
+            if "callhistory/callreview" not in url:
+                found.setdefault(str(call_id), url)
+    return found
+
+
+def capture_recording_responses(page, found):
+    """Collect recording URLs from the JSON the Conversation History page loads."""
+
+    def on_response(response):
+        if "dialpad.com" not in response.url or "json" not in (response.headers.get("content-type") or ""):
+            return
+        try:
+            recording_urls_from_payload(response.json(), found)
+        except Exception:
+            pass  # Non-JSON or already-disposed bodies carry no recordings.
+
+    page.on("response", on_response)
 
 
 def download_visible_recordings(args):
@@ -212,14 +257,16 @@ def download_visible_recordings(args):
     rows_seen = rows_inserted = rows_updated = 0
     failures = []
     try:
+        jobs = []
         with sync_playwright() as p:
             context = p.chromium.launch_persistent_context(
                 args.profile_dir,
                 headless=args.headless and not args.interactive_login,
-                accept_downloads=True,
                 viewport={"width": 1440, "height": 1000},
             )
             page = context.pages[0] if context.pages else context.new_page()
+            network_urls = {}
+            capture_recording_responses(page, network_urls)
             page.goto(CONVERSATION_HISTORY_URL, wait_until="domcontentloaded", timeout=60000)
             wait_until_ready(page)
             wait_for_authenticated_page(page, CONVERSATION_HISTORY_URL, args.interactive_login, args.login_timeout)
@@ -229,60 +276,59 @@ def download_visible_recordings(args):
                 if within_window(row["parsed"], args.start_date, args.end_date)
                 and has_recording_action(row["parsed"])
             ]
-            for candidate in candidates:
-                if rows_seen >= args.limit:
-                    break
-                parsed = candidate["parsed"]
-                call_id = parsed.get("call_id") or parsed["event_id"]
-                rows_seen += 1
-                upsert_voice_event(conn, parsed)
-                if existing_success(conn, call_id) and not args.force:
-                    upsert_recording_download(
-                        conn,
-                        recording_row(parsed, call_id, "skipped_existing", None, None, None, None, None),
-                    )
-                    rows_updated += 1
-                    conn.commit()
-                    continue
-                if args.dry_run:
-                    upsert_recording_download(
-                        conn,
-                        recording_row(parsed, call_id, "dry_run", None, None, None, None, None),
-                    )
-                    rows_inserted += 1
-                    conn.commit()
-                    continue
-                try:
-                    download = click_download_for_row(page, candidate["dom_index"])
-                    extension = safe_extension(download.suggested_filename)
-                    destination = output_dir / f"{call_id}{extension}"
-                    download.save_as(str(destination))
-                    file_hash = file_sha256(destination)
-                    size = destination.stat().st_size
-                    recording_url = download.url
-                    upsert_recording_download(
-                        conn,
-                        recording_row(
-                            parsed,
-                            call_id,
-                            "success",
-                            recording_url,
-                            str(destination),
-                            file_hash,
-                            size,
-                            None,
-                        ),
-                    )
-                    ensure_transcription_pending(conn, call_id, recording_url, row_duration(parsed))
+            cookies = context.cookies()
+            user_agent = page.evaluate("navigator.userAgent")
+            context.close()
+
+        # Phase 1: resolve recording URLs from what the page already loaded; nothing is clicked per row.
+        stored_urls = stored_recording_urls(conn, [row["parsed"].get("call_id") for row in candidates])
+        for candidate in candidates:
+            if rows_seen >= args.limit:
+                break
+            parsed = candidate["parsed"]
+            call_id = parsed.get("call_id") or parsed["event_id"]
+            rows_seen += 1
+            upsert_voice_event(conn, parsed)
+            if existing_success(conn, call_id) and not args.force:
+                upsert_recording_download(
+                    conn,
+                    recording_row(parsed, call_id, "skipped_existing", None, None, None, None, None),
+                )
+                rows_updated += 1
+                conn.commit()
+                continue
+            if args.dry_run:
+                upsert_recording_download(
+                    conn,
+                    recording_row(parsed, call_id, "dry_run", None, None, None, None, None),
+                )
+                rows_inserted += 1
+                conn.commit()
+                continue
+            url = (
+                network_urls.get(str(call_id))
+                or dom_recording_url(candidate["dom"])
+                or stored_urls.get(str(call_id))
+            )
+            if url:
+                jobs.append(RecordingJob(call_id, url, parsed))
+            else:
+                error = "No recording URL in the page responses, row links, or stored Dialpad exports"
+                failures.append({"call_id": call_id, "error": error})
+                upsert_recording_download(
+                    conn,
+                    recording_row(parsed, call_id, "error", None, None, None, None, error),
+                )
+            conn.commit()
+
+        # Phase 2: stream every recording concurrently over the session's cookies.
+        with authenticated_client(cookies, user_agent, args.concurrency) as client:
+            for result in download_recordings(client, jobs, output_dir, args.concurrency):
+                if record_download_result(conn, result):
                     rows_inserted += 1
-                except Exception as exc:
-                    failures.append({"call_id": call_id, "error": str(exc)[:300]})
-                    upsert_recording_download(
-                        conn,
-                        recording_row(parsed, call_id, "error", None, None, None, None, str(exc)[:300]),
-                    )
+                else:
+                    failures.append({"call_id": result.job.call_id, "error": result.error})
                 conn.commit()
-            context.close()
         finish_import_run(
             conn,
             run_id,
@@ -302,6 +348,34 @@ def download_visible_recordings(args):
     return rows_seen, rows_inserted, rows_updated, failures
 
 
+def record_download_result(conn, result):
+    """Store one finished download; identical audio already on disk is kept once and not re-queued."""
+    job = result.job
+    parsed = job.metadata
+    if not result.ok:
+        upsert_recording_download(
+            conn,
+            recording_row(parsed, job.call_id, "error", job.url, None, None, None, result.error),
+        )
+        return False
+    duplicate = known_recording_by_hash(conn, result.sha256, job.call_id)
+    if duplicate is not None:
+        result.path.unlink()
+        row = recording_row(
+            parsed, job.call_id, "duplicate", job.url, duplicate["file_path"], result.sha256, result.size, None
+        )
+        row["error_message"] = f"Same audio as {duplicate['call_id']}"
+        upsert_recording_download(conn, row)
+        return True
+    row = recording_row(
+        parsed, job.call_id, "success", job.url, str(result.path), result.sha256, result.size, None
+    )
+    row["content_type"] = result.content_type
+    upsert_recording_download(conn, row)
+    ensure_transcription_pending(conn, job.call_id, job.url, row_duration(parsed))
+    return True
+
+
 def recording_row(parsed, call_id, status, recording_url, file_path, file_hash, file_size, error):
     now = utc_now_iso()
     return {
@@ -339,6 +413,7 @@ def main():
     parser.add_argument("--login-timeout", type=int, default=300)
     parser.add_argument("--dry-run", action="store_true")
     parser.add_argument("--force", action="store_true")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_MAX_WORKERS, help="Concurrent download streams.")
     args = parser.parse_args()
 
     rows_seen, rows_inserted, rows_updated, failures = download_visible_recordings(args)
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from notesreminder.lib.analytics_snapshot import DEFAULT_KEEP, default_snapshot_dir, export_snapshot  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the Arrow snapshot read by the retention and churn reports.")
+    parser.add_argument("--db", default=str(ROOT / "reminders.db"))
+    parser.add_argument("--snapshot-dir", default="", help="Default: outputs/analytics_snapshot next to the DB")
+    parser.add_argument("--keep", type=int, default=DEFAULT_KEEP, help="Snapshot versions to keep")
+    args = parser.parse_args()
+
+    manifest = export_snapshot(args.db, args.snapshot_dir or None, keep=args.keep)
+    snapshot_dir = Path(args.snapshot_dir) if args.snapshot_dir else default_snapshot_dir(args.db)
+    print(f"Snapshot {manifest['version']} in {snapshot_dir / manifest['version']}")
+    for name, info in manifest["tables"].items():
+        print(f"  {name:<24} {info['rows']:>9} rows")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
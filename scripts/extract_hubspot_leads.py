@@ -22,6 +22,7 @@ from lead_followup_schema import (  # noqa: E402
     start_import_run,
     utc_now_iso,
 )
+from notesreminder.lib.browser_broker import open_profile_context  # noqa: E402
 from notesreminder.lib.raw_capture import write_raw_capture  # noqa: E402
 
 
@@ -681,7 +682,8 @@ def main():
     rows_seen = rows_written = 0
     try:
         with sync_playwright() as p:
-            context = p.chromium.launch_persistent_context(
+            context = open_profile_context(
+                p,
                 args.profile_dir,
                 headless=args.headless,
                 viewport={"width": 1440, "height": 1000},
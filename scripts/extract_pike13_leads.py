@@ -24,6 +24,7 @@ from lead_followup_schema import (  # noqa: E402
     start_import_run,
     utc_now_iso,
 )
+from notesreminder.lib.browser_broker import open_profile_context  # noqa: E402
 from notesreminder.lib.raw_capture import write_raw_capture  # noqa: E402
 
 
@@ -900,7 +901,7 @@ def launch_browser_context(playwright, profile_dir, headless=False, chrome_chann
     if chrome_channel:
         launch_kwargs["channel"] = "chrome"
     try:
-        return playwright.chromium.launch_persistent_context(str(profile_dir), **launch_kwargs)
+        return open_profile_context(playwright, profile_dir, **launch_kwargs)
     except Exception:
         if not chrome_channel:
             raise
@@ -908,7 +909,7 @@ def launch_browser_context(playwright, profile_dir, headless=False, chrome_chann
             "headless": headless,
             "viewport": {"width": 1440, "height": 1000},
         }
-        return playwright.chromium.launch_persistent_context(str(profile_dir), **fallback_kwargs)
+        return open_profile_context(playwright, profile_dir, **fallback_kwargs)
 
 
 def enrich_report_visit_from_event(page, visit, timeout=60000):
@@ -6,19 +6,23 @@ Scrapes 4 reports via Pike13's internal API:
   2. Leavers (last_membership_end in range)
   3. New Members (first signup in range)
   4. Late Cancellations (enrollment cancellations)
-Stores results in reminders.db under pike13_member_snapshots.
+Current members are applied to the change-only pike13_member_history (see
+notesreminder/lib/member_history.py); the other reports are stored in
+reminders.db under pike13_member_snapshots.
 """
 import asyncio, os, sys, json, re, time, argparse
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from playwright.async_api import async_playwright
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
 PROJECT_ROOT = Path.home() / "projects/hughrscott/NotesReminder"
 DB_PATH = PROJECT_ROOT / "reminders.db"
 
 # Load env
 env_path = Path.home() / ".hermes" / ".env"
-for line in open(env_path):
+for line in (open(env_path) if env_path.exists() else ()):
     if '=' in line and not line.startswith('#'):
         k, _, v = line.partition('=')
         if k.strip() in ('PIKE13_USER', 'PIKE13_PASSWORD'):
@@ -102,9 +106,11 @@ async def extract_current_members(page, school):
     # Intercept API response
     token = None
     rows = []
+    fields = []
+    total_count = None
     
     async def on_response(response):
-        nonlocal token, rows
+        nonlocal token, rows, fields, total_count
         if 'api/v3/reports/clients/queries' in response.url:
             if 'auth_token=' in response.url:
                 m = re.search(r'auth_token=([a-f0-9-]+)', response.url)
@@ -114,6 +120,8 @@ async def extract_current_members(page, school):
                 body = await response.json()
                 attrs = body.get('data', {}).get('attributes', {})
                 rows = attrs.get('rows', [])
+                fields = [f.get('name') for f in attrs.get('fields', [])]
+                total_count = attrs.get('total_count')
             except:
                 pass
     
@@ -121,7 +129,8 @@ async def extract_current_members(page, school):
     await page.reload(wait_until="domcontentloaded")
     await page.wait_for_timeout(5000)
     
-    return {"token": token, "rows": rows, "report": "current_members"}
+    return {"token": token, "rows": rows, "fields": fields, "total_count": total_count,
+            "report": "current_members"}
 
 async def extract_leavers(page, school, start_date, end_date):
     """Extract students whose membership ended in a date range."""
@@ -200,6 +209,23 @@ async def extract_late_cancels(page, school, start_date, end_date):
     
     return {"rows": rows, "report": "late_cancels"}
 
+def store_current_members(db_path, school, data, scraped_at):
+    """Apply a complete current-member roster to the membership history.
+
+    Only members that changed since the last scrape get a new row. This
+    extractor sees a single report response, and recording a partial roster
+    would close every missing member's version, so short captures are skipped;
+    scrape_pike13_current_members.py pages the full roster.
+    """
+    rows, total = data.get("rows") or [], data.get("total_count")
+    if not rows or total is None or len(rows) != int(total):
+        print(f"      roster incomplete ({len(rows)} of {total}); membership history not updated")
+        return None
+    from scrape_pike13_current_members import SCHOOLS as SCHOOL_NAMES, rows_to_records, store_snapshot as store_roster
+
+    records = rows_to_records(data.get("fields") or [], rows)
+    return store_roster(db_path, school, SCHOOL_NAMES[school], scraped_at, records)
+
 def store_snapshot(conn, school, data, report_type, scraped_at):
     """Store raw report rows in the database."""
     conn.execute("""
@@ -228,6 +254,7 @@ async def main():
     args = parser.parse_args()
     
     today = datetime.now().strftime('%Y-%m-%d')
+    scraped_at = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
     week_ago = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
     start = args.start_date or week_ago
     end = args.end_date or today
@@ -257,7 +284,9 @@ async def main():
             print("\n  [1] Current Members...")
             data = await extract_current_members(page, school)
             print(f"      {len(data['rows'])} members")
-            store_snapshot(conn, school, data, "current_members", today)
+            changes = store_current_members(DB_PATH, school, data, scraped_at)
+            if changes:
+                print(f"      {changes['versions_added']} new versions, {changes['unchanged']} unchanged")
             reports.append(data)
             
             # 2. Leavers
@@ -287,7 +316,7 @@ async def main():
     
     # Summary
     for school in SCHOOLS:
-        for report_type in ["current_members", "leavers", "new_members", "late_cancels"]:
+        for report_type in ["leavers", "new_members", "late_cancels"]:
             count = conn.execute("""
                 SELECT COUNT(*) FROM pike13_member_snapshots
                 WHERE school=? AND report_type=? AND scraped_at=?
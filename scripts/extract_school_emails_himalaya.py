@@ -6,6 +6,9 @@ Stores genuine customer communications in school_email_messages
 via the existing upsert_school_email_message from lead_followup_schema.
 
 Run: python scripts/extract_school_emails_himalaya.py [--limit 500]
+
+Prefer scripts/extract_school_emails_imap.py, which syncs over one IMAP
+connection and only fetches messages above the stored UID watermark.
 """
 import argparse, json, re, sqlite3, subprocess, sys, time
 from datetime import datetime, timezone
@@ -21,6 +24,11 @@ from lead_followup_schema import (
     utc_now_iso,
 )
 from school_email import external_email_for_message, json_email_list
+from notesreminder.extractors.school_email_imap import (
+    extract_phone_numbers,
+    should_skip,
+    strip_html,
+)
 
 # ── constants ──────────────────────────────────────────────────────────────
 SOR_ACCOUNT = "sor"
@@ -28,55 +36,6 @@ OUR_EMAIL = "huscott@schoolofrock.com"
 OUR_EMAIL_N = normalize_email(OUR_EMAIL)
 DB_PATH = ROOT / "reminders.db"
 
-# Domains/senders we skip (notifications picked up by other scrapers)
-SKIP_FROM_DOMAINS = {
-    "pike13.com", "hubspot.com", "dialpad.com",
-    "instagram.com", "mail.instagram.com", "zapier.com", "markel.com",
-    "linkedin.com", "facebookmail.com",
-}
-SKIP_SENDERS = {"no-reply@", "noreply@", "notifications@", "alert@"}
-# Subject patterns that indicate notifications (not customer comms)
-SKIP_SUBJECT_PATTERNS = [
-    r"added a note about",         # Pike13 lesson notes
-    r"booked you for",              # Pike13 booking confirmations
-    r"New Trial/Tour Booking",       # Pike13 trial bookings
-    r"New Lead - Contact -",         # HubSpot new lead
-    r"^HubSpot",                     # HubSpot generic
-    r"^Follow-Up for",               # HubSpot follow-up sequences
-    r"New login for your",           # Dialpad login notification
-    r"^Your verification code",      # 2FA codes
-    r"^Re: Update:",                 # forwarded internal threads (via Pike13)
-    r"^Re: Following Up on",         # HubSpot follow-up via forward
-    r"stories-recap",                # Instagram
-    r"recently added to their stories", # Instagram
-    r"Payment Confirmation",         # Markel/billing
-    r"held Tasks are still waiting", # Zapier alerts
-    r"unread messages.*instagram",   # Instagram
-]
-
-def should_skip(actual_from, subject):
-    """Return True if this email should be filtered out (notification/system)."""
-    from_lower = (actual_from or "").lower()
-    subj = (subject or "").lower()
-    # Domain check
-    for d in SKIP_FROM_DOMAINS:
-        if d in from_lower:
-            return True
-    # Sender prefix check
-    for s in SKIP_SENDERS:
-        if from_lower.startswith(s):
-            return True
-    # Subject pattern check
-    for pat in SKIP_SUBJECT_PATTERNS:
-        if re.search(pat, subj, re.IGNORECASE):
-            return True
-    # Internal @schoolofrock.com: allow only if it looks like personal customer comm
-    if from_lower.endswith("@schoolofrock.com"):
-        # Keep only if from huscott@ or a known staff to/from a customer
-        # Skip staff-to-staff internal threads (they usually have "Re:" + customer name)
-        pass  # For now, keep all that pass the above filters
-    return False
-
 def parse_himalaya_envelope(line):
     """Parse a himalaya envelope list line.
     Format: | ID | flags | subject | sender | date |
@@ -138,18 +97,6 @@ def read_message_body(msg_id):
     except Exception as e:
         return f"(read error: {e})"
 
-def strip_html(raw_text):
-    """Very basic HTML tag stripping for plain-text extraction."""
-    return re.sub(r'<[^>]+>', '', raw_text).strip()
-
-def extract_phone_numbers(text):
-    """Extract US phone numbers from text."""
-    phones = re.findall(
-        r'(?:\+?1[-\s.]?)?\(?\d{3}\)?[-\s.]?\d{3}[-\s.]?\d{4}',
-        text
-    )
-    return list(set(phones))
-
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--limit", type=int, default=500, help="Max envelopes to scan")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Sync school emails over IMAP into school_email_messages.
+
+Keeps one IMAP connection open for the whole run, stores the mailbox
+UIDVALIDITY/last UID in imap_sync_state, and fetches only messages above
+that watermark in batched UID FETCH commands.
+
+Run: python scripts/extract_school_emails_imap.py [--db reminders.db] [--batch-size 100]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from lead_followup_schema import (  # noqa: E402
+    ensure_lead_followup_schema,
+    finish_import_run,
+    start_import_run,
+)
+from notesreminder.extractors.school_email_imap import (  # noqa: E402
+    DEFAULT_ACCOUNT,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_IMAP_HOST,
+    DEFAULT_MAILBOX,
+    OUR_EMAIL,
+    connect_imap,
+    sync_mailbox,
+)
+
+
+load_dotenv(ROOT / ".env")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental IMAP sync of the school mailbox.")
+    parser.add_argument("--db", default=str(ROOT / "reminders.db"), help="SQLite DB path")
+    parser.add_argument("--host", default=os.getenv("SOR_IMAP_HOST", DEFAULT_IMAP_HOST))
+    parser.add_argument("--port", type=int, default=int(os.getenv("SOR_IMAP_PORT", "0")) or None)
+    parser.add_argument("--user", default=os.getenv("SOR_IMAP_USER", OUR_EMAIL))
+    parser.add_argument("--account", default=DEFAULT_ACCOUNT, help="Watermark/message-id prefix")
+    parser.add_argument("--mailbox", default=DEFAULT_MAILBOX)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--limit", type=int, help="Max new messages to fetch this run")
+    parser.add_argument("--no-ssl", action="store_true", help="Plain IMAP (local testing only)")
+    args = parser.parse_args()
+
+    password = os.getenv("SOR_IMAP_PASSWORD")
+    if not password:
+        print("SOR_IMAP_PASSWORD is not set.", file=sys.stderr)
+        return 2
+
+    conn = sqlite3.connect(args.db)
+    ensure_lead_followup_schema(conn)
+    run_id = start_import_run(conn, "school_email", Path(__file__).name, metadata={"mailbox": args.mailbox})
+    conn.commit()
+    client = None
+    try:
+        client = connect_imap(args.host, args.user, password, port=args.port, use_ssl=not args.no_ssl)
+        stats = sync_mailbox(
+            conn,
+            client,
+            account=args.account,
+            mailbox=args.mailbox,
+            batch_size=args.batch_size,
+            limit=args.limit,
+        )
+    except Exception as exc:
+        finish_import_run(conn, run_id, "failed", error=str(exc))
+        conn.commit()
+        raise
+    finally:
+        if client is not None:
+            try:
+                client.logout()
+            except Exception:
+                pass
+    finish_import_run(
+        conn,
+        run_id,
+        "success",
+        rows_seen=stats["fetched"],
+        rows_inserted=stats["stored"],
+        metadata=stats,
+    )
+    conn.commit()
+    conn.close()
+    print(
+        f"Done. {stats['new_uids']} new UIDs in {stats['batches']} batches: "
+        f"{stats['stored']} stored, {stats['skipped']} skipped (last UID {stats['end_uid']})"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
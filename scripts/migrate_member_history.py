@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from notesreminder.lib.member_history import migrate_snapshots  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay full Pike13 roster snapshots into the valid-from/valid-to membership history."
+    )
+    parser.add_argument("--db", default=str(ROOT / "reminders.db"))
+    parser.add_argument(
+        "--drop-legacy",
+        action="store_true",
+        help="Drop pike13_current_member_snapshots once every scrape in it has been replayed",
+    )
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        try:
+            result = migrate_snapshots(conn, drop_legacy=args.drop_legacy)
+        except ValueError as exc:
+            print(exc, file=sys.stderr)
+            return 1
+        history_rows = conn.execute("SELECT COUNT(*) FROM pike13_member_history").fetchone()[0]
+    finally:
+        conn.close()
+    print(f"Replayed {result['scrapes']} roster scrapes; {result['versions_added']} versions added")
+    print(f"pike13_member_history now holds {history_rows} rows")
+    if args.drop_legacy:
+        print("Dropped pike13_current_member_snapshots")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
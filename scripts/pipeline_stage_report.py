@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""CLI shim for the slowest-pipeline-stages report."""
+
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from notesreminder.reports.pipeline_stage_report import main
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -11,6 +11,7 @@ ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT))
 
 from lead_followup_schema import ensure_lead_followup_schema
+from notesreminder.schema.lead_intel_migration import sync_table
 
 
 DEFAULT_LEAD_PROOF_DB = (
@@ -64,10 +65,10 @@ def table_info(conn, schema, table):
     ).fetchall()
 
 
-def copy_table(conn, table):
+def copy_table(conn, table, incremental=False):
     if not table_exists(conn, "lead_source", table):
-        conn.execute(f"DELETE FROM {quote_identifier(table)}")
-        return {"table": table, "source_exists": False, "rows": 0}
+        deleted = conn.execute(f"DELETE FROM {quote_identifier(table)}").rowcount
+        return {"table": table, "source_exists": False, "rows": 0, "inserted": 0, "updated": 0, "deleted": deleted}
 
     dest_info = table_info(conn, "main", table)
     source_info = table_info(conn, "lead_source", table)
@@ -86,24 +87,80 @@ def copy_table(conn, table):
         )
 
     copy_columns = [column for column in dest_columns if column in source_columns]
-    column_sql = ", ".join(quote_identifier(column) for column in copy_columns)
-    conn.execute(f"DELETE FROM {quote_identifier(table)}")
-    conn.execute(
-        f"""
-        INSERT INTO {quote_identifier(table)} ({column_sql})
-        SELECT {column_sql}
-        FROM lead_source.{quote_identifier(table)}
-        """
-    )
+    if incremental and copy_columns == dest_columns:
+        changes = sync_table(conn, "lead_source", table, copy_columns)
+    else:
+        column_sql = ", ".join(quote_identifier(column) for column in copy_columns)
+        deleted = conn.execute(f"DELETE FROM {quote_identifier(table)}").rowcount
+        inserted = conn.execute(
+            f"""
+            INSERT INTO {quote_identifier(table)} ({column_sql})
+            SELECT {column_sql}
+            FROM lead_source.{quote_identifier(table)}
+            """
+        ).rowcount
+        changes = {"inserted": inserted, "updated": 0, "deleted": deleted}
     rows = conn.execute(f"SELECT COUNT(*) FROM {quote_identifier(table)}").fetchone()[0]
-    return {"table": table, "source_exists": True, "rows": rows}
+    return {"table": table, "source_exists": True, "rows": rows, **changes}
+
+
+def user_tables(conn, schema):
+    return {
+        row[0]
+        for row in conn.execute(
+            f"""
+            SELECT name
+            FROM {quote_identifier(schema)}.sqlite_master
+            WHERE type = 'table'
+              AND name NOT LIKE 'sqlite_%'
+            """
+        )
+    }
+
+
+def lead_schema_tables():
+    conn = sqlite3.connect(":memory:")
+    try:
+        ensure_lead_followup_schema(conn)
+        return user_tables(conn, "main")
+    finally:
+        conn.close()
+
+
+def incremental_blockers(conn):
+    """Reasons the existing working DB cannot be synced in place (empty when it can)."""
+    production_tables = user_tables(conn, "production") - set(LEAD_TABLES)
+    working_tables = user_tables(conn, "main")
+    blockers = [
+        f"{table}: not in working DB"
+        for table in sorted(production_tables - working_tables)
+    ]
+    blockers += [
+        f"{table}: dropped from production"
+        for table in sorted(working_tables - production_tables - set(LEAD_TABLES) - lead_schema_tables())
+    ]
+    for table in sorted(production_tables & working_tables):
+        working_columns = {row["name"] for row in table_info(conn, "main", table)}
+        missing = [row["name"] for row in table_info(conn, "production", table) if row["name"] not in working_columns]
+        if missing:
+            blockers.append(f"{table}: new production columns {', '.join(missing)}")
+    return blockers
+
+
+def sync_production_table(conn, table):
+    """Bring one production-owned table in the working DB up to date with production."""
+    production_columns = {row["name"] for row in table_info(conn, "production", table)}
+    # Columns the lead schema added to a production table keep their defaults.
+    columns = [row["name"] for row in table_info(conn, "main", table) if row["name"] in production_columns]
+    changes = sync_table(conn, "production", table, columns)
+    return {"table": table, **changes}
 
 
 def scalar(conn, sql):
     return conn.execute(sql).fetchone()[0]
 
 
-def rebuild_lead_working_db(production_db, lead_proof_db, output_db):
+def rebuild_lead_working_db(production_db, lead_proof_db, output_db, incremental=False):
     production_db = Path(production_db).expanduser().resolve()
     lead_proof_db = Path(lead_proof_db).expanduser().resolve()
     output_db = Path(output_db).expanduser().resolve()
@@ -115,6 +172,11 @@ def rebuild_lead_working_db(production_db, lead_proof_db, output_db):
     if output_db == production_db:
         raise ValueError("Output DB must not be the production reminders.db")
 
+    if incremental and output_db.exists():
+        summary = sync_lead_working_db(production_db, lead_proof_db, output_db)
+        if summary is not None:
+            return summary
+
     output_db.parent.mkdir(parents=True, exist_ok=True)
 
     with tempfile.TemporaryDirectory(prefix="lead-working-db-", dir=output_db.parent) as tmp:
@@ -144,6 +206,7 @@ def rebuild_lead_working_db(production_db, lead_proof_db, output_db):
                 raise RuntimeError(f"Integrity check failed: {integrity}")
 
             summary = {
+                "mode": "full",
                 "production_db": str(production_db),
                 "lead_source_db": str(lead_proof_db),
                 "output_db": str(output_db),
@@ -151,6 +214,7 @@ def rebuild_lead_working_db(production_db, lead_proof_db, output_db):
                 "reminders_rows": scalar(conn, "SELECT COUNT(*) FROM reminders"),
                 "latest_lesson_date": scalar(conn, "SELECT MAX(lesson_date) FROM reminders"),
                 "copied_tables": copied_tables,
+                "synced_tables": [],
             }
             conn.commit()
         finally:
@@ -162,6 +226,58 @@ def rebuild_lead_working_db(production_db, lead_proof_db, output_db):
     return summary
 
 
+def sync_lead_working_db(production_db, lead_proof_db, output_db):
+    """Apply only row-level changes to an existing working DB, in one transaction.
+
+    Production-owned tables are diffed against production and the lead tables
+    against the lead source (nothing to do when the source is the working DB
+    itself). Returns None, leaving the DB untouched, when the production
+    schema has moved on and a full rebuild is needed.
+    """
+    conn = sqlite3.connect(output_db)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute("PRAGMA foreign_keys = OFF")
+        conn.execute("ATTACH DATABASE ? AS production", (str(production_db),))
+        blockers = incremental_blockers(conn)
+        if blockers:
+            print(f"Full rebuild needed: {'; '.join(blockers)}", file=sys.stderr)
+            return None
+
+        production_tables = user_tables(conn, "production") - set(LEAD_TABLES)
+        synced_tables = [sync_production_table(conn, table) for table in sorted(production_tables)]
+        # A full rebuild creates lead-schema tables production lacks empty.
+        for table in sorted(user_tables(conn, "main") - production_tables - set(LEAD_TABLES)):
+            deleted = conn.execute(f"DELETE FROM {quote_identifier(table)}").rowcount
+            synced_tables.append({"table": table, "inserted": 0, "updated": 0, "deleted": deleted})
+        copied_tables = []
+        if lead_proof_db != output_db:
+            conn.execute("ATTACH DATABASE ? AS lead_source", (str(lead_proof_db),))
+            copied_tables = [copy_table(conn, table, incremental=True) for table in LEAD_TABLES]
+        ensure_lead_followup_schema(conn)
+        integrity = scalar(conn, "PRAGMA quick_check")
+        if integrity != "ok":
+            raise RuntimeError(f"Integrity check failed: {integrity}")
+        conn.commit()
+
+        return {
+            "mode": "incremental",
+            "production_db": str(production_db),
+            "lead_source_db": str(lead_proof_db),
+            "output_db": str(output_db),
+            "integrity": integrity,
+            "reminders_rows": scalar(conn, "SELECT COUNT(*) FROM reminders"),
+            "latest_lesson_date": scalar(conn, "SELECT MAX(lesson_date) FROM reminders"),
+            "copied_tables": copied_tables,
+            "synced_tables": synced_tables,
+        }
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
 def main():
     parser = argparse.ArgumentParser(
         description=(
@@ -172,6 +288,14 @@ def main():
     parser.add_argument("--production-db", default="reminders.db")
     parser.add_argument("--lead-proof-db", default=DEFAULT_LEAD_PROOF_DB)
     parser.add_argument("--output", default=DEFAULT_OUTPUT_DB)
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Update an existing --output in place, writing only inserted, changed and "
+            "deleted rows. Falls back to a full rebuild when the production schema changed."
+        ),
+    )
     parser.add_argument("--json", action="store_true", help="Print machine-readable JSON.")
     args = parser.parse_args()
 
@@ -179,18 +303,25 @@ def main():
         args.production_db,
         args.lead_proof_db,
         args.output,
+        incremental=args.incremental,
     )
     if args.json:
         print(json.dumps(summary, indent=2, sort_keys=True))
         return
 
-    print(f"Lead working DB: {summary['output_db']}")
+    print(f"Lead working DB: {summary['output_db']} ({summary['mode']})")
     print(f"Integrity: {summary['integrity']}")
     print(f"Reminders: {summary['reminders_rows']}")
     print(f"Latest lesson date: {summary['latest_lesson_date']}")
+    for table in summary["synced_tables"]:
+        if table["inserted"] or table["updated"] or table["deleted"]:
+            print(f"{table['table']}: +{table['inserted']} ~{table['updated']} -{table['deleted']}")
     for table in summary["copied_tables"]:
         status = "copied" if table["source_exists"] else "missing source"
-        print(f"{table['table']}: {table['rows']} rows ({status})")
+        print(
+            f"{table['table']}: {table['rows']} rows ({status}; "
+            f"+{table['inserted']} ~{table['updated']} -{table['deleted']})"
+        )
 
 
 if __name__ == "__main__":
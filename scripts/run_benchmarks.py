@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from notesreminder.benchmarks.suite import (  # noqa: E402
+    BENCHMARKS,
+    DEFAULT_MIN_DELTA_SECONDS,
+    DEFAULT_REPEAT,
+    DEFAULT_SCALES,
+    DEFAULT_TOLERANCE,
+    compare_to_baseline,
+    load_results,
+    render_comparison,
+    results_to_json,
+    run_suite,
+)
+from notesreminder.benchmarks.synthetic_db import DEFAULT_ANCHOR, DEFAULT_SEED  # noqa: E402
+
+
+DEFAULT_OUTPUT_DIR = "outputs/benchmarks"
+
+
+def parse_scales(value):
+    return [float(item) for item in value.split(",") if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline hot paths on seeded synthetic databases.")
+    parser.add_argument("--scales", type=parse_scales, default=list(DEFAULT_SCALES), help="Comma-separated volume multipliers (default: 1,10,100)")
+    parser.add_argument("--benchmarks", default="", help="Comma-separated benchmark names (default: all)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument(
+        "--anchor",
+        type=date.fromisoformat,
+        default=DEFAULT_ANCHOR,
+        help=f"Date the synthetic data is laid out around (default: {DEFAULT_ANCHOR.isoformat()})",
+    )
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--db-dir", default="", help="Where generated databases are cached (default: <output-dir>/db)")
+    parser.add_argument("--baseline", default="", help="Baseline results JSON (default: <output-dir>/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed median slowdown, as a fraction")
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA_SECONDS, help="Ignore slowdowns smaller than this many seconds")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 when any benchmark regressed")
+    parser.add_argument("--list", action="store_true", help="List benchmarks and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for benchmark in BENCHMARKS:
+            print(f"{benchmark.name:<35} {benchmark.description}")
+        return
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    baseline_path = Path(args.baseline) if args.baseline else output_dir / "baseline.json"
+    results = run_suite(
+        scales=args.scales,
+        names=[name.strip() for name in args.benchmarks.split(",") if name.strip()] or None,
+        repeat=args.repeat,
+        db_dir=args.db_dir or output_dir / "db",
+        seed=args.seed,
+        anchor=args.anchor,
+        progress=print,
+    )
+    latest_path = output_dir / "latest.json"
+    latest_path.write_text(results_to_json(results) + "\n")
+    print(f"Wrote {latest_path}")
+
+    regressed = []
+    if baseline_path.exists():
+        rows = compare_to_baseline(results, load_results(baseline_path), args.tolerance, args.min_delta)
+        print()
+        print(render_comparison(rows))
+        regressed = [row["key"] for row in rows if row["status"] == "regressed"]
+        if regressed:
+            print(f"\nRegressed vs {baseline_path}: {', '.join(regressed)}")
+    if args.save_baseline or not baseline_path.exists():
+        baseline_path.write_text(results_to_json(results) + "\n")
+        print(f"Wrote baseline {baseline_path}")
+    if regressed and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
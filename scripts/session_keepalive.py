@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Keep the shared Pike13/Okta session warm so scheduled runs start authenticated.
+
+Run alongside (or instead of) the browser broker, e.g.:
+  python scripts/session_keepalive.py --interval 1200
+  python scripts/session_keepalive.py --once --print
+
+Every pass probes Pike13 (both schools), Dialpad and HubSpot with one cheap
+authenticated request each, saves the refreshed storage_state, re-logs Pike13
+in before its cookies expire, and writes liveness/TTL to the status file that
+the pike13_cookie_status MCP tool reports.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from notesreminder.lib.browser_broker import async_open_profile_context, load_storage_cookies  # noqa: E402
+from notesreminder.lib.session_keepalive import (  # noqa: E402
+    DEFAULT_INTERVAL_SECONDS,
+    DEFAULT_MIN_REFRESH_INTERVAL_SECONDS,
+    DEFAULT_REFRESH_BEFORE_SECONDS,
+    DEFAULT_STATUS_PATH,
+    DEFAULT_STORAGE_STATE,
+    SITES,
+    apply_refresh,
+    keepalive_pass,
+    record_pass_error,
+    run_refresh_command,
+    status_summary,
+)
+from okta_auth.session_state import set_session_ready, shared_profile_path  # noqa: E402
+
+
+async def run_pass(args) -> dict:
+    from playwright.async_api import async_playwright
+
+    on_okta_status = set_session_ready if Path(args.profile).resolve() == shared_profile_path() else None
+    sites = [site for site in SITES if not args.sites or site.name in args.sites]
+    async with async_playwright() as playwright:
+        context = await async_open_profile_context(
+            playwright,
+            args.profile,
+            headless=True,
+            args=["--disable-dev-shm-usage"],
+        )
+        try:
+            cookies = load_storage_cookies(args.storage_state)
+            if cookies:
+                await context.add_cookies(cookies)
+            status = await keepalive_pass(
+                context,
+                sites=sites,
+                storage_state_path=args.storage_state,
+                status_path=args.status_file,
+                refresh_before_seconds=int(args.refresh_before_hours * 3600),
+                on_okta_status=on_okta_status,
+                interval_seconds=args.interval,
+            )
+        finally:
+            await context.close()
+    # The refresh opens the same profile, so it runs only after our context is closed.
+    command = [sys.executable, str(ROOT / "refresh_pike13_session.py")]
+    return apply_refresh(
+        status,
+        status_path=args.status_file,
+        refresh=lambda: run_refresh_command(command),
+        min_refresh_interval_seconds=int(args.min_refresh_interval_hours * 3600),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Proactive Pike13/Okta session keep-alive.")
+    parser.add_argument("--profile", default="browser_profiles/sor_shared", help="Persistent browser profile dir")
+    parser.add_argument("--storage-state", default=str(DEFAULT_STORAGE_STATE), help="storage_state JSON to seed from and refresh")
+    parser.add_argument("--status-file", default=str(DEFAULT_STATUS_PATH))
+    parser.add_argument("--sites", nargs="*", choices=[site.name for site in SITES], help="Probe only these sites")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL_SECONDS, help="Seconds between passes")
+    parser.add_argument("--refresh-before-hours", type=float, default=DEFAULT_REFRESH_BEFORE_SECONDS / 3600)
+    parser.add_argument("--min-refresh-interval-hours", type=float, default=DEFAULT_MIN_REFRESH_INTERVAL_SECONDS / 3600)
+    parser.add_argument("--once", action="store_true", help="Run one pass and exit")
+    parser.add_argument("--print", action="store_true", dest="print_output", help="Print each pass summary")
+    args = parser.parse_args()
+
+    while True:
+        try:
+            status = asyncio.run(run_pass(args))
+        except Exception as exc:
+            # A locked profile or failed lease must not end the service; report it and try again.
+            print(f"Keep-alive pass failed: {exc}", file=sys.stderr)
+            status = record_pass_error(exc, args.status_file, interval_seconds=args.interval)
+        summary = status_summary(status)
+        if args.print_output or args.once:
+            print(json.dumps(summary, indent=2, sort_keys=True))
+        if args.once:
+            return 0 if all(site["live"] for site in summary["sites"].values()) else 2
+        try:
+            time.sleep(args.interval)
+        except KeyboardInterrupt:
+            return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,6 +5,7 @@ set -euo pipefail
 # 1) Scrape + update reminders.db (and sync to S3)
 # 2) Import Dialpad + Pike13 client data
 # 3) Generate call reports
+# 4) Refresh the analytics snapshot read by the retention/churn reports
 
 if [ ! -f .env ]; then
   echo "Missing .env. Copy .env.example to .env and fill in credentials." >&2
@@ -35,3 +36,8 @@ fi
 
 # Step 3: generate reports (requires reminders.db)
 "$PYTHON_BIN" generate_call_reports.py --db "${DB_PATH:-reminders.db}"
+
+# Step 4: columnar snapshot for retention/churn reports (skipped without pyarrow)
+if "$PYTHON_BIN" -c "import pyarrow" >/dev/null 2>&1; then
+  "$PYTHON_BIN" scripts/export_analytics_snapshot.py --db "${DB_PATH:-reminders.db}"
+fi
@@ -1,9 +1,11 @@
 import argparse
 import difflib
+import hashlib
 import json
 import sqlite3
 import re
 from datetime import datetime, timedelta, timezone
+from uuid import uuid4
 from lead_followup_schema import ensure_lead_followup_schema, upsert_identity_match
 from lead_gap_analysis import build_gap_report
 
@@ -11,6 +13,10 @@ from lead_gap_analysis import build_gap_report
 DEFAULT_WINDOW_DAYS = 7
 DEFAULT_PIKE13_LOOKAHEAD_DAYS = 30
 STALE_RUNNING_RUN_HOURS = 6
+# Import-run staleness is judged against the clock, so cached sections still expire.
+DEFAULT_SECTION_CACHE_MAX_AGE_MINUTES = 60
+SCHEMA_STATE_KEY = "__schema__"
+CHANGE_TIMESTAMP_COLUMNS = ("updated_at", "imported_at", "last_seen_at", "finished_at", "created_at")
 SCHOOL_ALIASES = {
     "west university place": {"west university place", "west u", "westu"},
     "west u": {"west university place", "west u", "westu"},
@@ -117,71 +123,104 @@ def status_for(required_rates, blockers=None, min_ready=80.0, min_partial=40.0):
     return "blocked"
 
 
-def field_coverage(conn, table, fields, where_sql="1=1", params=None):
-    total = count(conn, f"SELECT COUNT(*) FROM {table} WHERE {where_sql}", params)
-    coverage = {}
-    for field in fields:
-        filled = count(
-            conn,
-            f"""
-            SELECT COUNT(*)
-            FROM {table}
-            WHERE {where_sql}
-              AND {field} IS NOT NULL
-              AND CAST({field} AS TEXT) != ''
-            """,
-            params,
+def filled_condition(field):
+    return f"{field} IS NOT NULL AND CAST({field} AS TEXT) != ''"
+
+
+def valid_date_condition(field):
+    return f"""
+        {filled_condition(field)}
+        AND (
+            date({field}) IS NOT NULL
+            OR CAST({field} AS TEXT) GLOB '[0-9][0-9]/[0-9][0-9]/[0-9][0-9][0-9][0-9]'
+            OR CAST({field} AS TEXT) GLOB '[0-9]/[0-9][0-9]/[0-9][0-9][0-9][0-9]'
+            OR CAST({field} AS TEXT) GLOB '[0-9][0-9]/[0-9]/[0-9][0-9][0-9][0-9]'
+            OR CAST({field} AS TEXT) GLOB '[0-9]/[0-9]/[0-9][0-9][0-9][0-9]'
+            OR CAST({field} AS TEXT) GLOB '[A-Z][a-z][a-z] [0-9], [0-9][0-9][0-9][0-9]*'
+            OR CAST({field} AS TEXT) GLOB '[A-Z][a-z][a-z] [0-9][0-9], [0-9][0-9][0-9][0-9]*'
         )
-        coverage[field] = {
-            "filled": filled,
-            "total": total,
-            "fill_rate": percent(filled, total),
-        }
+    """
+
+
+def profile_table(
+    conn,
+    table,
+    fields=(),
+    date_fields=(),
+    value_fields=None,
+    where_sql="1=1",
+    params=None,
+    conditions=None,
+):
+    """Fill, valid-date and allowed-value counts for many columns in one scan of ``table``.
+
+    ``conditions`` maps names to extra SQL predicates counted in the same scan.
+    """
+    value_fields = value_fields or {}
+    conditions = conditions or {}
+    query_params = dict(params or {})
+    columns = ["COUNT(*)"]
+    columns += [f"SUM(CASE WHEN {filled_condition(field)} THEN 1 ELSE 0 END)" for field in fields]
+    columns += [f"SUM(CASE WHEN {valid_date_condition(field)} THEN 1 ELSE 0 END)" for field in date_fields]
+    for i, (field, values) in enumerate(value_fields.items()):
+        placeholders = []
+        for j, value in enumerate(values):
+            query_params[f"profile_value_{i}_{j}"] = value
+            placeholders.append(f":profile_value_{i}_{j}")
+        columns.append(
+            f"SUM(CASE WHEN LOWER(COALESCE({field}, '')) IN ({', '.join(placeholders)}) THEN 1 ELSE 0 END)"
+        )
+    columns += [f"SUM(CASE WHEN ({condition}) THEN 1 ELSE 0 END)" for condition in conditions.values()]
+    row = conn.execute(
+        f"SELECT {', '.join(columns)} FROM {table} WHERE {where_sql}",
+        query_params,
+    ).fetchone()
+    counts = iter([value or 0 for value in row])
+    total = next(counts)
+    return {
+        "total": total,
+        "filled": {field: next(counts) for field in fields},
+        "valid_dates": {field: next(counts) for field in date_fields},
+        "values": {field: next(counts) for field in value_fields},
+        "conditions": {name: next(counts) for name in conditions},
+    }
+
+
+def coverage_entry(filled, total):
+    return {"filled": filled, "total": total, "fill_rate": percent(filled, total)}
+
+
+def table_coverage(conn, table, fields, date_fields=(), value_fields=None, where_sql="1=1", params=None):
+    """Single-scan replacement for field_coverage plus per-field date/value coverage overrides.
+
+    Date and value fields report valid-date and allowed-value rates instead of
+    plain fill rates, exactly as the separate helpers did.
+    """
+    return coverage_from_profile(profile_table(conn, table, fields, date_fields, value_fields, where_sql, params))
+
+
+def coverage_from_profile(profile):
+    total = profile["total"]
+    coverage = {field: coverage_entry(filled, total) for field, filled in profile["filled"].items()}
+    for field, filled in profile["valid_dates"].items():
+        coverage[field] = coverage_entry(filled, total)
+    for field, filled in profile["values"].items():
+        coverage[field] = coverage_entry(filled, total)
     return total, coverage
 
 
+def field_coverage(conn, table, fields, where_sql="1=1", params=None):
+    return table_coverage(conn, table, fields, where_sql=where_sql, params=params)
+
+
 def valid_date_coverage(conn, table, field, where_sql="1=1", params=None):
-    total = count(conn, f"SELECT COUNT(*) FROM {table} WHERE {where_sql}", params)
-    filled = count(
-        conn,
-        f"""
-        SELECT COUNT(*)
-        FROM {table}
-        WHERE {where_sql}
-          AND {field} IS NOT NULL
-          AND CAST({field} AS TEXT) != ''
-          AND (
-              date({field}) IS NOT NULL
-              OR CAST({field} AS TEXT) GLOB '[0-9][0-9]/[0-9][0-9]/[0-9][0-9][0-9][0-9]'
-              OR CAST({field} AS TEXT) GLOB '[0-9]/[0-9][0-9]/[0-9][0-9][0-9][0-9]'
-              OR CAST({field} AS TEXT) GLOB '[0-9][0-9]/[0-9]/[0-9][0-9][0-9][0-9]'
-              OR CAST({field} AS TEXT) GLOB '[0-9]/[0-9]/[0-9][0-9][0-9][0-9]'
-              OR CAST({field} AS TEXT) GLOB '[A-Z][a-z][a-z] [0-9], [0-9][0-9][0-9][0-9]*'
-              OR CAST({field} AS TEXT) GLOB '[A-Z][a-z][a-z] [0-9][0-9], [0-9][0-9][0-9][0-9]*'
-          )
-        """,
-        params,
-    )
-    return {"filled": filled, "total": total, "fill_rate": percent(filled, total)}
+    profile = profile_table(conn, table, date_fields=(field,), where_sql=where_sql, params=params)
+    return coverage_entry(profile["valid_dates"][field], profile["total"])
 
 
 def value_coverage(conn, table, field, values, where_sql="1=1", params=None):
-    total = count(conn, f"SELECT COUNT(*) FROM {table} WHERE {where_sql}", params)
-    placeholders = ", ".join(f":value_{i}" for i, _ in enumerate(values))
-    query_params = dict(params or {})
-    for i, value in enumerate(values):
-        query_params[f"value_{i}"] = value
-    filled = count(
-        conn,
-        f"""
-        SELECT COUNT(*)
-        FROM {table}
-        WHERE {where_sql}
-          AND LOWER(COALESCE({field}, '')) IN ({placeholders})
-        """,
-        query_params,
-    )
-    return {"filled": filled, "total": total, "fill_rate": percent(filled, total)}
+    profile = profile_table(conn, table, value_fields={field: values}, where_sql=where_sql, params=params)
+    return coverage_entry(profile["values"][field], profile["total"])
 
 
 def json_value_counts(conn, table, json_field, json_path, where_sql="1=1", params=None):
@@ -744,7 +783,7 @@ def dialpad_daily_intake_summary(conn, window_start):
 
 
 def hubspot_section(conn, window_start):
-    total, coverage = field_coverage(
+    profile = profile_table(
         conn,
         "hubspot_deals",
         [
@@ -759,21 +798,19 @@ def hubspot_section(conn, window_start):
             "source_url",
             "raw_text",
         ],
+        date_fields=("create_date", "last_activity_date", "last_contacted"),
+        params={"window_start": window_start},
+        conditions={
+            "recent": """
+                date(create_date) >= date(:window_start)
+                OR date(last_activity_date) >= date(:window_start)
+                OR date(last_contacted) >= date(:window_start)
+                OR date(updated_at) >= date(:window_start)
+            """,
+        },
     )
-    for field in ("create_date", "last_activity_date", "last_contacted"):
-        coverage[field] = valid_date_coverage(conn, "hubspot_deals", field)
-    recent = count(
-        conn,
-        """
-        SELECT COUNT(*)
-        FROM hubspot_deals
-        WHERE date(create_date) >= date(:window_start)
-           OR date(last_activity_date) >= date(:window_start)
-           OR date(last_contacted) >= date(:window_start)
-           OR date(updated_at) >= date(:window_start)
-        """,
-        {"window_start": window_start},
-    )
+    total, coverage = coverage_from_profile(profile)
+    recent = profile["conditions"]["recent"]
     required_rates = [
         coverage["deal_id"]["fill_rate"],
         coverage["deal_name"]["fill_rate"],
@@ -817,50 +854,38 @@ def hubspot_section(conn, window_start):
 
 
 def dialpad_section(conn, window_start):
-    sms_total, sms_coverage = field_coverage(
+    sms_profile = profile_table(
         conn,
         "dialpad_sms_messages",
         ["message_id", "thread_id", "message_at", "direction", "body", "source_url", "raw_text"],
+        date_fields=("message_at",),
+        value_fields={"direction": ("inbound", "outbound")},
+        params={"window_start": window_start},
+        conditions={
+            "recent": "date(COALESCE(message_at, updated_at)) >= date(:window_start)",
+            "future": "date(message_at) > date('now')",
+            "inferred_direction": "COALESCE(json_extract(raw_json, '$.direction_source'), '') = 'inferred'",
+        },
     )
-    sms_coverage["message_at"] = valid_date_coverage(conn, "dialpad_sms_messages", "message_at")
-    sms_coverage["direction"] = value_coverage(
-        conn,
-        "dialpad_sms_messages",
-        "direction",
-        ("inbound", "outbound"),
-    )
-    voice_total, voice_coverage = field_coverage(
+    sms_total, sms_coverage = coverage_from_profile(sms_profile)
+    voice_profile = profile_table(
         conn,
         "vw_dialpad_communications",
         ["communication_id", "event_at", "direction", "phone_normalized", "source_url"],
-        "channel = 'call'",
-    )
-    voice_coverage["event_at"] = valid_date_coverage(conn, "vw_dialpad_communications", "event_at", "channel = 'call'")
-    voice_coverage["direction"] = value_coverage(
-        conn,
-        "vw_dialpad_communications",
-        "direction",
-        ("inbound", "outbound"),
-        "channel = 'call'",
-    )
-    recent_sms = count(
-        conn,
-        "SELECT COUNT(*) FROM dialpad_sms_messages WHERE date(COALESCE(message_at, updated_at)) >= date(:window_start)",
-        {"window_start": window_start},
-    )
-    recent_voice = count(
-        conn,
-        "SELECT COUNT(*) FROM vw_dialpad_communications WHERE channel = 'call' AND date(event_at) >= date(:window_start)",
-        {"window_start": window_start},
-    )
-    future_sms = count(
-        conn,
-        "SELECT COUNT(*) FROM dialpad_sms_messages WHERE date(message_at) > date('now')",
-    )
-    future_voice = count(
-        conn,
-        "SELECT COUNT(*) FROM vw_dialpad_communications WHERE channel = 'call' AND date(event_at) > date('now')",
+        date_fields=("event_at",),
+        value_fields={"direction": ("inbound", "outbound")},
+        where_sql="channel = 'call'",
+        params={"window_start": window_start},
+        conditions={
+            "recent": "date(event_at) >= date(:window_start)",
+            "future": "date(event_at) > date('now')",
+        },
     )
+    voice_total, voice_coverage = coverage_from_profile(voice_profile)
+    recent_sms = sms_profile["conditions"]["recent"]
+    recent_voice = voice_profile["conditions"]["recent"]
+    future_sms = sms_profile["conditions"]["future"]
+    future_voice = voice_profile["conditions"]["future"]
     sms_extraction_sources = json_value_counts(
         conn,
         "dialpad_sms_messages",
@@ -873,14 +898,7 @@ def dialpad_section(conn, window_start):
         "raw_json",
         "$.direction_source",
     )
-    sms_inferred_direction_rows = count(
-        conn,
-        """
-        SELECT COUNT(*)
-        FROM dialpad_sms_messages
-        WHERE COALESCE(json_extract(raw_json, '$.direction_source'), '') = 'inferred'
-        """,
-    )
+    sms_inferred_direction_rows = sms_profile["conditions"]["inferred_direction"]
     voice_source_id_status = json_value_counts(
         conn,
         "dialpad_voice_events",
@@ -1213,12 +1231,12 @@ def pike13_section(conn, window_start, lookahead_end):
                 lesson_visit_metrics["lesson_visit_rows"],
             ),
         }
-    people_total, people_coverage = field_coverage(
+    people_total, people_coverage = table_coverage(
         conn,
         "pike13_people",
         ["person_id", "full_name", "email_normalized", "phone_normalized", "membership_state", "source_url", "raw_text"],
     )
-    visits_total, visits_coverage = field_coverage(
+    visits_total, visits_coverage = table_coverage(
         conn,
         "pike13_visits",
         [
@@ -1231,15 +1249,14 @@ def pike13_section(conn, window_start, lookahead_end):
             "source_url",
             "raw_text",
         ],
+        date_fields=("starts_at",),
     )
-    visits_coverage["starts_at"] = valid_date_coverage(conn, "pike13_visits", "starts_at")
-    plans_total, plans_coverage = field_coverage(
+    plans_total, plans_coverage = table_coverage(
         conn,
         "pike13_plans_passes",
         ["plan_pass_id", "person_id", "name", "status", "starts_at", "ends_at", "source_url", "raw_text"],
+        date_fields=("starts_at", "ends_at"),
     )
-    plans_coverage["starts_at"] = valid_date_coverage(conn, "pike13_plans_passes", "starts_at")
-    plans_coverage["ends_at"] = valid_date_coverage(conn, "pike13_plans_passes", "ends_at")
     recent_visits = count(
         conn,
         """
@@ -1503,13 +1520,236 @@ def lead_gap_section(conn):
     }
 
 
-def build_source_completeness_report(conn, window_days=DEFAULT_WINDOW_DAYS, pike13_lookahead_days=DEFAULT_PIKE13_LOOKAHEAD_DAYS):
+def ensure_source_completeness_history_schema(conn):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS source_completeness_section_cache (
+            section TEXT NOT NULL,
+            params_json TEXT NOT NULL,
+            input_state_json TEXT NOT NULL,
+            result_json TEXT NOT NULL,
+            computed_at TEXT NOT NULL,
+            PRIMARY KEY (section, params_json)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS source_completeness_history (
+            run_id TEXT NOT NULL,
+            recorded_at TEXT NOT NULL,
+            window_start TEXT NOT NULL,
+            window_end TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            value REAL,
+            text_value TEXT,
+            PRIMARY KEY (run_id, metric)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_source_completeness_history_metric
+        ON source_completeness_history(metric, recorded_at)
+        """
+    )
+
+
+def quote_identifier(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def table_state(conn, table):
+    """Row count, max rowid and max change timestamp used to detect that a table changed."""
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({quote_identifier(table)})").fetchall()}
+    if not columns:
+        return None
+    stamp = next((column for column in CHANGE_TIMESTAMP_COLUMNS if column in columns), None)
+    stamp_sql = f"MAX({quote_identifier(stamp)})" if stamp else "NULL"
+    try:
+        row = conn.execute(f"SELECT COUNT(*), MAX(rowid), {stamp_sql} FROM {quote_identifier(table)}").fetchone()
+    except sqlite3.OperationalError:
+        # WITHOUT ROWID tables have no rowid to compare.
+        row = conn.execute(f"SELECT COUNT(*), NULL, {stamp_sql} FROM {quote_identifier(table)}").fetchone()
+    return [row[0], row[1], row[2]]
+
+
+def input_state(conn, tables):
+    state = {table: table_state(conn, table) for table in sorted(tables)}
+    # Hash of the schema text rather than PRAGMA schema_version, which moves every time
+    # ensure_lead_followup_schema recreates its views.
+    schema = conn.execute("SELECT type, name, sql FROM sqlite_master ORDER BY type, name").fetchall()
+    state[SCHEMA_STATE_KEY] = hashlib.sha256(json.dumps([list(row) for row in schema]).encode()).hexdigest()
+    return state
+
+
+class SectionCache:
+    """Reuse a report section while the tables it read are unchanged.
+
+    The tables a section reads are recorded with a SQLite authorizer while it
+    runs, so the cache never needs a hand-maintained list of inputs. Views are
+    expanded to their underlying tables by SQLite itself.
+    """
+
+    def __init__(self, conn, max_age_minutes=DEFAULT_SECTION_CACHE_MAX_AGE_MINUTES, now=None):
+        self.conn = conn
+        self.now = now or utc_now()
+        self.oldest_reusable = (self.now - timedelta(minutes=max_age_minutes)).isoformat()
+        self.recomputed = []
+        self.reused = []
+        ensure_source_completeness_history_schema(conn)
+
+    def section(self, name, params, compute):
+        params_json = json.dumps(params, sort_keys=True, default=str)
+        cached = self.conn.execute(
+            """
+            SELECT input_state_json, result_json, computed_at
+            FROM source_completeness_section_cache
+            WHERE section = ? AND params_json = ?
+            """,
+            (name, params_json),
+        ).fetchone()
+        if cached and cached[2] >= self.oldest_reusable:
+            stored_state = json.loads(cached[0])
+            tables = [table for table in stored_state if table != SCHEMA_STATE_KEY]
+            if input_state(self.conn, tables) == stored_state:
+                self.reused.append(name)
+                return json.loads(cached[1])
+
+        tables = set()
+
+        def record_reads(action, table, column, database, trigger):
+            if action == sqlite3.SQLITE_READ and table and not table.startswith("sqlite_"):
+                tables.add(table)
+            return sqlite3.SQLITE_OK
+
+        self.conn.set_authorizer(record_reads)
+        try:
+            result = compute()
+        finally:
+            self.conn.set_authorizer(None)
+        # Taken after the run so sections that write (identity matches) see their own writes as current.
+        self.conn.execute(
+            """
+            INSERT OR REPLACE INTO source_completeness_section_cache
+            (section, params_json, input_state_json, result_json, computed_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (
+                name,
+                params_json,
+                json.dumps(input_state(self.conn, tables), default=str),
+                json.dumps(result, default=str),
+                self.now.isoformat(),
+            ),
+        )
+        self.recomputed.append(name)
+        return result
+
+
+class UncachedSections:
+    def section(self, name, params, compute):
+        return compute()
+
+
+def flatten_metrics(value, prefix=""):
+    """Numeric and status leaves of a report as (metric, value, text_value) rows."""
+    if isinstance(value, dict):
+        for key, child in value.items():
+            yield from flatten_metrics(child, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(value, bool):
+        yield prefix, int(value), None
+    elif isinstance(value, (int, float)):
+        yield prefix, value, None
+    elif isinstance(value, str) and prefix.rsplit(".", 1)[-1].endswith("status"):
+        yield prefix, None, value
+
+
+def record_source_completeness_history(conn, report, run_id=None):
+    ensure_source_completeness_history_schema(conn)
+    run_id = run_id or f"completeness_{uuid4().hex[:12]}"
+    recorded_at = utc_now().isoformat()
+    metrics = {key: value for key, value in report.items() if key not in ("window", "cache")}
+    rows = [
+        (run_id, recorded_at, report["window"]["start"], report["window"]["end"], metric, value, text_value)
+        for metric, value, text_value in flatten_metrics(metrics)
+    ]
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO source_completeness_history
+        (run_id, recorded_at, window_start, window_end, metric, value, text_value)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+    return run_id
+
+
+def source_completeness_trend(conn, metric, limit=30):
+    """Most recent recorded values for ``metric`` (GLOB patterns allowed), oldest first."""
+    ensure_source_completeness_history_schema(conn)
+    rows = conn.execute(
+        """
+        SELECT run_id, recorded_at, window_start, window_end, metric, value, text_value
+        FROM source_completeness_history
+        WHERE metric GLOB ?
+        ORDER BY recorded_at DESC, rowid DESC
+        LIMIT ?
+        """,
+        (metric, max(1, limit)),
+    ).fetchall()
+    return [
+        {
+            "run_id": row[0],
+            "recorded_at": row[1],
+            "window_start": row[2],
+            "window_end": row[3],
+            "metric": row[4],
+            "value": row[5],
+            "text_value": row[6],
+        }
+        for row in reversed(rows)
+    ]
+
+
+def build_source_completeness_report(
+    conn,
+    window_days=DEFAULT_WINDOW_DAYS,
+    pike13_lookahead_days=DEFAULT_PIKE13_LOOKAHEAD_DAYS,
+    incremental=False,
+    record_history=False,
+):
+    """Build the completeness report.
+
+    With ``incremental`` each section is reused from ``source_completeness_section_cache``
+    while its input tables are unchanged; with ``record_history`` the run's metrics are
+    appended to ``source_completeness_history``.
+    """
     ensure_lead_followup_schema(conn)
     conn.row_factory = sqlite3.Row
     now = utc_now()
     window_start = iso_date_days_ago(window_days, now)
     window_end = now.date().isoformat()
     lookahead_end = iso_date_days_ahead(pike13_lookahead_days, now)
+    sections = SectionCache(conn, now=now) if incremental else UncachedSections()
+    day = {"window_end": window_end}
+    sources = {
+        "hubspot": sections.section(
+            "hubspot", {**day, "window_start": window_start}, lambda: hubspot_section(conn, window_start)
+        ),
+        "dialpad": sections.section(
+            "dialpad", {**day, "window_start": window_start}, lambda: dialpad_section(conn, window_start)
+        ),
+        "pike13": sections.section(
+            "pike13",
+            {**day, "window_start": window_start, "lookahead_end": lookahead_end},
+            lambda: pike13_section(conn, window_start, lookahead_end),
+        ),
+    }
+    matching = sections.section("matching", day, lambda: matching_section(conn))
+    upstream_digest = hashlib.sha256(
+        json.dumps([sources, matching], sort_keys=True, default=str).encode()
+    ).hexdigest()
     report = {
         "window": {
             "days": window_days,
@@ -1518,15 +1758,15 @@ def build_source_completeness_report(conn, window_days=DEFAULT_WINDOW_DAYS, pike
             "pike13_lookahead_days": pike13_lookahead_days,
             "pike13_lookahead_end": lookahead_end,
         },
-        "sources": {
-            "hubspot": hubspot_section(conn, window_start),
-            "dialpad": dialpad_section(conn, window_start),
-            "pike13": pike13_section(conn, window_start, lookahead_end),
-        },
-        "matching": matching_section(conn),
+        "sources": sources,
+        "matching": matching,
     }
-    report["first_value"] = first_value_section(conn, report["sources"], report["matching"], window_start)
-    report["lead_gap"] = lead_gap_section(conn)
+    report["first_value"] = sections.section(
+        "first_value",
+        {**day, "window_start": window_start, "upstream": upstream_digest},
+        lambda: first_value_section(conn, sources, matching, window_start),
+    )
+    report["lead_gap"] = sections.section("lead_gap", day, lambda: lead_gap_section(conn))
     statuses = [source["status"] for source in report["sources"].values()]
     if any(status == "blocked" for status in statuses):
         overall = "blocked"
@@ -1535,6 +1775,10 @@ def build_source_completeness_report(conn, window_days=DEFAULT_WINDOW_DAYS, pike
     else:
         overall = "ready"
     report["overall_status"] = overall
+    if incremental:
+        report["cache"] = {"recomputed": sections.recomputed, "reused": sections.reused}
+    if record_history:
+        report["history_run_id"] = record_source_completeness_history(conn, report)
     return report
 
 
@@ -1544,12 +1788,25 @@ def main():
     parser.add_argument("--window-days", type=int, default=DEFAULT_WINDOW_DAYS)
     parser.add_argument("--pike13-lookahead-days", type=int, default=DEFAULT_PIKE13_LOOKAHEAD_DAYS)
     parser.add_argument("--pretty", action="store_true")
+    parser.add_argument("--full", action="store_true", help="Recompute every section instead of reusing unchanged ones.")
+    parser.add_argument("--no-history", action="store_true", help="Do not append this run to source_completeness_history.")
+    parser.add_argument("--trend", help="Print recorded values for a metric (GLOB pattern) instead of running the report.")
+    parser.add_argument("--trend-limit", type=int, default=30)
     args = parser.parse_args()
 
     conn = sqlite3.connect(args.db)
     conn.row_factory = sqlite3.Row
     try:
-        report = build_source_completeness_report(conn, args.window_days, args.pike13_lookahead_days)
+        if args.trend:
+            report = source_completeness_trend(conn, args.trend, args.trend_limit)
+        else:
+            report = build_source_completeness_report(
+                conn,
+                args.window_days,
+                args.pike13_lookahead_days,
+                incremental=not args.full,
+                record_history=not args.no_history,
+            )
         conn.commit()
     finally:
         conn.close()
@@ -0,0 +1,109 @@
+import re
+import sqlite3
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+from notesreminder.benchmarks.synthetic_db import generate_synthetic_db
+from notesreminder.lib.analytics_snapshot import (
+    HAS_PYARROW,
+    SNAPSHOT_TABLES,
+    db_version,
+    export_snapshot,
+    iter_rows,
+    load_frames,
+    read_table,
+    snapshot_is_current,
+)
+
+
+class AnalyticsSnapshotTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.template = Path(cls._tmp.name) / "template.db"
+        generate_synthetic_db(cls.template, scale=0.02, seed=5, anchor=date(2026, 5, 11))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._tmp.cleanup()
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db = Path(tmp.name) / "reminders.db"
+        self.db.write_bytes(self.template.read_bytes())
+        self.snapshot_dir = Path(tmp.name) / "snapshot"
+
+    def test_student_lessons_match_the_legacy_split(self):
+        with sqlite3.connect(self.db) as conn:
+            lessons = pd.read_sql_query(
+                "SELECT lesson_id, students_raw FROM lessons WHERE students_raw IS NOT NULL AND students_raw != ''", conn
+            )
+            students = read_table(conn, "student_lessons")
+
+        expected = sorted(
+            (lesson_id, name.strip())
+            for lesson_id, raw in zip(lessons["lesson_id"], lessons["students_raw"])
+            for name in re.split(r",\s*", str(raw))
+            if name.strip()
+        )
+        self.assertEqual(sorted(zip(students["lesson_id"], students["student_name"])), expected)
+        self.assertTrue((students["student_key"] == students["student_name"].str.lower()).all())
+        self.assertNotIn("notes_text", students.columns)
+
+    def test_phone_keys_are_digits_only(self):
+        with sqlite3.connect(self.db) as conn:
+            conn.execute("UPDATE pike13_people SET phone = '(713) 555-0100', phone_normalized = NULL WHERE rowid = 1")
+            people = read_table(conn, "pike13_people")
+
+        first = people.iloc[0]
+        self.assertEqual((first["phone_key"], first["phone_normalized_key"]), ("7135550100", ""))
+        self.assertNotIn("raw_json", people.columns)
+
+    def test_iter_rows_yields_none_for_missing_values(self):
+        frame = pd.DataFrame({"name": ["Ada", None], "score": [1.5, float("nan")]})
+        self.assertEqual(list(iter_rows(frame, ["name", "score"])), [("Ada", 1.5), (None, None)])
+
+    def test_version_changes_when_notes_are_edited_in_place(self):
+        with sqlite3.connect(self.db) as conn:
+            before = db_version(conn)
+            self.assertEqual(db_version(conn), before)
+            conn.execute("UPDATE lesson_notes SET note_score = COALESCE(note_score, 0) + 1 WHERE rowid = 1")
+            self.assertNotEqual(db_version(conn), before)
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow not installed")
+    def test_snapshot_round_trips_and_goes_stale_when_the_db_changes(self):
+        self.assertFalse(snapshot_is_current(self.db, self.snapshot_dir))
+        manifest = export_snapshot(self.db, self.snapshot_dir)
+
+        self.assertTrue(snapshot_is_current(self.db, self.snapshot_dir))
+        self.assertEqual(set(manifest["tables"]), set(SNAPSHOT_TABLES))
+        from_snapshot = load_frames(self.db, SNAPSHOT_TABLES, self.snapshot_dir)
+        with sqlite3.connect(self.db) as conn:
+            for name in SNAPSHOT_TABLES:
+                pd.testing.assert_frame_equal(from_snapshot[name], read_table(conn, name), check_dtype=False, obj=name)
+            conn.execute("DELETE FROM lesson_notes WHERE rowid = 1")
+
+        self.assertFalse(snapshot_is_current(self.db, self.snapshot_dir))
+        self.assertEqual(len(load_frames(self.db, ["lesson_notes"], self.snapshot_dir)["lesson_notes"]), manifest["tables"]["lesson_notes"]["rows"] - 1)
+
+        second = export_snapshot(self.db, self.snapshot_dir, keep=1)
+        self.assertNotEqual(second["version"], manifest["version"])
+        self.assertEqual([path.name for path in self.snapshot_dir.iterdir()], [second["version"]])
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow not installed")
+    def test_mixed_type_columns_are_stored_as_text(self):
+        with sqlite3.connect(self.db) as conn:
+            conn.execute("""UPDATE pike13_clients SET "Phone" = 7135550100 WHERE rowid = 1""")
+
+        export_snapshot(self.db, self.snapshot_dir)
+        clients = load_frames(self.db, ["pike13_clients"], self.snapshot_dir)["pike13_clients"]
+        self.assertEqual(clients.iloc[0]["Phone"], "7135550100")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from notesreminder.orchestration.backfill_scheduler import (
+    ChunkSpec,
+    connect_state,
+    import_progress_json,
+    register_chunks,
+    run_scheduler,
+    throughput,
+)
+
+
+def spec(key, source, site, priority=0, start="2026-01-01"):
+    return ChunkSpec(key=key, source=source, school=None, start=start, end="2026-01-31", site=site, priority=priority)
+
+
+class BackfillSchedulerTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.state_db = Path(tmp.name) / "backfill_state.db"
+
+    def test_runs_sites_concurrently_but_caps_each_site(self):
+        lock = threading.Lock()
+        active = {}
+        peak = {}
+        peak_total = []
+
+        def run_chunk(chunk):
+            with lock:
+                active[chunk.site] = active.get(chunk.site, 0) + 1
+                peak[chunk.site] = max(peak.get(chunk.site, 0), active[chunk.site])
+                peak_total.append(sum(active.values()))
+            time.sleep(0.05)
+            with lock:
+                active[chunk.site] -= 1
+            return {"verdict": "PASS", "rc": 0, "before": 10, "after": 25}
+
+        specs = [
+            spec("pike13:westu-sor:2026-01-01", "pike13", "pike13:westu-sor"),
+            spec("pike13:westu-sor:2026-02-01", "pike13", "pike13:westu-sor", 5, "2026-02-01"),
+            spec("pike13:theheights-sor:2026-01-01", "pike13", "pike13:theheights-sor"),
+            spec("dialpad_sms:-:2026-01-01", "dialpad_sms", "dialpad", 1),
+            spec("dialpad_voice:-:2026-01-01", "dialpad_voice", "dialpad", 2),
+        ]
+        summary = run_scheduler(self.state_db, specs, run_chunk, site_caps={}, max_workers=4)
+
+        self.assertEqual(summary["attempted"], 5)
+        self.assertEqual(summary["status_counts"], {"done": 5})
+        self.assertEqual(max(peak.values()), 1)
+        self.assertGreaterEqual(max(peak_total), 2)
+        self.assertEqual(summary["throughput"]["pike13"]["rows_added"], 45)
+        self.assertGreater(summary["throughput"]["pike13"]["rows_per_minute"], 0)
+
+        conn = connect_state(self.state_db)
+        self.addCleanup(conn.close)
+        row = conn.execute(
+            "SELECT rows_delta, attempts, duration_s FROM backfill_chunks WHERE chunk_key = ?",
+            ("dialpad_sms:-:2026-01-01",),
+        ).fetchone()
+        self.assertEqual(row["rows_delta"], 15)
+        self.assertEqual(row["attempts"], 1)
+        self.assertIsNotNone(row["duration_s"])
+
+    def test_resume_skips_passed_chunks_and_retries_failures_in_priority_order(self):
+        calls = []
+        verdicts = {"a": "PASS", "b": "FAIL", "c": "PASS"}
+
+        def run_chunk(chunk):
+            calls.append(chunk.key)
+            return {"verdict": verdicts[chunk.key], "rc": 0, "before": 0, "after": 1}
+
+        specs = [spec("c", "hubspot", "hubspot", 3), spec("a", "hubspot", "hubspot", 1), spec("b", "hubspot", "hubspot", 2)]
+        run_scheduler(self.state_db, specs, run_chunk, max_workers=1)
+        self.assertEqual(calls, ["a", "b", "c"])
+
+        calls.clear()
+        verdicts["b"] = "PASS"
+        summary = run_scheduler(self.state_db, specs, run_chunk, max_workers=1)
+        self.assertEqual(calls, ["b"])
+        self.assertEqual(summary["status_counts"], {"done": 3})
+
+    def test_interrupted_running_chunks_and_legacy_progress_are_resumed(self):
+        conn = connect_state(self.state_db)
+        self.addCleanup(conn.close)
+        specs = [spec("x", "hubspot", "hubspot"), spec("y", "hubspot", "hubspot", 1)]
+        register_chunks(conn, specs)
+        conn.execute("UPDATE backfill_chunks SET status = 'running' WHERE chunk_key = 'y'")
+        imported = import_progress_json(conn, {"chunks": {"x": {"verdict": "PASS", "before": 1, "after": 4}}})
+        self.assertEqual(imported, 1)
+
+        calls = []
+        run_scheduler(self.state_db, specs, lambda chunk: calls.append(chunk.key) or {"verdict": "PASS"})
+
+        self.assertEqual(calls, ["y"])
+        self.assertEqual(throughput(conn)["hubspot"]["chunks"], 1)
+
+    def test_runner_exception_marks_chunk_failed(self):
+        def run_chunk(chunk):
+            raise RuntimeError("boom")
+
+        summary = run_scheduler(self.state_db, [spec("z", "school_email", "gmail")], run_chunk)
+
+        self.assertEqual(summary["status_counts"], {"failed": 1})
+        conn = sqlite3.connect(self.state_db)
+        self.addCleanup(conn.close)
+        self.assertIn("boom", conn.execute("SELECT detail FROM backfill_chunks").fetchone()[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import sqlite3
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+
+from notesreminder.benchmarks.suite import benchmark_names, compare_to_baseline, run_suite
+from notesreminder.benchmarks.synthetic_db import generate_synthetic_db, read_synthetic_meta, volume_for_scale
+
+
+ANCHOR = date(2026, 5, 11)
+
+
+class SyntheticDbTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+
+    def test_row_counts_follow_scale_and_seed_is_reproducible(self):
+        counts = generate_synthetic_db(self.dir / "a.db", scale=0.05, seed=3, anchor=ANCHOR)
+        generate_synthetic_db(self.dir / "b.db", scale=0.05, seed=3, anchor=ANCHOR)
+
+        volume = volume_for_scale(0.05)
+        for table in ("reminders", "pike13_people", "hubspot_deals", "dialpad_sms_messages", "school_email_messages"):
+            self.assertEqual(counts[table], volume[table])
+        self.assertGreater(counts["lesson_students"], 0)
+
+        query = "SELECT lesson_id, students, notes_text FROM reminders ORDER BY lesson_id"
+        with sqlite3.connect(self.dir / "a.db") as first, sqlite3.connect(self.dir / "b.db") as second:
+            self.assertEqual(first.execute(query).fetchall(), second.execute(query).fetchall())
+            meta = read_synthetic_meta(first)
+        self.assertEqual((meta["scale"], meta["seed"], meta["anchor"]), (0.05, 3, "2026-05-11"))
+
+    def test_refuses_to_overwrite(self):
+        path = self.dir / "existing.db"
+        path.touch()
+        with self.assertRaises(FileExistsError):
+            generate_synthetic_db(path, scale=0.01)
+
+
+class BenchmarkSuiteTests(unittest.TestCase):
+    def test_every_benchmark_runs_on_a_small_database(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            results = run_suite(scales=[0.02], repeat=1, db_dir=tmp, anchor=ANCHOR)
+
+            self.assertEqual(sorted(results["results"]), sorted(f"{name}@0.02x" for name in benchmark_names()))
+            self.assertTrue(all(result["median_s"] > 0 for result in results["results"].values()))
+            self.assertEqual(results["databases"]["0.02x"]["anchor"], "2026-05-11")
+            # The cached database is reused and left untouched by the benchmarks.
+            self.assertEqual(len(list(Path(tmp).glob("*.db"))), 1)
+
+    def test_unknown_benchmark_is_rejected(self):
+        with self.assertRaises(ValueError):
+            run_suite(scales=[0.01], names=["nope"])
+
+    def test_regressions_are_flagged_against_baseline(self):
+        def doc(**medians):
+            return {"results": {key: {"median_s": value} for key, value in medians.items()}}
+
+        rows = compare_to_baseline(
+            doc(slower=2.0, faster=0.5, noisy=0.012, steady=1.1, fresh=1.0),
+            doc(slower=1.0, faster=1.0, noisy=0.005, steady=1.0),
+        )
+
+        self.assertEqual(
+            {row["key"]: row["status"] for row in rows},
+            {"slower": "regressed", "faster": "improved", "noisy": "ok", "steady": "ok", "fresh": "new"},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
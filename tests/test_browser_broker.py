@@ -0,0 +1,161 @@
+import json
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+from notesreminder.lib import browser_broker
+from notesreminder.lib.browser_broker import (
+    broker_endpoint,
+    open_profile_context,
+    write_broker_record,
+)
+
+
+class CdpVersionHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/json/version":
+            self.send_response(404)
+            self.end_headers()
+            return
+        payload = json.dumps({"Browser": "Chrome/126", "webSocketDebuggerUrl": "ws://127.0.0.1/devtools"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeContext:
+    def __init__(self, storage_state=None, options=None):
+        self.storage_state_value = storage_state
+        self.options = options or {}
+        self.closed = False
+
+    def storage_state(self):
+        return self.storage_state_value
+
+    def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = [FakeContext(storage_state={"cookies": [{"name": "cwr_u"}], "origins": []})]
+        self.new_contexts = []
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def new_context(self, storage_state=None, **options):
+        context = FakeContext(storage_state, options)
+        self.new_contexts.append(context)
+        return context
+
+
+class FakeChromium:
+    def __init__(self):
+        self.browser = FakeBrowser()
+        self.connected = []
+        self.launched = []
+
+    def connect_over_cdp(self, endpoint):
+        self.connected.append(endpoint)
+        return self.browser
+
+    def launch_persistent_context(self, profile_dir, **options):
+        self.launched.append((profile_dir, options))
+        return FakeContext(options=options)
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = FakeChromium()
+
+
+class BrowserBrokerTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.state_dir = self.root / ".broker"
+        self.profile = self.root / "sor_shared"
+        patcher = mock.patch.object(browser_broker, "DEFAULT_STATE_DIR", self.state_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def start_cdp_server(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), CdpVersionHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    def test_no_record_falls_back_to_persistent_launch(self):
+        playwright = FakePlaywright()
+
+        context = open_profile_context(playwright, self.profile, headless=True, viewport={"width": 10, "height": 10})
+
+        self.assertEqual(playwright.chromium.connected, [])
+        self.assertEqual(len(playwright.chromium.launched), 1)
+        self.assertTrue(context.options["headless"])
+
+    def test_live_broker_leases_isolated_context_with_profile_state(self):
+        endpoint = self.start_cdp_server()
+        write_broker_record(self.profile, {"status": "ready", "cdp_endpoint": endpoint})
+        playwright = FakePlaywright()
+
+        context = open_profile_context(
+            playwright,
+            self.profile,
+            headless=True,
+            channel="chrome",
+            viewport={"width": 1440, "height": 1000},
+        )
+
+        self.assertEqual(playwright.chromium.connected, [endpoint])
+        self.assertEqual(playwright.chromium.launched, [])
+        self.assertEqual(context.storage_state_value["cookies"][0]["name"], "cwr_u")
+        self.assertEqual(context.options, {"viewport": {"width": 1440, "height": 1000}})
+
+        context.close()
+        self.assertTrue(context.closed)
+        self.assertTrue(playwright.chromium.browser.closed)
+
+    def test_headed_launch_and_unready_broker_bypass_the_lease(self):
+        endpoint = self.start_cdp_server()
+        write_broker_record(self.profile, {"status": "ready", "cdp_endpoint": endpoint})
+        playwright = FakePlaywright()
+
+        context = open_profile_context(playwright, self.profile, headless=False)
+
+        self.assertEqual(playwright.chromium.connected, [])
+        self.assertFalse(context.options["headless"])
+
+        write_broker_record(self.profile, {"status": "needs_auth", "cdp_endpoint": endpoint})
+        self.assertIsNone(broker_endpoint(self.profile))
+
+    def test_dead_or_stopped_broker_is_ignored(self):
+        write_broker_record(self.profile, {"status": "ready", "cdp_endpoint": "http://127.0.0.1:9"})
+        self.assertIsNone(broker_endpoint(self.profile))
+
+        endpoint = self.start_cdp_server()
+        write_broker_record(self.profile, {"status": "stopped", "cdp_endpoint": endpoint})
+        self.assertIsNone(broker_endpoint(self.profile))
+
+    def test_disabled_env_skips_broker(self):
+        endpoint = self.start_cdp_server()
+        write_broker_record(self.profile, {"status": "ready", "cdp_endpoint": endpoint})
+        with mock.patch.dict("os.environ", {"BROWSER_BROKER_DISABLED": "1"}):
+            self.assertIsNone(broker_endpoint(self.profile))
+        self.assertEqual(broker_endpoint(self.profile), endpoint)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,11 @@
 import subprocess
+import sys
+import threading
+import time
 import unittest
 from pathlib import Path
 
-from notesreminder.orchestration.cadence import build_cadence_plan, run_cadence
+from notesreminder.orchestration.cadence import _default_runner, build_cadence_plan, run_cadence
 
 
 class CadenceRunnerTests(unittest.TestCase):
@@ -67,6 +70,50 @@ class CadenceRunnerTests(unittest.TestCase):
         self.assertEqual(production["status"], "action_required")
         self.assertIn("MFA/auth session is expired", production["error"])
 
+    def test_plan_dependencies_put_reports_after_mutating_step(self):
+        plan = {task.name: task for task in build_cadence_plan("2026-05-23", Path("/repo"))}
+        self.assertEqual(plan["production_notes_local_mfa"].depends_on, ())
+        for name, task in plan.items():
+            if name != "production_notes_local_mfa":
+                self.assertEqual(task.depends_on, ("production_notes_local_mfa",))
+
+    def test_shadow_reports_run_concurrently_after_production(self):
+        lock = threading.Lock()
+        active = []
+        peak = []
+        order = []
+
+        def runner(command, cwd):
+            with lock:
+                order.append(command)
+                active.append(command)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(command)
+            return subprocess.CompletedProcess(command, 0, stdout="ok", stderr="")
+
+        metadata = run_cadence(
+            run_date="2026-05-23",
+            root=Path("/repo"),
+            execute_shadow=True,
+            execute_production=True,
+            runner=runner,
+            max_workers=3,
+        )
+        self.assertEqual(metadata["status"], "shadow_success")
+        self.assertIn("run_notes_local_mfa.sh", order[0][0])
+        self.assertEqual(max(peak), 3)
+        self.assertEqual([task["name"] for task in metadata["tasks"]][0], "production_notes_local_mfa")
+        self.assertTrue(all("wall_seconds" in task for task in metadata["tasks"]))
+
+    def test_default_runner_records_cpu_and_peak_rss(self):
+        completed = _default_runner([sys.executable, "-c", "print('hi')"], Path.cwd())
+        self.assertEqual(completed.returncode, 0)
+        self.assertEqual(completed.stdout.strip(), "hi")
+        self.assertGreater(completed.resource_usage["peak_rss_kb"], 0)
+        self.assertIn("cpu_user_seconds", completed.resource_usage)
+
 
 if __name__ == "__main__":
     unittest.main()
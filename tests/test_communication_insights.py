@@ -88,6 +88,29 @@ class CommunicationInsightTests(unittest.TestCase):
             self.assertEqual(row["review_status"], "pending_human_review")
             self.assertTrue(row["recommendation"])
 
+    def test_rerun_only_analyzes_new_or_edited_events(self):
+        conn = sqlite3.connect(":memory:")
+        conn.row_factory = sqlite3.Row
+        self.addCleanup(conn.close)
+        seed_communication_data(conn)
+        generate_insights(conn, "2026-05-21", "2026-05-21", school="West U", limit=10, chunk_size=1)
+
+        rerun = generate_insights(conn, "2026-05-21", "2026-05-21", school="West U", limit=10)
+        self.assertEqual((rerun["rows_seen"], rerun["rows_skipped_unchanged"], rerun["rows_written"]), (2, 2, 0))
+
+        conn.execute("UPDATE school_email_messages SET body = 'Please cancel and refund.' WHERE message_id = 'email-1'")
+        edited = generate_insights(conn, "2026-05-21", "2026-05-21", school="West U", limit=10, max_workers=2)
+        self.assertEqual([row["source_id"] for row in edited["insights"]], ["email-1"])
+        self.assertEqual(edited["rows_written"], 1)
+        intent = conn.execute(
+            "SELECT intent FROM communication_ai_insights WHERE source_id = 'email-1'"
+        ).fetchone()[0]
+        self.assertEqual(intent, "cancellation_or_retention_risk")
+
+        forced = generate_insights(conn, "2026-05-21", "2026-05-21", school="West U", limit=1, force=True, dry_run=True)
+        self.assertEqual(forced["rows_seen"], 1)
+        self.assertEqual(forced["rows_written"], 0)
+
     def test_review_markdown_is_sanitized(self):
         conn = sqlite3.connect(":memory:")
         conn.row_factory = sqlite3.Row
@@ -109,6 +132,7 @@ class CommunicationInsightTests(unittest.TestCase):
         conn = sqlite3.connect(db_path)
         conn.row_factory = sqlite3.Row
         seed_communication_data(conn)
+        generate_insights(conn, "2026-05-21", "2026-05-21", school="West U", limit=10)
         conn.commit()
         conn.close()
 
@@ -127,6 +151,8 @@ class CommunicationInsightTests(unittest.TestCase):
         )
         self.assertEqual(mcp_report["rows_seen"], 2)
         self.assertEqual(mcp_report["rows_written"], 0)
+        # Already analyzed events are still returned for review.
+        self.assertEqual(len(mcp_report["insights"]), 2)
         self.assertTrue(mcp_report["dry_run"])
 
 
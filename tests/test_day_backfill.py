@@ -0,0 +1,157 @@
+import sqlite3
+import threading
+import time
+from datetime import date
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from notesreminder.orchestration.backfill_scheduler import connect_state, run_scheduler  # noqa: E402
+from notesreminder.orchestration.day_backfill import DayShardRunner, SiteRateLimiter, day_shards  # noqa: E402
+from run_daily import update_reminders_from_dataframe  # noqa: E402
+
+SCHOOLS = ["westu-sor", "theheights-sor"]
+
+
+def make_reminders_db(path):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        """
+        CREATE TABLE reminders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, lesson_id TEXT UNIQUE, school TEXT,
+            instructor_name TEXT, lesson_date TEXT, lesson_time TEXT, lesson_type TEXT,
+            students TEXT, location TEXT, note_completed INTEGER, attendance_status TEXT,
+            notes_text TEXT, note_timestamp TEXT, note_status TEXT, pike13_lesson_id TEXT,
+            note_score REAL, note_score_explanation TEXT, note_score_model TEXT,
+            note_score_version TEXT, note_score_updated_at TEXT, note_score_hash TEXT,
+            last_checked TEXT
+        )
+        """
+    )
+    conn.commit()
+    conn.close()
+
+
+def lesson(school, day):
+    return {
+        "Lesson ID": f"{school}-{day}",
+        "Instructor": "Teacher One",
+        "Date": day,
+        "Time": "4:00 PM",
+        "Lesson Type": "Private Lesson",
+        "Students": "Student One",
+        "Notes": "Worked on scales.",
+        "Attendance Status": "present",
+    }
+
+
+class FakeScraper:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+        self.active = {}
+        self.peak = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, school, day, failed_dates):
+        with self.lock:
+            self.calls.append((school, day))
+            self.active[school] = self.active.get(school, 0) + 1
+            self.peak[school] = max(self.peak.get(school, 0), self.active[school])
+        time.sleep(0.02)
+        with self.lock:
+            self.active[school] -= 1
+        if (school, day) in self.failing:
+            failed_dates.append(day)
+            return pd.DataFrame([])
+        return pd.DataFrame([lesson(school, day)])
+
+
+def test_day_shards_interleave_schools_per_day():
+    shards = day_shards(SCHOOLS, date(2026, 3, 1), date(2026, 3, 3), order="newest")
+    assert [(s.school, s.start, s.priority) for s in shards[:3]] == [
+        ("westu-sor", "2026-03-03", 0),
+        ("theheights-sor", "2026-03-03", 0),
+        ("westu-sor", "2026-03-02", 1),
+    ]
+    assert {s.site for s in shards} == {"pike13:westu-sor", "pike13:theheights-sor"}
+    assert shards[0].key == "pike13_day:westu-sor:2026-03-03" and shards[0].end == shards[0].start
+
+
+def test_rate_limiter_spaces_starts_per_site():
+    now = [100.0]
+    slept = []
+    limiter = SiteRateLimiter(2.0, clock=lambda: now[0], sleep=slept.append)
+    assert limiter.wait("pike13:westu-sor") == 0
+    assert limiter.wait("pike13:westu-sor") == 2.0
+    assert limiter.wait("pike13:theheights-sor") == 0
+    assert slept == [2.0]
+
+
+def test_parallel_backfill_merges_and_resumes_only_failed_shards(tmp_path):
+    db_path = tmp_path / "reminders.db"
+    state_db = tmp_path / "backfill_state.db"
+    make_reminders_db(db_path)
+    shards = day_shards(SCHOOLS, date(2026, 3, 1), date(2026, 3, 4))
+    caps = {shard.site: 2 for shard in shards}
+
+    first = FakeScraper(failing={("theheights-sor", "2026-03-02")})
+    runner = DayShardRunner(db_path, first, update_reminders_from_dataframe, SiteRateLimiter(0))
+    summary = run_scheduler(state_db, shards, runner, site_caps=caps, max_workers=4)
+
+    assert summary["attempted"] == 8
+    assert summary["status_counts"] == {"done": 7, "failed": 1}
+    assert max(first.peak.values()) <= 2
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM reminders").fetchone()[0] == 7
+    conn.close()
+    state = connect_state(state_db)
+    row = state.execute(
+        "SELECT rows_delta, detail FROM backfill_chunks WHERE chunk_key = 'pike13_day:westu-sor:2026-03-01'"
+    ).fetchone()
+    assert row["rows_delta"] == 1 and "1 inserted" in row["detail"]
+    state.close()
+
+    second = FakeScraper()
+    runner = DayShardRunner(db_path, second, update_reminders_from_dataframe, SiteRateLimiter(0))
+    summary = run_scheduler(state_db, shards, runner, site_caps=caps, max_workers=4)
+
+    assert second.calls == [("theheights-sor", "2026-03-02")]
+    assert summary["status_counts"] == {"done": 8}
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM reminders").fetchone()[0] == 8
+    conn.close()
+
+
+def test_parallel_backfill_round_trips_the_db_through_s3(tmp_path, monkeypatch):
+    import argparse
+
+    import backfill
+    import run_daily
+    from notesreminder.orchestration import day_backfill
+
+    db_path = tmp_path / "reminders.db"
+    make_reminders_db(db_path)
+    calls = []
+    monkeypatch.setattr(run_daily, "DB_PATH", run_daily.DB_PATH)
+    monkeypatch.setattr(run_daily, "download_db_from_s3", lambda path, bucket, key: calls.append(("download", path)))
+    monkeypatch.setattr(run_daily, "upload_db_to_s3", lambda path, bucket, key: calls.append(("upload", path)))
+    monkeypatch.setattr(run_daily, "sync_reporting_tables", lambda path: calls.append(("reporting", path)))
+    monkeypatch.setattr(run_daily, "sync_lesson_notes_to_reminders", lambda path: calls.append(("notes", path)))
+    monkeypatch.setattr(day_backfill, "pike13_day_scraper", lambda *args: FakeScraper())
+    args = argparse.Namespace(
+        db_path=str(db_path), skip_s3_sync=False, schools=SCHOOLS, order="oldest", workers=2, site_cap=1,
+        min_interval=0, pike13_profile_dir=None, scrape_diagnostics=None, verbose=False,
+        state_db=str(tmp_path / "backfill_state.db"),
+    )
+
+    assert backfill.run_parallel(args, "2026-03-01", "2026-03-02") == 0
+    assert [kind for kind, _ in calls] == ["download", "reporting", "notes", "upload"]
+    assert {path for _, path in calls} == {str(db_path)}
+
+    calls.clear()
+    args.skip_s3_sync = True
+    args.state_db = str(tmp_path / "fresh_state.db")
+    assert backfill.run_parallel(args, "2026-03-01", "2026-03-01") == 0
+    assert [kind for kind, _ in calls] == ["reporting", "notes"]
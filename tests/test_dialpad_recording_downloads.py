@@ -1,20 +1,68 @@
+import hashlib
 import sqlite3
 import tempfile
+import threading
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 
 from lead_followup_schema import ensure_lead_followup_schema
+from notesreminder.transcription.recording_downloads import (
+    RecordingJob,
+    authenticated_client,
+    download_recordings,
+    recording_extension,
+    stream_recording,
+)
 from scripts.download_dialpad_recordings import (
+    dom_recording_url,
     ensure_transcription_pending,
-    file_sha256,
     has_recording_action,
+    record_download_result,
     recording_row,
-    safe_extension,
+    recording_urls_from_payload,
+    stored_recording_urls,
     upsert_recording_download,
     within_window,
 )
 
 
+RECORDINGS = {
+    "/rec/a": b"A" * 70000 + b"tail-a",
+    "/rec/b": b"B" * 1000,
+    "/rec/a-copy": b"A" * 70000 + b"tail-a",
+}
+
+
+class RecordingHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.seen.append((self.path, self.headers.get("Range"), self.headers.get("Cookie")))
+        body = RECORDINGS.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        start = 0
+        requested = self.headers.get("Range")
+        if requested and self.server.honor_range:
+            start = int(requested.split("=")[1].rstrip("-"))
+            if start >= len(body):
+                self.send_response(416)
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Content-Length", str(len(body) - start))
+        self.end_headers()
+        self.wfile.write(body[start:])
+
+    def log_message(self, *args):
+        pass
+
+
 class DialpadRecordingDownloadTests(unittest.TestCase):
     def test_recording_metadata_links_asset_and_queues_transcription(self):
         conn = sqlite3.connect(":memory:")
@@ -53,19 +101,119 @@ class DialpadRecordingDownloadTests(unittest.TestCase):
         self.assertEqual(transcript["recording_duration"], "1m 2s")
 
     def test_recording_helpers_are_stable(self):
-        self.assertEqual(safe_extension("call.MP3"), ".mp3")
-        self.assertEqual(safe_extension("download"), ".mp3")
+        self.assertEqual(recording_extension("https://x.test/rec/call.WAV", None, None), ".wav")
+        self.assertEqual(recording_extension("https://x.test/download", "audio/mpeg", 'attachment; filename="c.m4a"'), ".m4a")
+        self.assertEqual(recording_extension("https://x.test/download", None, None), ".mp3")
         self.assertTrue(within_window({"event_at": "2026-05-09T10:00:00"}, "2026-05-01", "2026-05-10"))
         self.assertFalse(within_window({"event_at": "2026-04-30T10:00:00"}, "2026-05-01", "2026-05-10"))
         self.assertTrue(has_recording_action({"raw_json": '{"recording_action_visible": true}'}))
         self.assertFalse(has_recording_action({"raw_json": '{"recording_action_visible": false}'}))
-        with tempfile.TemporaryDirectory() as tmp:
-            path = Path(tmp) / "sample.bin"
-            path.write_bytes(b"recording")
-            self.assertEqual(
-                file_sha256(path),
-                "3ebb153fb24e4411400e94a9a92b0ec458c3a8473e51e03cd37d4a34c99dfda6",
-            )
+
+    def test_recording_urls_come_from_page_data_not_download_clicks(self):
+        payload = {
+            "calls": [
+                {"call_id": 11, "recording_url": ["https://dialpad.test/r/11.mp3"]},
+                {"id": "12", "recording_details": [{"url": "https://dialpad.test/r/12.mp3"}]},
+                {"call_id": 13, "recording_url": None},
+            ]
+        }
+        self.assertEqual(
+            recording_urls_from_payload(payload),
+            {"11": "https://dialpad.test/r/11.mp3", "12": "https://dialpad.test/r/12.mp3"},
+        )
+        row = {
+            "links": [
+                {"href": "https://dialpad.com/callhistory/callreview/14"},
+                {"href": "https://dialpad.com/recordings/14/download"},
+            ]
+        }
+        self.assertEqual(dom_recording_url(row), "https://dialpad.com/recordings/14/download")
+        self.assertIsNone(dom_recording_url({"links": [{"href": "https://dialpad.com/callhistory/callreview/15"}]}))
+
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE dialpad_recordings (call_id TEXT, recording_url TEXT)")
+        conn.execute("CREATE TABLE call_logs (call_id TEXT, recording_url TEXT)")
+        conn.execute("INSERT INTO dialpad_recordings VALUES ('21', 'https://dialpad.test/r/21.mp3')")
+        conn.execute("INSERT INTO call_logs VALUES ('22', 'https://dialpad.com/callhistory/callreview/22')")
+        self.assertEqual(stored_recording_urls(conn, ["21", "22", "23"]), {"21": "https://dialpad.test/r/21.mp3"})
+        conn.close()
+
+
+class RecordingStreamTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.output_dir = Path(tmp.name)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), RecordingHandler)
+        server.seen = []
+        server.honor_range = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.server = server
+        self.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        self.client = authenticated_client([{"name": "session", "value": "s1", "domain": "127.0.0.1", "path": "/"}])
+        self.addCleanup(self.client.close)
+
+    def job(self, call_id, path):
+        return RecordingJob(call_id, self.base_url + path, {"event_id": f"voice-{call_id}"})
+
+    def test_concurrent_downloads_hash_while_streaming(self):
+        jobs = [self.job("call-a", "/rec/a"), self.job("call-b", "/rec/b")]
+
+        results = {result.job.call_id: result for result in download_recordings(self.client, jobs, self.output_dir, 2)}
+
+        for call_id, path in (("call-a", "/rec/a"), ("call-b", "/rec/b")):
+            result = results[call_id]
+            self.assertTrue(result.ok, result.error)
+            self.assertEqual(result.path.name, f"{call_id}.mp3")
+            self.assertEqual(result.sha256, hashlib.sha256(RECORDINGS[path]).hexdigest())
+            self.assertEqual(hashlib.sha256(result.path.read_bytes()).hexdigest(), result.sha256)
+        self.assertTrue(all(cookie == "session=s1" for _, _, cookie in self.server.seen))
+
+    def test_partial_file_resumes_with_range_request(self):
+        body = RECORDINGS["/rec/a"]
+        (self.output_dir / "call-a.part").write_bytes(body[:50000])
+
+        result = stream_recording(self.client, self.job("call-a", "/rec/a"), self.output_dir)
+
+        self.assertEqual(self.server.seen[-1][1], "bytes=50000-")
+        self.assertEqual(result.resumed_from, 50000)
+        self.assertEqual(result.path.read_bytes(), body)
+        self.assertEqual(result.sha256, hashlib.sha256(body).hexdigest())
+        self.assertFalse((self.output_dir / "call-a.part").exists())
+
+    def test_server_without_range_support_restarts_cleanly(self):
+        self.server.honor_range = False
+        (self.output_dir / "call-b.part").write_bytes(b"stale")
+
+        result = stream_recording(self.client, self.job("call-b", "/rec/b"), self.output_dir)
+
+        self.assertEqual(result.resumed_from, 0)
+        self.assertEqual(result.path.read_bytes(), RECORDINGS["/rec/b"])
+
+    def test_duplicate_audio_is_not_kept_or_requeued(self):
+        conn = sqlite3.connect(":memory:")
+        conn.row_factory = sqlite3.Row
+        ensure_lead_followup_schema(conn)
+        jobs = [self.job("call-a", "/rec/a")]
+        for result in download_recordings(self.client, jobs, self.output_dir):
+            self.assertTrue(record_download_result(conn, result))
+        copy = next(download_recordings(self.client, [self.job("call-copy", "/rec/a-copy")], self.output_dir))
+
+        self.assertTrue(record_download_result(conn, copy))
+
+        row = conn.execute("SELECT * FROM recording_downloads WHERE call_id = 'call-copy'").fetchone()
+        self.assertEqual(row["status"], "duplicate")
+        self.assertEqual(row["file_path"], str(self.output_dir / "call-a.mp3"))
+        self.assertFalse((self.output_dir / "call-copy.mp3").exists())
+        queued = {r[0] for r in conn.execute("SELECT call_id FROM recording_transcripts")}
+        self.assertEqual(queued, {"call-a"})
+
+    def test_missing_recording_is_reported_not_raised(self):
+        result = next(download_recordings(self.client, [self.job("call-x", "/rec/missing")], self.output_dir))
+        self.assertFalse(result.ok)
+        self.assertIn("HTTP 404", result.error)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,150 @@
+import sqlite3
+import unittest
+
+import import_call_data
+from import_call_data import build_matches, create_table, fuzzy_name_candidates, soundex
+
+
+CLIENT_COLUMNS = [
+    "Client ID",
+    "Client",
+    "Email",
+    "Guardian Name",
+    "Guardian Email",
+    "Account Manager Emails",
+    "Phone",
+    "Mobile Phone",
+    "Account Manager Phones",
+    "Emergency Contact Number",
+]
+
+
+class BuildMatchesTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.addCleanup(self.conn.close)
+        create_table(self.conn, "pike13_clients", CLIENT_COLUMNS)
+        create_table(
+            self.conn,
+            "dialpad_calls",
+            ["call_id", "name", "email_lower", "external_number_digits", "name_lower"],
+        )
+        self.add_client(
+            "c1",
+            Client="Avery Johnson",
+            Email="Avery@Example.com",
+            **{"Account Manager Emails": "mom@example.com; dad@example.com"},
+            **{"Emergency Contact Number": "+1 (713) 555-0199"},
+        )
+        self.add_client("c2", Client="Jordan Smith", **{"Mobile Phone": "832-555-0100"})
+        self.add_client("c3", Client="Priya Raman")
+
+    def add_client(self, client_id, **values):
+        values["Client ID"] = client_id
+        columns = ", ".join(f'"{col}"' for col in values)
+        self.conn.execute(
+            f"INSERT INTO pike13_clients ({columns}) VALUES ({', '.join('?' * len(values))})",
+            list(values.values()),
+        )
+
+    def add_call(self, call_id, name=None, email=None, phone=None):
+        self.conn.execute(
+            "INSERT INTO dialpad_calls VALUES (?, ?, ?, ?, ?)",
+            (call_id, name, email, phone, name.lower() if name else None),
+        )
+
+    def matches(self):
+        return set(
+            self.conn.execute(
+                "SELECT call_id, client_id, match_type FROM call_client_matches ORDER BY call_id"
+            ).fetchall()
+        )
+
+    def test_exact_matches_use_every_normalized_client_key(self):
+        self.add_call("k1", email="dad@example.com")
+        self.add_call("k2", phone="7135550199")
+        self.add_call("k3", phone="8325550100")
+        self.add_call("k4", name="Priya Raman")
+        self.add_call("k5", email="avery@example.com", phone="0000000000")
+
+        counts = build_matches(self.conn)
+
+        self.assertEqual(
+            self.matches(),
+            {
+                ("k1", "c1", "email_exact"),
+                ("k2", "c1", "phone_exact"),
+                ("k3", "c2", "phone_exact"),
+                ("k4", "c3", "name_exact"),
+                ("k5", "c1", "email_exact"),
+            },
+        )
+        self.assertEqual(counts, {"email_exact": 2, "phone_exact": 2, "name_exact": 1})
+
+    def test_exact_joins_use_the_key_index(self):
+        build_matches(self.conn)
+        plan = " ".join(
+            row[-1]
+            for row in self.conn.execute(
+                "EXPLAIN QUERY PLAN SELECT c.call_id FROM dialpad_calls c "
+                "JOIN client_match_keys k ON k.key_type = 'email' AND k.key_value = c.email_lower"
+            )
+        )
+        self.assertIn("USING PRIMARY KEY", plan)
+
+    def test_rebuild_is_idempotent(self):
+        self.add_call("k1", email="avery@example.com")
+        build_matches(self.conn)
+        build_matches(self.conn)
+        self.assertEqual(len(self.matches()), 1)
+        self.assertEqual(
+            self.conn.execute("SELECT COUNT(*) FROM client_match_keys WHERE client_id = 'c1'").fetchone()[0],
+            5,
+        )
+
+    def test_fuzzy_matches_only_when_enabled_and_only_unmatched_calls(self):
+        self.add_call("f1", name="Jordan Smyth")
+        self.add_call("f2", name="Jordan Smith")
+        self.add_call("f3", name="West U School of Rock")
+        # Same name as the unmatched f1, but already matched exactly by phone.
+        self.add_call("f4", name="Jordan Smyth", phone="7135550199")
+
+        build_matches(self.conn)
+        self.assertEqual(self.matches(), {("f2", "c2", "name_exact"), ("f4", "c1", "phone_exact")})
+
+        counts = build_matches(self.conn, enable_fuzzy=True)
+
+        self.assertEqual(counts["name_fuzzy"], 1)
+        self.assertEqual(
+            self.matches(),
+            {("f1", "c2", "name_fuzzy"), ("f2", "c2", "name_exact"), ("f4", "c1", "phone_exact")},
+        )
+        confidence = self.conn.execute(
+            "SELECT confidence FROM call_client_matches WHERE match_type = 'name_fuzzy'"
+        ).fetchone()[0]
+        self.assertLess(confidence, 0.70)
+
+
+class FuzzyBlockingTests(unittest.TestCase):
+    def test_soundex_groups_spelling_variants(self):
+        self.assertEqual(soundex("Smith"), soundex("Smyth"))
+        self.assertEqual(soundex("Robert"), "R163")
+        self.assertEqual(soundex("Ashcraft"), "A261")
+
+    def test_candidates_only_scored_within_shared_blocks(self):
+        clients = [("c1", "Jordan Smith"), ("c2", "Morgan Lee")]
+        self.assertEqual(
+            list(fuzzy_name_candidates(["jordan smyth", "taylor brown"], clients)),
+            [("jordan smyth", "c1", 0.917)],
+        )
+
+    def test_oversized_blocks_are_skipped(self):
+        clients = [(f"c{i}", f"Music Student{i}") for i in range(5)]
+        original = import_call_data.FUZZY_MAX_BLOCK_SIZE
+        import_call_data.FUZZY_MAX_BLOCK_SIZE = 3
+        self.addCleanup(setattr, import_call_data, "FUZZY_MAX_BLOCK_SIZE", original)
+        self.assertEqual(list(fuzzy_name_candidates(["music"], clients)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -186,6 +186,31 @@ class LeadIntelMigrationTests(unittest.TestCase):
             2,
         )
 
+    def test_second_migration_reports_no_row_changes_for_replaced_tables(self):
+        production = self.root / "production.db"
+        lead = self.root / "lead.db"
+        output = self.root / "unified.db"
+        create_production_db(production)
+        create_lead_db(lead)
+
+        migrate_lead_intelligence(production, lead, output_db=output)
+        conn = sqlite3.connect(lead)
+        conn.execute("UPDATE hubspot_deals SET stage = 'Enrolled' WHERE deal_id = 'deal-1'")
+        conn.commit()
+        conn.close()
+        second = migrate_lead_intelligence(output, lead, output_db=output)
+
+        results = {row["table"]: row for row in second["table_results"]}
+        self.assertEqual(results["hubspot_deals"]["strategy"], "replace_sync")
+        self.assertEqual(
+            [results["hubspot_deals"][key] for key in ("inserted", "updated", "deleted")],
+            [0, 1, 0],
+        )
+        self.assertEqual(
+            [results["dialpad_sms_messages"][key] for key in ("inserted", "updated", "deleted")],
+            [0, 0, 0],
+        )
+
     def test_requires_explicit_output_or_in_place_mode(self):
         production = self.root / "production.db"
         lead = self.root / "lead.db"
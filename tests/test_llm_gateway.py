@@ -0,0 +1,150 @@
+import json
+import sqlite3
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from notesreminder.lib.llm_gateway import (
+    AdaptiveRateLimiter,
+    LLMRequest,
+    json_list,
+    parse_json_content,
+    parse_reset_seconds,
+    run_completions,
+)
+
+
+class StubCompletionsHandler(BaseHTTPRequestHandler):
+    """Echo server shaped like /v1/chat/completions; the reply is the user prompt as JSON."""
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests.append(body)
+            throttle = server.throttle_next > 0
+            if throttle:
+                server.throttle_next -= 1
+        if throttle:
+            self.send_json(429, {"error": {"message": "rate limited"}}, {"retry-after": "0"})
+            return
+        prompt = body["messages"][-1]["content"]
+        self.send_json(
+            200,
+            {
+                "choices": [{"message": {"content": json.dumps({"items": [{"echo": prompt}]})}}],
+                "usage": {"prompt_tokens": 100, "completion_tokens": 20},
+            },
+            {"x-ratelimit-remaining-requests": "500", "x-ratelimit-reset-requests": "120ms"},
+        )
+
+    def send_json(self, status, payload, headers):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class LLMGatewayTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_db = str(Path(tmp.name) / "llm_cache.db")
+        server = ThreadingHTTPServer(("127.0.0.1", 0), StubCompletionsHandler)
+        server.lock = threading.Lock()
+        server.requests = []
+        server.throttle_next = 0
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.server = server
+        self.options = {
+            "api_key": "test-key",
+            "base_url": f"http://127.0.0.1:{server.server_address[1]}/v1",
+            "caller": "test",
+            "cache_db_path": self.cache_db,
+            "max_concurrency": 3,
+            "backoff_seconds": 0,
+        }
+
+    def requests_for(self, prompts, **options):
+        return [LLMRequest.chat("system", prompt, json_mode=True, key=i, **options) for i, prompt in enumerate(prompts)]
+
+    def test_batch_returns_parsed_responses_in_input_order(self):
+        prompts = [f"prompt {i}" for i in range(8)]
+
+        responses, summary = run_completions(self.requests_for(prompts), **self.options)
+
+        self.assertEqual([r.json_list()[0]["echo"] for r in responses], prompts)
+        self.assertEqual([r.request.key for r in responses], list(range(8)))
+        self.assertEqual(len(self.server.requests), 8)
+        self.assertEqual(self.server.requests[0]["response_format"], {"type": "json_object"})
+        self.assertEqual(summary["requests"], 8)
+        self.assertEqual(summary["prompt_tokens"], 800)
+        self.assertAlmostEqual(summary["cost_usd"], (800 * 0.15 + 160 * 0.60) / 1_000_000)
+        self.assertIsNotNone(summary["latency_p90_ms"])
+
+    def test_repeated_prompts_are_served_from_cache(self):
+        run_completions(self.requests_for(["a", "b"]), **self.options)
+        responses, summary = run_completions(self.requests_for(["a", "b"]), **self.options)
+
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertTrue(all(response.cached for response in responses))
+        self.assertEqual(summary["cache_hits"], 2)
+        self.assertEqual(summary["cost_usd"], 0)
+
+        run_completions(self.requests_for(["a"], temperature=0.7), **self.options)
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_throttled_requests_are_retried_and_shrink_concurrency(self):
+        self.server.throttle_next = 2
+
+        responses, summary = run_completions(self.requests_for(["x", "y", "z"]), **self.options)
+
+        self.assertTrue(all(response.ok for response in responses))
+        self.assertEqual(summary["throttled"], 2)
+        self.assertEqual(len(self.server.requests), 5)
+
+    def test_run_telemetry_is_recorded(self):
+        _, summary = run_completions(self.requests_for(["a", "b", "c"]), **self.options)
+
+        conn = sqlite3.connect(self.cache_db)
+        self.addCleanup(conn.close)
+        row = conn.execute(
+            "SELECT caller, requests, completion_tokens, latency_p50_ms, models_json FROM llm_run_telemetry WHERE run_id = ?",
+            (summary["run_id"],),
+        ).fetchone()
+        self.assertEqual(row[:3], ("test", 3, 60))
+        self.assertIsNotNone(row[3])
+        self.assertEqual(json.loads(row[4]), {"gpt-4o-mini": 3})
+
+    def test_parsers(self):
+        self.assertEqual(parse_json_content('```json\n{"a": 1}\n```'), {"a": 1})
+        self.assertEqual(parse_json_content('Sure! {"bucket": "x"} hope that helps'), {"bucket": "x"})
+        self.assertEqual(json_list(parse_json_content('[{"idx": 0}]')), [{"idx": 0}])
+        self.assertEqual(json_list({"results": [1, 2]}), [1, 2])
+        with self.assertRaises(ValueError):
+            parse_json_content("no json here")
+        self.assertEqual(parse_reset_seconds("6m0s"), 360)
+        self.assertAlmostEqual(parse_reset_seconds("20ms"), 0.02)
+        self.assertEqual(parse_reset_seconds("2"), 2)
+
+    def test_limiter_pauses_on_low_remaining_headers(self):
+        limiter = AdaptiveRateLimiter(4)
+        limiter.observe({"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "30s"})
+        self.assertGreater(limiter.pause_until, 0)
+        limiter.throttle(0)
+        self.assertEqual(limiter.limit, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import unittest
+from unittest import mock
+
+import mcp_server
+from notesreminder.mcp.executor import ToolExecutor, ToolTimeoutError, attach_budget
+
+
+RUNAWAY_SQL = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT COUNT(*) FROM n"
+
+
+def runaway_query():
+    conn = attach_budget(sqlite3.connect(":memory:"))
+    try:
+        return conn.execute(RUNAWAY_SQL).fetchone()
+    finally:
+        conn.close()
+
+
+class ToolExecutorTests(unittest.IsolatedAsyncioTestCase):
+    async def test_time_budget_interrupts_runaway_query(self):
+        executor = ToolExecutor(max_workers=2, default_budget_seconds=0.2)
+        started = time.monotonic()
+
+        with self.assertRaises(ToolTimeoutError):
+            await executor.run("query_sql", runaway_query)
+
+        self.assertLess(time.monotonic() - started, 5)
+        snapshot = executor.snapshot()
+        self.assertEqual(snapshot["outcomes"]["timed_out"], 1)
+        self.assertEqual(snapshot["tools"]["query_sql"]["failures"], 1)
+        self.assertEqual((snapshot["queue_depth"], snapshot["in_flight"]), (0, 0))
+
+    async def test_cancelled_call_interrupts_its_statement(self):
+        executor = ToolExecutor(max_workers=1, default_budget_seconds=None)
+        task = asyncio.create_task(executor.run("query_sql", runaway_query))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        # The worker thread is freed promptly, so the next call is not stuck behind it.
+        result = await asyncio.wait_for(executor.run("quick", lambda: "done"), timeout=5)
+        self.assertEqual(result, "done")
+        self.assertEqual(executor.snapshot()["outcomes"]["cancelled"], 1)
+
+    async def test_call_cancelled_while_queued_leaves_the_queue(self):
+        executor = ToolExecutor(max_workers=1, default_budget_seconds=None)
+        release = threading.Event()
+        busy = asyncio.create_task(executor.run("slow", release.wait))
+        queued = asyncio.create_task(executor.run("queued", lambda: "never"))
+        await asyncio.sleep(0.05)
+        self.assertEqual(executor.snapshot()["queue_depth"], 1)
+
+        queued.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await queued
+        release.set()
+        await busy
+        await asyncio.sleep(0.05)
+        snapshot = executor.snapshot()
+        self.assertEqual((snapshot["queue_depth"], snapshot["in_flight"]), (0, 0))
+
+    async def test_event_loop_stays_responsive_and_pool_is_bounded(self):
+        executor = ToolExecutor(max_workers=2, default_budget_seconds=None)
+        release = threading.Event()
+        calls = [asyncio.create_task(executor.run("slow", release.wait)) for _ in range(3)]
+
+        ticks = 0
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+            ticks += 1
+        snapshot = executor.snapshot()
+        self.assertEqual(ticks, 10)
+        self.assertEqual((snapshot["in_flight"], snapshot["queue_depth"]), (2, 1))
+
+        release.set()
+        await asyncio.gather(*calls)
+        snapshot = executor.snapshot()
+        self.assertEqual(snapshot["outcomes"]["ok"], 3)
+        self.assertEqual(sum(snapshot["latency_histogram"].values()), 3)
+
+
+class McpServerDispatchTests(unittest.TestCase):
+    def test_registered_tools_run_in_executor_threads(self):
+        seen = {}
+
+        def fake_connect(db_path=None):
+            seen["thread"] = threading.current_thread().name
+            conn = sqlite3.connect(":memory:")
+            conn.row_factory = sqlite3.Row
+            conn.execute("CREATE TABLE lessons (id INTEGER)")
+            return attach_budget(conn)
+
+        with mock.patch.object(mcp_server, "_connect", fake_connect):
+            asyncio.run(mcp_server.mcp.call_tool("list_tables", {}))
+            self.assertTrue(seen["thread"].startswith("mcp-tool"))
+            # Module-level tool functions stay directly callable.
+            self.assertEqual(json.loads(mcp_server.list_tables()), {"tables": ["lessons"]})
+
+        self.assertGreaterEqual(mcp_server.TOOL_EXECUTOR.snapshot()["tools"]["list_tables"]["calls"], 1)
+        status = asyncio.run(mcp_server.mcp.call_tool("server_status", {}))
+        self.assertIn("queue_depth", str(status))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+from notesreminder.mcp.jobs import JobManager
+
+
+class McpJobManagerTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db_path = str(Path(tmp.name) / "jobs.db")
+        self.manager = JobManager(self.db_path)
+        self.release = {}
+        self.running = []
+        self.manager.register("scrape", self.fake_scrape)
+
+    async def fake_scrape(self, params, progress):
+        school = params["school"]
+        self.running.append(school)
+        progress(dates_total=3)
+        for day in range(3):
+            await self.release.setdefault(school, asyncio.Event()).wait()
+            progress(dates_done=day + 1, lessons_scraped=(day + 1) * 5)
+        self.running.remove(school)
+        return {"status": "success", "school": school}
+
+    async def settle(self):
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+    async def test_submit_returns_immediately_and_records_progress(self):
+        job = self.manager.submit("scrape", "westu-sor", {"school": "westu-sor"})
+        self.assertEqual(job["status"], "queued")
+
+        await self.settle()
+        running = self.manager.get(job["job_id"])
+        self.assertEqual(running["status"], "running")
+        self.assertEqual(running["dates_total"], 3)
+        self.assertEqual(running["dates_done"], 0)
+
+        self.release["westu-sor"].set()
+        finished = await self.manager.wait(job["job_id"])
+        self.assertEqual(finished["status"], "succeeded")
+        self.assertEqual((finished["dates_done"], finished["lessons_scraped"]), (3, 15))
+        self.assertEqual(finished["result"], {"status": "success", "school": "westu-sor"})
+
+    async def test_same_school_serializes_and_other_schools_run_concurrently(self):
+        first = self.manager.submit("scrape", "westu-sor", {"school": "westu-sor"})
+        second = self.manager.submit("scrape", "westu-sor", {"school": "westu-sor"})
+        other = self.manager.submit("scrape", "theheights-sor", {"school": "theheights-sor"})
+        await self.settle()
+
+        self.assertEqual(sorted(self.running), ["theheights-sor", "westu-sor"])
+        self.assertEqual(self.manager.get(second["job_id"])["status"], "queued")
+
+        for event in ("westu-sor", "theheights-sor"):
+            self.release.setdefault(event, asyncio.Event()).set()
+        for job in (first, second, other):
+            self.assertEqual((await self.manager.wait(job["job_id"]))["status"], "succeeded")
+
+    async def test_cancel_running_and_queued_jobs(self):
+        running = self.manager.submit("scrape", "westu-sor", {"school": "westu-sor"})
+        queued = self.manager.submit("scrape", "westu-sor", {"school": "westu-sor"})
+        await self.settle()
+
+        self.assertEqual((await self.manager.cancel(queued["job_id"]))["status"], "cancelled")
+        self.assertEqual((await self.manager.cancel(running["job_id"]))["status"], "cancelled")
+        self.assertEqual(self.manager.list_jobs("cancelled")[0]["kind"], "scrape")
+        self.assertEqual(self.running, ["westu-sor"])  # the fake never reached its cleanup
+
+    async def test_jobs_left_active_by_a_dead_server_are_resumed(self):
+        job = self.manager.submit("scrape", "westu-sor", {"school": "westu-sor"})
+        await self.settle()
+        # Simulate the process dying mid-scrape: the task goes away, the row stays 'running'.
+        self.manager._tasks.pop(job["job_id"]).cancel()
+        await self.settle()
+        self.assertEqual(self.manager.get(job["job_id"])["status"], "running")
+
+        restarted = JobManager(self.db_path)
+        restarted.register("scrape", self.fake_scrape)
+        self.assertEqual(restarted.recover(), 1)
+        self.release["westu-sor"].set()
+        finished = await restarted.wait(job["job_id"])
+
+        self.assertEqual(finished["status"], "succeeded")
+        self.assertEqual(finished["attempts"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import sqlite3
+import unittest
+from unittest import mock
+from datetime import date
+
+from late_cancel_shadow import _latest_roster_rows
+from notesreminder.lib.member_history import (
+    LEGACY_SNAPSHOT_TABLE,
+    latest_scrape,
+    migrate_snapshots,
+    on_roster_between,
+    record_roster,
+    roster_as_of,
+    roster_rows,
+)
+
+
+def member(person_id, name, plan="Rock 101", last_visit="2026-06-20", **overrides):
+    row = {
+        "person_id": person_id,
+        "full_name": name,
+        "person_state": "active",
+        "current_plans": plan,
+        "current_plan_types": "Recurring",
+        "last_visit_date": last_visit,
+        "completed_visits": 10,
+        "has_membership": 1,
+        "has_plan_on_hold": 0,
+        "raw_json": {"person_id": person_id, "current_plans": plan, "days_since_last_visit": 3},
+    }
+    row.update(overrides)
+    return row
+
+
+DAY1 = "2026-07-01T06:00:00+00:00"
+DAY2 = "2026-07-02T06:00:00+00:00"
+DAY3 = "2026-07-03T06:00:00+00:00"
+
+
+class MemberHistoryTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.row_factory = sqlite3.Row
+
+    def tearDown(self):
+        self.conn.close()
+
+    def roster(self, stamp):
+        return {row["person_id"]: row["current_plans"] for row in roster_as_of(self.conn, "westu-sor", stamp)}
+
+    def test_unchanged_members_write_no_new_rows(self):
+        record_roster(self.conn, "westu-sor", "West U", DAY1, [member("1", "Ada"), member("2", "Ben")])
+        # Only the calendar-driven raw value moved.
+        second = member("1", "Ada")
+        second["raw_json"]["days_since_last_visit"] = 4
+        result = record_roster(self.conn, "westu-sor", "West U", DAY2, [second, member("2", "Ben")])
+
+        self.assertEqual(result, {"members": 2, "versions_added": 0, "versions_closed": 0, "unchanged": 2})
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM pike13_member_history").fetchone()[0], 2)
+        self.assertEqual(self.roster(DAY2), {"1": "Rock 101", "2": "Rock 101"})
+
+    def test_changes_and_departures_close_versions_and_keep_past_rosters(self):
+        record_roster(self.conn, "westu-sor", "West U", DAY1, [member("1", "Ada"), member("2", "Ben")])
+        record_roster(self.conn, "westu-sor", "West U", DAY2, [member("1", "Ada", plan="Jazz 201")])
+        record_roster(self.conn, "westu-sor", "West U", DAY3, [member("1", "Ada", plan="Jazz 201"), member("2", "Ben")])
+
+        self.assertEqual(self.roster(DAY1), {"1": "Rock 101", "2": "Rock 101"})
+        self.assertEqual(self.roster(DAY2), {"1": "Jazz 201"})
+        self.assertEqual(self.roster(DAY3), {"1": "Jazz 201", "2": "Rock 101"})
+        self.assertTrue(on_roster_between(self.conn, "2", "2026-07-03", "2026-07-03"))
+        self.assertFalse(on_roster_between(self.conn, "2", "2026-07-02", "2026-07-02"))
+
+        row = roster_rows(self.conn, "westu-sor", DAY3)[0]
+        self.assertEqual((row["snapshot_date"], row["days_since_last_visit"]), ("2026-07-03", 13))
+
+    def test_reapplying_the_latest_scrape_replaces_it_and_older_scrapes_are_rejected(self):
+        record_roster(self.conn, "westu-sor", "West U", DAY1, [member("1", "Ada")])
+        record_roster(self.conn, "westu-sor", "West U", DAY2, [member("1", "Ada", plan="Jazz 201")])
+        record_roster(self.conn, "westu-sor", "West U", DAY2, [member("1", "Ada", plan="Blues 301")])
+
+        self.assertEqual(self.roster(DAY2), {"1": "Blues 301"})
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM pike13_member_history").fetchone()[0], 2)
+        with self.assertRaises(ValueError):
+            record_roster(self.conn, "westu-sor", "West U", DAY1, [member("1", "Ada")])
+
+    def create_legacy_table(self):
+        self.conn.execute(
+            f"""CREATE TABLE {LEGACY_SNAPSHOT_TABLE} (
+                school_slug TEXT, school_name TEXT, scraped_at TEXT, snapshot_date TEXT, person_id TEXT,
+                full_name TEXT, person_state TEXT, current_plans TEXT, current_plan_types TEXT,
+                completed_visits INTEGER, days_since_last_visit INTEGER, has_membership INTEGER,
+                has_plan_on_hold INTEGER, raw_json TEXT)"""
+        )
+
+    def add_legacy_scrape(self, stamp, people, plan="Rock 101"):
+        for person_id in people:
+            self.conn.execute(
+                f"INSERT INTO {LEGACY_SNAPSHOT_TABLE} VALUES "
+                "('westu-sor','West U',?,?,?,'Ada','active',?,'Recurring',10,5,1,0,'{}')",
+                (stamp, stamp[:10], person_id, plan),
+            )
+
+    def test_legacy_snapshots_are_read_until_migrated(self):
+        self.create_legacy_table()
+        for stamp, people in ((DAY1, ("1", "2")), (DAY2, ("1",))):
+            self.add_legacy_scrape(stamp, people)
+        legacy = [row["person_id"] for row in _latest_roster_rows(self.conn, date(2026, 7, 2))]
+        self.assertEqual(latest_scrape(self.conn, "westu-sor", on_or_before=date(2026, 7, 1)), DAY1)
+
+        self.assertEqual(migrate_snapshots(self.conn, drop_legacy=True), {"scrapes": 2, "versions_added": 2})
+        self.assertEqual([row["person_id"] for row in _latest_roster_rows(self.conn, date(2026, 7, 2))], legacy)
+        self.assertEqual(self.roster(DAY1), {"1": "Rock 101", "2": "Rock 101"})
+        self.assertEqual(latest_scrape(self.conn, "westu-sor"), DAY2)
+
+    def test_legacy_scrapes_older_than_the_history_are_merged_in_order(self):
+        # The new scraper ran before the migration, so the history already holds DAY3.
+        record_roster(self.conn, "westu-sor", "West U", DAY3, [member("1", "Ada", plan="Jazz 201")])
+        self.create_legacy_table()
+        self.add_legacy_scrape(DAY1, ("1", "2"))
+        self.add_legacy_scrape(DAY2, ("1",), plan="Jazz 201")
+
+        self.assertEqual(migrate_snapshots(self.conn, drop_legacy=True), {"scrapes": 2, "versions_added": 3})
+        self.assertEqual(self.roster(DAY1), {"1": "Rock 101", "2": "Rock 101"})
+        self.assertEqual(self.roster(DAY2), {"1": "Jazz 201"})
+        self.assertEqual(self.roster(DAY3), {"1": "Jazz 201"})
+        self.assertTrue(on_roster_between(self.conn, "2", "2026-07-01", "2026-07-01"))
+        scrapes = self.conn.execute(
+            "SELECT scraped_at, versions_added, versions_closed, unchanged FROM pike13_roster_scrapes ORDER BY scraped_at"
+        ).fetchall()
+        self.assertEqual([tuple(row) for row in scrapes], [(DAY1, 2, 0, 0), (DAY2, 1, 2, 0), (DAY3, 1, 1, 0)])
+
+    def test_drop_legacy_refuses_while_scrapes_are_not_replayed(self):
+        self.create_legacy_table()
+        self.add_legacy_scrape(DAY1, ("1",))
+        with mock.patch("notesreminder.lib.member_history.record_roster"):
+            with self.assertRaises(ValueError):
+                migrate_snapshots(self.conn, drop_legacy=True)
+        self.assertEqual(self.conn.execute(f"SELECT COUNT(*) FROM {LEGACY_SNAPSHOT_TABLE}").fetchone()[0], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
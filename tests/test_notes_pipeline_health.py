@@ -1,3 +1,4 @@
+import os
 import sqlite3
 import tempfile
 import unittest
@@ -5,6 +6,8 @@ from pathlib import Path
 
 from notesreminder.reports.notes_pipeline_health import (
     build_notes_pipeline_health,
+    index_notes_send_logs,
+    indexed_notes_sends,
     is_reportable_lesson,
     render_markdown,
     scan_notes_send_logs,
@@ -50,6 +53,7 @@ class NotesPipelineHealthTests(unittest.TestCase):
 
     def test_build_health_report_counts_recent_school_coverage(self):
         conn = make_db()
+        state_conn = sqlite3.connect(":memory:")
         rows = [
             ("westu-sor", "Teacher A", "2026-05-19", "3pm", "Guitar Lessons - 45 minutes", "Student A", 1, "2026-05-20"),
             ("westu-sor", "Teacher B", "2026-05-19", "4pm", "Guitar Lessons - 45 minutes", "Student B", 0, "2026-05-20"),
@@ -67,6 +71,7 @@ class NotesPipelineHealthTests(unittest.TestCase):
                 as_of="2026-05-20",
                 lookback_days=1,
                 logs_dir=tmpdir,
+                state_conn=state_conn,
             )
         westu = next(item for item in report["schools"] if item["school"] == "westu-sor")
         self.assertEqual(westu["window_total_lessons"], 3)
@@ -74,6 +79,67 @@ class NotesPipelineHealthTests(unittest.TestCase):
         self.assertEqual(westu["window_missing_notes"], 1)
         self.assertEqual(westu["days"][0]["email_status"], "delivered")
         self.assertIn("Notes Pipeline Health", render_markdown(report))
+        # The send-log index lives in the state DB, not in the pipeline DB.
+        self.assertEqual(state_conn.execute("SELECT COUNT(*) FROM notes_send_events").fetchone()[0], 1)
+        self.assertIsNone(
+            conn.execute("SELECT name FROM sqlite_master WHERE name = 'notes_send_events'").fetchone()
+        )
+
+
+SUMMARY_LINE = "Sending email 'Lesson notes summary for West U ({day} to {day})' to x\n"
+DELIVERED_LINE = "Email delivered to SMTP server\n"
+
+
+class NotesSendLogIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.logs = Path(self.tmp.name)
+        self.path = self.logs / "send.log"
+        self.conn = sqlite3.connect(":memory:")
+
+    def append(self, text):
+        with self.path.open("a") as handle:
+            handle.write(text)
+
+    def sends(self):
+        return indexed_notes_sends(self.conn, "2026-05-01", "2026-05-31", self.logs)
+
+    def test_index_reads_only_appended_lines_and_matches_full_scan(self):
+        self.append(SUMMARY_LINE.format(day="2026-05-18") + DELIVERED_LINE + "noise\n" * 3)
+        first = index_notes_send_logs(self.conn, self.logs)
+        self.assertEqual(first["events_added"], 1)
+
+        self.assertEqual(index_notes_send_logs(self.conn, self.logs)["files_read"], 0)
+
+        self.append(SUMMARY_LINE.format(day="2026-05-19") + DELIVERED_LINE)
+        second = index_notes_send_logs(self.conn, self.logs)
+        self.assertEqual(second["events_added"], 1)
+        self.assertEqual(second["bytes_indexed"], len(SUMMARY_LINE.format(day="2026-05-19") + DELIVERED_LINE))
+        self.assertEqual(self.sends(), scan_notes_send_logs(self.logs))
+
+    def test_delivery_confirmed_in_a_later_append_is_picked_up(self):
+        self.append(SUMMARY_LINE.format(day="2026-05-19") + "connecting\n" + "Email deliv")
+        self.assertEqual(index_notes_send_logs(self.conn, self.logs)["events_added"], 0)
+        self.append("ered to SMTP server\n")
+        self.assertEqual(index_notes_send_logs(self.conn, self.logs)["events_added"], 1)
+        self.assertEqual(self.sends()["westu-sor"]["2026-05-19"]["status"], "delivered")
+
+    def test_rewritten_or_removed_log_drops_its_events(self):
+        self.append(SUMMARY_LINE.format(day="2026-05-18") + DELIVERED_LINE)
+        index_notes_send_logs(self.conn, self.logs)
+
+        self.path.write_text(SUMMARY_LINE.format(day="2026-05-20") + DELIVERED_LINE + "x\n")
+        stat = self.path.stat()
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        stats = index_notes_send_logs(self.conn, self.logs)
+        self.assertEqual(stats["files_reset"], 1)
+        self.assertEqual(list(self.sends()["westu-sor"]), ["2026-05-20"])
+
+        self.path.unlink()
+        index_notes_send_logs(self.conn, self.logs)
+        self.assertEqual(self.sends(), {})
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM notes_log_files").fetchone()[0], 0)
 
 
 if __name__ == "__main__":
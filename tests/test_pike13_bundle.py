@@ -0,0 +1,215 @@
+import asyncio
+import json
+import sqlite3
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from scrape_pike13_bundle import (
+    ReportResult,
+    ReportSpec,
+    fetch_report,
+    nightly_specs,
+    run_bundle,
+    store_results,
+)
+
+
+class FakeRequest:
+    def __init__(self, body, method="POST"):
+        self.post_data = json.dumps(body)
+        self.method = method
+
+
+class FakeResponse:
+    def __init__(self, url, fields, rows, total, body=None):
+        self.url = url
+        self.request = FakeRequest(body or {"data": {"attributes": {"page": {}}}})
+        self.payload = {"data": {"attributes": {"fields": [{"name": f} for f in fields], "rows": rows, "total_count": total}}}
+        self.ok = True
+        self.status = 200
+
+    async def json(self):
+        return self.payload
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.url = "about:blank"
+        self.listeners = []
+
+    def on(self, event, callback):
+        self.listeners.append(callback)
+
+    def remove_listener(self, event, callback):
+        self.listeners.remove(callback)
+
+    async def goto(self, url, **kwargs):
+        self.url = url
+        self.context.open_tabs += 1
+        self.context.max_open_tabs = max(self.context.max_open_tabs, self.context.open_tabs)
+        await asyncio.sleep(0)
+        for response in self.context.responses_for(url):
+            for listener in list(self.listeners):
+                asyncio.ensure_future(listener(response))
+
+    async def close(self):
+        self.context.open_tabs -= 1
+
+
+class FakeAPI:
+    def __init__(self, context):
+        self.context = context
+
+    async def post(self, url, data, **kwargs):
+        self.context.replays.append(json.loads(data))
+        return self.context.replay_response
+
+
+class FakeContext:
+    def __init__(self, routes, replay_response=None):
+        self.routes = routes
+        self.replay_response = replay_response
+        self.replays = []
+        self.request = FakeAPI(self)
+        self.open_tabs = self.max_open_tabs = 0
+        self.closed = False
+
+    def responses_for(self, url):
+        return [response for fragment, response in self.routes if fragment in url]
+
+    async def new_page(self):
+        return FakePage(self)
+
+    async def close(self):
+        self.closed = True
+
+
+CLIENTS = "https://westu-sor.pike13.com/desk/api/v3/reports/clients/queries?auth_token=x"
+ENROLLMENTS = "https://westu-sor.pike13.com/desk/api/v3/reports/enrollments/queries?auth_token=x"
+PLANS = "https://westu-sor.pike13.com/desk/api/v3/reports/person_plans/queries?auth_token=x"
+HOLD_FIELDS = ["Client", "Plan Name", "On Hold?", "Last Hold End Date"]
+
+
+def test_nightly_specs_cover_members_holds_and_late_cancel_window():
+    specs = nightly_specs(date(2026, 7, 19), ["westu-sor"])
+    assert [s.report for s in specs] == ["current_members", "active_holds", "recent_holds", "late_cancels"]
+    assert (specs[2].start_date, specs[2].end_date) == ("2026-06-19", "2026-07-19")
+    assert (specs[3].start_date, specs[3].end_date) == ("2026-05-21", "2026-07-19")
+    assert "last_hold_end_date" in specs[2].url
+    assert ReportSpec.parse("theheights-sor:leavers:2026-07-01:2026-07-19").end_date == "2026-07-19"
+    with pytest.raises(ValueError, match="needs start_date"):
+        ReportSpec("westu-sor", "late_cancels")
+
+
+def test_fetch_report_finishes_on_the_matching_queries_response():
+    context = FakeContext(
+        [
+            # The holds page also fires an unrelated person_plans query first.
+            ("is_on_hold", FakeResponse(PLANS, ["Plan Name"], [["x"]], 1)),
+            ("is_on_hold", FakeResponse(PLANS, HOLD_FIELDS, [["Ada", "Rock", "Yes", ""]], 1)),
+        ]
+    )
+    result = asyncio.run(fetch_report(context, ReportSpec("westu-sor", "active_holds"), timeout_ms=1000))
+    assert result.records() == [{"Client": "Ada", "Plan Name": "Rock", "On Hold?": "Yes", "Last Hold End Date": ""}]
+    assert context.open_tabs == 0
+
+
+def test_fetch_report_replays_short_pages_and_rejects_partial_results():
+    spec = ReportSpec("westu-sor", "late_cancels", "2026-07-01", "2026-07-19")
+    first_page = FakeResponse(ENROLLMENTS, ["visit_id", "state"], [["1", "late_canceled"]], 2)
+    full = FakeResponse(ENROLLMENTS, ["visit_id", "state"], [["1", "late_canceled"], ["2", "late_canceled"]], 2)
+    context = FakeContext([("enrollments", first_page)], replay_response=full)
+    result = asyncio.run(fetch_report(context, spec, timeout_ms=1000))
+    assert [r["visit_id"] for r in result.records()] == ["1", "2"]
+    assert context.replays[0]["data"]["attributes"]["page"] == {"limit": 2}
+
+    short = FakeResponse(ENROLLMENTS, ["visit_id", "state"], [["1", "late_canceled"]], 2)
+    context = FakeContext([("enrollments", first_page)], replay_response=short)
+    with pytest.raises(RuntimeError, match="Partial Pike13"):
+        asyncio.run(fetch_report(context, spec, timeout_ms=1000))
+
+
+def test_run_bundle_logs_in_once_per_school_and_shares_tabs():
+    contexts = {}
+
+    async def authenticate(school):
+        contexts.setdefault(school, []).append(
+            FakeContext(
+                [
+                    ("people/details", FakeResponse(CLIENTS, ["person_id", "full_name"], [["1", "Ada"]], 1)),
+                    ("person_plans", FakeResponse(PLANS, HOLD_FIELDS, [], 0)),
+                    ("enrollments", FakeResponse(ENROLLMENTS, ["visit_id", "state"], [], 0)),
+                ]
+            )
+        )
+        return contexts[school][-1]
+
+    specs = nightly_specs(date(2026, 7, 19))
+    results = asyncio.run(run_bundle(specs, authenticate, max_tabs=2))
+
+    assert set(results) == {spec.key for spec in specs}
+    assert {school: len(made) for school, made in contexts.items()} == {"westu-sor": 1, "theheights-sor": 1}
+    assert all(made[0].closed and made[0].max_open_tabs == 2 for made in contexts.values())
+
+
+def test_run_bundle_reports_each_school_as_it_finishes_and_keeps_failures_per_spec():
+    events = []
+
+    async def authenticate(school):
+        events.append(("login", school))
+        if school == "theheights-sor":
+            raise RuntimeError("MFA timed out")
+        short = FakeResponse(ENROLLMENTS, ["visit_id", "state"], [["1", "late_canceled"]], 2)
+        return FakeContext(
+            [
+                ("people/details", FakeResponse(CLIENTS, ["person_id", "full_name"], [["1", "Ada"]], 1)),
+                ("person_plans", FakeResponse(PLANS, HOLD_FIELDS, [], 0)),
+                ("enrollments", short),
+            ],
+            replay_response=short,
+        )
+
+    def on_school(school, school_results):
+        events.append(("stored", school, sorted(k for k, v in school_results.items() if isinstance(v, Exception))))
+
+    specs = nightly_specs(date(2026, 7, 19))
+    results = asyncio.run(run_bundle(specs, authenticate, max_tabs=2, on_school=on_school))
+
+    late_cancels = next(spec.key for spec in specs if spec.school == "westu-sor" and spec.report == "late_cancels")
+    heights = sorted(spec.key for spec in specs if spec.school == "theheights-sor")
+    assert events == [
+        ("login", "westu-sor"),
+        ("stored", "westu-sor", [late_cancels]),
+        ("login", "theheights-sor"),
+        ("stored", "theheights-sor", heights),
+    ]
+    assert isinstance(results["westu-sor/current_members"], ReportResult)
+    assert "Partial Pike13" in str(results[late_cancels])
+
+
+def test_store_results_uses_each_reports_writer(tmp_path: Path):
+    db = tmp_path / "reminders.db"
+    specs = {spec.report: spec for spec in nightly_specs(date(2026, 7, 19), ["westu-sor"])}
+    results = [
+        ReportResult(specs["current_members"], ["person_id", "full_name", "has_membership"], [["1", "Ada", "t"]], 1),
+        ReportResult(specs["active_holds"], HOLD_FIELDS, [["Ada", "Rock", "Yes", ""]], 1),
+        ReportResult(specs["recent_holds"], HOLD_FIELDS, [["Ben", "Jazz", "No", "Jul 1, 2026"]], 1),
+        ReportResult(
+            specs["late_cancels"],
+            ["person_id", "visit_id", "full_name", "service_date", "state"],
+            [["1", "v1", "Ada", "2026-07-10", "late_canceled"]],
+            1,
+        ),
+    ]
+    summary = store_results(db, results, "2026-07-19T06:00:00+00:00", models_dir=tmp_path)
+
+    conn = sqlite3.connect(db)
+    assert conn.execute("SELECT person_id, full_name FROM pike13_member_history").fetchall() == [("1", "Ada")]
+    assert conn.execute("SELECT row_count FROM pike13_late_cancel_extract_runs").fetchall() == [(1,)]
+    conn.close()
+    holds = json.loads((tmp_path / "pike13_holds_westu-sor.json").read_text())
+    assert sorted(h["client"] for h in holds) == ["Ada", "Ben"]
+    assert summary["westu-sor/holds"].startswith("2 hold records")
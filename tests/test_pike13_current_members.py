@@ -4,6 +4,8 @@ from pathlib import Path
 
 import pytest
 
+from notesreminder.lib.member_history import roster_as_of
+
 from scrape_pike13_current_members import (
     FULL_ROSTER_TIMEOUT_MS,
     coverage_request_bodies,
@@ -89,12 +91,17 @@ def test_store_snapshot_preserves_named_values(tmp_path: Path):
     store_snapshot(db, "westu-sor", "West U", "2026-07-18T12:00:00+00:00", [record])
     conn = sqlite3.connect(db)
     row = conn.execute(
-        "SELECT current_plans, days_since_last_visit, completed_visits, "
+        "SELECT current_plans, NULL, completed_visits, "
         "future_visits, has_membership, has_plan_on_hold, raw_json "
-        "FROM pike13_current_member_snapshots"
+        "FROM pike13_member_history"
     ).fetchone()
-    assert row[:6] == ("Rock 101", 8, 90, 12, 1, 0)
+    assert row[0] == "Rock 101"
+    assert row[2:6] == (90, 12, 1, 0)
     assert json.loads(row[6])["current_plans"] == "Rock 101"
+    assert "days_since_last_visit" not in json.loads(row[6])
+    conn.row_factory = sqlite3.Row
+    roster = roster_as_of(conn, "westu-sor", "2026-07-18T12:00:00+00:00")
+    assert [(r["person_id"], r["days_since_last_visit"]) for r in roster] == [("1", 8)]
 
 
 def test_store_snapshot_rejects_empty_or_duplicate_roster(tmp_path: Path):
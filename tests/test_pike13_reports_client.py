@@ -0,0 +1,158 @@
+import asyncio
+import json
+import sqlite3
+import unittest
+from datetime import date, timedelta
+
+from notesreminder.extractors.pike13_reports import (
+    Pike13ReportsClient,
+    Pike13ReportsError,
+    Pike13WindowTooLarge,
+    ReportQuery,
+    SqliteRowSink,
+    auth_token_from_url,
+    date_filter,
+)
+
+
+FIELDS = ("full_name", "person_id")
+
+
+class FakeQueriesEndpoint:
+    """Serves /queries like Pike13: no cursor, ``page.limit`` rows from the top of the sorted result.
+
+    ``people`` maps person_id -> last_membership_end; requests above 100 rows
+    fail the way the real gateway times out.
+    """
+
+    def __init__(self, people, delay=0.01, extra_total=0):
+        self.people = people
+        self.delay = delay
+        self.extra_total = extra_total
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def post(self, url, payload):
+        self.requests.append((url, payload))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            attributes = payload["data"]["attributes"]
+            limit = attributes["page"]["limit"]
+            if limit > 100:
+                raise TimeoutError(f"gateway timeout for limit {limit}")
+            start, end = attributes["filter"][2]
+            matching = sorted(pid for pid, day in self.people.items() if start <= day <= end)
+            if attributes["sort"] == ["person_id-"]:
+                matching.reverse()
+            rows = [[f"Person {pid}", pid] for pid in matching[:limit]]
+            return {
+                "data": {
+                    "type": "queries",
+                    "attributes": {
+                        "rows": rows,
+                        "fields": [{"name": name, "type": "string"} for name in attributes["fields"]],
+                        "total_count": len(matching) + self.extra_total,
+                        "has_more": len(matching) > limit,
+                    },
+                }
+            }
+        finally:
+            self.in_flight -= 1
+
+
+def people(count, first_day=date(2026, 1, 1), days=180, offset=0):
+    return {10000000 + offset + i: (first_day + timedelta(days=i % days)).isoformat() for i in range(count)}
+
+
+def query(start, end="2026-06-30", key=None):
+    return ReportQuery(key=key or start, fields=FIELDS, filter=date_filter("last_membership_end", start, end))
+
+
+class Pike13ReportsClientTests(unittest.IsolatedAsyncioTestCase):
+    async def test_pull_covers_query_with_two_sort_windows_of_at_most_100_rows(self):
+        endpoint = FakeQueriesEndpoint(people(150))
+        client = Pike13ReportsClient("westu-sor", "tok123", endpoint.post, page_size=500)
+
+        result = await client.pull(query("2026-01-01"))
+
+        self.assertEqual((result.pages, result.row_count, result.total_count), (2, 150, 150))
+        self.assertTrue(result.complete)
+        self.assertEqual(result.field_names, list(FIELDS))
+        self.assertEqual(sorted(row[1] for row in result.rows), sorted(endpoint.people))
+        windows = [
+            (payload["data"]["attributes"]["page"], payload["data"]["attributes"]["sort"])
+            for _, payload in endpoint.requests
+        ]
+        self.assertEqual(windows, [({"limit": 100}, ["person_id"]), ({"limit": 100}, ["person_id-"])])
+        url = endpoint.requests[0][0]
+        self.assertIn("westu-sor.pike13.com/desk/api/v3/reports/clients/queries", url)
+        self.assertEqual(auth_token_from_url(url), "tok123")
+
+    async def test_small_query_needs_one_request(self):
+        endpoint = FakeQueriesEndpoint(people(40))
+        client = Pike13ReportsClient("westu-sor", "tok", endpoint.post)
+
+        result = await client.pull(query("2026-01-01"))
+
+        self.assertEqual((result.pages, result.row_count), (1, 40))
+        self.assertEqual(len(endpoint.requests), 1)
+
+    async def test_wide_date_window_is_split_until_covered_and_streamed_to_sqlite(self):
+        endpoint = FakeQueriesEndpoint(people(700))
+        client = Pike13ReportsClient("westu-sor", "tok", endpoint.post, max_concurrency=2)
+        conn = sqlite3.connect(":memory:")
+        self.addCleanup(conn.close)
+        sink = SqliteRowSink(conn, "pull_1", "westu-sor", {"h1": "clients"})
+
+        result = await client.pull(query("2026-01-01", key="h1"), on_page=sink, collect_rows=False)
+
+        self.assertTrue(result.complete)
+        self.assertEqual((result.row_count, result.total_count), (700, 700))
+        self.assertTrue(all(payload["data"]["attributes"]["page"]["limit"] <= 100 for _, payload in endpoint.requests))
+        stored = conn.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT person_id), COUNT(DISTINCT page_number) FROM pike13_report_rows"
+        ).fetchone()
+        self.assertEqual(stored[:2], (700, 700))
+        self.assertEqual(stored[2], result.pages)
+        record = json.loads(conn.execute("SELECT row_json FROM pike13_report_rows LIMIT 1").fetchone()[0])
+        self.assertEqual(set(record), set(FIELDS))
+
+    async def test_pull_many_bounds_concurrency(self):
+        endpoint = FakeQueriesEndpoint(people(120))
+        client = Pike13ReportsClient("westu-sor", "tok", endpoint.post, max_concurrency=2)
+        months = [f"2026-0{i}-01" for i in range(1, 6)]
+
+        results = await client.pull_many([query(m, f"2026-0{i + 1}-28") for i, m in enumerate(months, 1)])
+
+        self.assertEqual(endpoint.max_in_flight, 2)
+        self.assertTrue(all(result.complete for result in results.values()))
+
+    async def test_short_read_and_unsplittable_windows_raise(self):
+        short = FakeQueriesEndpoint(people(150), extra_total=5)
+        with self.assertRaisesRegex(Pike13ReportsError, "fetched 150 of 155 rows"):
+            await Pike13ReportsClient("westu-sor", "tok", short.post).pull(query("2026-01-01"))
+
+        crowded = FakeQueriesEndpoint(people(250, days=1))
+        with self.assertRaises(Pike13WindowTooLarge):
+            await Pike13ReportsClient("westu-sor", "tok", crowded.post).pull(query("2026-01-01", "2026-01-01"))
+
+    async def test_error_payload_raises_or_is_returned_per_query(self):
+        async def post(url, payload):
+            if payload["data"]["attributes"]["filter"][2][0] == "bad":
+                return {"errors": [{"title": "Unauthorized"}]}
+            return {"data": {"attributes": {"rows": [["A", 1]], "fields": list(FIELDS), "total_count": 1}}}
+
+        client = Pike13ReportsClient("westu-sor", "tok", post)
+        with self.assertRaises(Pike13ReportsError):
+            await client.pull(query("bad"))
+
+        results = await client.pull_many([query("bad"), query("good")], return_exceptions=True)
+        self.assertIsInstance(results["bad"], Pike13ReportsError)
+        self.assertEqual(results["good"].rows, [["A", 1]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import sqlite3
+import tempfile
+import time
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+from lead_followup_schema import ensure_lead_followup_schema
+from notesreminder.lib.tracing import NOOP_SPAN, TracedConnection, Tracer, aggregate_span, save_traced_run, span
+from notesreminder.reports.pipeline_stage_report import build_stage_report
+
+
+class SpanTests(unittest.TestCase):
+    def test_nested_and_aggregate_spans_build_a_tree(self):
+        tracer = Tracer("pipeline", school="demo")
+        with tracer.activate():
+            with span("scrape", start_date="2026-05-01") as scrape:
+                for _ in range(3):
+                    with aggregate_span("navigation"):
+                        time.sleep(0.002)
+                scrape.add_rows(7)
+            with span("parse"):
+                pass
+
+        root = tracer.root
+        self.assertEqual([child.name for child in root.children], ["scrape", "parse"])
+        scrape = root.children[0]
+        navigation = scrape.children[0]
+        self.assertEqual((len(scrape.children), navigation.calls), (1, 3))
+        self.assertEqual(scrape.rows, 7)
+        self.assertGreaterEqual(navigation.duration_ms, 6)
+        self.assertLessEqual(scrape.self_ms, scrape.duration_ms - navigation.duration_ms + 1e-6)
+        self.assertGreaterEqual(root.duration_ms, scrape.duration_ms)
+
+    def test_spans_are_noops_without_an_active_tracer(self):
+        with span("orphan") as item:
+            self.assertIs(item.add_rows(3).set(a=1), NOOP_SPAN)
+        with aggregate_span("orphan") as item:
+            self.assertIs(item, NOOP_SPAN)
+
+    def test_errors_mark_the_span_and_root(self):
+        tracer = Tracer("pipeline")
+        with self.assertRaises(RuntimeError):
+            with tracer.activate():
+                with span("upsert"):
+                    raise RuntimeError("boom")
+
+        upsert = tracer.root.children[0]
+        self.assertEqual((upsert.status, tracer.root.status), ("error", "error"))
+        self.assertIn("boom", upsert.error)
+
+    def test_traced_connection_attributes_sql_time_to_open_spans(self):
+        conn = sqlite3.connect(":memory:", factory=TracedConnection)
+        tracer = Tracer("pipeline")
+        with tracer.activate():
+            with span("upsert") as upsert:
+                conn.execute("CREATE TABLE t (x INTEGER)")
+                conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(100)])
+                conn.commit()
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 100)
+        conn.close()
+
+        self.assertEqual(upsert.sql_statements, 3)
+        self.assertGreater(upsert.sql_ms, 0)
+        self.assertEqual(tracer.root.sql_statements, 3)
+
+
+class SavedTraceTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.conn = sqlite3.connect(Path(tmp.name) / "trace.db")
+        self.addCleanup(self.conn.close)
+
+    def _traced_run(self, stage_sleeps, pipeline="run_daily"):
+        tracer = Tracer(pipeline)
+        with tracer.activate():
+            for name, seconds in stage_sleeps:
+                with span(name):
+                    time.sleep(seconds)
+        return tracer
+
+    def test_saved_run_links_spans_to_source_import_runs(self):
+        ensure_lead_followup_schema(self.conn)
+        tracer = self._traced_run([("scrape", 0.001)])
+
+        run_id = save_traced_run(self.conn, tracer, "notes", "run_daily.py", metadata={"school": "demo"})
+
+        status, metadata = self.conn.execute(
+            "SELECT status, metadata_json FROM source_import_runs WHERE id = ?", (run_id,)
+        ).fetchone()
+        self.assertEqual(status, "success")
+        self.assertIn(tracer.root.span_id, metadata)
+        rows = self.conn.execute(
+            "SELECT name, parent_span_id, trace_id FROM pipeline_spans WHERE run_id = ? ORDER BY started_at", (run_id,)
+        ).fetchall()
+        self.assertEqual(
+            rows,
+            [("run_daily", None, tracer.root.span_id), ("scrape", tracer.root.span_id, tracer.root.span_id)],
+        )
+
+        # Saving again (e.g. after a later stage) replaces rows instead of duplicating them.
+        tracer.save(self.conn, run_id)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM pipeline_spans").fetchone()[0], 2)
+
+    def test_spans_are_saved_without_an_import_runs_table(self):
+        tracer = self._traced_run([("parse", 0)])
+        self.assertIsNone(save_traced_run(self.conn, tracer, "notes", "run_daily.py"))
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM pipeline_spans").fetchone()[0], 2)
+
+    def test_stage_report_ranks_by_total_self_time(self):
+        for _ in range(2):
+            save_traced_run(self.conn, self._traced_run([("scrape", 0.02), ("parse", 0.001)]), "notes", "run_daily.py")
+        save_traced_run(self.conn, self._traced_run([("other", 0.03)], "other_pipeline"), "other", "other.py")
+
+        report = build_stage_report(self.conn, pipeline="run_daily", now=datetime.now(timezone.utc))
+
+        self.assertEqual(report["runs"]["count"], 2)
+        self.assertEqual([stage["stage"] for stage in report["stages"]], ["scrape", "parse"])
+        scrape = report["stages"][0]
+        self.assertEqual((scrape["runs"], scrape["calls"]), (2, 2))
+        self.assertGreater(scrape["share_of_run_time"], 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
+import contextlib
+import io
 import sqlite3
 import tempfile
 import unittest
@@ -309,6 +311,73 @@ class RebuildLeadWorkingDbTests(unittest.TestCase):
             1,
         )
 
+    def test_incremental_sync_matches_full_rebuild_and_reports_deltas(self):
+        production = self.root / "production.db"
+        proof = self.root / "proof.db"
+        output = self.root / "lead_working.db"
+        full_output = self.root / "full_working.db"
+        lesson = (
+            "westu-sor", "2026-05-01", "4:00 PM", "Guitar", "Student", 1,
+            "Note", "2026-05-01T22:00:00", None, 4.0, "2026-05-01T22:05:00",
+        )
+        create_base_db(
+            production,
+            [("keep", *lesson), ("drop", *lesson), ("edit", *lesson)],
+        )
+        create_lead_source_db(proof)
+        rebuild_lead_working_db(production, proof, output)
+
+        conn = sqlite3.connect(production)
+        conn.execute("UPDATE reminders SET note_score = 9.5 WHERE lesson_id = 'edit'")
+        conn.execute("DELETE FROM reminders WHERE lesson_id = 'drop'")
+        conn.execute(
+            "INSERT INTO reminders (lesson_id, school, lesson_date) VALUES ('new', 'westu-sor', '2026-05-02')"
+        )
+        conn.commit()
+        conn.close()
+
+        summary = rebuild_lead_working_db(production, output, output, incremental=True)
+        rebuild_lead_working_db(production, proof, full_output)
+
+        self.assertEqual(summary["mode"], "incremental")
+        synced = {row["table"]: row for row in summary["synced_tables"]}
+        self.assertEqual(
+            [synced["reminders"][key] for key in ("inserted", "updated", "deleted")],
+            [1, 1, 1],
+        )
+        self.assertEqual(
+            [synced["call_logs"][key] for key in ("inserted", "updated", "deleted")],
+            [0, 0, 0],
+        )
+        for table in ("reminders", "hubspot_deals", "dialpad_call_reviews", "call_logs"):
+            query = f"SELECT * FROM {table} ORDER BY 1"
+            with sqlite3.connect(output) as left, sqlite3.connect(full_output) as right:
+                self.assertEqual(left.execute(query).fetchall(), right.execute(query).fetchall(), table)
+
+    def test_incremental_falls_back_to_full_rebuild_after_production_schema_change(self):
+        production = self.root / "production.db"
+        proof = self.root / "proof.db"
+        output = self.root / "lead_working.db"
+        create_base_db(production, [])
+        create_lead_source_db(proof)
+        rebuild_lead_working_db(production, proof, output)
+
+        conn = sqlite3.connect(production)
+        conn.execute("CREATE TABLE lesson_feedback (id INTEGER PRIMARY KEY, body TEXT)")
+        conn.commit()
+        conn.close()
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            summary = rebuild_lead_working_db(production, output, output, incremental=True)
+
+        self.assertEqual(summary["mode"], "full")
+        conn = sqlite3.connect(output)
+        self.addCleanup(conn.close)
+        self.assertIsNotNone(
+            conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'lesson_feedback'").fetchone()
+        )
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM hubspot_deals").fetchone()[0], 1)
+
     def test_output_cannot_be_production_db(self):
         production = self.root / "production.db"
         proof = self.root / "proof.db"
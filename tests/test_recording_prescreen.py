@@ -0,0 +1,190 @@
+import shutil
+import sqlite3
+import tempfile
+import unittest
+import wave
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from notesreminder.transcription.prescreen import (
+    decode_audio,
+    ensure_prescreen_schema,
+    prescreen_file,
+    recordable_skips,
+    release_duplicates,
+    skip_reason,
+    transcription_queue,
+    write_trimmed_audio,
+    write_trimmed_wav,
+)
+
+RATE = 8000
+
+
+def speech_like(seconds, seed, lead_silence=0.0, tail_silence=0.0):
+    """Bursts of noise-modulated harmonics separated by pauses, over a faint noise floor."""
+    rng = np.random.default_rng(seed)
+    total = int((lead_silence + seconds + tail_silence) * RATE)
+    samples = rng.normal(0, 0.0005, total)
+    start = int(lead_silence * RATE)
+    t = np.arange(int(seconds * RATE)) / RATE
+    pitch = 120 + 40 * np.sin(2 * np.pi * 0.7 * t + seed)
+    voiced = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+    envelope = (np.sin(2 * np.pi * 2.5 * t + seed) > -0.2).astype(float)
+    samples[start : start + len(t)] += 0.3 * voiced * envelope * (1 + 0.3 * rng.normal(size=len(t)))
+    return samples
+
+
+def write_wav(path, samples, rate=RATE):
+    with wave.open(str(path), "wb") as handle:
+        handle.setnchannels(1)
+        handle.setsampwidth(2)
+        handle.setframerate(rate)
+        handle.writeframes((np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes())
+    return path
+
+
+class RecordingPrescreenTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.conn = sqlite3.connect(":memory:")
+        self.addCleanup(self.conn.close)
+
+    def wav(self, name, samples):
+        return write_wav(self.dir / f"{name}.wav", samples)
+
+    def test_silent_short_and_speech_verdicts(self):
+        rng = np.random.default_rng(0)
+        quiet = self.wav("quiet", rng.normal(0, 0.0008, RATE * 20))
+        short = self.wav("short", speech_like(1.5, seed=1))
+        speech = self.wav("speech", speech_like(12, seed=2))
+
+        queue, skipped = transcription_queue(self.conn, [quiet, short, speech])
+
+        self.assertEqual([item.call_id for item in queue], ["speech"])
+        verdicts = {row["call_id"]: row["verdict"] for row in skipped}
+        self.assertEqual(verdicts, {"quiet": "silent", "short": "too_short"})
+        self.assertTrue(skip_reason(skipped[0]).startswith("prescreen: "))
+
+    def test_leading_and_trailing_silence_is_trimmed(self):
+        path = self.wav("padded", speech_like(10, seed=3, lead_silence=4, tail_silence=6))
+
+        queue, _ = transcription_queue(self.conn, [path])
+
+        item = queue[0]
+        self.assertTrue(item.trimmed)
+        self.assertAlmostEqual(item.trim_start_s, 3.7, delta=0.5)
+        self.assertAlmostEqual(item.trim_end_s, 14.3, delta=0.8)
+
+        clip = write_trimmed_wav(path, item, self.dir / "clip.wav")
+        with wave.open(str(clip), "rb") as handle:
+            self.assertEqual(handle.getframerate(), 16000)
+            self.assertAlmostEqual(handle.getnframes() / 16000, item.trim_end_s - item.trim_start_s, delta=0.01)
+
+    def test_trimmed_upload_falls_back_to_the_original_when_too_big(self):
+        path = self.wav("padded", speech_like(10, seed=3, lead_silence=4, tail_silence=6))
+        item = transcription_queue(self.conn, [path])[0][0]
+
+        with mock.patch("notesreminder.transcription.prescreen.shutil.which", return_value=None):
+            self.assertEqual(write_trimmed_audio(path, item, self.dir).suffix, ".wav")
+            # 16 kHz 16-bit WAV of the ~10.6 s span is ~340 KB.
+            self.assertEqual(write_trimmed_audio(path, item, self.dir, max_bytes=100_000), path)
+
+    @unittest.skipIf(shutil.which("ffmpeg") is None, "ffmpeg not installed")
+    def test_trimmed_upload_is_compressed_with_ffmpeg(self):
+        path = self.wav("padded", speech_like(10, seed=3, lead_silence=4, tail_silence=6))
+        item = transcription_queue(self.conn, [path])[0][0]
+
+        clip = write_trimmed_audio(path, item, self.dir)
+
+        self.assertEqual(clip.suffix, ".mp3")
+        self.assertLess(clip.stat().st_size, 80_000)
+
+    def test_limit_stops_screening_once_enough_are_queued(self):
+        rng = np.random.default_rng(0)
+        paths = [
+            self.wav("a-quiet", rng.normal(0, 0.0008, RATE * 5)),
+            self.wav("b-speech", speech_like(6, seed=11)),
+            self.wav("c-speech", speech_like(6, seed=12)),
+            self.wav("d-speech", speech_like(6, seed=13)),
+        ]
+
+        queue, skipped = transcription_queue(self.conn, paths, limit=2)
+
+        self.assertEqual([item.call_id for item in queue], ["b-speech", "c-speech"])
+        self.assertEqual([row["call_id"] for row in skipped], ["a-quiet"])
+        screened = [row[0] for row in self.conn.execute("SELECT call_id FROM recording_prescreen ORDER BY call_id")]
+        self.assertEqual(screened, ["a-quiet", "b-speech", "c-speech"])
+
+    def test_failed_original_releases_its_skipped_duplicates(self):
+        original = speech_like(15, seed=4)
+        first = self.wav("a-first", original)
+        copy = self.wav("b-copy", 0.6 * original)
+        transcription_queue(self.conn, [first, copy])
+        self.conn.execute("CREATE TABLE recording_transcripts (call_id TEXT PRIMARY KEY, transcript_status TEXT, error_message TEXT)")
+        self.conn.execute("INSERT INTO recording_transcripts VALUES ('b-copy', 'skipped', 'prescreen: duplicate of a-first')")
+
+        self.assertEqual(release_duplicates(self.conn, "a-first"), ["b-copy"])
+
+        status = self.conn.execute("SELECT transcript_status FROM recording_transcripts WHERE call_id = 'b-copy'").fetchone()
+        self.assertEqual(status[0], "pending")
+        queue, skipped = transcription_queue(self.conn, [copy])
+        self.assertEqual(([item.call_id for item in queue], skipped), (["b-copy"], []))
+        self.assertEqual(release_duplicates(self.conn, "a-first"), [])
+
+    def test_completed_transcripts_are_not_marked_skipped(self):
+        skipped = [{"call_id": "done"}, {"call_id": "new"}]
+        self.assertEqual(recordable_skips(self.conn, skipped), skipped)
+        self.conn.execute("CREATE TABLE recording_transcripts (call_id TEXT PRIMARY KEY, transcript_status TEXT)")
+        self.conn.execute("INSERT INTO recording_transcripts VALUES ('done', 'completed')")
+        self.assertEqual(recordable_skips(self.conn, skipped), [{"call_id": "new"}])
+
+    def test_rescaled_copy_is_flagged_as_duplicate(self):
+        original = speech_like(15, seed=4)
+        first = self.wav("a-first", original)
+        copy = self.wav("b-copy", 0.6 * original + np.random.default_rng(9).normal(0, 0.002, len(original)))
+        other = self.wav("c-other", speech_like(15, seed=5))
+
+        queue, skipped = transcription_queue(self.conn, [first, copy, other])
+
+        self.assertEqual(sorted(item.call_id for item in queue), ["a-first", "c-other"])
+        self.assertEqual([(row["call_id"], row["duplicate_of"]) for row in skipped], [("b-copy", "a-first")])
+
+    def test_queue_is_shortest_first(self):
+        paths = [self.wav(name, speech_like(seconds, seed)) for name, seconds, seed in (("long", 20, 6), ("mid", 9, 7), ("brief", 5, 8))]
+
+        queue, _ = transcription_queue(self.conn, paths)
+
+        self.assertEqual([item.call_id for item in queue], ["brief", "mid", "long"])
+
+    def test_unchanged_files_reuse_stored_analysis(self):
+        ensure_prescreen_schema(self.conn)
+        path = self.wav("cached", speech_like(8, seed=10))
+        first = prescreen_file(self.conn, "cached", path)
+        self.conn.execute("UPDATE recording_prescreen SET verdict = 'silent' WHERE call_id = 'cached'")
+
+        self.assertEqual(prescreen_file(self.conn, "cached", path)["verdict"], "silent")
+
+        self.wav("cached", speech_like(9, seed=10))
+        self.assertEqual(prescreen_file(self.conn, "cached", path)["verdict"], first["verdict"])
+
+    def test_undecodable_file_stays_in_queue(self):
+        path = self.dir / "broken.wav"
+        path.write_bytes(b"not audio")
+
+        queue, skipped = transcription_queue(self.conn, [path])
+
+        self.assertEqual(skipped, [])
+        self.assertEqual([(item.call_id, item.trimmed) for item in queue], [("broken", False)])
+
+    def test_wav_is_resampled_on_decode(self):
+        path = write_wav(self.dir / "hi.wav", np.zeros(16000 * 2), rate=16000)
+        self.assertEqual(len(decode_audio(path)), RATE * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
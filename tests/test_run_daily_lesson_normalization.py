@@ -14,3 +14,46 @@ def test_should_skip_lesson_accepts_nan_instructor_and_lesson_type():
 def test_should_skip_lesson_still_filters_admin_and_non_person_instructors():
     assert should_skip_lesson("Admin Meeting", "", "Teacher") is True
     assert should_skip_lesson("Guitar Lesson", "Student Name", "---") is True
+
+
+def test_update_reminders_inserts_new_lessons():
+    import sqlite3
+
+    from run_daily import update_reminders_from_dataframe
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        """
+        CREATE TABLE reminders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, lesson_id TEXT UNIQUE, school TEXT,
+            instructor_name TEXT, lesson_date TEXT, lesson_time TEXT, lesson_type TEXT,
+            students TEXT, location TEXT, note_completed INTEGER, attendance_status TEXT,
+            notes_text TEXT, note_timestamp TEXT, note_status TEXT, pike13_lesson_id TEXT,
+            note_score REAL, note_score_explanation TEXT, note_score_model TEXT,
+            note_score_version TEXT, note_score_updated_at TEXT, note_score_hash TEXT,
+            last_checked TEXT
+        )
+        """
+    )
+    frame = pd.DataFrame(
+        [
+            {
+                "Lesson ID": "123",
+                "Instructor": "Teacher One",
+                "Date": "2026-05-01",
+                "Time": "4:00 PM",
+                "Lesson Type": "Private Lesson",
+                "Students": "Student One",
+                "Notes": "Worked on scales.",
+                "Attendance Status": "present",
+            }
+        ]
+    )
+
+    counts = update_reminders_from_dataframe(conn, frame, "westu-sor")
+
+    assert counts["rows_inserted"] == 1
+    row = conn.execute("SELECT lesson_id, notes_text, last_checked FROM reminders").fetchone()
+    assert row[0] == "westu-sor-123"
+    assert row[1] == "Worked on scales."
+    assert row[2] is not None
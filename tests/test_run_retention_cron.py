@@ -12,9 +12,10 @@ def test_refresh_sources_collects_60_day_late_cancel_window(monkeypatch):
     monkeypatch.setattr(run_retention_cron, "run_step", capture)
     run_retention_cron.refresh_sources(date(2026, 7, 19))
 
-    late = [command for label, command, _ in calls if label == "REFRESH LATE-CANCELLATION SHADOW SOURCE"]
-    assert len(late) == 1
-    assert late[0][-4:] == ["--start-date", "2026-05-21", "--end-date", "2026-07-19"]
+    bundle = [command for label, command, _ in calls if label == "REFRESH PIKE13 MEMBERS, HOLDS AND LATE CANCELLATIONS"]
+    assert len(bundle) == 1
+    assert "scrape_pike13_bundle.py" in bundle[0]
+    assert bundle[0][-4:] == ["--as-of", "2026-07-19", "--late-cancel-start", "2026-05-21"]
 
 
 def test_generate_shadow_is_explicitly_separate_from_actionable_report(tmp_path, monkeypatch):
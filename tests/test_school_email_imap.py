@@ -0,0 +1,268 @@
+import re
+import socketserver
+import sqlite3
+import threading
+import unittest
+from email.message import EmailMessage
+
+from lead_followup_schema import ensure_lead_followup_schema, upsert_school_email_message
+from notesreminder.extractors.school_email_imap import (
+    connect_imap,
+    load_watermark,
+    imap_message_key,
+    parse_message,
+    sync_mailbox,
+)
+
+
+def build_message(uid, from_email, subject, body, to_email="huscott@schoolofrock.com"):
+    message = EmailMessage()
+    message["From"] = from_email
+    message["To"] = to_email
+    message["Subject"] = subject
+    message["Date"] = f"Mon, 0{uid % 9 + 1} Jun 2026 10:00:00 -0500"
+    message["Message-ID"] = f"<msg-{uid}@example.test>"
+    message.set_content(body)
+    return message.as_bytes()
+
+
+class LocalImapServer(socketserver.ThreadingTCPServer):
+    """Minimal IMAP4rev1 stand-in: LOGIN, EXAMINE/SELECT, UID SEARCH, UID FETCH, LOGOUT."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, messages, uidvalidity=42):
+        super().__init__(("127.0.0.1", 0), LocalImapHandler)
+        self.messages = dict(messages)
+        self.uidvalidity = uidvalidity
+        self.commands = []
+
+
+class LocalImapHandler(socketserver.StreamRequestHandler):
+    def send(self, text):
+        self.wfile.write(text.encode() if isinstance(text, str) else text)
+
+    def handle(self):
+        server = self.server
+        self.send("* OK IMAP4rev1 stand-in ready\r\n")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            parts = line.decode().strip().split(" ")
+            tag, command, args = parts[0], parts[1].upper(), parts[2:]
+            server.commands.append(" ".join([command, *args]))
+            if command == "CAPABILITY":
+                self.send("* CAPABILITY IMAP4rev1\r\n")
+            elif command in ("SELECT", "EXAMINE"):
+                uids = sorted(server.messages)
+                self.send(f"* {len(uids)} EXISTS\r\n")
+                self.send(f"* OK [UIDVALIDITY {server.uidvalidity}] UIDs valid\r\n")
+            elif command == "UID" and args[0].upper() == "SEARCH":
+                start = int(re.match(r"(\d+):\*", args[-1]).group(1))
+                uids = sorted(server.messages)
+                matches = [uid for uid in uids if uid >= start] or uids[-1:]
+                self.send("* SEARCH " + " ".join(str(uid) for uid in matches) + "\r\n")
+            elif command == "UID" and args[0].upper() == "FETCH":
+                for uid in self._expand(args[1]):
+                    raw = server.messages.get(uid)
+                    if raw is None:
+                        continue
+                    seq = sorted(server.messages).index(uid) + 1
+                    self.send(
+                        f'* {seq} FETCH (UID {uid} INTERNALDATE "01-Jun-2026 10:00:00 -0500" BODY[] {{{len(raw)}}}\r\n'
+                    )
+                    self.send(raw)
+                    self.send(")\r\n")
+            elif command == "LOGOUT":
+                self.send("* BYE\r\n")
+                self.send(f"{tag} OK LOGOUT completed\r\n")
+                return
+            self.send(f"{tag} OK {command} completed\r\n")
+
+    @staticmethod
+    def _expand(uid_set):
+        uids = []
+        for part in uid_set.split(","):
+            if ":" in part:
+                low, high = part.split(":")
+                uids.extend(range(int(low), int(high) + 1))
+            else:
+                uids.append(int(part))
+        return uids
+
+
+class SchoolEmailImapTests(unittest.TestCase):
+    def start_server(self, messages, uidvalidity=42):
+        server = LocalImapServer(messages, uidvalidity)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def connect(self, server):
+        client = connect_imap("127.0.0.1", "user", "secret", port=server.server_address[1], use_ssl=False)
+        self.addCleanup(client.logout)
+        return client
+
+    def open_db(self):
+        conn = sqlite3.connect(":memory:")
+        conn.row_factory = sqlite3.Row
+        self.addCleanup(conn.close)
+        ensure_lead_followup_schema(conn)
+        return conn
+
+    def test_sync_stores_customer_mail_and_skips_notifications(self):
+        server = self.start_server(
+            {
+                3: build_message(3, "parent@example.com", "Question about lessons", "Call me at 713-555-0100"),
+                5: build_message(5, "no-reply@pike13.com", "Jamie booked you for Guitar", "Booking"),
+                8: build_message(
+                    8, "huscott@schoolofrock.com", "Re: Question about lessons", "Sure!", to_email="parent@example.com"
+                ),
+            }
+        )
+        conn = self.open_db()
+
+        stats = sync_mailbox(conn, self.connect(server), batch_size=2)
+
+        self.assertEqual(stats["new_uids"], 3)
+        self.assertEqual(stats["stored"], 2)
+        self.assertEqual(stats["skipped"], 1)
+        self.assertEqual(stats["batches"], 2)
+        self.assertEqual(load_watermark(conn, "sor", "INBOX"), (42, 8))
+        rows = {
+            row["message_id"]: row
+            for row in conn.execute("SELECT * FROM school_email_messages ORDER BY message_id").fetchall()
+        }
+        inbound, outbound = "sor-mid-msg-3@example.test", "sor-mid-msg-8@example.test"
+        self.assertEqual(set(rows), {inbound, outbound})
+        self.assertEqual(rows[inbound]["direction"], "inbound")
+        self.assertEqual(rows[inbound]["external_email_normalized"], "parent@example.com")
+        self.assertIn("713-555-0100", rows[inbound]["raw_json"])
+        self.assertEqual(rows[outbound]["direction"], "outbound")
+        self.assertEqual(rows[outbound]["external_email_normalized"], "parent@example.com")
+        fetches = [command for command in server.commands if command.startswith("UID FETCH")]
+        self.assertEqual(len(fetches), 2)
+
+    def test_second_sync_fetches_only_messages_above_watermark(self):
+        server = self.start_server({1: build_message(1, "a@example.com", "Hello", "first")})
+        conn = self.open_db()
+        sync_mailbox(conn, self.connect(server))
+
+        server.messages[2] = build_message(2, "b@example.com", "Hello again", "second")
+        server.commands.clear()
+        stats = sync_mailbox(conn, self.connect(server))
+
+        self.assertEqual(stats["new_uids"], 1)
+        self.assertEqual(stats["stored"], 1)
+        self.assertIn("UID FETCH 2 (UID INTERNALDATE BODY.PEEK[])", server.commands)
+
+        server.commands.clear()
+        stats = sync_mailbox(conn, self.connect(server))
+        self.assertEqual(stats["new_uids"], 0)
+        self.assertFalse(any(command.startswith("UID FETCH") for command in server.commands))
+        self.assertEqual(load_watermark(conn, "sor", "INBOX"), (42, 2))
+
+    def test_uidvalidity_change_resets_watermark(self):
+        server = self.start_server({7: build_message(7, "a@example.com", "Hello", "first")})
+        conn = self.open_db()
+        sync_mailbox(conn, self.connect(server))
+
+        server.uidvalidity = 99
+        # The renumbered mailbox reuses UID 7 for a different message.
+        server.messages = {7: build_message(1, "c@example.com", "Renumbered", "body")}
+        stats = sync_mailbox(conn, self.connect(server))
+
+        self.assertTrue(stats["uidvalidity_reset"])
+        self.assertEqual(stats["stored"], 1)
+        self.assertEqual(load_watermark(conn, "sor", "INBOX"), (99, 7))
+        subjects = [row[0] for row in conn.execute("SELECT subject FROM school_email_messages ORDER BY subject")]
+        self.assertEqual(subjects, ["Hello", "Renumbered"])
+
+    def test_sync_reuses_rows_the_himalaya_extractor_already_stored(self):
+        conn = self.open_db()
+        legacy = {
+            "thread_id": None,
+            "school_mailbox": "huscott@schoolofrock.com",
+            "school": None,
+            "direction": "inbound",
+            "from_email": "parent@example.com",
+            "from_email_normalized": "parent@example.com",
+            "to_emails": "[]",
+            "to_emails_normalized": "[]",
+            "cc_emails": "[]",
+            "cc_emails_normalized": "[]",
+            "external_email_normalized": "parent@example.com",
+            "snippet": "",
+            "body": "",
+            "source_url": None,
+            "updated_at": "2026-06-10T00:00:00+00:00",
+        }
+        # Same instant as the IMAP Date header, in UTC and to the minute as Himalaya lists it.
+        upsert_school_email_message(
+            conn,
+            dict(
+                legacy,
+                message_id="sor-101",
+                message_at="2026-06-04T15:00:00+00:00",
+                subject="Question about lessons",
+                raw_text="From: parent@example.com\n\nCall me",
+                raw_json='{"himalaya_id": "101", "phones": []}',
+            ),
+        )
+        # A different send time, but the raw headers carry the Message-ID.
+        upsert_school_email_message(
+            conn,
+            dict(
+                legacy,
+                message_id="sor-102",
+                message_at="2026-06-01T09:00:00+00:00",
+                subject="Schedule",
+                raw_text="Message-ID: <msg-7@example.test>\n\nSee you",
+                raw_json='{"himalaya_id": "102", "phones": []}',
+            ),
+        )
+        conn.commit()
+        server = self.start_server(
+            {
+                3: build_message(3, "parent@example.com", "Question about lessons", "Call me"),
+                7: build_message(7, "parent@example.com", "Schedule", "See you"),
+                9: build_message(9, "parent@example.com", "Question about lessons", "Another week"),
+            }
+        )
+
+        sync_mailbox(conn, self.connect(server))
+        server.uidvalidity = 99
+        sync_mailbox(conn, self.connect(server))
+
+        keys = [row[0] for row in conn.execute("SELECT message_id FROM school_email_messages ORDER BY message_id")]
+        self.assertEqual(keys, ["sor-101", "sor-102", "sor-mid-msg-9@example.test"])
+        raw_json = conn.execute("SELECT raw_json FROM school_email_messages WHERE message_id = 'sor-101'").fetchone()[0]
+        self.assertIn("msg-3@example.test", raw_json)
+
+    def test_message_keys_without_message_id_include_mailbox_and_uidvalidity(self):
+        self.assertEqual(imap_message_key("sor", "INBOX", 42, 7), "sor-INBOX-42-7")
+        self.assertNotEqual(imap_message_key("sor", "INBOX", 99, 7), imap_message_key("sor", "INBOX", 42, 7))
+        self.assertNotEqual(imap_message_key("sor", "Sent", 42, 7), imap_message_key("sor", "INBOX", 42, 7))
+        self.assertEqual(imap_message_key("sor", "Sent", 1, 2, " <a@b> "), "sor-mid-a@b")
+
+    def test_parse_message_prefers_plain_text_part(self):
+        message = EmailMessage()
+        message["From"] = "Parent <Parent@Example.com>"
+        message["To"] = "huscott@schoolofrock.com"
+        message["Subject"] = "Drums"
+        message.set_content("Plain body")
+        message.add_alternative("<p>Html body</p>", subtype="html")
+
+        row = parse_message(11, message.as_bytes(), uidvalidity=42)
+
+        self.assertEqual(row["message_id"], "sor-INBOX-42-11")
+        self.assertEqual(row["from_email_normalized"], "parent@example.com")
+        self.assertEqual(row["snippet"], "Plain body")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from notesreminder.lib.scrape_diagnostics import DiagnosticsPolicy, ScrapeDiagnostics
+
+
+class FakeTracing:
+    def __init__(self, chunk_bytes=100):
+        self.calls = []
+        self.chunk_bytes = chunk_bytes
+
+    async def start(self, **kwargs):
+        self.calls.append(("start", kwargs))
+
+    async def start_chunk(self, title=None):
+        self.calls.append(("start_chunk", title))
+
+    async def stop_chunk(self, path=None):
+        self.calls.append(("stop_chunk", path))
+        if path:
+            Path(path).write_bytes(b"z" * self.chunk_bytes)
+
+    async def stop(self, path=None):
+        self.calls.append(("stop", path))
+
+
+class FakeContext:
+    def __init__(self, chunk_bytes=100):
+        self.tracing = FakeTracing(chunk_bytes)
+
+
+class FakePage:
+    def __init__(self):
+        self.options = []
+
+    async def screenshot(self, **kwargs):
+        self.options.append(kwargs)
+        return b"img"
+
+
+def run_steps(diag, outcomes, context=None, page=None):
+    page = page or FakePage()
+
+    async def scenario():
+        await diag.start(context or FakeContext())
+        for label, failed in outcomes:
+            await diag.begin_step(label)
+            await diag.screenshot(page, f"screenshots/{label}.png", full_page=True)
+            if failed:
+                diag.fail()
+        await diag.stop()
+
+    asyncio.run(scenario())
+    return page
+
+
+def names(diag):
+    return sorted(path.name for path in diag.written)
+
+
+def test_on_failure_keeps_only_failed_steps_with_ring_buffer(tmp_path):
+    policy = DiagnosticsPolicy(mode="on-failure", ring_size=2)
+    diag = ScrapeDiagnostics(policy, output_dir=tmp_path)
+    context = FakeContext()
+    page = run_steps(diag, [("a", False), ("b", False), ("c", False), ("d", True)], context=context)
+
+    # The ring holds the last two captures; the failed step's trace chunk is saved.
+    assert names(diag) == ["c.jpg", "d.jpg", "trace_d.zip"]
+    assert ("stop_chunk", None) in context.tracing.calls
+    assert context.tracing.calls[0] == ("start", {"screenshots": False, "snapshots": True, "sources": False})
+    assert page.options[0]["type"] == "jpeg"
+
+
+def test_sampled_keeps_successes_at_the_sample_rate(tmp_path):
+    draws = iter([0.5, 0.01])
+    diag = ScrapeDiagnostics(DiagnosticsPolicy(mode="sampled", sample_rate=0.05), output_dir=tmp_path, sample=lambda: next(draws))
+    run_steps(diag, [("a", False), ("b", False)])
+    assert names(diag) == ["a.jpg", "b.jpg", "trace_b.zip"]
+
+
+def test_off_records_nothing_and_always_writes_everything(tmp_path):
+    off = ScrapeDiagnostics(DiagnosticsPolicy(mode="off"), output_dir=tmp_path / "off")
+    context = FakeContext()
+    page = run_steps(off, [("a", True)], context=context)
+    assert off.written == [] and context.tracing.calls == [] and page.options == []
+
+    always = ScrapeDiagnostics(DiagnosticsPolicy(mode="always"), output_dir=tmp_path / "always")
+    run_steps(always, [("a", False), ("b", False)])
+    assert names(always) == ["a.png", "b.png", "trace_a.zip", "trace_b.zip"]
+
+
+def test_size_caps_drop_oversized_traces_and_stop_at_run_budget(tmp_path):
+    policy = DiagnosticsPolicy(mode="always", max_trace_bytes=50, max_total_bytes=5)
+    diag = ScrapeDiagnostics(policy, output_dir=tmp_path)
+    run_steps(diag, [("a", False), ("b", False)], context=FakeContext(chunk_bytes=100))
+
+    assert names(diag) == ["a.png"]
+    assert sorted(diag.dropped) == ["b.png", "trace_a.zip", "trace_b.zip"]
+    assert not (tmp_path / "trace_a.zip").exists()
+
+
+def test_policy_reads_env_and_rejects_unknown_modes(monkeypatch):
+    monkeypatch.setenv("NOTES_SCRAPE_DIAGNOSTICS", "sampled")
+    monkeypatch.setenv("NOTES_SCRAPE_TRACE_MAX_MB", "1")
+    policy = DiagnosticsPolicy.coerce(None)
+    assert (policy.mode, policy.max_trace_bytes) == ("sampled", 1024 * 1024)
+    assert DiagnosticsPolicy.coerce("always").mode == "always"
+    with pytest.raises(ValueError, match="Unknown diagnostics mode"):
+        DiagnosticsPolicy(mode="verbose")
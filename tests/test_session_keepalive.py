@@ -0,0 +1,212 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+from notesreminder.lib.session_keepalive import (
+    SiteProbe,
+    apply_refresh,
+    classify_probe,
+    cookie_ttl_seconds,
+    keepalive_pass,
+    needs_pike13_refresh,
+    read_status,
+    record_pass_error,
+    status_summary,
+)
+
+
+SITES = (
+    SiteProbe("pike13-westu", "https://westu-sor.pike13.com/today", "pike13", ("cwr_u",)),
+    SiteProbe("hubspot", "https://app.hubspot.com/home-beta", "okta"),
+)
+
+
+class FakeResponse:
+    def __init__(self, status, location="", body=""):
+        self.status = status
+        self.headers = {"location": location} if location else {}
+        self.body = body
+
+    async def text(self):
+        return self.body
+
+
+class FakeRequest:
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+
+    async def get(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        return self.responses[url]
+
+
+class FakeContext:
+    def __init__(self, responses, cookies):
+        self.request = FakeRequest(responses)
+        self.cookie_map = cookies
+        self.saved = []
+
+    async def cookies(self, url):
+        return self.cookie_map.get(url, [])
+
+    async def storage_state(self, path):
+        self.saved.append(path)
+        with open(path, "w") as handle:
+            json.dump({"cookies": []}, handle)
+
+
+def test_classify_probe_uses_status_and_redirect_target():
+    assert classify_probe(200) == "authenticated"
+    assert classify_probe(302, "https://westu-sor.pike13.com/accounts/sign_in") == "needs_login"
+    assert classify_probe(302, "https://westu-sor.pike13.com/today#/") == "authenticated"
+    assert classify_probe(200, body='<input id="okta-signin-username">') == "needs_login"
+    assert classify_probe(401) == "needs_login"
+    assert classify_probe(403) == "blocked"
+    assert classify_probe(502) == "error"
+
+
+def test_cookie_ttl_ignores_session_cookies():
+    now = 1_000_000.0
+    assert cookie_ttl_seconds([{"expires": -1}, {"expires": now + 9000}, {"expires": now + 7200}], now=now) == 7200
+    assert cookie_ttl_seconds([{"expires": -1}], now=now) is None
+
+
+def test_cookie_ttl_ignores_short_lived_tracking_cookies():
+    now = 1_000_000.0
+    cookies = [
+        {"name": "__cf_bm", "expires": now + 1800},
+        {"name": "_gat", "expires": now + 60},
+        {"name": "cwr_u", "expires": now + 30 * 86400},
+    ]
+    assert cookie_ttl_seconds(cookies, now=now, names=("cwr_u",)) == 30 * 86400
+    assert cookie_ttl_seconds(cookies, now=now) == 30 * 86400
+    assert cookie_ttl_seconds(cookies[:2], now=now, names=("cwr_u",)) is None
+
+
+def test_refresh_follows_probe_status_and_auth_cookie_ttl():
+    def site(status, ttl):
+        return {"pike13-westu": {"kind": "pike13", "status": status, "ttl_seconds": ttl}}
+
+    assert needs_pike13_refresh(site("authenticated", 30 * 86400), 6 * 3600) is False
+    assert needs_pike13_refresh(site("authenticated", None), 6 * 3600) is False
+    assert needs_pike13_refresh(site("authenticated", 3600), 6 * 3600) is True
+    assert needs_pike13_refresh(site("needs_login", None), 6 * 3600) is True
+    assert needs_pike13_refresh(site("error", 3600), 6 * 3600) is False
+
+
+def test_pass_records_ttl_saves_storage_and_flags_refresh(tmp_path):
+    status_path = tmp_path / "status.json"
+    storage = tmp_path / "storage.json"
+    soon = time.time() + 3600
+    context = FakeContext(
+        {
+            SITES[0].url: FakeResponse(200),
+            SITES[1].url: FakeResponse(302, "https://app.hubspot.com/home-beta?x=1"),
+        },
+        {SITES[0].url: [{"name": "cwr_u", "expires": soon}, {"name": "__cf_bm", "expires": time.time() + 1800}]},
+    )
+    okta_flags = []
+    status = asyncio.run(
+        keepalive_pass(
+            context,
+            sites=SITES,
+            storage_state_path=storage,
+            status_path=status_path,
+            refresh_before_seconds=6 * 3600,
+            on_okta_status=okta_flags.append,
+        )
+    )
+
+    assert status["sites"]["pike13-westu"]["status"] == "authenticated"
+    assert 3500 < status["sites"]["pike13-westu"]["ttl_seconds"] <= 3600
+    assert status["refresh_due"] is True
+    assert storage.exists() and status["storage_state_saved_at"]
+    assert okta_flags == [True]
+    assert context.request.calls[0][1]["max_redirects"] == 0
+    assert read_status(status_path)["sites"].keys() == {"pike13-westu", "hubspot"}
+
+
+def test_logged_out_pass_keeps_last_good_storage_state(tmp_path):
+    storage = tmp_path / "storage.json"
+    storage.write_text('{"cookies": ["good"]}')
+    context = FakeContext(
+        {
+            SITES[0].url: FakeResponse(302, "https://westu-sor.pike13.com/accounts/sign_in"),
+            SITES[1].url: FakeResponse(200),
+        },
+        {},
+    )
+    okta_flags = []
+    status = asyncio.run(
+        keepalive_pass(
+            context,
+            sites=SITES,
+            storage_state_path=storage,
+            status_path=tmp_path / "status.json",
+            on_okta_status=okta_flags.append,
+        )
+    )
+    assert context.saved == [] and storage.read_text() == '{"cookies": ["good"]}'
+    assert status["refresh_due"] is True
+    assert okta_flags == [True]
+
+
+def test_apply_refresh_is_rate_limited(tmp_path):
+    status_path = tmp_path / "status.json"
+    calls = []
+
+    def refresh():
+        calls.append(1)
+        return {"started_at": datetime.now(timezone.utc).replace(microsecond=0).isoformat(), "ok": True}
+
+    status = apply_refresh({"refresh_due": True, "sites": {}}, status_path=status_path, refresh=refresh)
+    assert status["last_refresh"]["ok"] and not status["refresh_due"]
+    again = apply_refresh({**status, "refresh_due": True}, status_path=status_path, refresh=refresh)
+    assert len(calls) == 1 and again["refresh_due"]
+    assert read_status(status_path)["last_refresh"]["ok"]
+
+
+def test_status_summary_reports_remaining_ttl_and_staleness():
+    now = datetime(2026, 7, 1, 12, 0, tzinfo=timezone.utc)
+    status = {
+        "updated_at": (now - timedelta(hours=2)).isoformat(),
+        "sites": {
+            "pike13-westu": {
+                "status": "authenticated",
+                "checked_at": (now - timedelta(hours=2)).isoformat(),
+                "expires_at": (now + timedelta(hours=3)).isoformat(),
+            }
+        },
+    }
+    summary = status_summary(status, max_age_seconds=3600, now=now)
+    assert summary["stale"] is True
+    assert summary["sites"]["pike13-westu"] == {
+        "live": True,
+        "status": "authenticated",
+        "checked_at": (now - timedelta(hours=2)).isoformat(),
+        "ttl_seconds": 3 * 3600,
+    }
+    assert status_summary({}) == {"available": False}
+
+
+def test_failed_pass_is_recorded_and_staleness_follows_the_interval(tmp_path):
+    status_path = tmp_path / "status.json"
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    previous = {
+        "updated_at": now.isoformat(),
+        "sites": {"pike13-westu": {"status": "authenticated", "expires_at": None}},
+        "last_refresh": {"ok": True},
+    }
+    status_path.write_text(json.dumps(previous))
+
+    status = record_pass_error(RuntimeError("profile locked"), status_path, interval_seconds=7200)
+
+    assert status["sites"]["pike13-westu"]["status"] == "error"
+    assert status["pass_error"] == "RuntimeError: profile locked"
+    assert status["last_refresh"] == {"ok": True} and status["refresh_due"] is False
+    summary = status_summary(read_status(status_path), now=now + timedelta(hours=3))
+    assert summary["sites"]["pike13-westu"]["live"] is False
+    assert summary["stale"] is False
+    assert status_summary(read_status(status_path), now=now + timedelta(hours=5))["stale"] is True
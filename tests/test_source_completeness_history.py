@@ -0,0 +1,83 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from lead_followup_schema import ensure_lead_followup_schema, utc_now_iso
+from source_completeness import build_source_completeness_report, source_completeness_trend
+
+
+class SourceCompletenessHistoryTests(unittest.TestCase):
+    def open_db(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        conn = sqlite3.connect(Path(tmp.name) / "test.db")
+        self.addCleanup(conn.close)
+        conn.row_factory = sqlite3.Row
+        conn.execute(
+            """
+            CREATE TABLE call_logs (
+                call_id TEXT PRIMARY KEY, external_number TEXT, date_started TEXT, direction TEXT,
+                category TEXT, name TEXT, school_code TEXT, school_name TEXT,
+                voicemail_transcript TEXT, voicemail_recording_url TEXT, recording_url TEXT
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE recording_transcripts (
+                call_id TEXT PRIMARY KEY, recording_url TEXT, transcript_text TEXT, outcome TEXT, summary TEXT
+            )
+            """
+        )
+        ensure_lead_followup_schema(conn)
+        return conn
+
+    def add_deal(self, conn, deal_id, create_date="2026-04-20"):
+        conn.execute(
+            """
+            INSERT INTO hubspot_deals (deal_id, deal_name, stage, school, create_date, source_url, raw_text, updated_at)
+            VALUES (?, 'Sample | West U', 'New Lead', 'West U', ?, 'https://hubspot/deal', 'raw', ?)
+            """,
+            (deal_id, create_date, utc_now_iso()),
+        )
+
+    def test_unchanged_sections_are_reused(self):
+        conn = self.open_db()
+        self.add_deal(conn, "deal-1")
+
+        first = build_source_completeness_report(conn, incremental=True)
+        self.assertEqual(first["cache"]["reused"], [])
+        self.assertIn("hubspot", first["cache"]["recomputed"])
+
+        second = build_source_completeness_report(conn, incremental=True)
+        self.assertEqual(
+            sorted(second["cache"]["reused"]),
+            ["dialpad", "first_value", "hubspot", "lead_gap", "matching", "pike13"],
+        )
+        self.assertEqual(second["sources"], first["sources"])
+
+        self.add_deal(conn, "deal-2", create_date="")
+        third = build_source_completeness_report(conn, incremental=True)
+        self.assertIn("hubspot", third["cache"]["recomputed"])
+        self.assertIn("dialpad", third["cache"]["reused"])
+        self.assertEqual(third["sources"]["hubspot"]["rows"], 2)
+        self.assertEqual(third["sources"]["hubspot"]["field_coverage"]["create_date"]["fill_rate"], 50.0)
+
+    def test_runs_are_appended_to_history(self):
+        conn = self.open_db()
+        self.add_deal(conn, "deal-1")
+        build_source_completeness_report(conn, incremental=True, record_history=True)
+        self.add_deal(conn, "deal-2", create_date="")
+        build_source_completeness_report(conn, incremental=True, record_history=True)
+
+        trend = source_completeness_trend(conn, "sources.hubspot.field_coverage.create_date.fill_rate")
+        self.assertEqual([point["value"] for point in trend], [100.0, 50.0])
+        statuses = source_completeness_trend(conn, "overall_status")
+        self.assertEqual(len(statuses), 2)
+        self.assertIsNone(statuses[0]["value"])
+        self.assertIn(statuses[0]["text_value"], {"ready", "partial", "blocked"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import sqlite3
+import unittest
+
+from source_completeness import profile_table, table_coverage
+
+
+class ProfileTableTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.addCleanup(self.conn.close)
+        self.conn.execute("CREATE TABLE events (name TEXT, happened_at TEXT, direction TEXT, kind TEXT)")
+        self.conn.executemany(
+            "INSERT INTO events VALUES (?, ?, ?, ?)",
+            [
+                ("a", "2026-01-02T10:00:00", "Inbound", "sms"),
+                ("", "01/02/2026", "outbound", "sms"),
+                (None, "not a date", "sideways", "call"),
+                ("d", None, None, "sms"),
+            ],
+        )
+        self.statements = []
+        self.conn.set_trace_callback(self.statements.append)
+
+    def test_counts_every_measure_in_one_statement(self):
+        profile = profile_table(
+            self.conn,
+            "events",
+            fields=("name", "happened_at"),
+            date_fields=("happened_at",),
+            value_fields={"direction": ("inbound", "outbound")},
+            where_sql="kind = :kind",
+            params={"kind": "sms"},
+            conditions={"missing_direction": "direction IS NULL OR direction = ''"},
+        )
+
+        self.assertEqual(len(self.statements), 1)
+        self.assertEqual(profile["total"], 3)
+        self.assertEqual(profile["filled"], {"name": 2, "happened_at": 2})
+        self.assertEqual(profile["valid_dates"], {"happened_at": 2})
+        self.assertEqual(profile["values"], {"direction": 2})
+        self.assertEqual(profile["conditions"], {"missing_direction": 1})
+
+    def test_table_coverage_reports_date_and_value_rates_over_fill_rates(self):
+        total, coverage = table_coverage(
+            self.conn,
+            "events",
+            ("name", "happened_at", "direction"),
+            date_fields=("happened_at",),
+            value_fields={"direction": ("inbound", "outbound")},
+        )
+
+        self.assertEqual(len(self.statements), 1)
+        self.assertEqual(total, 4)
+        self.assertEqual(coverage["name"], {"filled": 2, "total": 4, "fill_rate": 50.0})
+        self.assertEqual(coverage["happened_at"]["filled"], 2)
+        self.assertEqual(coverage["direction"]["filled"], 2)
+
+    def test_empty_table_profiles_to_zero(self):
+        self.conn.execute("DELETE FROM events")
+        total, coverage = table_coverage(self.conn, "events", ("name",))
+        self.assertEqual(total, 0)
+        self.assertEqual(coverage["name"]["filled"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
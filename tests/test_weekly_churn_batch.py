@@ -0,0 +1,108 @@
+import unittest
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+import generate_weekly_churn_email as churn
+
+
+TODAY = date(2026, 5, 11)
+
+
+def lessons_for(student, days_ago, instructors):
+    return [
+        {"student": student, "lesson_id": f"{student}-{i}", "lesson_date": pd.Timestamp(TODAY - timedelta(days=d)),
+         "school_id": 1, "instructor_id": instructor}
+        for i, (d, instructor) in enumerate(zip(days_ago, instructors))
+    ]
+
+
+class FakeScaler:
+    def transform(self, X):
+        return X
+
+
+class FakeModel:
+    def __init__(self):
+        self.batches = []
+
+    def predict_proba(self, X):
+        self.batches.append(X.shape)
+        p = np.clip(X[:, 0] / 100, 0, 1)
+        return np.column_stack([1 - p, p])
+
+
+class BatchFeatureTests(unittest.TestCase):
+    def setUp(self):
+        rows = (
+            lessons_for("ada", [3, 10, 17, 24, 31, 38, 80, 120], [1, 1, 2, 1, None, 1, 3, 3])
+            # A scheduled lesson after TODAY keeps the student active but is not a feature input.
+            + lessons_for("ben", [-7, 40, 47, 54, 61, 68, 75], [2, 2, 2, 2, 2, 2, 2])
+            + lessons_for("cy", [5, 12, 19], [1, 1, 1])  # fewer than 5 lessons
+            + lessons_for("dee", [100, 107, 114, 121, 128], [4, 4, 4, 4, 4])  # inactive
+        )
+        self.expanded = pd.DataFrame(rows)
+        self.notes = pd.DataFrame({"lesson_id": ["ada-0", "ada-1", "ben-2"], "note_score": [8.0, 6.0, 3.0]})
+        self.engagement = {"ada": {"comms_engagement_total": "4", "comms_engagement_avg_risk": "0.2"}}
+
+    def test_matrix_matches_per_student_features(self):
+        matrix = churn.build_feature_matrix(self.expanded, self.notes, self.engagement, TODAY)
+
+        self.assertEqual(list(matrix.index), ["ada", "ben"])
+        for name, group in self.expanded.groupby("student"):
+            if name not in matrix.index:
+                continue
+            expected = churn.compute_features(name, group, self.notes, self.engagement, TODAY)
+            row = matrix.loc[name]
+            for feature, value in expected.items():
+                self.assertTrue(np.isclose(float(row[feature]), float(value)), f"{name}.{feature}: {row[feature]} != {value}")
+        self.assertIsInstance(matrix.to_dict("index")["ada"]["max_gap_days"], int)
+
+    def test_predict_churn_scores_every_student_in_one_call(self):
+        model = FakeModel()
+        artifact = {"model": model, "scaler": FakeScaler(), "features": ["days_since_last", "total_lessons", "not_a_feature"]}
+        people = {"ada": {"full_name": "Ada Lovelace", "school": "West U", "membership": "Active"}}
+        original_today = churn.TODAY
+        churn.TODAY = TODAY
+        try:
+            predictions = churn.predict_churn(self.expanded, self.notes, people, self.engagement, artifact)
+        finally:
+            churn.TODAY = original_today
+
+        self.assertEqual(model.batches, [(2, 3)])
+        self.assertEqual(predictions["ada"]["name"], "Ada Lovelace")
+        self.assertEqual(predictions["ada"]["churn_probability"], 0.03)
+        self.assertEqual(predictions["ben"]["features"]["total_lessons"], 6)
+
+
+class EvidenceTests(unittest.TestCase):
+    def test_actions_and_talking_points_use_preloaded_evidence(self):
+        student_lessons = pd.DataFrame(
+            {
+                "student_key": ["ada", "ada", "ada"],
+                "lesson_id": ["l1", "l2", "l3"],
+                "lesson_date": ["2026-04-01", "2026-04-20", "2026-04-27"],
+                "lesson_type": ["Guitar", "Piano", "Piano"],
+                "instructor_id": [1, 2, 2],
+                "note_score": [9.0, 3.0, None],
+            }
+        )
+        lessons = pd.DataFrame({"lesson_id": ["l1", "l2", "l3"], "note_score_explanation": ["Great focus", None, None]})
+        instructors = pd.DataFrame({"instructor_id": [1, 2], "instructor_name": ["Sam", "Kai"]})
+
+        evidence = churn.build_student_evidence(student_lessons, lessons, instructors)
+
+        self.assertEqual(evidence["last_lesson"]["ada"], ("Piano", "2026-04-27", "Kai"))
+        feat = {"days_since_last": 3, "comms_engagement_total": 2, "comms_engagement_cancellation_rate": 0, "freq_decline_ratio": 1.0}
+        actions = churn.generate_actions(feat, {"full_name": "Ada"}, "ada", evidence)
+        self.assertEqual(len(actions), 1)
+        self.assertIn("scored 3/10", actions[0])
+        self.assertIn("Kai", actions[0])
+
+        points = churn.generate_return_talking_points({"name": "Ada", "days_on_hold": 40}, evidence)
+        self.assertEqual(points[:2], ["Last lesson: Piano with Kai on 2026-04-27", 'Note: "Great focus"'])
+
+
+if __name__ == "__main__":
+    unittest.main()
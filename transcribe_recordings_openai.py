@@ -1,5 +1,6 @@
 import argparse
 import sqlite3
+import tempfile
 import time
 from datetime import datetime, timezone
 from pathlib import Path
@@ -7,6 +8,14 @@ from pathlib import Path
 from dotenv import load_dotenv
 from openai import OpenAI
 
+from notesreminder.transcription.prescreen import (
+    recordable_skips,
+    release_duplicates,
+    skip_reason,
+    transcription_queue,
+    write_trimmed_audio,
+)
+
 
 load_dotenv()
 
@@ -159,7 +168,7 @@ def get_pending_downloads(conn, limit=None, force=False, call_ids=None):
         base_sql += f" AND d.call_id IN ({placeholders})"
         params.extend(call_ids)
     if not force:
-        base_sql += " AND (t.call_id IS NULL OR t.transcript_status != 'completed')"
+        base_sql += " AND (t.call_id IS NULL OR t.transcript_status NOT IN ('completed', 'skipped'))"
     base_sql += " ORDER BY d.downloaded_at"
     if limit:
         base_sql += " LIMIT ?"
@@ -167,6 +176,24 @@ def get_pending_downloads(conn, limit=None, force=False, call_ids=None):
     return conn.execute(base_sql, params).fetchall()
 
 
+def prescreen_rows(conn, rows, model_name, limit=None):
+    """Skip silent/short/duplicate recordings and order the rest shortest-first.
+
+    Returns ``(call_id, recording_url, file_path, queued)`` tuples; ``queued`` is
+    the prescreen item for files that exist (carrying trim bounds) or None.
+    With ``limit``, pre-screening stops once that many recordings are queued.
+    """
+    urls = {call_id: recording_url for call_id, recording_url, _ in rows}
+    existing = {Path(file_path): call_id for call_id, _, file_path in rows if Path(file_path).exists()}
+    queue, skipped = transcription_queue(conn, list(existing), call_id_for=existing.__getitem__, limit=limit)
+    for row in recordable_skips(conn, skipped):
+        save_result(conn, row["call_id"], urls[row["call_id"]], None, "skipped", skip_reason(row), model_name)
+    if skipped:
+        print(f"Pre-screen skipped {len(skipped)} silent/short/duplicate recording(s)")
+    missing = [(call_id, url, file_path, None) for call_id, url, file_path in rows if Path(file_path) not in existing]
+    return missing + [(item.call_id, urls[item.call_id], str(item.path), item) for item in queue]
+
+
 def parse_args():
     parser = argparse.ArgumentParser(
         description="Transcribe downloaded recordings with OpenAI Whisper."
@@ -203,9 +230,21 @@ def parse_args():
         default="",
         help="Comma-separated call_ids to process (overrides normal selection)",
     )
+    parser.add_argument(
+        "--no-prescreen",
+        action="store_true",
+        help="Upload every file as-is (no silence/duplicate skipping, trimming or shortest-first order)",
+    )
     return parser.parse_args()
 
 
+def record_failure(conn, call_id, recording_url, error_message, model_name):
+    save_result(conn, call_id, recording_url, None, "failed", error_message, model_name)
+    released = release_duplicates(conn, call_id)
+    if released:
+        print(f"Re-queued {len(released)} duplicate(s) of {call_id}: {', '.join(released)}")
+
+
 def main():
     args = parse_args()
     client = OpenAI()
@@ -214,37 +253,38 @@ def main():
     conn = sqlite3.connect(args.db)
     try:
         ensure_table(conn)
+        # With the pre-screen, --limit caps the recordings queued for upload
+        # (skipped ones do not count) and is applied inside the pre-screen.
         rows = get_pending_downloads(
             conn,
-            limit=args.limit or None,
+            limit=(args.limit or None) if args.no_prescreen else None,
             force=args.force,
             call_ids=call_ids or None,
         )
         if not rows:
             print("No recordings to transcribe.")
             return
-        for call_id, recording_url, file_path in rows:
+        if args.no_prescreen:
+            rows = [(call_id, recording_url, file_path, None) for call_id, recording_url, file_path in rows]
+        else:
+            rows = prescreen_rows(conn, rows, args.model, limit=args.limit or None)
+        for call_id, recording_url, file_path, queued in rows:
             path = Path(file_path)
             if not path.exists():
-                save_result(
-                    conn,
-                    call_id,
-                    recording_url,
-                    None,
-                    "failed",
-                    f"Missing file: {path}",
-                    args.model,
-                )
+                record_failure(conn, call_id, recording_url, f"Missing file: {path}", args.model)
                 continue
             if not claim_recording(conn, call_id, recording_url, args.model, args.force):
                 continue
             print(f"Transcribing {call_id}")
             try:
-                with path.open("rb") as f:
-                    result = client.audio.transcriptions.create(
-                        model=args.model,
-                        file=f,
-                    )
+                with tempfile.TemporaryDirectory() as tmp:
+                    if queued is not None and queued.trimmed:
+                        path = write_trimmed_audio(path, queued, Path(tmp))
+                    with path.open("rb") as f:
+                        result = client.audio.transcriptions.create(
+                            model=args.model,
+                            file=f,
+                        )
                 transcript_text = (result.text or "").strip()
                 save_result(
                     conn,
@@ -256,15 +296,7 @@ def main():
                     args.model,
                 )
             except Exception as exc:
-                save_result(
-                    conn,
-                    call_id,
-                    recording_url,
-                    None,
-                    "failed",
-                    str(exc),
-                    args.model,
-                )
+                record_failure(conn, call_id, recording_url, str(exc), args.model)
             if args.sleep:
                 time.sleep(args.sleep)
     finally:
@@ -1,9 +1,17 @@
 import argparse
-import math
 import sqlite3
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Iterable, List
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from notesreminder.transcription.prescreen import (
+    recordable_skips,
+    release_duplicates,
+    skip_reason,
+    transcription_queue,
+)
+
+WHISPER_SAMPLE_RATE = 16000
 
 
 def ensure_table(conn):
@@ -108,13 +116,14 @@ def claim_recording(conn, call_id, recording_url, model_name, force):
 
 
 def chunk_list(items: List[str], chunks: int) -> List[List[str]]:
+    """Deal items round-robin so a shortest-first queue gives every worker a similar load."""
     if chunks <= 1:
         return [items]
-    size = max(1, math.ceil(len(items) / chunks))
-    return [items[i : i + size] for i in range(0, len(items), size)]
+    chunks = min(chunks, max(1, len(items)))
+    return [items[i::chunks] for i in range(chunks)]
 
 
-def transcribe_files(file_list: Iterable[str], args):
+def transcribe_files(file_list: Iterable[str], args, trims: Optional[Dict[str, Tuple[float, float]]] = None):
     try:
         import whisper  # type: ignore
     except ImportError as exc:
@@ -140,8 +149,14 @@ def transcribe_files(file_list: Iterable[str], args):
                 continue
             print(f"Transcribing {call_id}")
             try:
+                audio = str(path)
+                if trims and call_id in trims:
+                    start, end = trims[call_id]
+                    audio = whisper.load_audio(str(path))[
+                        int(start * WHISPER_SAMPLE_RATE) : int(end * WHISPER_SAMPLE_RATE)
+                    ]
                 result = model.transcribe(
-                    str(path),
+                    audio,
                     language=args.language,
                     fp16=args.fp16,
                 )
@@ -171,6 +186,9 @@ def transcribe_files(file_list: Iterable[str], args):
                     str(exc),
                     args.model,
                 )
+                released = release_duplicates(conn, call_id)
+                if released:
+                    print(f"Re-queued {len(released)} duplicate(s) of {call_id}: {', '.join(released)}")
     finally:
         conn.close()
 
@@ -180,8 +198,9 @@ def filter_pending_files(db_path: str, file_list: List[str], force: bool) -> Lis
         return file_list
     conn = sqlite3.connect(db_path)
     try:
+        ensure_table(conn)
         rows = conn.execute(
-            "SELECT call_id FROM recording_transcripts WHERE transcript_status = 'completed'"
+            "SELECT call_id FROM recording_transcripts WHERE transcript_status IN ('completed', 'skipped')"
         ).fetchall()
     finally:
         conn.close()
@@ -189,6 +208,31 @@ def filter_pending_files(db_path: str, file_list: List[str], force: bool) -> Lis
     return [path for path in file_list if Path(path).stem not in completed]
 
 
+def prescreen_queue(db_path: str, file_list: List[str], model_name: str, limit: Optional[int] = None):
+    """Drop silent/short/duplicate recordings, order the rest shortest-first, and return trim bounds.
+
+    With ``limit``, files are screened only until that many are queued.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        ensure_table(conn)
+        queue, skipped = transcription_queue(conn, file_list, limit=limit)
+        for row in recordable_skips(conn, skipped):
+            save_result(
+                conn,
+                row["call_id"],
+                get_recording_url(conn, row["call_id"]),
+                None,
+                "skipped",
+                skip_reason(row),
+                model_name,
+            )
+    finally:
+        conn.close()
+    trims = {item.call_id: (item.trim_start_s, item.trim_end_s) for item in queue if item.trimmed}
+    return [str(item.path) for item in queue], trims, skipped
+
+
 def save_result(
     conn,
     call_id,
@@ -291,6 +335,11 @@ def parse_args():
         action="store_true",
         help="Re-transcribe even if a transcript already exists",
     )
+    parser.add_argument(
+        "--no-prescreen",
+        action="store_true",
+        help="Transcribe every file as-is (no silence/duplicate skipping, trimming or shortest-first order)",
+    )
     return parser.parse_args()
 
 
@@ -314,7 +363,12 @@ def main():
     files = sorted(recordings_dir.glob("*.*"))
     file_list = [str(path) for path in files]
     file_list = filter_pending_files(args.db, file_list, args.force)
-    if args.limit:
+    trims = {}
+    if not args.no_prescreen:
+        file_list, trims, skipped = prescreen_queue(args.db, file_list, args.model, limit=args.limit or None)
+        if skipped:
+            print(f"Pre-screen skipped {len(skipped)} silent/short/duplicate recording(s)")
+    elif args.limit:
         file_list = file_list[: args.limit]
     if args.verbose:
         print(f"Device: {args.device}")
@@ -327,7 +381,7 @@ def main():
         return
 
     if args.workers <= 1:
-        transcribe_files(file_list, args)
+        transcribe_files(file_list, args, trims)
         return
 
     from multiprocessing import get_context
@@ -335,7 +389,7 @@ def main():
     chunks = chunk_list(file_list, args.workers)
     ctx = get_context("spawn")
     with ctx.Pool(processes=args.workers) as pool:
-        pool.starmap(transcribe_files, [(chunk, args) for chunk in chunks])
+        pool.starmap(transcribe_files, [(chunk, args, trims) for chunk in chunks])
 
 
 if __name__ == "__main__":